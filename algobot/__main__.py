@@ -2,6 +2,7 @@
 Main Algobot application.
 """
 
+import csv
 import os
 import sys
 import time
@@ -38,6 +39,7 @@ from algobot.news_scraper import scrape_news
 from algobot.slots import initiate_slots
 from algobot.telegram_bot.bot import TelegramBot
 from algobot.threads import backtest_thread, bot_thread, optimizer_thread, worker_thread
+from algobot.trade_journal import TRADE_JOURNAL_HEADERS, TradeJournal, get_history_row, get_trade_journal_path
 from algobot.traders.backtester import Backtester
 from algobot.traders.real_trader import RealTrader
 from algobot.traders.simulation_trader import SimulationTrader
@@ -270,7 +272,7 @@ class Interface(QMainWindow):
         :param file_type: Type of file to export optimizer results to.
         """
         if self.optimizer:
-            if len(self.optimizer.optimizer_rows) > 0:
+            if self.optimizer.get_optimizer_row_count() > 0:
                 optimizer_folder_path = create_folder('Optimizer Results')
                 inner_path = os.path.join(optimizer_folder_path, self.optimizer.symbol)
                 create_folder_if_needed(inner_path, optimizer_folder_path)
@@ -1241,6 +1243,7 @@ class Interface(QMainWindow):
         This will update values from Binance.
         """
         if self.trader is not None:
+            self.trader.invalidate_account_snapshot()
             thread = worker_thread.Worker(self.trader.retrieve_margin_values)
             thread.signals.finished.connect(lambda: create_popup(self, 'Successfully updated values.'))
             thread.signals.error.connect(lambda x: create_popup(self, x))
@@ -1295,25 +1298,31 @@ class Interface(QMainWindow):
 
     def export_trades(self, caller):
         """
-        Export trade history to a CSV file.
+        Export trade history to a CSV file. If the caller has a trade journal, every journaled trade (including trades
+        from previous runs) is exported with a single query; otherwise, the trade history table is exported.
         :param caller: Caller that'll determine which trades get exported.
         """
         table = self.interface_dictionary[caller]['mainInterface']['historyTable']
         label = self.interface_dictionary[caller]['mainInterface']['historyLabel']
-        columns = table.columnCount()
-        rows = table.rowCount()
+        journal_path = get_trade_journal_path(caller)
+        journal = TradeJournal(journal_path) if os.path.exists(journal_path) else None
         trades = []
 
-        if rows == 0:
-            label.setText("No data in table currently.")
-            return
+        if journal is None or journal.get_row_count() == 0:
+            journal = None
+            columns = table.columnCount()
+            rows = table.rowCount()
+
+            if rows == 0:
+                label.setText("No data in table currently.")
+                return
 
-        for row in range(rows):
-            trade = []
-            for column in range(columns):
-                item = table.item(row, column)
-                trade.append(item.text())
-            trades.append(trade)
+            for row in range(rows):
+                trade = []
+                for column in range(columns):
+                    item = table.item(row, column)
+                    trade.append(item.text())
+                trades.append(trade)
 
         path = create_folder("Trade History")
 
@@ -1325,16 +1334,19 @@ class Interface(QMainWindow):
         path, _ = QFileDialog.getSaveFileName(self, 'Export Trades', default_file, 'CSV (*.csv)')
 
         if path:
-            with open(path, 'w', encoding='utf-8') as f:
-                for trade in trades:
-                    f.write(','.join(trade) + '\n')
+            if journal is not None:
+                journal.export(path, 'CSV')
+            else:
+                with open(path, 'w', encoding='utf-8') as f:
+                    for trade in trades:
+                        f.write(','.join(trade) + '\n')
             label.setText(f"Exported trade history successfully to {path}.")
         else:
             label.setText("Could not save trade history.")
 
     def import_trades(self, caller):
         """
-        Import trade histories from a file.
+        Import trade histories from a file. Both trade history table and trade journal exports can be imported.
         :param caller: Caller that will determine which trade table gets updated.
         """
         table = self.interface_dictionary[caller]['mainInterface']['historyTable']
@@ -1345,9 +1357,17 @@ class Interface(QMainWindow):
         try:
             with open(path, 'r', encoding='utf-8') as f:
                 rows = f.readlines()
-                for row in rows:
-                    row = row.strip().split(',')
-                    add_to_table(table, row, insert_date=False)
+                header = rows[0].strip().split(',') if rows else []
+                # Journals exported by older versions have fewer columns.
+                if header and set(header) <= set(TRADE_JOURNAL_HEADERS.values()):
+                    column_names = {header: name for name, header in TRADE_JOURNAL_HEADERS.items()}
+                    for journal_row in csv.DictReader(rows):
+                        journal_row = {column_names[header]: value for header, value in journal_row.items()}
+                        add_to_table(table, get_history_row(journal_row), insert_date=False)
+                else:
+                    for row in rows:
+                        row = row.strip().split(',')
+                        add_to_table(table, row, insert_date=False)
             label.setText("Imported trade history successfully.")
         except Exception as e:
             label.setText("Could not import trade history due to data corruption or no file being selected.")
@@ -0,0 +1,298 @@
+"""
+Binary candle cache. Candles of a symbol/interval are stored in a file with a small header followed by fixed-width
+records, so they can be memory-mapped instead of parsed. Processes mapping the same file share its pages.
+"""
+
+import os
+import struct
+from collections.abc import Sequence
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+CANDLE_CACHE_MAGIC = b'ALGOCNDL'
+CANDLE_CACHE_VERSION = 2
+CANDLE_CACHE_EXTENSION = 'candles'
+
+# Magic, version, header size, record size, row count, and the latest database rowid the cache was synced with. The
+#  header is padded to HEADER_SIZE bytes.
+HEADER_FORMAT = '<8sHHIQQ'
+HEADER_SIZE = 64
+
+# Dates are stored as the period's UTC open time in milliseconds.
+CANDLE_DTYPE = np.dtype([
+    ('date_utc', '<i8'),
+    ('open', '<f8'),
+    ('high', '<f8'),
+    ('low', '<f8'),
+    ('close', '<f8'),
+    ('volume', '<f8'),
+    ('quote_asset_volume', '<f8'),
+    ('number_of_trades', '<f8'),
+    ('taker_buy_base_asset', '<f8'),
+    ('taker_buy_quote_asset', '<f8'),
+])
+
+PRICE_COLUMNS = CANDLE_DTYPE.names[1:]
+
+
+def get_candle_cache_file(database_folder: str, symbol: str, interval: str) -> str:
+    """
+    Returns the path of the candle cache file for the symbol and interval provided.
+    :param database_folder: Folder the databases are stored in.
+    :param symbol: Symbol of the candles.
+    :param interval: Interval of the candles in short form (e.g. 1h).
+    :return: Path to the candle cache file.
+    """
+    return os.path.join(database_folder, f'{symbol}_{interval}.{CANDLE_CACHE_EXTENSION}')
+
+
+def get_timestamp(date: datetime) -> int:
+    """
+    Returns the timestamp in milliseconds of the date provided. Naive dates are assumed to be in UTC.
+    :param date: Datetime object.
+    :return: Timestamp in milliseconds.
+    """
+    if date.tzinfo is None:
+        date = date.replace(tzinfo=timezone.utc)
+
+    return round(date.timestamp() * 1000)
+
+
+def convert_to_array(data: List[Dict[str, Any]]) -> np.ndarray:
+    """
+    Converts a list of candle dictionaries to an array of candle records.
+    :param data: List of candle dictionaries.
+    :return: Numpy array with the CANDLE_DTYPE data type.
+    """
+    array = np.empty(len(data), dtype=CANDLE_DTYPE)
+    array['date_utc'] = [get_timestamp(period['date_utc']) for period in data]
+    for column in PRICE_COLUMNS:
+        array[column] = [period[column] for period in data]
+
+    return array
+
+
+def convert_to_dictionaries(array: np.ndarray) -> List[Dict[str, Union[float, datetime]]]:
+    """
+    Converts an array of candle records to the list of dictionaries the rest of Algobot uses.
+    :param array: Numpy array with the CANDLE_DTYPE data type.
+    :return: List of candle dictionaries.
+    """
+    dates = pd.to_datetime(array['date_utc'], unit='ms', utc=True).to_pydatetime()
+    columns = [array[column].tolist() for column in PRICE_COLUMNS]
+    keys = ('date_utc',) + PRICE_COLUMNS
+    return [dict(zip(keys, values)) for values in zip(dates, *columns)]
+
+
+class CandleRows(Sequence):
+    """
+    Read-only list of candle dictionaries over an array of candle records (e.g. a memory-mapped candle cache). A row is
+    only converted to a dictionary when it's accessed, and slices are views of the array, so the candles themselves
+    are never copied. Columns can be read directly with get_column().
+    """
+    def __init__(self, array: np.ndarray, naive_dates: bool = False):
+        """
+        :param array: Numpy array with the CANDLE_DTYPE data type.
+        :param naive_dates: Boolean whether dates are returned naive (in UTC) instead of timezone aware.
+        """
+        self.array = array
+        self.naive_dates = naive_dates
+        self.epoch = datetime(1970, 1, 1) if naive_dates else datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+    def __len__(self) -> int:
+        return len(self.array)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return CandleRows(self.array[index], self.naive_dates)
+
+        timestamp, *values = self.array[index].tolist()
+        period = {'date_utc': self.epoch + timedelta(milliseconds=timestamp)}
+        period.update(zip(PRICE_COLUMNS, values))
+        return period
+
+    def get_column(self, column: str) -> np.ndarray:
+        """
+        Returns a column of the candles as a view of the array.
+        :param column: Column to return (e.g. close).
+        :return: Numpy array view.
+        """
+        return self.array[column]
+
+    def get_dates(self) -> List[datetime]:
+        """
+        Returns the dates of the candles without converting the other columns.
+        :return: List of datetime objects.
+        """
+        return [self.epoch + timedelta(milliseconds=timestamp) for timestamp in self.array['date_utc'].tolist()]
+
+
+class CandleCache:
+    """
+    Memory-mapped candle file for a symbol/interval. Candles must be written in ascending order by date.
+    """
+    def __init__(self, file_path: str):
+        """
+        :param file_path: Path to the candle cache file.
+        """
+        self.file_path = file_path
+
+    def exists(self) -> bool:
+        """
+        Checks whether the candle cache file exists or not.
+        :return: Boolean whether the file exists or not.
+        """
+        return os.path.isfile(self.file_path)
+
+    @staticmethod
+    def get_header(rows: int, synced_rowid: int = 0) -> bytes:
+        """
+        Returns the header of a candle cache file with the amount of rows provided.
+        :param rows: Amount of rows in the file.
+        :param synced_rowid: Latest database rowid the cache is in sync with.
+        :return: Header bytes.
+        """
+        header = struct.pack(HEADER_FORMAT, CANDLE_CACHE_MAGIC, CANDLE_CACHE_VERSION, HEADER_SIZE,
+                             CANDLE_DTYPE.itemsize, rows, synced_rowid)
+        return header.ljust(HEADER_SIZE, b'\0')
+
+    def read_header(self) -> Tuple[int, int]:
+        """
+        Reads the header of the candle cache.
+        :return: Tuple of the row count and the latest database rowid the cache is in sync with ((0, 0) if the cache
+         doesn't exist).
+        """
+        if not self.exists():
+            return 0, 0
+
+        with open(self.file_path, 'rb') as f:
+            header = f.read(struct.calcsize(HEADER_FORMAT))
+
+        if len(header) != struct.calcsize(HEADER_FORMAT):
+            raise ValueError(f"Invalid candle cache file: {self.file_path}.")
+
+        magic, version, header_size, record_size, rows, synced_rowid = struct.unpack(HEADER_FORMAT, header)
+        if magic != CANDLE_CACHE_MAGIC or version != CANDLE_CACHE_VERSION or header_size != HEADER_SIZE or \
+                record_size != CANDLE_DTYPE.itemsize:
+            raise ValueError(f"Invalid candle cache file: {self.file_path}.")
+
+        return rows, synced_rowid
+
+    def get_row_count(self) -> int:
+        """
+        Returns the amount of rows in the candle cache (0 if it doesn't exist).
+        :return: Row count.
+        """
+        return self.read_header()[0]
+
+    def get_synced_rowid(self) -> int:
+        """
+        Returns the latest database rowid the candle cache is in sync with (0 if it doesn't exist). Rows are only ever
+        inserted into the database, so the cache is in sync as long as this matches the database's latest rowid, and
+        loads don't have to count the database's rows.
+        :return: Synced rowid.
+        """
+        return self.read_header()[1]
+
+    def set_synced_rowid(self, synced_rowid: int):
+        """
+        Sets the latest database rowid the candle cache is in sync with.
+        :param synced_rowid: Latest database rowid.
+        """
+        rows = self.get_row_count()
+        with open(self.file_path, 'r+b') as f:
+            f.write(self.get_header(rows, synced_rowid))
+
+    def open(self) -> np.ndarray:
+        """
+        Memory-maps the candle cache in read-only mode. Columns of the returned array (e.g. array['close']) are views
+        into the mapped file, so nothing is copied until it's read.
+        :return: Numpy array with the CANDLE_DTYPE data type.
+        """
+        rows = self.get_row_count()
+        if rows == 0:  # Empty files can't be memory-mapped.
+            return np.empty(0, dtype=CANDLE_DTYPE)
+
+        return np.memmap(self.file_path, dtype=CANDLE_DTYPE, mode='r', offset=HEADER_SIZE, shape=(rows,))
+
+    def get_last_timestamp(self) -> Optional[int]:
+        """
+        Returns the timestamp in milliseconds of the latest candle in the cache.
+        :return: Timestamp or None if the cache is empty.
+        """
+        array = self.open()
+        return int(array['date_utc'][-1]) if len(array) else None
+
+    def write(self, data: List[Dict[str, Any]], synced_rowid: int = 0):
+        """
+        Rewrites the candle cache with the data provided. The file is written next to the cache and then moved over it,
+        so processes that have the previous file mapped are not affected.
+        :param data: List of candle dictionaries in ascending order.
+        :param synced_rowid: Latest database rowid the data is in sync with.
+        """
+        temp_path = f'{self.file_path}.tmp'
+        with open(temp_path, 'wb') as f:
+            f.write(self.get_header(len(data), synced_rowid))
+            f.write(convert_to_array(data).tobytes())
+
+        os.replace(temp_path, self.file_path)
+
+    def append(self, data: List[Dict[str, Any]]) -> int:
+        """
+        Appends candles newer than the latest cached candle to the cache. The rows are written before the header is
+        updated, so readers never see a row count that includes partially written rows. The synced rowid is kept.
+        :param data: List of candle dictionaries in ascending order.
+        :return: Amount of rows appended.
+        """
+        if not self.exists():
+            self.write(data)
+            return len(data)
+
+        rows, synced_rowid = self.read_header()
+        last_timestamp = self.get_last_timestamp()
+        array = convert_to_array(data)
+        if last_timestamp is not None:
+            array = array[array['date_utc'] > last_timestamp]
+
+        if len(array) == 0:
+            return 0
+
+        with open(self.file_path, 'r+b') as f:
+            f.seek(HEADER_SIZE + rows * CANDLE_DTYPE.itemsize)
+            f.write(array.tobytes())
+            f.flush()
+            f.seek(0)
+            f.write(self.get_header(rows + len(array), synced_rowid))
+
+        return len(array)
+
+    def get_range(self, start: Optional[datetime] = None, end: Optional[datetime] = None) -> np.ndarray:
+        """
+        Returns the memory-mapped candles between the start and end dates provided (both inclusive).
+        :param start: Datetime to start from.
+        :param end: Datetime to end at.
+        :return: Numpy array view of the candles.
+        """
+        array = self.open()
+        dates = array['date_utc']
+        start_index = 0 if start is None else int(np.searchsorted(dates, get_timestamp(start), side='left'))
+        end_index = len(array) if end is None else int(np.searchsorted(dates, get_timestamp(end), side='right'))
+        return array[start_index:end_index]
+
+    def load(self, start: Optional[datetime] = None, end: Optional[datetime] = None,
+             limit: Optional[int] = None) -> List[Dict[str, Union[float, datetime]]]:
+        """
+        Loads candles from the cache into a list of dictionaries.
+        :param start: Datetime to start from.
+        :param end: Datetime to end at.
+        :param limit: If provided, only the latest limit candles of the range are loaded.
+        :return: List of candle dictionaries in ascending order.
+        """
+        array = self.get_range(start, end)
+        if limit is not None:
+            array = array[-limit:]
+
+        return convert_to_dictionaries(array)
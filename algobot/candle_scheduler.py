@@ -0,0 +1,128 @@
+"""
+Candle close scheduling. Candle boundaries are computed in Binance's server time (the local clock plus an offset synced
+with the server periodically), so a data object sleeps until its next candle closes and fetches it once, instead of
+polling Binance and comparing candle dates against the local clock with a leeway.
+"""
+
+import time
+from typing import Callable, Dict, List, Optional, Sequence
+
+SERVER_TIME_RESYNC_INTERVAL = 600  # Seconds between server time syncs.
+CANDLE_CLOSE_DELAY = 0.25  # Seconds after a candle closes before it's fetched, so Binance has rolled over to the next.
+CANDLE_FETCH_RETRY_DELAYS = (0.5, 1, 2, 4, 8)  # Seconds slept before retrying fetches that had no closed candle.
+
+Kline = list  # Raw kline from Binance: [open time, open, high, low, close, volume, close time, ...].
+
+
+class ServerClock:
+    """
+    Clock in Binance's server time. The offset from the local clock is measured at the midpoint of a server time
+    request, so half the round trip isn't counted as offset.
+    """
+    def __init__(self, fetch_server_time: Callable[[], Dict[str, int]],
+                 resync_interval: float = SERVER_TIME_RESYNC_INTERVAL, clock: Callable[[], float] = time.time,
+                 monotonic: Callable[[], float] = time.monotonic):
+        """
+        :param fetch_server_time: Function returning Binance's server time (e.g. the client's get_server_time).
+        :param resync_interval: Seconds between syncs.
+        :param clock: Local epoch clock function.
+        :param monotonic: Monotonic clock function to time syncs with.
+        """
+        self.fetch_server_time = fetch_server_time
+        self.resync_interval = resync_interval
+        self.clock = clock
+        self.monotonic = monotonic
+        self.offset = 0.0  # Seconds the server clock is ahead of the local clock.
+        self.last_sync: Optional[float] = None
+
+    def sync(self):
+        """
+        Measures the offset of the server clock from the local clock.
+        """
+        sent_time = self.clock()
+        server_time = self.fetch_server_time()['serverTime'] / 1000
+        received_time = self.clock()
+        self.offset = server_time - (sent_time + received_time) / 2
+        self.last_sync = self.monotonic()
+
+    def now(self) -> float:
+        """
+        Returns the current epoch time of the server, syncing the offset first if it's due. If a sync fails, the
+        previous offset is kept until the next sync is due.
+        :return: Epoch time in seconds.
+        """
+        if self.last_sync is None or self.monotonic() - self.last_sync >= self.resync_interval:
+            try:
+                self.sync()
+            except Exception:  # pylint: disable=broad-except
+                self.last_sync = self.monotonic()
+
+        return self.clock() + self.offset
+
+
+class CandleCloseScheduler:
+    """
+    Schedules fetches of closed candles of one symbol and interval. Candles are identified by their open times in
+    epoch seconds; the latest closed candle is the one the data object has.
+    """
+    def __init__(self, interval_seconds: float, server_clock: ServerClock, sleep: Callable[[float], None] = time.sleep,
+                 close_delay: float = CANDLE_CLOSE_DELAY, retry_delays: Sequence[float] = CANDLE_FETCH_RETRY_DELAYS):
+        """
+        :param interval_seconds: Seconds per candle.
+        :param server_clock: Server clock candle boundaries are compared against.
+        :param sleep: Sleep function.
+        :param close_delay: Seconds after a close before fetching.
+        :param retry_delays: Seconds slept before each retry of a fetch without closed candles.
+        """
+        self.interval_seconds = interval_seconds
+        self.server_clock = server_clock
+        self.sleep = sleep
+        self.close_delay = close_delay
+        self.retry_delays = retry_delays
+
+    def get_next_close_time(self, last_open_time: float) -> float:
+        """
+        Returns when the candle after the latest closed candle closes.
+        :param last_open_time: Open time of the latest closed candle in epoch seconds.
+        :return: Close time in epoch seconds.
+        """
+        return last_open_time + 2 * self.interval_seconds
+
+    def is_due(self, last_open_time: float) -> bool:
+        """
+        Checks whether a candle closed after the latest closed candle provided.
+        :param last_open_time: Open time of the latest closed candle in epoch seconds.
+        :return: Boolean whether a new closed candle is due or not.
+        """
+        return self.server_clock.now() >= self.get_next_close_time(last_open_time)
+
+    def wait_for_close(self, last_open_time: float):
+        """
+        Sleeps until the candle after the latest closed candle closes (plus the close delay).
+        :param last_open_time: Open time of the latest closed candle in epoch seconds.
+        """
+        delay = self.get_next_close_time(last_open_time) + self.close_delay - self.server_clock.now()
+        if delay > 0:
+            self.sleep(delay)
+
+    def fetch_closed_candles(self, fetch: Callable[[], List[Kline]], last_open_time: float) -> List[Kline]:
+        """
+        Waits for the next close, then fetches candles closed after the latest closed candle. The last kline fetched
+        is the open candle, so a fetch is retried (a bounded amount of times) until Binance has rolled over to a new
+        candle.
+        :param fetch: Function fetching klines from after the latest closed candle up to the open candle.
+        :param last_open_time: Open time of the latest closed candle in epoch seconds.
+        :return: List of closed klines.
+        """
+        self.wait_for_close(last_open_time)
+        last_open_timestamp = int(last_open_time * 1000)
+
+        for delay in (*self.retry_delays, None):
+            closed = [kline for kline in fetch()[:-1] if int(kline[0]) > last_open_timestamp]
+            if closed:
+                return closed
+            if delay is not None:
+                self.sleep(delay)
+
+        raise RuntimeError(f"No closed candle was fetched from Binance after {len(self.retry_delays) + 1} attempts. "
+                           f"Please check Binance server.")
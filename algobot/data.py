@@ -7,13 +7,23 @@ import sqlite3
 import time
 from contextlib import closing
 from datetime import datetime, timedelta, timezone
+from functools import partial
 from logging import Logger
-from typing import Dict, List, Tuple, Union
+from typing import Dict, List, Optional, Tuple, Union
 
 import binance
+import numpy as np
 import pandas as pd
 
+from algobot.candle_cache import CandleCache, get_candle_cache_file
+from algobot.candle_scheduler import CandleCloseScheduler, ServerClock
+from algobot.date_index import DateIndex, get_date_index
 from algobot.helpers import ROOT_DIR, SHORT_INTERVAL_MAP, get_logging_object, get_normalized_data
+from algobot.input_buffer import InputArrayBuffer
+from algobot.kline_cache import fetch_klines
+from algobot.logging_pipeline import OUTPUT_LEVELS
+from algobot.rate_limiter import BINANCE_RATE_LIMITER
+from algobot.retry_policy import CLOSED, OPEN, RetryPolicy
 from algobot.typing_hints import DataType
 
 
@@ -50,22 +60,31 @@ class Data:
         self.caller = caller  # Used to specify which caller emitted signals for GUI.
         self.binance_client = binance.client.Client()  # Initialize Binance client to retrieve data.
         self.logger = get_logging_object(enable_logging=log, log_file=log_file, logger_object=log_object)
+        self.retry_policy = RetryPolicy(on_retry=self.handle_retry, on_state_change=self.handle_circuit_state)
 
         self.validate_interval(interval)  # Validate the interval provided.
         self.interval = interval  # Interval to trade in.
         self.interval_unit, self.interval_measurement = self.get_interval_unit_and_measurement()
         self.interval_minutes = self.get_interval_minutes()
+        # Candle boundaries are in server time. Syncs aren't retried, as a failed sync keeps the previous offset.
+        self.server_clock = ServerClock(partial(self.retry_policy.call, self.binance_client.get_server_time,
+                                                attempts=1))
+        self.candle_scheduler = CandleCloseScheduler(self.interval_minutes * 60, self.server_clock)
 
         self.precision = precision  # Decimal precision with which to show data.
         self.data_limit = 2000  # Max amount of data to contain.
         self.download_completed = False  # Boolean to determine whether data download is completed or not.
         self.download_loop = True  # Boolean to determine whether data is being downloaded or not.
-        self.tickers = self.binance_client.get_all_tickers()  # A list of all the tickers on Binance.
+        self.tickers = self.retry_policy.call(self.binance_client.get_all_tickers)  # A list of all tickers on Binance.
         self.symbol = symbol.upper()  # Symbol of data being used.
         self.validate_symbol(self.symbol)  # Validate symbol.
         self.data = []  # Total bot data.
+        self.persisted_date: Optional[datetime] = None  # Date of the latest candle stored in the database.
+        self.date_index: Optional[DateIndex] = None  # Sorted date index of the data for date lookups.
+        self.input_buffer = InputArrayBuffer()  # Persistent strategy input arrays of the data.
         self.ema_dict = {}  # Cached past EMA data for memoization.
         self.rsi_data = {}  # Cached past RSI data for memoization.
+        self.last_price: Optional[float] = None  # Last ticker price fetched, used while Binance is unreachable.
         self.current_values = {  # This dictionary will hold current data values.
             'date_utc': datetime.now(tz=timezone.utc),
             'open': 0,
@@ -81,6 +100,8 @@ class Data:
 
         self.database_table = f'data_{self.interval}'
         self.database_file = self.get_database_file()
+        self.candle_cache = CandleCache(get_candle_cache_file(os.path.dirname(self.database_file), self.symbol,
+                                                              self.interval))
         self.create_table()
 
         if load_data:
@@ -130,25 +151,19 @@ class Data:
         if not self.is_valid_symbol(symbol):
             raise ValueError(f'Invalid symbol/ticker {symbol} provided.')
 
-    def output_message(self, message: str, level: int = 2, print_message: bool = False):
+    def output_message(self, message: str, level: int = 2, print_message: bool = False, args: tuple = ()):
         """
         This function will log and optionally print the message provided.
         :param message: Messaged to be logged and potentially printed.
         :param level: Level message will be logged at.
         :param print_message: Boolean that decides whether message will also be printed or not.
+        :param args: Arguments of the message. They're only formatted into it once it's written.
         """
         if print_message:
-            print(message)
-
-        if self.logger:
-            if level == 2:
-                self.logger.info(message)
-            elif level == 3:
-                self.logger.debug(message)
-            elif level == 4:
-                self.logger.warning(message)
-            elif level == 5:
-                self.logger.critical(message)
+            print(message % args if args else message)
+
+        if self.logger and level in OUTPUT_LEVELS:
+            self.logger.log(OUTPUT_LEVELS[level], message, *args)
 
     def get_database_file(self) -> str:
         """
@@ -227,8 +242,83 @@ class Data:
                         return False
             connection.commit()
         self.output_message("Successfully stored all new data to database.")
+        if total_data and (self.persisted_date is None or total_data[-1]['date_utc'] > self.persisted_date):
+            self.persisted_date = total_data[-1]['date_utc']
+        self.update_candle_cache(total_data)
         return True
 
+    def get_unpersisted_data(self) -> List[Dict[str, Union[float, datetime]]]:
+        """
+        Returns data newer than the latest candle stored in the database. Data is only dumped to the database every so
+        often, so these candles would have to be downloaded again after a crash.
+        :return: List of data dictionaries.
+        """
+        index = len(self.data)
+        while index > 0 and (self.persisted_date is None or self.data[index - 1]['date_utc'] > self.persisted_date):
+            index -= 1
+        return self.data[index:]
+
+    def update_candle_cache(self, total_data: List[dict]):
+        """
+        Appends data dumped to the database to the candle cache. If the cache is missing, it's built the next time
+        data is loaded instead.
+        :param total_data: Data dumped to the database.
+        """
+        if not self.candle_cache.exists() or not total_data:
+            return
+
+        try:
+            synced_rowid = self.candle_cache.get_synced_rowid()
+            database_rowid = self.get_database_rowid()
+            appended = self.candle_cache.append(total_data)
+            # If the rows appended don't account for every row inserted since the last sync, the database was also
+            #  written to elsewhere, so the synced rowid is left behind and the cache is rebuilt on the next load.
+            if appended == database_rowid - synced_rowid:
+                self.candle_cache.set_synced_rowid(database_rowid)
+        except (OSError, ValueError) as e:
+            self.output_message(f"Failed to update candle cache: {e}", 4)
+
+    def get_database_rowid(self) -> int:
+        """
+        Returns the latest rowid of the database table. Unlike counting the rows, this is a single index lookup.
+        :return: Latest rowid (0 if the table is empty).
+        """
+        with closing(sqlite3.connect(self.database_file)) as connection:
+            with closing(connection.cursor()) as cursor:
+                return cursor.execute(f'SELECT MAX(rowid) FROM {self.database_table}').fetchone()[0] or 0
+
+    def candle_cache_is_synced(self) -> bool:
+        """
+        Checks whether the candle cache contains the same candles as the database. The latest database rowid the cache
+        was synced with is stored in its header, so this doesn't have to count the database's rows.
+        :return: Boolean whether the candle cache is in sync with the database or not.
+        """
+        try:
+            rows, synced_rowid = self.candle_cache.read_header()
+        except ValueError:
+            return False
+
+        return rows > 0 and synced_rowid == self.get_database_rowid()
+
+    def get_data_from_candle_cache(self, limit: int = None) -> List[Dict[str, Union[float, datetime]]]:
+        """
+        Loads data from the memory-mapped candle cache. If the cache is out of sync with the database, it's rebuilt
+        from the database first.
+        :param limit: Limit amount of rows to fetch.
+        :return: Data in a list of dictionaries.
+        """
+        if not self.candle_cache_is_synced():
+            synced_rowid = self.get_database_rowid()  # Read first, so rows inserted meanwhile make the cache stale.
+            data = self.get_data_from_database()
+            if not data:
+                return data
+
+            self.output_message("Building candle cache...")
+            self.candle_cache.write(data, synced_rowid=synced_rowid)
+            return data[-limit:] if limit is not None else data
+
+        return self.candle_cache.load(limit=limit)
+
     def get_latest_database_row(self) -> Dict[str, Union[float, datetime]]:
         """
         Returns the latest row from database table.
@@ -285,7 +375,7 @@ class Data:
         result = self.get_latest_database_row()
         if not result:
             # pylint: disable=protected-access
-            return self.binance_client._get_earliest_valid_timestamp(self.symbol, self.interval)
+            return self.retry_policy.call(self.binance_client._get_earliest_valid_timestamp, self.symbol, self.interval)
         else:
             return int(result['date_utc'].timestamp()) * 1000 + 1  # Converting timestamp to milliseconds
 
@@ -296,7 +386,8 @@ class Data:
         :param limit_fetch: Limit amount of data retrieved from the database.
         """
         limit = None if not limit_fetch else self.data_limit
-        self.data = self.get_data_from_database(limit=limit)
+        self.data = self.get_data_from_candle_cache(limit=limit)
+        self.persisted_date = self.data[-1]['date_utc'] if self.data else None
         if update:
             if not self.database_is_updated():
                 self.output_message("Updating data...")
@@ -329,7 +420,8 @@ class Data:
                 progress_callback.emit(int(percentage), msg, caller)
 
         while self.download_loop:
-            temp_data = self.binance_client.get_klines(
+            temp_data = self.retry_policy.call(
+                self.binance_client.get_klines,
                 symbol=self.symbol,
                 interval=self.interval,
                 limit=limit,
@@ -392,7 +484,8 @@ class Data:
         :param get_current: Boolean for whether to include current period's data.
         :return: A list of dictionaries.
         """
-        new_data = self.binance_client.get_historical_klines(self.symbol, self.interval, timestamp + 1, limit=limit)
+        new_data = self.retry_policy.call(self.binance_client.get_historical_klines, self.symbol, self.interval,
+                                          timestamp + 1, limit=limit)
         self.download_completed = True
         if len(new_data[:-1]) == 0:
             raise RuntimeError("No data was fetched from Binance. Please check Binance server.")
@@ -404,13 +497,12 @@ class Data:
 
     def is_latest_date(self, latest_date: datetime) -> bool:
         """
-        Checks whether the latest date available is the latest period available.
+        Checks whether the latest date available is the latest period available, i.e. whether the candle after it is
+        still open in Binance's server time.
         :param latest_date: Datetime object.
         :return: True or false whether date is latest period or not.
         """
-        minutes = self.interval_minutes
-        current_date = latest_date + timedelta(minutes=minutes) + timedelta(seconds=15)  # 15s leeway for server update
-        return current_date >= datetime.now(timezone.utc) - timedelta(minutes=minutes)
+        return not self.candle_scheduler.is_due(latest_date.timestamp())
 
     def data_is_updated(self) -> bool:
         """
@@ -443,7 +535,8 @@ class Data:
 
     def update_data(self, verbose: bool = False):
         """
-        Updates run-time data with Binance API values.
+        Updates run-time data with Binance API values. Candles are fetched once the candle scheduler's next close has
+        passed in server time, so there's no polling.
         """
         latest_date = self.data[-1]['date_utc']
         timestamp = int(latest_date.timestamp()) * 1000
@@ -454,11 +547,11 @@ class Data:
 
         if not self.data_is_updated():
             # self.try_callback("Found new data. Attempting to update...")
-            new_data = []
-            while len(new_data) == 0:
-                time.sleep(0.5)  # Sleep half a second for server to refresh new values.
-                new_data = self.get_new_data(timestamp)
-
+            new_data = self.candle_scheduler.fetch_closed_candles(
+                lambda: self.retry_policy.call(fetch_klines, self.binance_client, self.symbol, self.interval,
+                                               timestamp + 1, BINANCE_RATE_LIMITER),
+                latest_date.timestamp()
+            )
             self.insert_data(new_data)
 
             if verbose:
@@ -475,14 +568,36 @@ class Data:
             self.dump_to_table()
             self.data = self.data[self.data_limit // 2:]
 
-    def get_current_data(self, counter: int = 0) -> Dict[str, Union[str, float]]:
+    def handle_retry(self, error: Exception, attempt: int, delay: float):
+        """
+        Outputs a failed attempt of a Binance call that's retried.
+        :param error: Exception raised by the attempt.
+        :param attempt: Number of the failed attempt.
+        :param delay: Seconds slept before the retry.
+        """
+        self.output_message("Error: %s. Retrying (attempt %d) in %.1f seconds...", 4, args=(error, attempt + 1, delay))
+
+    def handle_circuit_state(self, state: str):
+        """
+        Signals when Binance becomes unreachable (degraded mode, in which last known values are used) or reachable
+        again.
+        :param state: New state of the circuit.
+        """
+        if state == OPEN:
+            self.output_message("Binance is unreachable. Using last known values until it is reachable again.", 4)
+            self.try_callback("Internet connectivity issue detected. Running in degraded mode with last known values.")
+        elif state == CLOSED:
+            self.output_message("Binance is reachable again.")
+            self.try_callback("Successfully reconnected.")
+
+    def get_current_data(self) -> Dict[str, Union[str, float]]:
         """
-        Retrieves current market dictionary with open, high, low, close prices.
-        :param counter: Counter to check how many times bot is trying to retrieve current data.
+        Retrieves current market dictionary with open, high, low, close prices. If Binance can't be reached, the last
+        known values are returned instead.
         :return: A dictionary with current open, high, low, and close prices.
         """
+        self.remove_past_data_if_needed()
         try:
-            self.remove_past_data_if_needed()
             if not self.data_is_updated():
                 self.update_data()
 
@@ -491,25 +606,22 @@ class Data:
 
             next_interval = current_interval + timedelta(minutes=self.interval_minutes)
             next_timestamp = int(next_interval.timestamp() * 1000) - 1
-            current_data = [current_interval] + self.binance_client.get_klines(symbol=self.symbol,
-                                                                               interval=self.interval,
-                                                                               startTime=current_timestamp,
-                                                                               endTime=next_timestamp,
-                                                                               )[0][1:]  # We don't need timestamp.
-            self.current_values = get_normalized_data(data=current_data)
-
-            if counter > 0:
-                self.try_callback("Successfully reconnected.")
-
-            return self.current_values
+            current_data = [current_interval] + self.retry_policy.call(self.binance_client.get_klines,
+                                                                       symbol=self.symbol,
+                                                                       interval=self.interval,
+                                                                       startTime=current_timestamp,
+                                                                       endTime=next_timestamp,
+                                                                       )[0][1:]  # We don't need timestamp.
         except Exception as e:
-            sleep_time = 5 + counter * 2
-            error_message = f"Error: {e}. Retrying in {sleep_time} seconds..."
-            self.output_message(error_message, 4)
-            self.try_callback(f"Internet connectivity issue detected. Trying again in {sleep_time} seconds.")
             self.ema_dict = {}  # Reset EMA cache as it could be corrupted.
-            time.sleep(sleep_time)
-            return self.get_current_data(counter=counter + 1)
+            if not self.current_values['close']:  # There are no last known values to fall back to.
+                raise
+
+            self.output_message("Error: %s. Using last known values.", 4, args=(e,))
+            return self.current_values
+
+        self.current_values = get_normalized_data(data=current_data)
+        return self.current_values
 
     def try_callback(self, message: str):
         """
@@ -521,17 +633,21 @@ class Data:
 
     def get_current_price(self) -> float:
         """
-        Returns the current market ticker price.
+        Returns the current market ticker price. If Binance can't be reached, the last known price is returned instead.
         :return: Ticker market price
         """
         try:
-            return float(self.binance_client.get_symbol_ticker(symbol=self.symbol)['price'])
+            self.last_price = float(self.retry_policy.call(self.binance_client.get_symbol_ticker,
+                                                           symbol=self.symbol)['price'])
         except Exception as e:
-            error_message = f'Error: {e}. Retrying in 15 seconds...'
-            self.output_message(error_message, 4)
-            self.try_callback(message=error_message)
-            time.sleep(15)
-            return self.get_current_price()
+            last_price = self.last_price or self.current_values['close']
+            if not last_price:  # There is no last known price to fall back to.
+                raise
+
+            self.output_message("Error: %s. Using last known price.", 4, args=(e,))
+            return last_price
+
+        return self.last_price
 
     def create_csv_file(self, descending: bool = True, army_time: bool = True, start_date: datetime.date = None) -> str:
         """
@@ -548,11 +664,7 @@ class Data:
 
         data = self.data
         if start_date is not None:  # Getting date to start from.
-            data = []
-            for index, period in enumerate(self.data):
-                if period['date_utc'].date() >= start_date:
-                    data = self.data[index:]
-                    break
+            data = self.get_date_index().get_data_range(start=start_date)
 
         if not data:
             raise RuntimeError("No data to create CSV with found.")
@@ -568,6 +680,21 @@ class Data:
 
         return file_path
 
+    def get_date_index(self) -> DateIndex:
+        """
+        Returns the date index of the current data. It's rebuilt only if the data changed since it was last built.
+        :return: Date index.
+        """
+        self.date_index = get_date_index(self.data, self.date_index)
+        return self.date_index
+
+    def get_input_arrays_dict(self) -> Dict[str, np.ndarray]:
+        """
+        Returns strategy input arrays of the data and current values. Only new candles are copied into the buffer.
+        :return: Dictionary containing price type as key and price values as value.
+        """
+        return self.input_buffer.get_input_arrays_dict(self.data, self.current_values)
+
     def is_valid_symbol(self, symbol: str) -> bool:
         """
         Checks whether the symbol provided is valid or not for Binance.
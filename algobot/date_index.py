@@ -0,0 +1,128 @@
+"""
+Sorted date index over candle data. Lookups by date, datetime, or date range are binary searches instead of scans.
+"""
+
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+DateType = Union[date, datetime]
+
+
+class DateIndex:
+    """
+    Index of the dates of candle data sorted in ascending order. The index is a snapshot: use matches() (or
+    get_date_index()) to check whether it still describes the data after the data has been modified.
+    """
+    def __init__(self, data: List[Dict[str, Any]]):
+        """
+        :param data: List of candle dictionaries sorted by their date_utc key in ascending order.
+        """
+        self.data = data
+        # Candle rows over an array (see CandleRows) read the dates column without converting every row.
+        get_dates = getattr(data, 'get_dates', None)
+        self.dates: List[datetime] = get_dates() if get_dates else [period['date_utc'] for period in data]
+        self.tzinfo = self.dates[0].tzinfo if self.dates else None
+
+    def matches(self, data: List[Dict[str, Any]]) -> bool:
+        """
+        Checks whether this index still describes the data provided. Candles are only appended to or trimmed from
+        the ends of the data, so the list, its length, and its first and last dates are compared.
+        :param data: Data to compare against.
+        :return: Boolean whether the index matches the data or not.
+        """
+        if data is not self.data or len(data) != len(self.dates):
+            return False
+
+        return not data or (data[0]['date_utc'] == self.dates[0] and data[-1]['date_utc'] == self.dates[-1])
+
+    def normalize(self, target: DateType, end_of_day: bool = False) -> datetime:
+        """
+        Converts the date or datetime provided into a datetime comparable with the indexed dates. Dates are converted
+        to the start of the day (or the start of the next day if end_of_day is True). Naive datetimes are assumed to be
+        in UTC.
+        :param target: Date or datetime to normalize.
+        :param end_of_day: Boolean whether a date should be converted to the start of the next day.
+        :return: Normalized datetime.
+        """
+        if not isinstance(target, datetime):
+            target = datetime.combine(target + timedelta(days=1) if end_of_day else target, time.min)
+
+        if self.tzinfo is None and target.tzinfo is not None:
+            return target.astimezone(timezone.utc).replace(tzinfo=None)
+        if self.tzinfo is not None and target.tzinfo is None:
+            return target.replace(tzinfo=self.tzinfo)
+
+        return target
+
+    def get_start_index(self, target: DateType) -> int:
+        """
+        Returns the index of the first period at or after the date or datetime provided.
+        :param target: Date or datetime to search for.
+        :return: Index (equal to the data's length if every period is before the target).
+        """
+        return bisect_left(self.dates, self.normalize(target))
+
+    def get_end_index(self, target: DateType) -> int:
+        """
+        Returns the index of the last period at or before the datetime provided. If a date is provided, the last period
+        of that day is searched for.
+        :param target: Date or datetime to search for.
+        :return: Index (-1 if every period is after the target).
+        """
+        if isinstance(target, datetime):
+            return bisect_right(self.dates, self.normalize(target)) - 1
+
+        return bisect_left(self.dates, self.normalize(target, end_of_day=True)) - 1
+
+    def find_date(self, target: date, starting: bool = True) -> int:
+        """
+        Returns the index of the first (or last) period on the date provided.
+        :param target: Date to search for.
+        :param starting: Boolean whether to find the first period of the date or the last one.
+        :return: Index of the period.
+        """
+        if isinstance(target, datetime):
+            target = target.date()
+
+        index = self.get_start_index(target) if starting else self.get_end_index(target)
+        if not 0 <= index < len(self.dates) or self.dates[index].date() != target:
+            raise IndexError("Date not found.")
+
+        return index
+
+    def get_range(self, start: Optional[DateType] = None, end: Optional[DateType] = None) -> Tuple[int, int]:
+        """
+        Returns slice indices of the periods between the start and end provided (both inclusive). Dates include their
+        whole day.
+        :param start: Date or datetime to start from. If None, the range starts from the first period.
+        :param end: Date or datetime to end at. If None, the range ends at the last period.
+        :return: Tuple of start and stop indices to slice the data with.
+        """
+        start_index = 0 if start is None else self.get_start_index(start)
+        stop_index = len(self.dates) if end is None else self.get_end_index(end) + 1
+        return start_index, max(start_index, stop_index)
+
+    def get_data_range(self, start: Optional[DateType] = None,
+                       end: Optional[DateType] = None) -> List[Dict[str, Any]]:
+        """
+        Returns the periods between the start and end provided (both inclusive).
+        :param start: Date or datetime to start from.
+        :param end: Date or datetime to end at.
+        :return: List of periods.
+        """
+        start_index, stop_index = self.get_range(start, end)
+        return self.data[start_index:stop_index]
+
+
+def get_date_index(data: List[Dict[str, Any]], date_index: Optional[DateIndex] = None) -> DateIndex:
+    """
+    Returns the date index provided if it still matches the data, else a new date index over the data.
+    :param data: Data to index.
+    :param date_index: Previously built date index.
+    :return: Date index matching the data.
+    """
+    if date_index is not None and date_index.matches(data):
+        return date_index
+
+    return DateIndex(data)
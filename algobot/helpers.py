@@ -19,6 +19,7 @@ import requests
 from dateutil import parser
 
 import algobot
+from algobot.logging_pipeline import LOGGING_PIPELINE
 from algobot.typing_hints import DictType
 
 LOG_FOLDER = 'Logs'
@@ -203,7 +204,9 @@ def setup_and_return_log_path(file_name: str) -> str:
 
 def get_logger(log_file: str, logger_name: str) -> logging.Logger:
     """
-    Returns a logger object with loggerName provided and that'll log to log_file.
+    Returns a logger object with loggerName provided and that'll log to log_file. Records are written by the logging
+    pipeline's listener thread, so logging never blocks on disk I/O. Getting a logger again switches it to the new log
+    file.
     :param log_file: File to log to.
     :param logger_name: Name logger will have.
     :return: A logger object.
@@ -218,7 +221,7 @@ def get_logger(log_file: str, logger_name: str) -> logging.Logger:
     formatter = logging.Formatter('%(message)s')
     handler = logging.FileHandler(filename=setup_and_return_log_path(file_name=log_file), delay=True)
     handler.setFormatter(formatter)
-    logger.addHandler(handler)
+    LOGGING_PIPELINE.add_logger(logger, handler)
 
     return logger
 
@@ -500,6 +503,37 @@ def parse_precision(precision: str, symbol: str) -> int:
     return int(precision)
 
 
+EXPORT_FILE_TYPES = ('CSV', 'XLSX', 'PARQUET')
+
+
+def validate_export_file_type(file_type: str) -> str:
+    """
+    Validates a file type data can be exported to. If the file type is invalid, raises TypeError.
+    :param file_type: File type to validate (case-insensitive).
+    :return: Upper case file type.
+    """
+    file_type = file_type.upper()
+    if file_type not in EXPORT_FILE_TYPES:
+        raise TypeError("Invalid type of file type provided.")
+    return file_type
+
+
+def export_dataframe(df: pd.DataFrame, file_path: str, file_type: str):
+    """
+    Exports a dataframe to the file path provided.
+    :param df: Dataframe to export.
+    :param file_path: Path to export the dataframe to.
+    :param file_type: Type of file to export to: CSV, XLSX, or PARQUET.
+    """
+    file_type = validate_export_file_type(file_type)
+    if file_type == 'CSV':
+        df.to_csv(file_path)  # noqa
+    elif file_type == 'XLSX':
+        df.to_excel(file_path)
+    else:
+        df.to_parquet(file_path)  # Requires pyarrow or fastparquet to be installed.
+
+
 def write_json_file(file_path: str = 'secret.json', **kwargs):
     """
     Writes JSON file with **kwargs provided.
@@ -0,0 +1,113 @@
+"""
+Persistent input arrays for strategies. Candle columns are kept in preallocated numpy arrays that are appended to as
+candles close and overwritten in place for the current candle, so trends don't require a DataFrame on every tick.
+"""
+
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from algobot.candle_cache import PRICE_COLUMNS
+
+DERIVED_COLUMNS = ('high/low', 'open/close')
+INITIAL_CAPACITY = 2048
+
+
+class InputArrayBuffer:
+    """
+    Input arrays over candle data plus the current (still open) candle. Like the date index, the buffer tracks the data
+    list it was built from: appended candles are copied incrementally, and any other change rebuilds the buffer.
+    """
+    def __init__(self, capacity: int = INITIAL_CAPACITY):
+        """
+        :param capacity: Initial amount of rows to allocate.
+        """
+        self.arrays: Dict[str, np.ndarray] = {column: np.empty(capacity) for column in PRICE_COLUMNS + DERIVED_COLUMNS}
+        self.data: Optional[List[Dict[str, Any]]] = None
+        self.length = 0  # Amount of closed candles in the buffer.
+        self.first_date = None
+        self.last_date = None
+
+    def get_capacity(self) -> int:
+        """
+        Returns the amount of rows allocated.
+        :return: Capacity.
+        """
+        return len(self.arrays['close'])
+
+    def reserve(self, rows: int):
+        """
+        Grows the arrays (by doubling) so they can hold at least the amount of rows provided.
+        :param rows: Amount of rows required.
+        """
+        capacity = self.get_capacity()
+        if rows <= capacity:
+            return
+
+        while capacity < rows:
+            capacity *= 2
+
+        for column, array in self.arrays.items():
+            grown = np.empty(capacity)
+            grown[:self.length] = array[:self.length]
+            self.arrays[column] = grown
+
+    def write(self, start: int, rows: List[Dict[str, Any]]):
+        """
+        Writes the candles provided into the arrays starting at the index provided.
+        :param start: Index to start writing at.
+        :param rows: List of candle dictionaries.
+        """
+        end = start + len(rows)
+        self.reserve(end)
+        arrays = self.arrays
+        for column in PRICE_COLUMNS:  # Columns rows don't have (e.g. in backtester gap data) are NaN.
+            arrays[column][start:end] = [row.get(column, np.nan) for row in rows]
+
+        arrays['high/low'][start:end] = (arrays['high'][start:end] + arrays['low'][start:end]) / 2
+        arrays['open/close'][start:end] = (arrays['open'][start:end] + arrays['close'][start:end]) / 2
+
+    def matches(self, data: List[Dict[str, Any]]) -> bool:
+        """
+        Checks whether the buffered candles are still a prefix of the data provided.
+        :param data: Data to compare against.
+        :return: Boolean whether the buffer can be extended to the data or not.
+        """
+        if data is not self.data or len(data) < self.length:
+            return False
+
+        return self.length == 0 or (data[0]['date_utc'] == self.first_date and
+                                    data[self.length - 1]['date_utc'] == self.last_date)
+
+    def sync(self, data: List[Dict[str, Any]]):
+        """
+        Updates the buffer with the data provided, only copying candles that were appended since the last sync.
+        :param data: List of candle dictionaries in ascending order.
+        """
+        if not self.matches(data):
+            self.data = data
+            self.length = 0
+
+        if len(data) > self.length:
+            self.write(self.length, data[self.length:])
+            self.length = len(data)
+
+        self.first_date = data[0]['date_utc'] if data else None
+        self.last_date = data[-1]['date_utc'] if data else None
+
+    def get_input_arrays_dict(self, data: List[Dict[str, Any]],
+                              current_values: Optional[Dict[str, Any]] = None) -> Dict[str, np.ndarray]:
+        """
+        Returns the input arrays of the data and the current candle provided. The arrays are views into the buffer, so
+        they're only valid until the next call.
+        :param data: List of closed candle dictionaries in ascending order.
+        :param current_values: Current candle dictionary (if any).
+        :return: Dictionary containing price type as key and price values as value.
+        """
+        self.sync(data)
+        length = self.length
+        if current_values is not None:
+            self.write(length, [current_values])
+            length += 1
+
+        return {column: array[:length] for column, array in self.arrays.items()}
@@ -0,0 +1,161 @@
+"""
+In-memory klines cache. Klines fetched from Binance are cached per ticker and interval, so repeated scans within the
+time to live don't hit the API at all, and later scans only fetch the candles after the cached ones.
+"""
+
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from binance.client import interval_to_milliseconds
+
+from algobot.rate_limiter import BINANCE_RATE_LIMITER, RateLimiter
+
+KLINES_LIMIT = 1000  # Maximum klines Binance returns per request.
+DEFAULT_TTL = 60  # Seconds fetched klines are reused for without fetching again.
+
+Kline = list  # Raw kline from Binance: [open time, open, high, low, close, volume, close time, ...].
+
+
+def get_klines_weight(limit: int) -> int:
+    """
+    Returns Binance's request weight of a klines request with the limit provided.
+    :param limit: Limit of the klines request.
+    :return: Request weight.
+    """
+    if limit < 100:
+        return 1
+    if limit < 500:
+        return 2
+    if limit <= 1000:
+        return 5
+    return 10
+
+
+def get_expected_limit(interval: str, start_time: int) -> int:
+    """
+    Returns the klines limit to request klines from the start time provided up to now in a single request (if possible).
+    Requesting only what's needed keeps the request weight low.
+    :param interval: Short interval (e.g. 1h) of klines.
+    :param start_time: Open time in milliseconds of the first kline.
+    :return: Klines limit.
+    """
+    elapsed = time.time() * 1000 - start_time
+    expected = int(elapsed // interval_to_milliseconds(interval)) + 2  # The open kline and one spare.
+    return min(KLINES_LIMIT, max(1, expected))
+
+
+def fetch_klines(client, symbol: str, interval: str, start_time: int, rate_limiter: RateLimiter,
+                 limit: Optional[int] = None) -> List[Kline]:
+    """
+    Fetches klines from the start time provided up to the current (open) kline. Every request waits on the rate
+    limiter provided.
+    :param client: Binance client.
+    :param symbol: Symbol to fetch klines of.
+    :param interval: Short interval (e.g. 1h) to fetch klines of.
+    :param start_time: Open time in milliseconds of the first kline to fetch.
+    :param rate_limiter: Rate limiter shared by threads making requests.
+    :param limit: Klines per request. If None, it's the amount of klines expected (up to Binance's maximum).
+    :return: List of klines.
+    """
+    if limit is None:
+        limit = get_expected_limit(interval, start_time)
+
+    klines = []
+    while True:
+        rate_limiter.acquire(get_klines_weight(limit))
+        fetched = client.get_klines(symbol=symbol, interval=interval, startTime=start_time, limit=limit)
+        klines += fetched
+
+        if len(fetched) < limit:
+            return klines
+
+        start_time = fetched[-1][0] + 1
+
+
+class KlineCache:
+    """
+    Thread-safe klines cache keyed by ticker and interval.
+    """
+    def __init__(self, ttl: float = DEFAULT_TTL, rate_limiter: RateLimiter = BINANCE_RATE_LIMITER,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        :param ttl: Seconds cached klines are returned for without fetching.
+        :param rate_limiter: Rate limiter requests wait on.
+        :param clock: Monotonic clock function.
+        """
+        self.ttl = ttl
+        self.rate_limiter = rate_limiter
+        self.clock = clock
+        self.entries: Dict[Tuple[str, str], Tuple[float, int, List[Kline]]] = {}  # Fetch time, start time, klines.
+        self.lock = threading.Lock()
+
+    def clear(self):
+        """
+        Clears the cache.
+        """
+        with self.lock:
+            self.entries = {}
+
+    def get_klines(self, client, symbol: str, interval: str, start_time: int) -> List[Kline]:
+        """
+        Returns klines from the start time provided up to the current kline. Fresh cached klines are returned as they
+        are; stale cached klines are only refreshed from their last (possibly still open) kline onwards.
+        :param client: Binance client.
+        :param symbol: Symbol to get klines of.
+        :param interval: Short interval (e.g. 1h) to get klines of.
+        :param start_time: Open time in milliseconds of the first kline needed.
+        :return: List of klines.
+        """
+        key = (symbol, interval)
+        with self.lock:
+            entry = self.entries.get(key)
+
+        cached_klines = self.get_cached_klines(entry, start_time)
+        if cached_klines is not None and self.clock() - entry[0] < self.ttl:
+            return self.slice_klines(cached_klines, start_time)
+
+        if cached_klines is None:
+            klines = fetch_klines(client, symbol, interval, start_time, self.rate_limiter)
+        else:  # Fetch from the last cached kline onwards, as it may have still been open when it was cached.
+            tail = fetch_klines(client, symbol, interval, cached_klines[-1][0], self.rate_limiter)
+            klines = cached_klines[:-1] + tail if tail else cached_klines
+
+        klines = self.slice_klines(klines, start_time)  # Klines older than needed aren't kept.
+        with self.lock:
+            self.entries[key] = (self.clock(), start_time, klines)
+
+        return klines
+
+    @staticmethod
+    def get_cached_klines(entry: Optional[Tuple[float, int, List[Kline]]], start_time: int) -> Optional[List[Kline]]:
+        """
+        Returns cached klines of an entry if they cover the start time provided.
+        :param entry: Cache entry (if any).
+        :param start_time: Open time in milliseconds of the first kline needed.
+        :return: Cached klines or None if they can't be used.
+        """
+        if entry is None:
+            return None
+
+        _fetch_time, entry_start_time, klines = entry
+        if not klines or entry_start_time > start_time:  # Older klines are needed than the ones cached.
+            return None
+
+        return klines
+
+    @staticmethod
+    def slice_klines(klines: List[Kline], start_time: int) -> List[Kline]:
+        """
+        Returns klines opened at or after the start time provided.
+        :param klines: Klines in ascending order.
+        :param start_time: Open time in milliseconds.
+        :return: List of klines.
+        """
+        for index, kline in enumerate(klines):
+            if kline[0] >= start_time:
+                return klines[index:]
+        return []
+
+
+KLINE_CACHE = KlineCache()
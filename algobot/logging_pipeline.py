@@ -0,0 +1,157 @@
+"""
+Non-blocking logging pipeline. Loggers created with helpers.get_logger only put records on a queue; a single listener
+thread formats them and writes them to their files, so disk I/O never blocks the trading thread. Records keep their
+message and arguments separately and are only formatted by the listener, and every logger is rate limited, so
+advanced logging can stay enabled without flooding the disk.
+"""
+
+import atexit
+import logging
+import queue
+import threading
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+
+from algobot.rate_limiter import RateLimiter
+
+# Logging levels of the output message levels used by traders and data objects.
+OUTPUT_LEVELS = {
+    2: logging.INFO,
+    3: logging.DEBUG,
+    4: logging.WARNING,
+    5: logging.CRITICAL,
+}
+
+LOG_RATE = 100  # Records per second a logger can log on average.
+LOG_BURST = 1000  # Records a logger can log at once (e.g. a full advanced logging dump of a tick).
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Drops records of a logger above its rate. Warnings and above are never dropped. The amount of dropped records is
+    prepended to the next record logged.
+    """
+    def __init__(self, rate: float = LOG_RATE, burst: float = LOG_BURST):
+        """
+        :param rate: Records per second allowed on average.
+        :param burst: Records allowed at once.
+        """
+        super().__init__()
+        self.rate_limiter = RateLimiter(rate=rate, capacity=burst)
+        self.suppressed = 0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        """
+        Checks whether the record provided is logged or not.
+        :param record: Record to check.
+        :return: Boolean whether the record is logged or not.
+        """
+        if record.levelno < logging.WARNING and not self.rate_limiter.try_acquire():
+            self.suppressed += 1
+            return False
+
+        if self.suppressed:
+            record.msg = f'[{self.suppressed} messages suppressed by rate limiting]\n{record.msg}'
+            self.suppressed = 0
+        return True
+
+
+class DeferredQueueHandler(QueueHandler):
+    """
+    Queue handler that leaves formatting to the listener. The default handler formats records before queueing them,
+    which would keep formatting on the trading thread. Records are stamped with the handler they're written with, so
+    records queued before a logger switches files are still written to the previous file.
+    """
+    def __init__(self, log_queue: queue.Queue, target: logging.Handler):
+        """
+        :param log_queue: Queue of the pipeline.
+        :param target: Handler the listener writes records of this handler with.
+        """
+        super().__init__(log_queue)
+        self.target = target
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """
+        Prepares a record for queueing. Only exception information is formatted here, as the traceback is gone once
+        the exception is handled.
+        :param record: Record to prepare.
+        :return: Record to queue.
+        """
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        record.target = self.target
+        return record
+
+
+class DispatchHandler(logging.Handler):
+    """
+    Handler of the listener that writes records with the handler they're stamped with.
+    """
+    def emit(self, record: logging.LogRecord):
+        """
+        Writes the record provided with its target handler, or closes the handler if the record is a close request.
+        :param record: Record to write.
+        """
+        if getattr(record, 'close', False):
+            record.target.close()
+        else:
+            record.target.handle(record)
+
+
+class LoggingPipeline:
+    """
+    Queue and listener shared by every logger of the process.
+    """
+    def __init__(self):
+        self.queue: queue.Queue = queue.Queue()
+        self.listener: Optional[QueueListener] = None
+        self.lock = threading.Lock()
+
+    def start(self):
+        """
+        Starts the listener thread if it's not running.
+        """
+        with self.lock:
+            if self.listener is None:
+                self.listener = QueueListener(self.queue, DispatchHandler())
+                self.listener.start()
+
+    def stop(self):
+        """
+        Stops the listener thread after it writes every queued record.
+        """
+        with self.lock:
+            if self.listener is not None:
+                self.listener.stop()
+                self.listener = None
+
+    def flush(self):
+        """
+        Blocks until every record queued so far is written.
+        """
+        if self.listener is not None:
+            self.queue.join()
+
+    def add_logger(self, logger: logging.Logger, handler: logging.Handler):
+        """
+        Makes the logger provided log through the pipeline to the handler provided. A logger added again keeps its
+        queue handler and only gets its handler replaced. The previous handler is closed by the listener once the
+        records queued before it are written.
+        :param logger: Logger to add.
+        :param handler: Handler records of the logger are written with.
+        """
+        self.start()
+        for queue_handler in logger.handlers:
+            if isinstance(queue_handler, DeferredQueueHandler):
+                previous, queue_handler.target = queue_handler.target, handler
+                self.queue.put(logging.makeLogRecord({'name': logger.name, 'close': True, 'target': previous}))
+                return
+
+        queue_handler = DeferredQueueHandler(self.queue, handler)
+        queue_handler.addFilter(RateLimitFilter())
+        logger.addHandler(queue_handler)
+
+
+LOGGING_PIPELINE = LoggingPipeline()
+atexit.register(LOGGING_PIPELINE.stop)
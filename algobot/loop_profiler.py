@@ -0,0 +1,180 @@
+"""
+Trading loop profiler. Every stage of a bot's trading loop is timed with a monotonic clock and the latest durations are
+kept in rolling windows, so percentiles, the loop rate, and the stage dominating tick-to-decision latency can be shown
+in the statistics window and optionally written to a metrics file.
+"""
+
+import json
+import os
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Deque, Dict, Iterator, Optional
+
+import numpy as np
+
+from algobot.helpers import create_folder
+from algobot.order_latency import PERCENTILES
+
+METRICS_FOLDER = 'Metrics'
+# Loop metrics are written to a file if this environment variable is set.
+LOOP_METRICS_VARIABLE = 'ALGOBOT_LOOP_METRICS'
+LOOP_PROFILE_WINDOW = 500  # Amount of latest loops percentiles and the loop rate are computed over.
+
+
+def get_loop_metrics_path(caller: str) -> Optional[str]:
+    """
+    Returns the path loop metrics of the caller provided are written to, if writing them is enabled.
+    :param caller: Caller (live or simulation) the metrics belong to.
+    :return: Path to the metrics file or None if loop metrics aren't written.
+    """
+    if os.getenv(LOOP_METRICS_VARIABLE) is None:
+        return None
+
+    return os.path.join(create_folder(METRICS_FOLDER), f'{caller.lower()}_loop.json')
+
+
+class LoopProfiler:
+    """
+    Profiler of the stages of a trading loop. Timing a stage only appends to a bounded deque, so it's cheap enough for
+    the hot path; percentiles are computed when statistics are requested.
+    """
+    def __init__(self, window: int = LOOP_PROFILE_WINDOW, metrics_path: Optional[str] = None,
+                 metrics_interval: float = 60, clock: Callable[[], float] = time.perf_counter):
+        """
+        :param window: Amount of latest durations kept per stage.
+        :param metrics_path: Path of the file metrics are written to. If None, metrics aren't written.
+        :param metrics_interval: Seconds between metrics file writes.
+        :param clock: Monotonic clock function.
+        """
+        self.window = window
+        self.metrics_path = metrics_path
+        self.metrics_interval = metrics_interval
+        self.clock = clock
+        self.stages: Dict[str, Deque[float]] = {}  # Latest durations in milliseconds keyed by stage.
+        self.loops: Deque[float] = deque(maxlen=window)  # Latest loop durations in milliseconds.
+        self.loop_end_times: Deque[float] = deque(maxlen=window)
+        self.loop_start_time: Optional[float] = None
+        self.last_metrics_time: Optional[float] = None
+        self.loop_count = 0
+
+    def start_loop(self):
+        """
+        Marks the start of a loop.
+        """
+        self.loop_start_time = self.clock()
+
+    def end_loop(self):
+        """
+        Marks the end of a loop started with start_loop.
+        """
+        end_time = self.clock()
+        if self.loop_start_time is not None:
+            self.loops.append((end_time - self.loop_start_time) * 1000)
+            self.loop_start_time = None
+
+        self.loop_end_times.append(end_time)
+        self.loop_count += 1
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """
+        Context manager timing the stage provided. Stages raising exceptions aren't recorded.
+        :param name: Name of the stage in camel case (e.g. updateData).
+        """
+        start_time = self.clock()
+        yield
+        self.add_duration(name, (self.clock() - start_time) * 1000)
+
+    def add_duration(self, name: str, duration: float):
+        """
+        Adds a duration of the stage provided.
+        :param name: Name of the stage.
+        :param duration: Duration in milliseconds.
+        """
+        durations = self.stages.get(name)
+        if durations is None:
+            durations = self.stages[name] = deque(maxlen=self.window)
+        durations.append(duration)
+
+    def get_loop_rate(self) -> Optional[float]:
+        """
+        Returns the amount of loops per second over the window.
+        :return: Loops per second or None if there aren't enough loops yet.
+        """
+        if len(self.loop_end_times) < 2 or self.loop_end_times[-1] == self.loop_end_times[0]:
+            return None
+
+        return (len(self.loop_end_times) - 1) / (self.loop_end_times[-1] - self.loop_end_times[0])
+
+    @staticmethod
+    def get_percentiles(durations: Deque[float]) -> Dict[str, float]:
+        """
+        Returns percentiles of the durations provided.
+        :param durations: Durations in milliseconds.
+        :return: Dictionary of durations keyed by percentile (e.g. p95).
+        """
+        values = np.percentile(np.fromiter(durations, dtype=float, count=len(durations)), PERCENTILES)
+        return {f'p{percentile}': float(value) for percentile, value in zip(PERCENTILES, values)}
+
+    def get_dominant_stage(self) -> Optional[str]:
+        """
+        Returns the stage taking the most time on average.
+        :return: Name of the dominant stage or None if no stage was timed yet.
+        """
+        means = {name: sum(durations) / len(durations) for name, durations in self.stages.items() if durations}
+        return max(means, key=means.get) if means else None
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        Returns raw loop metrics for the metrics file.
+        :return: Dictionary of metrics.
+        """
+        return {
+            'time': time.time(),
+            'loops': self.loop_count,
+            'loopRate': self.get_loop_rate(),
+            'loop': self.get_percentiles(self.loops) if self.loops else None,
+            'stages': {name: self.get_percentiles(durations) for name, durations in self.stages.items() if durations},
+            'dominantStage': self.get_dominant_stage(),
+        }
+
+    def get_statistics_dictionary(self) -> Dict[str, str]:
+        """
+        Returns formatted loop statistics for the statistics window in the GUI.
+        :return: Dictionary of formatted statistics.
+        """
+        def get_percentile_string(durations: Deque[float]) -> str:
+            if not durations:
+                return 'None'
+            return ' / '.join(f'{round(value, 1)}' for value in self.get_percentiles(durations).values()) + \
+                ' ms (p50 / p95 / p99)'
+
+        loop_rate = self.get_loop_rate()
+        statistics = {
+            'loopRate': 'None' if loop_rate is None else f'{round(loop_rate, 2)} loops/second',
+            'loopLatency': get_percentile_string(self.loops),
+            'dominantStage': str(self.get_dominant_stage()),
+        }
+        for name, durations in self.stages.items():
+            statistics[f'{name}Latency'] = get_percentile_string(durations)
+
+        return statistics
+
+    def write_metrics_if_due(self) -> bool:
+        """
+        Writes metrics to the metrics file if it's enabled and metrics interval seconds passed since the last write.
+        The file is replaced atomically, so readers never see a partial write.
+        :return: Boolean whether metrics were written or not.
+        """
+        now = self.clock()
+        if self.metrics_path is None or (self.last_metrics_time is not None and
+                                         now - self.last_metrics_time < self.metrics_interval):
+            return False
+
+        self.last_metrics_time = now
+        temporary_path = f'{self.metrics_path}.tmp'
+        with open(temporary_path, 'w', encoding='utf-8') as f:
+            json.dump(self.get_metrics(), f)
+        os.replace(temporary_path, self.metrics_path)
+        return True
@@ -0,0 +1,269 @@
+"""
+Metrics exporter for monitoring many bots. Bots publish samples (net, position, loop latency, API requests, errors,
+etc.) once per loop, and the exporter serves the latest ones in the Prometheus text format over a local HTTP port
+and/or rewrites them to a file periodically. The exporter is disabled unless enabled through the environment.
+"""
+
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+
+from algobot.rate_limiter import BINANCE_RATE_LIMITER, RateLimiter
+
+METRICS_PORT_VARIABLE = 'ALGOBOT_METRICS_PORT'  # Port metrics are served on (on localhost) if set.
+METRICS_FILE_VARIABLE = 'ALGOBOT_METRICS_FILE'  # File metrics are written to if set.
+METRICS_FILE_INTERVAL = 15  # Seconds between metrics file writes.
+
+# Name, labels, and value of a sample.
+MetricSample = Tuple[str, Dict[str, str], Optional[float]]
+
+# Type and help text of every metric exported.
+METRIC_DEFINITIONS = {
+    'algobot_up': ('gauge', 'Whether the bot is running.'),
+    'algobot_net': ('gauge', 'Net balance of the trader in the quote asset.'),
+    'algobot_position': ('gauge', 'Position of the trader (1 for long, -1 for short, and 0 for none).'),
+    'algobot_candles': ('gauge', 'Amount of candles held by the trader.'),
+    'algobot_loops_total': ('counter', 'Trading loops completed.'),
+    'algobot_loop_rate': ('gauge', 'Trading loops per second over the profiling window.'),
+    'algobot_loop_latency_milliseconds': ('gauge', 'Trading loop duration percentiles.'),
+    'algobot_stage_latency_milliseconds': ('gauge', 'Trading loop stage duration percentiles.'),
+    'algobot_errors_total': ('counter', 'Exceptions handled by the bot.'),
+    'algobot_degraded': ('gauge', 'Whether Binance calls are failing and last known values are used.'),
+    'algobot_api_requests_total': ('counter', 'Authenticated API requests made by the trader per endpoint.'),
+    'algobot_api_used_weight': ('gauge', 'Request weight used in the current minute as last reported by Binance.'),
+    'algobot_rate_limited_requests_total': ('counter', 'Requests made through the shared rate limiter.'),
+    'algobot_rate_limited_weight_total': ('counter', 'Request weight acquired from the shared rate limiter.'),
+    'algobot_memory_bytes': ('gauge', 'Resident memory of the process.'),
+}
+
+# Headers Binance reports used request weight in (the second one for margin endpoints).
+USED_WEIGHT_HEADERS = ('x-mbx-used-weight-1m', 'x-sapi-used-ip-weight-1m')
+
+
+def get_memory_usage() -> Optional[int]:
+    """
+    Returns the resident memory of the process in bytes. Where /proc isn't available, the peak resident memory is
+    returned instead.
+    :return: Memory in bytes or None if it can't be retrieved (e.g. on Windows).
+    """
+    try:
+        with open('/proc/self/statm', 'r', encoding='utf-8') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        pass
+
+    try:
+        import resource  # pylint: disable=import-outside-toplevel
+    except ImportError:
+        return None
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024  # Reported in bytes on macOS and kilobytes elsewhere.
+
+
+def get_used_weight(client) -> Optional[float]:
+    """
+    Returns the request weight used in the current minute as reported in the last response the client received.
+    :param client: Binance client.
+    :return: Used weight or None if the client hasn't received a response reporting it.
+    """
+    headers = getattr(getattr(client, 'response', None), 'headers', None) or {}
+    for header in USED_WEIGHT_HEADERS:
+        if header in headers:
+            return float(headers[header])
+    return None
+
+
+def get_quantile_samples(name: str, labels: Dict[str, str], percentiles: Dict[str, float]) -> List[MetricSample]:
+    """
+    Returns samples of percentiles keyed like p95 with Prometheus quantile labels.
+    :param name: Name of the metric.
+    :param labels: Labels of the samples.
+    :param percentiles: Values keyed by percentile (e.g. p95).
+    :return: List of samples.
+    """
+    return [(name, {**labels, 'quantile': str(int(key[1:]) / 100)}, value) for key, value in percentiles.items()]
+
+
+def format_labels(labels: Dict[str, str]) -> str:
+    """
+    Returns labels formatted for the Prometheus text format.
+    :param labels: Dictionary of labels.
+    :return: Formatted labels.
+    """
+    if not labels:
+        return ''
+
+    def escape(value: Any) -> str:
+        return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+    return '{' + ','.join(f'{key}="{escape(value)}"' for key, value in labels.items()) + '}'
+
+
+class MetricsRequestHandler(BaseHTTPRequestHandler):
+    """
+    Serves the latest metrics of the exporter the server belongs to.
+    """
+    def do_GET(self):  # pylint: disable=invalid-name
+        """
+        Responds with metrics on /metrics.
+        """
+        if self.path.split('?')[0] not in ('/', '/metrics'):
+            self.send_error(404)
+            return
+
+        body = self.server.exporter.render().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *_args):
+        """
+        Scrapes aren't logged.
+        """
+
+
+class MetricsExporter:
+    """
+    Thread-safe store of the latest samples of every bot that renders them in the Prometheus text format.
+    """
+    def __init__(self, rate_limiter: RateLimiter = BINANCE_RATE_LIMITER):
+        """
+        :param rate_limiter: Shared rate limiter whose request counts are exported.
+        """
+        self.rate_limiter = rate_limiter
+        self.samples: Dict[str, List[MetricSample]] = {}  # Latest samples keyed by source (e.g. bot caller).
+        self.lock = threading.Lock()
+        self.server: Optional[ThreadingHTTPServer] = None
+        self.file_path: Optional[str] = None
+        self.stop_event = threading.Event()
+        self.started_from_environment = False
+
+    @property
+    def enabled(self) -> bool:
+        """
+        Whether metrics are served or written, so bots know if they need to publish samples.
+        """
+        return self.server is not None or self.file_path is not None
+
+    def update(self, source: str, samples: List[MetricSample]):
+        """
+        Replaces the samples of the source provided.
+        :param source: Source of samples (e.g. the caller of a bot).
+        :param samples: Latest samples of the source.
+        """
+        with self.lock:
+            self.samples[source] = samples
+
+    def remove(self, source: str):
+        """
+        Removes samples of the source provided.
+        :param source: Source of samples.
+        """
+        with self.lock:
+            self.samples.pop(source, None)
+
+    def get_samples(self) -> List[MetricSample]:
+        """
+        Returns samples of every source along with process samples.
+        :return: List of samples.
+        """
+        with self.lock:
+            samples = [sample for source_samples in self.samples.values() for sample in source_samples]
+
+        return samples + [
+            ('algobot_rate_limited_requests_total', {}, self.rate_limiter.request_count),
+            ('algobot_rate_limited_weight_total', {}, self.rate_limiter.weight_total),
+            ('algobot_memory_bytes', {}, get_memory_usage()),
+        ]
+
+    def render(self) -> str:
+        """
+        Renders samples in the Prometheus text format. Samples without values are skipped.
+        :return: Metrics text.
+        """
+        grouped: Dict[str, List[str]] = {}
+        for name, labels, value in self.get_samples():
+            if value is not None:
+                grouped.setdefault(name, []).append(f'{name}{format_labels(labels)} {float(value)!r}')
+
+        lines = []
+        for name, sample_lines in grouped.items():
+            metric_type, description = METRIC_DEFINITIONS.get(name, ('untyped', name))
+            lines += [f'# HELP {name} {description}', f'# TYPE {name} {metric_type}', *sample_lines]
+
+        return '\n'.join(lines) + '\n'
+
+    def start_server(self, port: int, host: str = '127.0.0.1') -> int:
+        """
+        Starts serving metrics over HTTP in a daemon thread.
+        :param port: Port to serve on. If 0, a free port is picked.
+        :param host: Host to bind to. Defaults to localhost, so metrics aren't exposed to the network.
+        :return: Port metrics are served on.
+        """
+        self.server = ThreadingHTTPServer((host, port), MetricsRequestHandler)
+        self.server.daemon_threads = True
+        self.server.exporter = self
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self.server.server_address[1]
+
+    def write_file(self):
+        """
+        Writes metrics to the metrics file. The file is replaced atomically, so readers never see a partial write.
+        """
+        temporary_path = f'{self.file_path}.tmp'
+        with open(temporary_path, 'w', encoding='utf-8') as f:
+            f.write(self.render())
+        os.replace(temporary_path, self.file_path)
+
+    def start_file_writer(self, file_path: str, interval: float = METRICS_FILE_INTERVAL):
+        """
+        Starts rewriting metrics to the file provided every interval seconds in a daemon thread.
+        :param file_path: Path of the metrics file.
+        :param interval: Seconds between writes.
+        """
+        self.file_path = file_path
+        self.stop_event = stop_event = threading.Event()
+
+        def write_periodically():
+            while not stop_event.wait(interval):
+                try:
+                    self.write_file()
+                except OSError:
+                    pass  # The next write is attempted anyway, e.g. once the disk has space again.
+
+        threading.Thread(target=write_periodically, daemon=True).start()
+
+    def start_from_environment(self):
+        """
+        Starts the HTTP server and/or file writer if they're enabled through the environment. Only the first call has
+        an effect, so every bot can call this when it starts.
+        """
+        if self.started_from_environment:
+            return
+
+        self.started_from_environment = True
+        port = os.getenv(METRICS_PORT_VARIABLE)
+        file_path = os.getenv(METRICS_FILE_VARIABLE)
+        if port:
+            self.start_server(int(port))
+        if file_path:
+            self.start_file_writer(file_path)
+
+    def stop(self):
+        """
+        Stops the HTTP server and file writer.
+        """
+        self.stop_event.set()
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+        self.file_path = None
+
+
+METRICS_EXPORTER = MetricsExporter()
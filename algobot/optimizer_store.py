@@ -0,0 +1,335 @@
+"""
+Optimizer results store. Optimizer results are appended to Parquet files (or an SQLite database if pyarrow isn't
+installed) as they're computed, so long optimizations survive crashes, can be queried while they're running, can be
+resumed, and can be exported without rebuilding them.
+"""
+
+import glob
+import json
+import os
+import shutil
+import sqlite3
+import time
+from contextlib import closing
+from threading import Lock
+from typing import Any, Dict, List, Optional, Set
+
+import pandas as pd
+
+from algobot.helpers import export_dataframe, validate_export_file_type
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Results are checkpointed to the SQLite database instead.
+    pa = pq = None
+
+OPTIMIZER_RESULTS_TABLE = 'optimizer_results'
+OPTIMIZER_SESSION_TABLE = 'optimizer_session'
+
+# Column name, SQLite type, and the header used when exporting.
+OPTIMIZER_COLUMNS = (
+    ('run', 'INTEGER PRIMARY KEY', 'Run'),
+    ('total_runs', 'INTEGER NOT NULL', 'Total Runs'),
+    ('profit_percentage', 'REAL', 'Profit Percentage'),
+    ('stop_loss_strategy', 'TEXT', 'Stop Loss Strategy'),
+    ('stop_loss_percentage', 'REAL', 'Stop Loss Percentage'),
+    ('take_profit_strategy', 'TEXT', 'Take Profit Strategy'),
+    ('take_profit_percentage', 'REAL', 'Take Profit Percentage'),
+    ('ticker', 'TEXT', 'Ticker'),
+    ('interval', 'TEXT', 'Interval'),
+    ('strategy_interval', 'TEXT', 'Strategy Interval'),
+    ('trades', 'INTEGER', 'Trades'),
+    ('result', 'TEXT', 'Result'),
+    ('strategy', 'TEXT', 'Strategy'),
+    ('settings', 'TEXT', 'Settings'),
+)
+
+OPTIMIZER_COLUMN_NAMES = [column[0] for column in OPTIMIZER_COLUMNS]
+OPTIMIZER_HEADERS = {column[0]: column[2] for column in OPTIMIZER_COLUMNS}
+PARQUET_TYPES = {'INTEGER': 'int64', 'REAL': 'float64', 'TEXT': 'string'}  # Arrow types of the SQLite types above.
+
+
+def get_parquet_schema() -> 'pa.Schema':
+    """
+    Returns the Arrow schema of optimizer results. Requires pyarrow.
+    :return: Arrow schema with the typed optimizer columns.
+    """
+    return pa.schema([(name, PARQUET_TYPES[column_type.split()[0]])
+                      for name, column_type, _header in OPTIMIZER_COLUMNS])
+
+
+class OptimizerStore:
+    """
+    Append-only store for optimizer results. The session is kept in an SQLite database. If pyarrow is installed,
+    results are checkpointed to a directory of Parquet files next to the database (one file per checkpoint); otherwise,
+    they're stored in a table of the database.
+
+    Rows added with add_row() are buffered and checkpointed to disk every checkpoint_size rows or checkpoint_seconds
+    seconds (whichever comes first), so a crash loses at most one checkpoint worth of runs.
+    """
+    def __init__(self, database_file: str, table: str = OPTIMIZER_RESULTS_TABLE, checkpoint_size: int = 25,
+                 checkpoint_seconds: float = 30, parquet: bool = True):
+        """
+        :param database_file: Path to the SQLite database file to store the session (and results without Parquet) in.
+        :param table: Table to store results in.
+        :param checkpoint_size: Amount of buffered rows after which a checkpoint is written.
+        :param checkpoint_seconds: Seconds after which buffered rows are checkpointed regardless of their amount.
+        :param parquet: Boolean whether to checkpoint results to Parquet files if pyarrow is installed or not.
+        """
+        self.database_file = database_file
+        self.table = table
+        # Directory of Parquet checkpoints, or None if results are stored in the database.
+        self.parquet_directory = f'{os.path.splitext(database_file)[0]}_{table}' if parquet and pq else None
+        self.checkpoint_size = checkpoint_size
+        self.checkpoint_seconds = checkpoint_seconds
+        self.pending_rows: List[Dict[str, Any]] = []
+        self.last_checkpoint = time.time()
+        self.lock = Lock()  # The GUI may export while the optimizer thread is adding rows.
+        self.create_table()
+        if self.parquet_directory is not None:
+            os.makedirs(self.parquet_directory, exist_ok=True)
+
+    def create_table(self):
+        """
+        Creates the results and session tables if they do not exist. WAL mode is enabled so results can be read while
+        the optimizer is still writing to them.
+        """
+        columns = ',\n'.join(f'{name} {column_type}' for name, column_type, _header in OPTIMIZER_COLUMNS)
+        with closing(sqlite3.connect(self.database_file)) as connection:
+            with closing(connection.cursor()) as cursor:
+                cursor.execute('PRAGMA journal_mode=WAL;')
+                cursor.execute(f'CREATE TABLE IF NOT EXISTS {self.table}({columns});')
+                cursor.execute(f'''
+                                CREATE TABLE IF NOT EXISTS {OPTIMIZER_SESSION_TABLE}(
+                                session_id TEXT PRIMARY KEY,
+                                specification TEXT NOT NULL,
+                                total_runs INTEGER NOT NULL,
+                                created_utc TEXT NOT NULL
+                                );''')
+                connection.commit()
+
+    def get_session(self) -> Optional[Dict[str, Any]]:
+        """
+        Returns the session this store belongs to (if any).
+        :return: Dictionary with session information or None.
+        """
+        with closing(sqlite3.connect(self.database_file)) as connection:
+            with closing(connection.cursor()) as cursor:
+                query = f'SELECT session_id, specification, total_runs, created_utc FROM {OPTIMIZER_SESSION_TABLE}'
+                fetched_values = cursor.execute(query).fetchone()
+
+        if fetched_values is None:
+            return None
+
+        session_id, specification, total_runs, created_utc = fetched_values
+        return {
+            'session_id': session_id,
+            'specification': json.loads(specification),
+            'total_runs': total_runs,
+            'created_utc': created_utc
+        }
+
+    def start_session(self, session_id: str, specification: Dict[str, Any], total_runs: int,
+                      resume: bool = True) -> bool:
+        """
+        Binds the store to the session provided. If the store belongs to a different session (or resume is False), its
+        results are cleared as they can't be reused.
+        :param session_id: Session ID (hash of the combos specification and data fingerprint).
+        :param specification: Specification the session ID was created from.
+        :param total_runs: Total runs in the session.
+        :param resume: Boolean whether to keep results from a matching previous session or not.
+        :return: Boolean whether an existing session was resumed or not.
+        """
+        session = self.get_session()
+        if resume and session is not None and session['session_id'] == session_id and \
+                session['total_runs'] == total_runs:
+            return True
+
+        with closing(sqlite3.connect(self.database_file)) as connection:
+            with closing(connection.cursor()) as cursor:
+                cursor.execute(f'DELETE FROM {self.table}')
+                cursor.execute(f'DELETE FROM {OPTIMIZER_SESSION_TABLE}')
+                cursor.execute(f'INSERT INTO {OPTIMIZER_SESSION_TABLE} VALUES (?, ?, ?, ?);',
+                               (session_id, self.serialize_settings(specification), total_runs,
+                                time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime())))
+                connection.commit()
+
+        if self.parquet_directory is not None:
+            shutil.rmtree(self.parquet_directory)
+            os.makedirs(self.parquet_directory)
+
+        return False
+
+    def get_parquet_files(self) -> List[str]:
+        """
+        Returns the Parquet checkpoint files in the order they were written.
+        :return: List of file paths.
+        """
+        return sorted(glob.glob(os.path.join(self.parquet_directory, 'part-*.parquet')))
+
+    def read_parquet_rows(self, columns: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Reads rows from the Parquet checkpoints ordered by run. If a run was written more than once, its last row is
+        returned, the same way inserting it into the database replaces it.
+        :param columns: Columns to read (must include run). Defaults to every column.
+        :return: List of rows.
+        """
+        rows = {}
+        for file_path in self.get_parquet_files():
+            for row in pq.read_table(file_path, columns=columns).to_pylist():
+                rows[row['run']] = row
+
+        return [rows[run] for run in sorted(rows)]
+
+    def get_completed_runs(self) -> Set[int]:
+        """
+        Returns the runs that have been checkpointed.
+        :return: Set of run numbers.
+        """
+        if self.parquet_directory is not None:
+            return {row['run'] for row in self.read_parquet_rows(columns=['run'])}
+
+        with closing(sqlite3.connect(self.database_file)) as connection:
+            with closing(connection.cursor()) as cursor:
+                return {row[0] for row in cursor.execute(f'SELECT run FROM {self.table}').fetchall()}
+
+    def get_rows(self) -> List[Dict[str, Any]]:
+        """
+        Returns checkpointed rows in a list of dictionaries ordered by run.
+        :return: List of rows.
+        """
+        if self.parquet_directory is not None:
+            return self.read_parquet_rows()
+
+        with closing(sqlite3.connect(self.database_file)) as connection:
+            with closing(connection.cursor()) as cursor:
+                query = f'SELECT {", ".join(OPTIMIZER_COLUMN_NAMES)} FROM {self.table} ORDER BY run'
+                return [dict(zip(OPTIMIZER_COLUMN_NAMES, row)) for row in cursor.execute(query).fetchall()]
+
+    def add_row(self, row: Dict[str, Any]):
+        """
+        Buffers a row and checkpoints buffered rows if needed.
+        :param row: Dictionary with keys from OPTIMIZER_COLUMN_NAMES.
+        """
+        with self.lock:
+            self.pending_rows.append(row)
+            checkpoint_due = time.time() - self.last_checkpoint >= self.checkpoint_seconds
+
+            if len(self.pending_rows) >= self.checkpoint_size or checkpoint_due:
+                self._checkpoint()
+
+    def checkpoint(self):
+        """
+        Writes all buffered rows to disk.
+        """
+        with self.lock:
+            self._checkpoint()
+
+    def _checkpoint(self):
+        """
+        Writes all buffered rows to disk. The lock must be held by the caller.
+        """
+        self.insert_rows(self.pending_rows)
+        self.pending_rows = []
+        self.last_checkpoint = time.time()
+
+    @staticmethod
+    def serialize_settings(settings: Dict[str, Any]) -> str:
+        """
+        Serializes an optimizer combo to JSON, so the full parameter combination is stored with each row.
+        :param settings: Settings dictionary to serialize.
+        :return: JSON string.
+        """
+        return json.dumps(settings, default=str, sort_keys=True)
+
+    def insert_rows(self, rows: List[Dict[str, Any]]):
+        """
+        Inserts rows into the results table. If a row with the same run already exists, it's replaced.
+        :param rows: List of dictionaries with keys from OPTIMIZER_COLUMN_NAMES.
+        """
+        if not rows:
+            return
+
+        if self.parquet_directory is not None:
+            self.write_parquet_rows(rows)
+            return
+
+        placeholders = ', '.join('?' for _ in OPTIMIZER_COLUMN_NAMES)
+        query = f'INSERT OR REPLACE INTO {self.table} ({", ".join(OPTIMIZER_COLUMN_NAMES)}) VALUES ({placeholders});'
+        values = [tuple(row.get(name) for name in OPTIMIZER_COLUMN_NAMES) for row in rows]
+
+        with closing(sqlite3.connect(self.database_file)) as connection:
+            with closing(connection.cursor()) as cursor:
+                cursor.executemany(query, values)
+                connection.commit()
+
+    def write_parquet_rows(self, rows: List[Dict[str, Any]]):
+        """
+        Writes rows to a new Parquet checkpoint file. The file is written under a temporary name and renamed once it's
+        complete, so a crash while writing doesn't leave a corrupt checkpoint behind.
+        :param rows: List of dictionaries with keys from OPTIMIZER_COLUMN_NAMES.
+        """
+        table = pa.Table.from_pylist([{name: row.get(name) for name in OPTIMIZER_COLUMN_NAMES} for row in rows],
+                                     schema=get_parquet_schema())
+        file_path = os.path.join(self.parquet_directory, f'part-{len(self.get_parquet_files()) + 1:08d}.parquet')
+        pq.write_table(table, f'{file_path}.tmp')
+        os.replace(f'{file_path}.tmp', file_path)
+
+    def insert_row(self, row: Dict[str, Any]):
+        """
+        Inserts a single row into the results table.
+        :param row: Dictionary with keys from OPTIMIZER_COLUMN_NAMES.
+        """
+        self.insert_rows([row])
+
+    def get_row_count(self) -> int:
+        """
+        Returns the amount of rows in the results table.
+        :return: Row count.
+        """
+        self.checkpoint()
+        if self.parquet_directory is not None:
+            return len(self.get_completed_runs())
+
+        with closing(sqlite3.connect(self.database_file)) as connection:
+            with closing(connection.cursor()) as cursor:
+                return cursor.execute(f'SELECT COUNT(*) FROM {self.table}').fetchone()[0]
+
+    def get_dataframe(self, order_by: str = 'run', descending: bool = False) -> pd.DataFrame:
+        """
+        Returns the results table in a Pandas DataFrame.
+        :param order_by: Column to sort results by.
+        :param descending: Boolean whether to sort in descending order or not.
+        :return: DataFrame containing optimizer results.
+        """
+        if order_by not in OPTIMIZER_COLUMN_NAMES:
+            raise ValueError(f"Invalid column to order by: {order_by}.")
+
+        self.checkpoint()
+        if self.parquet_directory is not None:
+            df = pa.Table.from_pylist(self.read_parquet_rows(), schema=get_parquet_schema()).to_pandas()
+            return df.sort_values(order_by, ascending=not descending, kind='stable').reset_index(drop=True)
+
+        query = f'SELECT * FROM {self.table} ORDER BY {order_by}{" DESC" if descending else ""}'
+        with closing(sqlite3.connect(self.database_file)) as connection:
+            return pd.read_sql_query(query, connection)
+
+    def export(self, file_path: str, file_type: str):
+        """
+        Exports results to the file path provided. If pyarrow is installed, Parquet exports are written straight from
+        the typed rows without building a DataFrame.
+        :param file_path: Path to export results to.
+        :param file_type: Type of file to export to: CSV, XLSX, or PARQUET.
+        """
+        file_type = validate_export_file_type(file_type)  # Validated before querying results.
+        if file_type == 'PARQUET' and pq is not None:
+            self.checkpoint()
+            table = pa.Table.from_pylist(self.get_rows(), schema=get_parquet_schema())
+            pq.write_table(table.rename_columns([OPTIMIZER_HEADERS[name] for name in table.column_names]), file_path)
+            return
+
+        df = self.get_dataframe()
+        df.rename(columns=OPTIMIZER_HEADERS, inplace=True)
+        df.set_index('Run', inplace=True)
+        export_dataframe(df, file_path, file_type)
@@ -0,0 +1,150 @@
+"""
+Order latency instrumentation. Exchange calls are timed from the trading signal to the request being sent, from the
+request to its response, and from the request to the fill reported by the exchange. Timings are kept in fixed-bucket
+histograms per endpoint and stage, so percentiles cost the same regardless of how many orders were made.
+"""
+
+from threading import Lock
+from typing import Dict, List, Optional, Tuple
+
+# Upper bounds in milliseconds of the histogram buckets. Latencies above the last bound go to an overflow bucket.
+LATENCY_BUCKETS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+SIGNAL_STAGE = 'signal'  # From the signal (the trade function being called) to the request being sent.
+REQUEST_STAGE = 'request'  # From the request being sent to its response.
+FILL_STAGE = 'fill'  # From the request being sent to the exchange's transaction time. Includes clock offset.
+STAGES = (SIGNAL_STAGE, REQUEST_STAGE, FILL_STAGE)
+
+PERCENTILES = (50, 95, 99)
+
+
+class LatencyHistogram:
+    """
+    Histogram of latencies in milliseconds with fixed buckets.
+    """
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        """
+        :param buckets: Ascending upper bounds of the buckets.
+        """
+        self.buckets = buckets
+        self.counts: List[int] = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.total = 0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+
+    def add(self, latency: float):
+        """
+        Adds a latency to the histogram.
+        :param latency: Latency in milliseconds.
+        """
+        index = next((index for index, bound in enumerate(self.buckets) if latency <= bound), len(self.buckets))
+        self.counts[index] += 1
+        self.count += 1
+        self.total += latency
+        self.min = latency if self.min is None else min(self.min, latency)
+        self.max = latency if self.max is None else max(self.max, latency)
+
+    def get_mean(self) -> Optional[float]:
+        """
+        Returns the mean latency.
+        :return: Mean latency or None if there aren't any latencies.
+        """
+        return self.total / self.count if self.count else None
+
+    def get_percentile(self, percentile: float) -> Optional[float]:
+        """
+        Returns an estimate of the percentile provided by interpolating linearly inside the bucket it falls in. The
+        estimate is clamped to the minimum and maximum latencies seen.
+        :param percentile: Percentile between 0 and 100.
+        :return: Estimated latency or None if there aren't any latencies.
+        """
+        if self.count == 0:
+            return None
+
+        rank = percentile / 100 * self.count
+        cumulative = 0
+        for index, bucket_count in enumerate(self.counts):
+            if bucket_count and cumulative + bucket_count >= rank:
+                lower = self.buckets[index - 1] if index > 0 else self.min
+                upper = self.buckets[index] if index < len(self.buckets) else self.max
+                estimate = lower + (upper - lower) * (rank - cumulative) / bucket_count
+                return min(max(estimate, self.min), self.max)
+            cumulative += bucket_count
+
+        return self.max
+
+
+class OrderLatencyTracker:
+    """
+    Latency histograms of exchange calls keyed by endpoint and stage, and slippage of fills against signal prices.
+    """
+    def __init__(self):
+        self.histograms: Dict[Tuple[str, str], LatencyHistogram] = {}
+        self.slippage_total = 0
+        self.slippage_count = 0
+        self.updates = 0  # Amount of calls and fills added, so views know when the statistics changed.
+        self.lock = Lock()  # Orders may be placed by the bot thread and by forced trades from the GUI.
+
+    def add_timings(self, endpoint: str, timings: Dict[str, Optional[float]]):
+        """
+        Adds the timings of a call to the endpoint's histograms.
+        :param endpoint: Endpoint called (e.g. createMarginOrder).
+        :param timings: Dictionary of latencies in milliseconds keyed by stage. None values are skipped.
+        """
+        with self.lock:
+            self.updates += 1
+            for stage, latency in timings.items():
+                if latency is not None:
+                    self.histograms.setdefault((endpoint, stage), LatencyHistogram()).add(latency)
+
+    def add_slippage(self, side: str, signal_price: float, fill_price: Optional[float]):
+        """
+        Adds the slippage of a fill against the price when its signal happened. Slippage is positive when the fill is
+        worse than the signal price.
+        :param side: Side of the order (BUY or SELL).
+        :param signal_price: Price when the order's signal happened.
+        :param fill_price: Average fill price of the order.
+        """
+        if fill_price is None or not signal_price:
+            return
+
+        slippage = (fill_price - signal_price) / signal_price * 100
+        with self.lock:
+            self.slippage_total += slippage if side == 'BUY' else -slippage
+            self.slippage_count += 1
+            self.updates += 1
+
+    def get_average_slippage(self) -> Optional[float]:
+        """
+        Returns the average slippage percentage of fills.
+        :return: Average slippage percentage or None if there weren't any fills.
+        """
+        return self.slippage_total / self.slippage_count if self.slippage_count else None
+
+    def get_request_counts(self) -> Dict[str, int]:
+        """
+        Returns the amount of requests made per endpoint.
+        :return: Dictionary of request counts keyed by endpoint.
+        """
+        with self.lock:
+            return {endpoint: histogram.count for (endpoint, stage), histogram in self.histograms.items()
+                    if stage == REQUEST_STAGE}
+
+    def get_statistics_dictionary(self) -> Dict[str, str]:
+        """
+        Returns formatted latency percentiles per endpoint and stage for the statistics window in the GUI.
+        :return: Dictionary of formatted statistics.
+        """
+        average_slippage = self.get_average_slippage()
+        statistics = {'averageSlippagePercentage': 'None' if average_slippage is None else
+                      f'{round(average_slippage, 4)}%'}
+
+        with self.lock:
+            for (endpoint, stage), histogram in sorted(self.histograms.items()):
+                percentiles = [histogram.get_percentile(percentile) for percentile in PERCENTILES]
+                statistics[f'{endpoint}{stage.capitalize()}Count'] = str(histogram.count)
+                statistics[f'{endpoint}{stage.capitalize()}Latency'] = \
+                    ' / '.join(f'{round(value, 1)}' for value in percentiles) + ' ms (p50 / p95 / p99)'
+
+        return statistics
@@ -0,0 +1,86 @@
+"""
+Rate limiter for Binance API requests shared across threads.
+"""
+
+import threading
+import time
+from typing import Callable
+
+# Binance allows 1200 request weight per minute (20 per second) per IP. Stay at half of it, as other threads use the API
+# too.
+BINANCE_WEIGHT_PER_SECOND = 10
+
+
+class RateLimiter:
+    """
+    Token bucket rate limiter. Tokens are refilled continuously at the rate provided and callers block until a token is
+    available, so bursts up to the capacity are allowed while the average rate is kept.
+    """
+    def __init__(self, rate: float, capacity: float = None, clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep):
+        """
+        :param rate: Tokens refilled per second.
+        :param capacity: Maximum tokens in the bucket. Defaults to the rate (one second worth of requests).
+        :param clock: Monotonic clock function.
+        :param sleep: Sleep function.
+        """
+        if rate <= 0:
+            raise ValueError("Rate must be positive.")
+
+        self.rate = rate
+        self.capacity = rate if capacity is None else capacity
+        self.clock = clock
+        self.sleep = sleep
+        self.tokens = self.capacity
+        self.last_refill = clock()
+        self.request_count = 0  # Amount of acquisitions (requests) made, for metrics.
+        self.weight_total = 0  # Total tokens (request weight) acquired, for metrics.
+        self.lock = threading.Lock()
+
+    def refill(self):
+        """
+        Refills tokens for the time elapsed since the last refill. The lock must be held by the caller.
+        """
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.last_refill) * self.rate)
+        self.last_refill = now
+
+    def try_acquire(self, tokens: float = 1) -> bool:
+        """
+        Takes the amount of tokens provided if they're available without blocking.
+        :param tokens: Amount of tokens to take.
+        :return: Boolean whether tokens were taken or not.
+        """
+        with self.lock:
+            self.refill()
+            if self.tokens < tokens:
+                return False
+
+            self.tokens -= tokens
+            self.request_count += 1
+            self.weight_total += tokens
+            return True
+
+    def acquire(self, tokens: float = 1):
+        """
+        Blocks until the amount of tokens provided is available and takes them.
+        :param tokens: Amount of tokens (request weight) to take.
+        """
+        if tokens > self.capacity:
+            raise ValueError(f"Cannot acquire {tokens} tokens with a capacity of {self.capacity}.")
+
+        while True:
+            with self.lock:
+                self.refill()
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    self.request_count += 1
+                    self.weight_total += tokens
+                    return
+
+                wait = (tokens - self.tokens) / self.rate
+
+            self.sleep(wait)
+
+
+BINANCE_RATE_LIMITER = RateLimiter(rate=BINANCE_WEIGHT_PER_SECOND)
@@ -0,0 +1,165 @@
+"""
+Retry policy for Binance API calls. Failed calls are retried a bounded amount of times with exponential backoff and
+jitter instead of recursing with fixed sleeps, and a circuit breaker stops calling Binance after consecutive failures,
+so callers fall back to their last known values (degraded mode) instead of stalling until Binance is reachable again.
+"""
+
+import random
+import threading
+import time
+from typing import Any, Callable, Optional
+
+CLOSED = 'closed'  # Calls are made normally.
+OPEN = 'open'  # Calls fail fast without being made.
+HALF_OPEN = 'half open'  # A single trial call is made to check whether Binance is reachable again.
+
+RETRY_MAX_ATTEMPTS = 4  # Attempts of a call before giving up.
+RETRY_BASE_DELAY = 1  # Seconds slept before the first retry. Doubled with every retry.
+RETRY_MAX_DELAY = 16  # Seconds slept before a retry at most.
+CIRCUIT_FAILURE_THRESHOLD = 8  # Consecutive failed attempts that open the circuit.
+CIRCUIT_RESET_TIMEOUT = 30  # Seconds the circuit stays open before a trial call.
+
+
+class CircuitOpenError(RuntimeError):
+    """
+    Raised instead of making a call while the circuit is open.
+    """
+
+
+class RetryPolicy:
+    """
+    Thread-safe retry policy with a circuit breaker. The circuit opens after consecutive failed attempts (across every
+    call made through the policy), fails calls fast while it's open, and lets a single trial attempt through once the
+    reset timeout passes; concurrent calls fail fast until the trial is done. A successful call closes it again.
+    """
+    def __init__(self, max_attempts: int = RETRY_MAX_ATTEMPTS, base_delay: float = RETRY_BASE_DELAY,
+                 max_delay: float = RETRY_MAX_DELAY, failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD,
+                 reset_timeout: float = CIRCUIT_RESET_TIMEOUT,
+                 on_retry: Callable[[Exception, int, float], None] = None,
+                 on_state_change: Callable[[str], None] = None,
+                 sleep: Callable[[float], None] = time.sleep, clock: Callable[[], float] = time.monotonic,
+                 random_function: Callable[[], float] = random.random):
+        """
+        :param max_attempts: Attempts of a call before giving up.
+        :param base_delay: Seconds slept before the first retry.
+        :param max_delay: Seconds slept before a retry at most.
+        :param failure_threshold: Consecutive failed attempts that open the circuit.
+        :param reset_timeout: Seconds the circuit stays open before a trial call.
+        :param on_retry: Function called with the exception, the failed attempt, and the delay before a retry.
+        :param on_state_change: Function called with the new state when the circuit opens or closes.
+        :param sleep: Sleep function.
+        :param clock: Monotonic clock function.
+        :param random_function: Function returning a random float in [0, 1) for jitter.
+        """
+        if max_attempts < 1:
+            raise ValueError("Max attempts must be at least 1.")
+
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.on_retry = on_retry
+        self.on_state_change = on_state_change
+        self.sleep = sleep
+        self.clock = clock
+        self.random_function = random_function
+        self.failure_count = 0  # Consecutive failed attempts.
+        self.opened_time: Optional[float] = None  # Clock time the circuit was last opened at.
+        self.retry_count = 0  # Amount of retries made, for metrics.
+        self.trial_in_flight = False  # Whether a half open trial attempt is being made.
+        self.lock = threading.RLock()
+
+    def get_state(self) -> str:
+        """
+        Returns the state of the circuit.
+        :return: Closed, open, or half open.
+        """
+        with self.lock:
+            if self.opened_time is None:
+                return CLOSED
+            if self.clock() - self.opened_time >= self.reset_timeout:
+                return HALF_OPEN
+            return OPEN
+
+    @property
+    def degraded(self) -> bool:
+        """
+        Boolean whether calls are failing (the circuit isn't closed) and callers are using last known values.
+        """
+        return self.get_state() != CLOSED
+
+    def get_delay(self, retry: int) -> float:
+        """
+        Returns seconds to sleep before a retry. Half of the exponential delay is jittered, so callers that failed
+        together don't retry together.
+        :param retry: Index of the retry starting from 0.
+        :return: Delay in seconds.
+        """
+        delay = min(self.max_delay, self.base_delay * 2 ** retry)
+        return delay / 2 + self.random_function() * delay / 2
+
+    def record_success(self):
+        """
+        Records a successful attempt, closing the circuit.
+        """
+        with self.lock:
+            previous = self.get_state()
+            self.failure_count = 0
+            self.opened_time = None
+
+        if previous != CLOSED and self.on_state_change:
+            self.on_state_change(CLOSED)
+
+    def record_failure(self):
+        """
+        Records a failed attempt, opening the circuit if the failure threshold is reached or if the attempt was a trial.
+        """
+        with self.lock:
+            previous = self.get_state()
+            self.failure_count += 1
+            if previous == HALF_OPEN or self.failure_count >= self.failure_threshold:
+                self.opened_time = self.clock()
+
+        if previous == CLOSED and self.opened_time is not None and self.on_state_change:
+            self.on_state_change(OPEN)
+
+    def call(self, function: Callable[..., Any], *args, attempts: int = None, **kwargs) -> Any:
+        """
+        Calls the function provided, retrying it if it raises. Calls that aren't safe to repeat (e.g. orders) must be
+        made with a single attempt.
+        :param function: Function to call.
+        :param args: Positional arguments of the function.
+        :param attempts: Attempts of the call. Defaults to the max attempts of the policy.
+        :param kwargs: Keyword arguments of the function.
+        :return: Return value of the function.
+        """
+        attempts = self.max_attempts if attempts is None else attempts
+        for attempt in range(1, attempts + 1):
+            with self.lock:
+                state = self.get_state()
+                if state == OPEN or (state == HALF_OPEN and self.trial_in_flight):
+                    raise CircuitOpenError(f"Binance calls are paused after {self.failure_count} consecutive "
+                                           f"failures.")
+                if state == HALF_OPEN:
+                    self.trial_in_flight = True
+
+            try:
+                result = function(*args, **kwargs)
+            except Exception as e:
+                self.record_failure()
+                if attempt == attempts or state == HALF_OPEN or self.get_state() == OPEN:
+                    raise
+
+                delay = self.get_delay(attempt - 1)
+                self.retry_count += 1
+                if self.on_retry:
+                    self.on_retry(e, attempt, delay)
+                self.sleep(delay)
+            else:
+                self.record_success()
+                return result
+            finally:
+                if state == HALF_OPEN:
+                    with self.lock:
+                        self.trial_in_flight = False
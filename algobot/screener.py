@@ -0,0 +1,256 @@
+"""
+Cross-sectional screener. Candles of every symbol in the local candle store are loaded into symbol by time matrices
+aligned on the interval's open times, indicators and custom strategies are evaluated over the whole matrices, and
+symbols are ranked by their latest values.
+"""
+
+import os
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from binance.client import interval_to_milliseconds
+from talib import abstract
+
+from algobot.candle_cache import CANDLE_CACHE_EXTENSION, PRICE_COLUMNS, CandleCache, get_candle_cache_file
+from algobot.enums import TRENDS
+from algobot.helpers import ROOT_DIR
+from algobot.interface.utils import MOVING_AVERAGE_TYPES_BY_NUM
+from algobot.strategies.plan import IndicatorNode, Signature, StrategyPlan, StrategySetPlan
+
+DATABASE_FOLDER = os.path.join(ROOT_DIR, 'Databases')
+DEFAULT_PERIODS = 500  # Periods loaded per symbol. Indicators with longer windows need more.
+DEFAULT_PRICE = 'close'
+
+# Trend arrays of symbols without a trend rank after symbols with one.
+NO_TREND_STREAK = np.iinfo(np.int64).max
+
+
+def get_cached_symbols(interval: str, database_folder: str = DATABASE_FOLDER) -> List[str]:
+    """
+    Returns symbols with candles of the interval provided in the candle store.
+    :param interval: Interval of the candles in short form (e.g. 1h).
+    :param database_folder: Folder the databases are stored in.
+    :return: Sorted list of symbols.
+    """
+    if not os.path.isdir(database_folder):
+        return []
+
+    suffix = f'_{interval}.{CANDLE_CACHE_EXTENSION}'
+    return sorted(file_name[:-len(suffix)] for file_name in os.listdir(database_folder) if file_name.endswith(suffix))
+
+
+def get_operation(info: Dict[str, Any], price: Optional[str] = None, output: Optional[str] = None,
+                  parameters: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Returns a parsed operation (as custom strategies parse them) of the TALIB indicator provided. Parameters that
+    aren't provided keep TALIB's defaults.
+    :param info: TALIB info dictionary of the indicator (as in strategy JSON files).
+    :param price: Price type the indicator is computed over. Defaults to the indicator's default price.
+    :param output: Output name of the indicator. Defaults to its first output.
+    :param parameters: Parameters of the indicator.
+    :return: Operation dictionary.
+    """
+    price = price or info['input_names'].get('price', DEFAULT_PRICE)
+    operation: Dict[str, Any] = {'indicator': info['name'], 'price': price.lower()}
+
+    for parameter, value in {**info['parameters'], **(parameters or {})}.items():
+        if 'matype' in parameter and isinstance(value, int):  # Operations hold moving averages by name.
+            value = MOVING_AVERAGE_TYPES_BY_NUM[value]
+        elif parameter in {'nbdevdn', 'nbdevup'}:  # TALIB expects a float even though it should accept an int.
+            value = float(value)
+        operation[parameter] = value
+
+    output = output or info['output_names'][0]
+    operation['output'] = (None, output) if output == 'real' else (info['output_names'].index(output), output)
+    return operation
+
+
+def get_strategy_values(json_strategy: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Returns parsed custom strategy values of a strategy loaded from JSON (see strategies.loader). The GUI fills in
+    parameters from its widgets; the screener uses TALIB's defaults (or the JSON's values if it has any).
+    :param json_strategy: Strategy dictionary loaded from JSON.
+    :return: Parsed strategy values.
+    """
+    values: Dict[str, Any] = {'name': json_strategy['name']}
+    for trend in TRENDS:
+        trend_items = json_strategy.get(trend)
+        if not trend_items:
+            continue
+
+        values[trend] = {}
+        for uuid, item in trend_items.items():
+            operation = get_operation(item, price=item.get('price'), output=item.get('output'))
+            operation['operator'] = item['operator']
+
+            against = item['against']
+            if isinstance(against, dict):
+                operation['against'] = get_operation(against)
+            elif against == 'current_price':
+                operation['against'] = DEFAULT_PRICE.capitalize()
+            else:
+                operation['against'] = against
+
+            values[trend][uuid] = operation
+
+    return values
+
+
+class CandleMatrix:
+    """
+    Candles of many symbols aligned on the same open times. Every column is a symbol by time matrix; periods a symbol
+    doesn't have a candle for (e.g. before it was listed) are NaN.
+    """
+    def __init__(self, symbols: List[str], timestamps: np.ndarray, arrays: Dict[str, np.ndarray]):
+        """
+        :param symbols: Symbols of the rows.
+        :param timestamps: Open times in milliseconds of the columns.
+        :param arrays: Dictionary of symbol by time matrices keyed by price column.
+        """
+        self.symbols = symbols
+        self.timestamps = timestamps
+        self.arrays = arrays
+
+        # Index of the first period after the last missing candle of every symbol. Indicators are computed from there,
+        #  as TALIB can't compute over gaps.
+        missing = np.isnan(arrays['close'])
+        self.starts = np.where(missing.any(axis=1), len(timestamps) - np.argmax(missing[:, ::-1], axis=1), 0)
+
+    def compute(self, indicator: IndicatorNode) -> np.ndarray:
+        """
+        Computes the indicator provided over every symbol. TALIB only works on 1-D arrays, so it's called once per
+        symbol over the symbol's contiguous rows; symbols without enough candles are left NaN.
+        :param indicator: Compiled indicator.
+        :return: Symbol by time matrix of indicator values.
+        """
+        periods = len(self.timestamps)
+        result = np.full((len(self.symbols), periods), np.nan)
+        min_period = indicator.get_min_period()
+
+        for row, start in enumerate(self.starts):
+            if periods - start < min_period:
+                continue
+
+            input_arrays_dict = {column: array[row, start:] for column, array in self.arrays.items()}
+            result[row, start:] = indicator.compute(input_arrays_dict)
+
+        return result
+
+    def compute_all(self, indicators: Dict[Signature, IndicatorNode]) -> Dict[Signature, np.ndarray]:
+        """
+        Computes every indicator provided over every symbol.
+        :param indicators: Dictionary of compiled indicators keyed by their signatures.
+        :return: Dictionary of indicator matrices keyed by their signatures.
+        """
+        return {signature: self.compute(indicator) for signature, indicator in indicators.items()}
+
+
+def load_candle_matrix(interval: str, symbols: Optional[List[str]] = None, periods: int = DEFAULT_PERIODS,
+                       database_folder: str = DATABASE_FOLDER) -> CandleMatrix:
+    """
+    Loads the latest candles of the symbols provided from the candle store into a candle matrix. Columns end at the
+    latest open time of any symbol, so symbols that aren't up to date end with NaN.
+    :param interval: Interval of the candles in short form (e.g. 1h).
+    :param symbols: Symbols to load. Defaults to every symbol in the candle store.
+    :param periods: Amount of periods to load.
+    :param database_folder: Folder the databases are stored in.
+    :return: Candle matrix.
+    """
+    if symbols is None:
+        symbols = get_cached_symbols(interval, database_folder)
+
+    interval_milliseconds = interval_to_milliseconds(interval)
+    candles = {}
+    for symbol in symbols:
+        array = CandleCache(get_candle_cache_file(database_folder, symbol, interval)).open()
+        if len(array):
+            candles[symbol] = array[-periods:]
+
+    symbols = list(candles)
+    end = max((int(array['date_utc'][-1]) for array in candles.values()), default=0)
+    timestamps = end - interval_milliseconds * np.arange(periods - 1, -1, -1, dtype=np.int64)
+    arrays = {column: np.full((len(symbols), periods), np.nan) for column in PRICE_COLUMNS}
+
+    for row, array in enumerate(candles.values()):
+        indices = (array['date_utc'] - timestamps[0]) // interval_milliseconds
+        in_range = (indices >= 0) & ((array['date_utc'] - timestamps[0]) % interval_milliseconds == 0)
+        for column in PRICE_COLUMNS:
+            arrays[column][row, indices[in_range]] = array[column][in_range]
+
+    arrays['high/low'] = (arrays['high'] + arrays['low']) / 2
+    arrays['open/close'] = (arrays['open'] + arrays['close']) / 2
+
+    return CandleMatrix(symbols, timestamps, arrays)
+
+
+def set_ranks(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Replaces the index of a sorted DataFrame with ranks starting from 1.
+    :param df: Sorted DataFrame.
+    :return: DataFrame indexed by rank.
+    """
+    df.index = pd.RangeIndex(1, len(df) + 1, name='Rank')
+    return df
+
+
+def screen_indicator(matrix: CandleMatrix, indicator: str, price: Optional[str] = None, output: Optional[str] = None,
+                     ascending: bool = False, **parameters) -> pd.DataFrame:
+    """
+    Ranks symbols by the latest value of a TALIB indicator.
+    :param matrix: Candle matrix to screen.
+    :param indicator: Name of the TALIB indicator (e.g. RSI).
+    :param price: Price type the indicator is computed over.
+    :param output: Output name of the indicator for indicators with multiple outputs.
+    :param ascending: Boolean whether the lowest values rank first or not.
+    :param parameters: Parameters of the indicator. Missing parameters keep TALIB's defaults.
+    :return: DataFrame ranked by indicator value. Symbols without a value rank last.
+    """
+    node = IndicatorNode(get_operation(abstract.Function(indicator).info, price, output, parameters))
+    values = matrix.compute(node)[:, -1]
+
+    df = pd.DataFrame({
+        'Symbol': matrix.symbols,
+        'Close': matrix.arrays['close'][:, -1],
+        node.label: values,
+    })
+    df = df.sort_values([node.label, 'Symbol'], ascending=[ascending, True], na_position='last', kind='mergesort')
+    return set_ranks(df)
+
+
+def get_trend_streaks(trend_array: np.ndarray) -> np.ndarray:
+    """
+    Returns how many periods the latest trend of every symbol has held for.
+    :param trend_array: Symbol by time object matrix of trends.
+    :return: Array of streaks.
+    """
+    same = trend_array == trend_array[:, -1:]
+    streaks = np.where(same.all(axis=1), same.shape[1], np.argmin(same[:, ::-1], axis=1))
+    return np.where(pd.isnull(trend_array[:, -1]), NO_TREND_STREAK, streaks)
+
+
+def screen_strategies(matrix: CandleMatrix, strategies: Dict[str, Dict[str, Any]]) -> Dict[str, pd.DataFrame]:
+    """
+    Ranks symbols by the latest trend of every custom strategy provided. Indicators shared across strategies are
+    computed once. Symbols with a trend rank first, with the most recent signals (shortest streaks) first.
+    :param matrix: Candle matrix to screen.
+    :param strategies: Dictionary of parsed strategy values (see get_strategy_values) keyed by strategy name.
+    :return: Dictionary of ranked DataFrames keyed by strategy name.
+    """
+    set_plan = StrategySetPlan({name: StrategyPlan(values) for name, values in strategies.items()})
+    indicator_arrays = matrix.compute_all(set_plan.indicators)
+    close = matrix.arrays['close'][:, -1]
+
+    results = {}
+    for name, plan in set_plan.plans.items():
+        trend_array = plan.get_trend_array(matrix.arrays, indicator_arrays)
+        streaks = get_trend_streaks(trend_array)
+        columns = {'Symbol': matrix.symbols, 'Close': close, 'Trend': trend_array[:, -1], 'Streak': streaks}
+        for signature, indicator in plan.indicators.items():
+            columns[indicator.label] = indicator_arrays[signature][:, -1]
+
+        df = pd.DataFrame(columns).sort_values(['Streak', 'Symbol'], kind='mergesort')
+        df['Streak'] = df['Streak'].where(df['Streak'] != NO_TREND_STREAK)
+        results[name] = set_ranks(df)
+
+    return results
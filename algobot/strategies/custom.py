@@ -11,10 +11,11 @@ import pandas as pd
 from PyQt5.QtWidgets import QWidget
 from talib import abstract
 
-from algobot.enums import BEARISH, BULLISH, ENTER_LONG, ENTER_SHORT, EXIT_LONG, EXIT_SHORT, TRENDS
+from algobot.enums import TRENDS
 from algobot.helpers import get_random_color
 from algobot.interface.configuration_helpers import get_input_widget_value
-from algobot.interface.utils import MOVING_AVERAGE_TYPES_BY_NAME, PRICE_TYPES
+from algobot.strategies.plan import (ComparisonNode, IndicatorNode, StrategyPlan, get_func_kwargs, get_pretty_label,
+                                     get_trend_from_true_trends)
 
 
 class CustomStrategy:
@@ -39,6 +40,9 @@ class CustomStrategy:
         self.values: Dict[str, Any] = self.parse_values(values)
         self.name = self.values['name']
 
+        # Execution plan compiled from the values, so they're not re-walked and re-parsed on every tick.
+        self.plan = StrategyPlan(self.values)
+
         # These are dynamically set by the get_trend() function.
         self.log_data: bool = False
         self.in_lower_interval: bool = False
@@ -68,21 +72,11 @@ class CustomStrategy:
 
     def initialize_plot_dict(self):
         """
-        Initialize plot dictionary for custom strategies. This will loop through each indicator, gather outputs and
-         labels, and then create a dictionary with label/value pairs.
+        Initialize plot dictionary for custom strategies. This will loop through each indicator of the plan and create
+         a dictionary with label/value pairs.
         """
-        for trend, indicators in self.values.items():
-            if trend not in TRENDS:
-                continue
-
-            for operation in indicators.values():
-                label = self.get_pretty_label(operation, self.get_func_kwargs(operation))
-                self.plot_dict[label] = [self.get_current_trader_price(), get_random_color()]
-
-                against = operation['against']
-                if isinstance(against, dict):
-                    label = self.get_pretty_label(against, self.get_func_kwargs(against))
-                    self.plot_dict[label] = [self.get_current_trader_price(), get_random_color()]
+        for label in self.plan.get_labels():
+            self.plot_dict[label] = [self.get_current_trader_price(), get_random_color()]
 
     def get_plot_data(self) -> Dict[str, Union[List[Union[float, str]], int]]:
         """
@@ -93,39 +87,34 @@ class CustomStrategy:
 
     def get_indicator_val_and_label(
             self,
-            operation: dict,
+            indicator: IndicatorNode,
             input_arrays_dict: Dict[str, pd.Series],
             get_arr: bool = False
     ) -> Tuple[Union[pd.Series, int, float], str]:
         """
         Get indicator value and label. This also logs the value and label. TODO: Why log here? Separate it.
-        :param operation: Dictionary containing indicator operation information in a dictionary.
+        :param indicator: Compiled indicator from the strategy plan.
         :param input_arrays_dict: Dictionary containing price type as key and price values as value.
         :param get_arr: Boolean whether to get entire array of results from TALIB or singular result value.
         :return:
         """
-        kwargs = self.get_func_kwargs(operation)
-        label = self.get_pretty_label(operation=operation, func_kwargs=kwargs)
+        label = indicator.label
 
-        # We have this value in our cache, so just quick-return.
-        if label in self.cache:
-            return self.cache[label], label
+        # We have this value in our cache, so just quick-return. The cache is keyed by signature, so it can be shared
+        #  between strategies using the same indicators.
+        if indicator.signature in self.cache and not get_arr:
+            return self.cache[indicator.signature], label
 
-        func = abstract.Function(operation['indicator'])
-        val = func(input_arrays_dict, **kwargs)
-
-        output_index, _output_verbose = operation['output']
-        if output_index is not None:
-            val = val[output_index]
+        val = indicator.compute(input_arrays_dict)
 
         if get_arr:
             return val, label
 
         # TODO: Fix this. Very ugly solution.
         if self.log_data and hasattr(self.trader, 'output_message'):
-            self.trader.output_message(f'{label}: {val[-1]}')
+            self.trader.output_message('%s: %s', args=(label, val[-1]))
 
-        self.cache[label] = val[-1]
+        self.cache[indicator.signature] = val[-1]
         return val[-1], label
 
     def populate_grouped_dict(self, grouped_dict: Dict[str, Dict[str, Any]]):
@@ -207,15 +196,7 @@ class CustomStrategy:
         :param kwargs: Kwargs to filter out.
         :return: Filtered kwargs.
         """
-        ignored_keys = {'against', 'indicator', 'operator', 'output'}
-
-        parsed = {key: value for key, value in kwargs.items() if key not in ignored_keys}
-        for key, value in parsed.items():
-            # We display verbosely, but we must cast back to numeric for TALIB to understand the moving average.
-            if 'matype' in key:
-                parsed[key] = MOVING_AVERAGE_TYPES_BY_NAME[value]
-
-        return parsed
+        return get_func_kwargs(kwargs)
 
     @staticmethod
     def get_pretty_label(operation: dict, func_kwargs: dict) -> str:
@@ -225,15 +206,29 @@ class CustomStrategy:
         :param func_kwargs: Function keyword arguments. We use this to get the timeperiod.
         :return: Prettified label.
         """
-        output_index, output_verbose = operation['output']
-        price = operation['price'].capitalize()
+        return get_pretty_label(operation, func_kwargs)
 
-        # If there's no output index, we get the "real" value. The real value is nothing but the indicator, so we'll
-        #  leverage that for the label. However, if it does have an index, we'll get the verbose output from above.
-        if output_index is None:
-            return f'{operation["indicator"]}({func_kwargs.get("timeperiod", "No Timeperiod")}) - {price}'
+    def get_tick_output(self) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, Any]]:
+        """
+        Returns a copy of what the strategy output at the current tick besides its trend: its strategy dictionary and
+        plot values. Backtests sharing trends between runs restore it with restore_tick_output().
+        :return: Tuple of the strategy dictionary and plot values keyed by label.
+        """
+        strategy_dict = {interval_type: dict(values) for interval_type, values in self.strategy_dict.items()}
+        return strategy_dict, {label: plot[0] for label, plot in self.plot_dict.items()}
+
+    def restore_tick_output(self, output: Tuple[Dict[str, Dict[str, Any]], Dict[str, Any]]):
+        """
+        Restores the strategy dictionary and plot values from get_tick_output().
+        :param output: Tuple of the strategy dictionary and plot values keyed by label.
+        """
+        strategy_dict, plot_values = output
+        for interval_type, values in strategy_dict.items():
+            self.strategy_dict[interval_type].clear()
+            self.strategy_dict[interval_type].update(values)
 
-        return f'{output_verbose}({func_kwargs.get("timeperiod", "No Timeperiod")}) - {price}'
+        for label, value in plot_values.items():
+            self.plot_dict[label][0] = value
 
     def get_interval_type(self):
         """
@@ -242,6 +237,27 @@ class CustomStrategy:
         """
         return 'lower' if self.in_lower_interval else 'regular'
 
+    def get_against_val(self, comparison: ComparisonNode, input_arrays_dict: Dict[str, pd.Series]):
+        """
+        Get the value the comparison's indicator is compared against.
+        :param comparison: Compiled comparison from the strategy plan.
+        :param input_arrays_dict: Dictionary containing price type as key and price values as value.
+        :return: Against value.
+        """
+        if comparison.against_price is not None:
+            return np.asarray(input_arrays_dict[comparison.against_price])[-1]
+        if comparison.against_indicator is None:
+            return comparison.against_value
+
+        against_val, against_label = self.get_indicator_val_and_label(comparison.against_indicator, input_arrays_dict)
+        self.strategy_dict[self.get_interval_type()][against_label] = against_val
+
+        # TODO: Ugly. We don't want to initialize plot dictionaries for lower intervals, do we?
+        if not self.in_lower_interval:
+            self.plot_dict[against_label][0] = against_val
+
+        return against_val
+
     def get_trend_by_key(self, key: str, input_arrays_dict: Dict[str, pd.Series]) -> bool:
         """
         Get trend by key.
@@ -249,34 +265,22 @@ class CustomStrategy:
         :param input_arrays_dict: Dictionary containing price type as key and price values as value.
         :return: Boolean regarding trend. If True is returned, this key trend is true, else false.
         """
-        indicators = self.values.get(key)
-        if not indicators:  # Nothing provided as an input for this trend.
+        comparisons = self.plan.trends.get(key)
+        if not comparisons:  # Nothing provided as an input for this trend.
             return False
 
         interval_type = self.get_interval_type()
         trends = []
-        for operation in indicators.values():
-            val, label = self.get_indicator_val_and_label(operation, input_arrays_dict)
+        for comparison in comparisons:
+            val, label = self.get_indicator_val_and_label(comparison.indicator, input_arrays_dict)
             self.strategy_dict[interval_type][label] = val
 
             # TODO: This is ugly. Refactor.
             if not self.in_lower_interval:
                 self.plot_dict[label][0] = val  # The 2nd value is the color, so we only update the value.
 
-            if operation['against'] in PRICE_TYPES:
-                price_type = operation['against'].lower()
-                against_val = input_arrays_dict[price_type].iloc[-1]
-            elif isinstance(operation['against'], (float, int)):
-                against_val = operation['against']
-            else:
-                against_val, against_label = self.get_indicator_val_and_label(operation['against'], input_arrays_dict)
-                self.strategy_dict[interval_type][against_label] = against_val
-
-                # TODO: Ugly. We don't want to initialize plot dictionaries for lower intervals, do we?
-                if not self.in_lower_interval:
-                    self.plot_dict[against_label][0] = against_val
-
-            result = eval(f'{val} {operation["operator"]} {against_val}')  # pylint: disable=eval-used
+            against_val = self.get_against_val(comparison, input_arrays_dict)
+            result = comparison.compare(val, against_val)
             trends.append(result)
 
             if self.short_circuit and result is False:
@@ -304,26 +308,10 @@ class CustomStrategy:
         # TODO: Fix this. Very ugly solution.
         if self.log_data and hasattr(self.trader, 'output_message'):
             label = 'lower' if in_lower_interval else 'regular'
-            self.trader.output_message(f'\nInformation for {label} interval data:')
+            self.trader.output_message('\nInformation for %s interval data:', args=(label,))
 
         trends = {trend: self.get_trend_by_key(trend, input_arrays_dict) for trend in TRENDS}
-
-        true_trends = []
-        for trend_name, trend_status in trends.items():
-            if trend_status is True:
-                true_trends.append(trend_name)
-
-        if len(true_trends) == 0:
-            self.trend = None
-        elif len(true_trends) == 1:
-            self.trend = true_trends.pop()
-        elif all(trend in (EXIT_LONG, ENTER_SHORT) for trend in true_trends):
-            self.trend = BEARISH
-        elif all(trend in (ENTER_LONG, EXIT_SHORT) for trend in true_trends):
-            self.trend = BULLISH
-        else:
-            self.trend = None
-
+        self.trend = get_trend_from_true_trends([trend for trend, status in trends.items() if status is True])
         return self.trend
 
     def get_current_trader_price(self):
@@ -357,39 +345,9 @@ class CustomStrategy:
 
     def get_min_option_period(self) -> int:
         """
-        Get minimum periods required. This will traverse through the current selected parameters and get the minimum
-         periods required. To find the minimum, we find the maximum number. To use a dummy placeholder, we'll
-         initialize a dummy numpy array with 500 random values for each price type.
+        Get minimum periods required. This is the maximum of the minimum periods required by the current selected
+         indicators, computed from TALIB's lookbacks (memoized per indicator signature).
 
         :return: Minimum periods required.
         """
-        np_arr = np.random.random(500)
-        test_dict = {
-            'high': np_arr,
-            'low': np_arr,
-            'open': np_arr,
-            'close': np_arr,
-            'volume': np_arr,
-            'open/close': np_arr,
-            'high/low': np_arr
-        }
-
-        current_minimum = 0
-
-        for trend, indicators in self.values.items():
-            if trend not in TRENDS:
-                continue
-
-            for operation in indicators.values():
-                val, _label = self.get_indicator_val_and_label(operation, test_dict, get_arr=True)
-                first_non_nan = np.where(np.isnan(val))[0][-1] + 2
-                current_minimum = max(first_non_nan, current_minimum)
-
-                # Check for the against indicator too if it exists.
-                against = operation['against']
-                if isinstance(against, dict):
-                    val, _label = self.get_indicator_val_and_label(against, test_dict, get_arr=True)
-                    first_non_nan = np.where(np.isnan(val))[0][-1] + 2
-                    current_minimum = max(first_non_nan, current_minimum)
-
-        return current_minimum
+        return self.plan.get_min_period()
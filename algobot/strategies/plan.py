@@ -0,0 +1,463 @@
+"""
+Execution plans compiled from custom strategy values. Compiling resolves TALIB functions, operators, labels, and keyword
+arguments once, so evaluating a strategy doesn't walk its values or build expressions on every tick.
+"""
+import operator
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+from talib import abstract
+
+from algobot.enums import BEARISH, BULLISH, ENTER_LONG, ENTER_SHORT, EXIT_LONG, EXIT_SHORT, TRENDS
+from algobot.interface.utils import MOVING_AVERAGE_TYPES_BY_NAME, PRICE_TYPES
+
+OPERATORS: Dict[str, Callable[[Any, Any], Any]] = {
+    '>': operator.gt,
+    '<': operator.lt,
+    '>=': operator.ge,
+    '<=': operator.le,
+    '==': operator.eq,
+    '!=': operator.ne,
+}
+
+# Canonical signature of an indicator: function, input price, sorted parameters, and output index.
+Signature = Tuple[str, Optional[str], Tuple[Tuple[str, Any], ...], Optional[int]]
+
+# Lookbacks of indicator signatures, memoized for the whole process so optimizer combos don't recompute them.
+LOOKBACKS: Dict[Signature, int] = {}
+PROBE_PERIODS = 500  # Initial amount of periods used when probing for a lookback.
+MAX_PROBE_PERIODS = 64000
+
+# Functions with an unstable period (e.g. EMA or KAMA) depend on every value before them, so computing them over a
+#  window only converges after extra periods. These are added on top of the lookback when deriving windows.
+UNSTABLE_PERIOD_FLAG = 'Function has an unstable period'
+UNSTABLE_FUNCTIONS = {'APO', 'DEMA', 'MACD', 'MACDEXT', 'MACDFIX', 'PPO', 'STOCHRSI', 'TEMA', 'TRIX'}
+STABILITY_MARGIN_MULTIPLIER = 10
+MIN_STABILITY_MARGIN = 100
+
+BEARISH_TRENDS = {EXIT_LONG, ENTER_SHORT}
+BULLISH_TRENDS = {ENTER_LONG, EXIT_SHORT}
+
+
+def get_func_kwargs(kwargs: dict) -> dict:
+    """
+    We just want **kwargs to feed into TALIB. To do this, we'll just use the current dictionary minus the ignored
+     keys.
+    :param kwargs: Kwargs to filter out.
+    :return: Filtered kwargs.
+    """
+    ignored_keys = {'against', 'indicator', 'operator', 'output'}
+
+    parsed = {key: value for key, value in kwargs.items() if key not in ignored_keys}
+    for key, value in parsed.items():
+        # We display verbosely, but we must cast back to numeric for TALIB to understand the moving average.
+        if 'matype' in key:
+            parsed[key] = MOVING_AVERAGE_TYPES_BY_NAME[value]
+
+    return parsed
+
+
+def get_pretty_label(operation: dict, func_kwargs: dict) -> str:
+    """
+    Get prettified label for plots and statistics windows.
+    :param operation: Operation dictionary containing indicator, operator, and against information.
+    :param func_kwargs: Function keyword arguments. We use this to get the timeperiod.
+    :return: Prettified label.
+    """
+    output_index, output_verbose = operation['output']
+    price = operation['price'].capitalize()
+
+    # If there's no output index, we get the "real" value. The real value is nothing but the indicator, so we'll
+    #  leverage that for the label. However, if it does have an index, we'll get the verbose output from above.
+    if output_index is None:
+        return f'{operation["indicator"]}({func_kwargs.get("timeperiod", "No Timeperiod")}) - {price}'
+
+    return f'{output_verbose}({func_kwargs.get("timeperiod", "No Timeperiod")}) - {price}'
+
+
+def get_trend_from_true_trends(true_trends: List[str]) -> Optional[str]:
+    """
+    Returns the overall trend from the trends that are true. There must be only one trend; if multiple trends are true,
+    they must all be bearish or all be bullish, else there's no trend.
+    :param true_trends: List of trends that are true.
+    :return: Trend or None.
+    """
+    if len(true_trends) == 0:
+        return None
+    if len(true_trends) == 1:
+        return true_trends[0]
+    if all(trend in BEARISH_TRENDS for trend in true_trends):
+        return BEARISH
+    if all(trend in BULLISH_TRENDS for trend in true_trends):
+        return BULLISH
+
+    return None
+
+
+def get_probe_lookback(signature: Signature) -> int:
+    """
+    Finds the lookback of an indicator by computing it over random values and finding its last NaN value. The amount
+    of random values is doubled until the indicator produces a value.
+    :param signature: Signature of the indicator.
+    :return: Lookback (amount of leading periods without a value).
+    """
+    function_name, price, parameters, output_index = signature
+    kwargs = dict(parameters)
+    if price is not None:
+        kwargs['price'] = price
+
+    periods = PROBE_PERIODS
+    while True:
+        values = np.random.random(periods)
+        input_arrays_dict = {price_type.lower(): values for price_type in PRICE_TYPES}
+        input_arrays_dict['volume'] = values
+
+        output = abstract.Function(function_name)(input_arrays_dict, **kwargs)
+        if output_index is not None:
+            output = output[output_index]
+
+        nan_indices = np.where(np.isnan(np.asarray(output, dtype=float)))[0]
+        if len(nan_indices) == 0:
+            return 0
+        if nan_indices[-1] < periods - 1 or periods >= MAX_PROBE_PERIODS:
+            return int(nan_indices[-1]) + 1
+
+        periods *= 2
+
+
+def get_lookback(signature: Signature) -> int:
+    """
+    Returns the lookback of an indicator: the amount of leading periods TALIB doesn't produce a value for. TALIB's own
+    lookback is used when it's available, else the indicator is probed. Results are memoized per signature.
+    :param signature: Signature of the indicator.
+    :return: Lookback.
+    """
+    if signature not in LOOKBACKS:
+        function = abstract.Function(signature[0])
+        try:
+            function.set_parameters(dict(signature[2]))
+            LOOKBACKS[signature] = int(function.lookback)
+        except Exception:  # pylint: disable=broad-except
+            LOOKBACKS[signature] = get_probe_lookback(signature)
+
+    return LOOKBACKS[signature]
+
+
+def is_unstable(signature: Signature) -> bool:
+    """
+    Checks whether an indicator has an unstable period: either the function itself or a moving average it uses (any
+    moving average type other than the simple moving average).
+    :param signature: Signature of the indicator.
+    :return: Boolean whether the indicator is unstable or not.
+    """
+    function_name, _price, parameters, _output_index = signature
+    if function_name in UNSTABLE_FUNCTIONS:
+        return True
+    if any('matype' in key and value != 0 for key, value in parameters):
+        return True
+
+    return UNSTABLE_PERIOD_FLAG in (abstract.Function(function_name).info['function_flags'] or [])
+
+
+def get_stability_margin(signature: Signature) -> int:
+    """
+    Returns the amount of extra periods an indicator needs on top of its lookback for its values to stabilize.
+    :param signature: Signature of the indicator.
+    :return: Stability margin (0 for stable indicators).
+    """
+    if not is_unstable(signature):
+        return 0
+
+    return max(MIN_STABILITY_MARGIN, STABILITY_MARGIN_MULTIPLIER * (get_lookback(signature) + 1))
+
+
+class IndicatorNode:
+    """
+    Compiled indicator with its resolved TALIB function, keyword arguments, output index, and label.
+    """
+    def __init__(self, operation: dict):
+        """
+        :param operation: Parsed operation (or against) dictionary of a custom strategy.
+        """
+        self.indicator: str = operation['indicator']
+        self.function = abstract.Function(self.indicator)
+        self.kwargs = get_func_kwargs(operation)
+        self.output_index: Optional[int] = operation['output'][0]
+        self.label = get_pretty_label(operation, self.kwargs)
+
+        # Labels only contain the time period, so two indicators with the same label can differ in their other
+        #  parameters. Computations are shared by signature instead.
+        parameters = tuple(sorted((key, value) for key, value in self.kwargs.items() if key != 'price'))
+        self.signature: Signature = (self.indicator, self.kwargs.get('price'), parameters, self.output_index)
+
+    def get_min_period(self) -> int:
+        """
+        Returns the minimum amount of periods required for the indicator to produce a value.
+        :return: Minimum periods.
+        """
+        return get_lookback(self.signature) + 1
+
+    def get_window(self) -> int:
+        """
+        Returns the amount of periods the indicator should be computed over for a stable latest value.
+        :return: Window size.
+        """
+        return self.get_min_period() + get_stability_margin(self.signature)
+
+    def compute(self, input_arrays_dict: Dict[str, Any]):
+        """
+        Computes the indicator over the input arrays provided.
+        :param input_arrays_dict: Dictionary containing price type as key and price values as value.
+        :return: Array of indicator values.
+        """
+        values = self.function(input_arrays_dict, **self.kwargs)
+        if self.output_index is not None:
+            values = values[self.output_index]
+
+        return values
+
+
+class ComparisonNode:
+    """
+    Compiled comparison of an indicator against a price type, a constant, or another indicator.
+    """
+    def __init__(self, operation: dict, indicator: IndicatorNode, against_indicator: Optional[IndicatorNode]):
+        """
+        :param operation: Parsed operation dictionary of a custom strategy.
+        :param indicator: Compiled indicator of the operation.
+        :param against_indicator: Compiled against indicator of the operation (if it's compared against one).
+        """
+        if operation['operator'] not in OPERATORS:
+            raise ValueError(f"Invalid operator {operation['operator']} provided.")
+
+        self.indicator = indicator
+        self.operator_string: str = operation['operator']
+        self.operator = OPERATORS[self.operator_string]
+        self.against_indicator = against_indicator
+        self.against_price: Optional[str] = None
+        self.against_value: Optional[Union[float, int]] = None
+
+        against = operation['against']
+        if against in PRICE_TYPES:
+            self.against_price = against.lower()
+        elif isinstance(against, (float, int)):
+            self.against_value = against
+        elif against_indicator is None:
+            raise ValueError(f"Invalid against value {against} provided.")
+
+    def compare(self, value, against_value) -> bool:
+        """
+        Compares the values provided with this comparison's operator.
+        :param value: Indicator value.
+        :param against_value: Value to compare the indicator value against.
+        :return: Boolean result of the comparison.
+        """
+        return bool(self.operator(value, against_value))
+
+    def evaluate_arrays(self, indicator_arrays: Dict[Signature, np.ndarray],
+                        input_arrays_dict: Dict[str, Any]) -> np.ndarray:
+        """
+        Evaluates the comparison over whole arrays (or symbol by time matrices). Periods where a value is not available
+        yet are false.
+        :param indicator_arrays: Dictionary of computed indicator arrays keyed by their signatures.
+        :param input_arrays_dict: Dictionary containing price type as key and price values as value.
+        :return: Boolean array.
+        """
+        values = indicator_arrays[self.indicator.signature]
+        if self.against_price is not None:
+            against_values = np.asarray(input_arrays_dict[self.against_price], dtype=float)
+        elif self.against_indicator is not None:
+            against_values = indicator_arrays[self.against_indicator.signature]
+        else:
+            against_values = np.full(np.shape(values), self.against_value, dtype=float)
+
+        valid = ~np.isnan(values) & ~np.isnan(against_values)
+        return valid & self.operator(np.where(valid, values, 0), np.where(valid, against_values, 0))
+
+
+class StrategyPlan:
+    """
+    Execution plan of a custom strategy: its unique indicators in the order they're needed, and the comparisons of
+    every trend.
+    """
+    def __init__(self, values: Dict[str, Any]):
+        """
+        :param values: Parsed values of a custom strategy.
+        """
+        self.indicators: Dict[Signature, IndicatorNode] = {}
+        self.trends: Dict[str, List[ComparisonNode]] = {}
+
+        for trend in TRENDS:
+            operations = values.get(trend)
+            if not operations:  # Nothing provided as an input for this trend.
+                continue
+
+            comparisons = []
+            for operation in operations.values():
+                indicator = self.add_indicator(operation)
+                against_indicator = None
+                if isinstance(operation['against'], dict):
+                    against_indicator = self.add_indicator(operation['against'])
+
+                comparisons.append(ComparisonNode(operation, indicator, against_indicator))
+
+            self.trends[trend] = comparisons
+
+    def add_indicator(self, operation: dict) -> IndicatorNode:
+        """
+        Adds the indicator of the operation provided to the plan if it's not in it already.
+        :param operation: Parsed operation (or against) dictionary.
+        :return: Compiled indicator.
+        """
+        indicator = IndicatorNode(operation)
+        return self.indicators.setdefault(indicator.signature, indicator)
+
+    def get_min_period(self) -> int:
+        """
+        Returns the minimum amount of periods required for every indicator of the plan to produce a value.
+        :return: Minimum periods.
+        """
+        return max((indicator.get_min_period() for indicator in self.indicators.values()), default=0)
+
+    def get_window(self) -> int:
+        """
+        Returns the amount of periods the plan's indicators should be computed over for stable latest values.
+        :return: Window size.
+        """
+        return max((indicator.get_window() for indicator in self.indicators.values()), default=0)
+
+    def get_labels(self) -> List[str]:
+        """
+        Returns the unique labels of the plan's indicators.
+        :return: List of labels.
+        """
+        return list(dict.fromkeys(indicator.label for indicator in self.indicators.values()))
+
+    def get_indicator_arrays(self, input_arrays_dict: Dict[str, Any]) -> Dict[Signature, np.ndarray]:
+        """
+        Computes every indicator of the plan over whole arrays.
+        :param input_arrays_dict: Dictionary containing price type as key and price values as value.
+        :return: Dictionary of indicator arrays keyed by their signatures.
+        """
+        return {signature: np.asarray(indicator.compute(input_arrays_dict), dtype=float)
+                for signature, indicator in self.indicators.items()}
+
+    def get_trend_arrays(self, input_arrays_dict: Dict[str, Any],
+                         indicator_arrays: Optional[Dict[Signature, np.ndarray]] = None) -> Dict[str, np.ndarray]:
+        """
+        Evaluates every trend over whole arrays (or symbol by time matrices). A trend is true in a period if all of its
+        comparisons are.
+        :param input_arrays_dict: Dictionary containing price type as key and price values as value.
+        :param indicator_arrays: Precomputed indicator arrays keyed by signature (e.g. from a strategy set plan).
+        :return: Dictionary of boolean arrays keyed by trend.
+        """
+        if indicator_arrays is None:
+            indicator_arrays = self.get_indicator_arrays(input_arrays_dict)
+
+        shape = np.shape(next(iter(input_arrays_dict.values())))
+        trend_arrays = {}
+
+        for trend in TRENDS:
+            result = np.zeros(shape, dtype=bool)
+            comparisons = self.trends.get(trend)
+            if comparisons:
+                result = ~result
+                for comparison in comparisons:
+                    result &= comparison.evaluate_arrays(indicator_arrays, input_arrays_dict)
+
+            trend_arrays[trend] = result
+
+        return trend_arrays
+
+    def get_trend_array(self, input_arrays_dict: Dict[str, Any],
+                        indicator_arrays: Optional[Dict[Signature, np.ndarray]] = None) -> np.ndarray:
+        """
+        Evaluates the overall trend of every period over whole arrays.
+        :param input_arrays_dict: Dictionary containing price type as key and price values as value.
+        :param indicator_arrays: Precomputed indicator arrays keyed by signature (e.g. from a strategy set plan).
+        :return: Object array with the trend (or None) of every period.
+        """
+        trend_arrays = self.get_trend_arrays(input_arrays_dict, indicator_arrays)
+        true_counts = sum(array.astype(int) for array in trend_arrays.values())
+        result = np.full(np.shape(true_counts), None, dtype=object)
+
+        for trend, array in trend_arrays.items():
+            result[array & (true_counts == 1)] = trend
+
+        bearish = trend_arrays[EXIT_LONG] & trend_arrays[ENTER_SHORT] & (true_counts == 2)
+        bullish = trend_arrays[ENTER_LONG] & trend_arrays[EXIT_SHORT] & (true_counts == 2)
+        result[bearish] = BEARISH
+        result[bullish] = BULLISH
+        return result
+
+
+class StrategySetPlan:
+    """
+    Plan shared by every strategy of a trader. Indicators are deduplicated across strategies and trends by their
+    canonical signature, so each one is computed once per tick (through the shared cache) or once per run.
+    """
+    def __init__(self, plans: Dict[str, StrategyPlan]):
+        """
+        :param plans: Dictionary of strategy plans keyed by strategy name.
+        """
+        self.plans = plans
+        self.indicators: Dict[Signature, IndicatorNode] = {}
+        self.usages: Dict[Signature, List[Tuple[str, str]]] = {}  # Strategy name and trend of every usage.
+
+        for name, plan in plans.items():
+            for trend, comparisons in plan.trends.items():
+                for comparison in comparisons:
+                    for indicator in (comparison.indicator, comparison.against_indicator):
+                        if indicator is not None:
+                            self.indicators.setdefault(indicator.signature, indicator)
+                            self.usages.setdefault(indicator.signature, []).append((name, trend))
+
+    def get_window(self) -> int:
+        """
+        Returns the amount of periods every strategy's indicators should be computed over for stable latest values.
+        :return: Window size.
+        """
+        return max((indicator.get_window() for indicator in self.indicators.values()), default=0)
+
+    def get_total_usages(self) -> int:
+        """
+        Returns the amount of indicator usages across all strategies, which is how many computations there would be
+        without sharing.
+        :return: Total usages.
+        """
+        return sum(len(usages) for usages in self.usages.values())
+
+    def get_indicator_arrays(self, input_arrays_dict: Dict[str, Any]) -> Dict[Signature, np.ndarray]:
+        """
+        Computes every unique indicator over whole arrays once.
+        :param input_arrays_dict: Dictionary containing price type as key and price values as value.
+        :return: Dictionary of indicator arrays keyed by their signatures.
+        """
+        return {signature: np.asarray(indicator.compute(input_arrays_dict), dtype=float)
+                for signature, indicator in self.indicators.items()}
+
+    def get_trend_arrays(self, input_arrays_dict: Dict[str, Any]) -> Dict[str, np.ndarray]:
+        """
+        Evaluates the overall trend of every strategy over whole arrays, sharing indicator computations.
+        :param input_arrays_dict: Dictionary containing price type as key and price values as value.
+        :return: Dictionary of object trend arrays keyed by strategy name.
+        """
+        indicator_arrays = self.get_indicator_arrays(input_arrays_dict)
+        return {name: plan.get_trend_array(input_arrays_dict, indicator_arrays) for name, plan in self.plans.items()}
+
+    def get_report(self) -> str:
+        """
+        Returns a description of the shared plan for debugging.
+        :return: Report string.
+        """
+        lines = [f'Shared indicator plan: {len(self.indicators)} unique indicator(s) for '
+                 f'{self.get_total_usages()} usage(s) across {len(self.plans)} strateg(ies).']
+
+        for signature, indicator in self.indicators.items():
+            function, price, parameters, output_index = signature
+            parameter_string = ', '.join(f'{key}={value}' for key, value in parameters)
+            usages = ', '.join(f'{name} ({trend})' for name, trend in self.usages[signature])
+            lines.append(f'\t{indicator.label}: {function}[{price}; {parameter_string}; output {output_index}] used by '
+                         f'{usages}')
+
+        return '\n'.join(lines)
@@ -13,6 +13,8 @@ from telegram.ext import CommandHandler, Updater
 
 from algobot.enums import LIVE, LONG, SHORT, SIMULATION
 from algobot.helpers import get_label_string
+from algobot.telegram_bot.notifications import NotificationQueue
+from algobot.trade_statistics import TRADES_PAGE_SIZE, get_page
 from algobot.traders.simulation_trader import SimulationTrader
 
 if TYPE_CHECKING:
@@ -24,11 +26,14 @@ class TelegramBot:
     Telegram bot class.
     """
 
-    def __init__(self, gui: Interface, token: str):
+    def __init__(self, gui: Interface, token: str, base_url: Optional[str] = None):
         self.token = token
         self.gui = gui
-        self.updater = Updater(token, use_context=True)
-        self.bot = Bot(token=self.token)
+        self.updater = Updater(token, use_context=True, base_url=base_url)
+        self.bot = Bot(token=self.token, base_url=base_url)
+
+        # Outbound notifications are delivered in the background, so senders never wait on the Telegram API.
+        self.notifications = NotificationQueue(self.deliver_message, logger=getattr(gui, 'logger', None))
 
         self.joke_responses = self.load_text('texts/joke_responses.txt')
         self.print_responses = self.load_text('texts/print_responses.txt')
@@ -124,7 +129,15 @@ class TelegramBot:
 
     def send_message(self, chat_id: str, message: str):
         """
-        Sends provided message to specified chat ID using Telegram.
+        Queues provided message to be sent to specified chat ID using Telegram. This returns immediately.
+        :param chat_id: Chat ID in Telegram to send message to.
+        :param message: Message to send.
+        """
+        self.notifications.enqueue(chat_id, message)
+
+    def deliver_message(self, chat_id: str, message: str):
+        """
+        Sends provided message to specified chat ID using Telegram and waits for it to be delivered.
         :param chat_id: Chat ID in Telegram to send message to.
         :param message: Message to send.
         """
@@ -138,38 +151,58 @@ class TelegramBot:
 
     def stop(self):
         """
-        Stops the Telegram bot.
+        Stops the Telegram bot. Pending notifications get a few seconds to be delivered.
         """
+        self.notifications.stop()
         self.updater.stop()
 
-    def get_trades_telegram(self, update, *_args):
-        """
-        Sends trades information using Telegram bot to the chat that requested the trades using /trades.
+    @staticmethod
+    def get_trades_message(trades: List[dict], page: Optional[int] = None) -> str:
+        """
+        Returns a message with a page of the trades provided.
+        :param trades: List of trades.
+        :param page: Page number starting from 1. If None, the page with the latest trades is used.
+        :return: Trades message.
+        """
+        if not trades:
+            return "No trades made yet."
+
+        page_trades, page, total_pages = get_page(trades, page)
+        start = (page - 1) * TRADES_PAGE_SIZE + 1
+        parts = [f'Trades page {page} of {total_pages} (/trades <page> for other pages):\n\n']
+        for index, trade in enumerate(page_trades, start=start):
+            parts.append(f'Trade {index}:\n'
+                         f'Date in UTC: {trade["date"].strftime("%m/%d/%Y, %H:%M:%S")}\n'
+                         f'Order ID: {trade["orderID"]}\n'
+                         f'Pair: {trade["pair"]}\n'
+                         f'Action: {trade["action"]}\n'
+                         f'Price: {trade["price"]}\n'
+                         f'Method: {trade["method"]}\n'
+                         f'Percentage: {trade["percentage"]}\n'
+                         f'Profit: {trade["profit"]}\n\n')
+        return ''.join(parts)
+
+    def get_trades_telegram(self, update, context):
+        """
+        Sends a page of trades using Telegram bot to the chat that requested the trades using /trades {page}. If no
+        page is provided, the latest trades are sent.
         """
         if not self.verify_bot(update):
             return
 
-        trades = self.trader.trades
-        message = ''
-        for index, trade in enumerate(trades, start=1):
-            message += f'Trade {index}:\n'
-            message += f'Date in UTC: {trade["date"].strftime("%m/%d/%Y, %H:%M:%S")}\n'
-            message += f'Order ID: {trade["orderID"]}\n'
-            message += f'Pair: {trade["pair"]}\n'
-            message += f'Action: {trade["action"]}\n'
-            message += f'Price: {trade["price"]}\n'
-            message += f'Method: {trade["method"]}\n'
-            message += f'Percentage: {trade["percentage"]}\n'
-            message += f'Profit: {trade["profit"]}\n\n'
-
-        if message == '':
-            message = "No trades made yet."
-            update.message.reply_text(message)
-        else:
-            limit = constants.MAX_MESSAGE_LENGTH
-            message_parts = [message[i:i + limit] for i in range(0, len(message), limit)]
-            for part in message_parts:
-                update.message.reply_text(part)
+        page = None
+        if context.args:
+            try:
+                page = int(context.args[0])
+            except ValueError:
+                update.message.reply_text("Please make sure you specify a page number.")
+                return
+
+        message = self.get_trades_message(self.trader.trades, page)
+        limit = constants.MAX_MESSAGE_LENGTH
+        message_parts = [message[i:i + limit] for i in range(0, len(message), limit)]
+        for part in message_parts:
+            update.message.reply_text(part)
 
     @staticmethod
     def help_telegram(update, *_args):
@@ -190,7 +223,7 @@ class TelegramBot:
                                   "/setcustomstoploss <your stop loss value here> -> To set custom stop loss.\n"
                                   "/settrader <LIVE or SIM> -> To set the selected bot. (NEW)\n"
                                   "/exitposition -> To exit position.\n"
-                                  "/trades -> To get list of trades made.\n"
+                                  "/trades <page> -> To get a page of trades made (latest by default).\n"
                                   "/update or /updatevalues -> To update current coin values.\n"
                                   "/thanks or /thankyou or /thanksbot -> to thank the bot.\n")
 
@@ -201,6 +234,7 @@ class TelegramBot:
         if self.gui.trader is None or self.gui.threads[LIVE] is None:
             update.message.reply_text("There is no live bot running.")
         else:
+            self.gui.trader.invalidate_account_snapshot()
             self.gui.trader.retrieve_margin_values()
             update.message.reply_text("Successfully retrieved new values from Binance.")
 
@@ -246,11 +280,14 @@ class TelegramBot:
 
         profit = trader.get_profit()
         profit_label = trader.get_profit_or_loss_string(profit=profit)
+        trade_statistics = trader.trade_statistics.get_statistics_dictionary(precision=2)
 
         return (f'Symbol: {trader.symbol}\n'
                 f'Position: {trader.get_position_string()}\n'
                 f'Interval: {trader.data_view.interval}\n'
                 f'Total trades made: {len(trader.trades)}\n'
+                f"Win rate: {trade_statistics['winRate']}\n"
+                f"Average trade profit: {trade_statistics['averageProfit']}\n"
                 f"Coin owned: {trader.coin}\n"
                 f"Coin owed: {trader.coin_owed}\n"
                 f"Starting balance: ${round(trader.starting_balance, 2)}\n"
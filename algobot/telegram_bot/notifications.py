@@ -0,0 +1,239 @@
+"""
+Asynchronous outbound Telegram notifications. Messages are queued and delivered by a background thread, so callers
+(e.g. the trading loop) never wait on the Telegram API. Deliveries are rate limited per chat, messages queued while a
+chat is rate limited are coalesced into one, and failed deliveries are retried with exponential backoff.
+"""
+
+import random
+import threading
+import time
+from collections import deque
+from logging import Logger
+from typing import Callable, Deque, Dict, List, Optional
+
+from telegram import constants
+from telegram.error import RetryAfter
+
+COALESCE_SEPARATOR = '\n\n'
+
+
+def split_message(message: str, max_length: int = constants.MAX_MESSAGE_LENGTH) -> List[str]:
+    """
+    Splits a message into chunks Telegram accepts, preferring to split on newlines.
+    :param message: Message to split.
+    :param max_length: Maximum length of a chunk.
+    :return: List of chunks.
+    """
+    chunks = []
+    while len(message) > max_length:
+        split_index = message.rfind('\n', 0, max_length)
+        if split_index <= 0:
+            split_index = max_length
+
+        chunks.append(message[:split_index])
+        message = message[split_index:].lstrip('\n')
+
+    if message:
+        chunks.append(message)
+
+    return chunks
+
+
+class ChatQueue:
+    """
+    Pending messages and delivery state of a chat.
+    """
+    def __init__(self):
+        self.messages: Deque[str] = deque()
+        self.next_send_time = 0  # Monotonic time the chat can be sent to next.
+        self.attempts = 0  # Failed attempts of the chunk at the front of the queue.
+
+
+class NotificationQueue:
+    """
+    Background sender for Telegram notifications.
+    """
+    def __init__(self,
+                 send_function: Callable[[str, str], None],
+                 rate_limit_interval: float = 1,
+                 max_retries: int = 5,
+                 backoff_base: float = 1,
+                 max_backoff: float = 60,
+                 max_message_length: int = constants.MAX_MESSAGE_LENGTH,
+                 logger: Optional[Logger] = None):
+        """
+        :param send_function: Function that synchronously delivers a message to a chat ID.
+        :param rate_limit_interval: Minimum seconds between deliveries to the same chat.
+        :param max_retries: Amount of times a delivery is retried before its message is dropped.
+        :param backoff_base: Seconds to wait before the first retry. It doubles with every failed attempt.
+        :param max_backoff: Maximum seconds to wait before a retry.
+        :param max_message_length: Maximum length of a delivered message. Coalesced messages are split to fit it.
+        :param logger: Optional logger for failed deliveries.
+        """
+        self.send_function = send_function
+        self.rate_limit_interval = rate_limit_interval
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.max_backoff = max_backoff
+        self.max_message_length = max_message_length
+        self.logger = logger
+
+        self.chats: Dict[str, ChatQueue] = {}
+        self.condition = threading.Condition()
+        self.running = False
+        self.thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """
+        Starts the background sender if it's not running.
+        """
+        with self.condition:
+            if self.running:
+                return
+
+            self.running = True
+            self.thread = threading.Thread(target=self.run, name='TelegramNotificationQueue', daemon=True)
+            self.thread.start()
+
+    def stop(self, timeout: Optional[float] = 5):
+        """
+        Stops the background sender after trying to deliver pending messages within the timeout provided.
+        :param timeout: Seconds to wait for pending messages. If 0, pending messages are dropped.
+        """
+        if timeout is None or timeout > 0:
+            self.flush(timeout)
+
+        with self.condition:
+            self.running = False
+            self.condition.notify_all()
+
+        if self.thread is not None:
+            self.thread.join(timeout)
+            self.thread = None
+
+    def enqueue(self, chat_id: str, message: str):
+        """
+        Queues a message for delivery. This never blocks on the Telegram API.
+        :param chat_id: Chat ID in Telegram to send message to.
+        :param message: Message to send.
+        """
+        self.start()
+        with self.condition:
+            self.chats.setdefault(str(chat_id), ChatQueue()).messages.append(message)
+            self.condition.notify_all()
+
+    def get_pending_count(self) -> int:
+        """
+        Returns the amount of messages that are queued or being delivered. Messages being delivered stay at the front
+        of their chat queue until they're delivered or dropped.
+        :return: Pending messages.
+        """
+        with self.condition:
+            return sum(len(chat.messages) for chat in self.chats.values())
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Waits until every queued message is delivered or dropped.
+        :param timeout: Maximum seconds to wait.
+        :return: Boolean whether the queue was flushed or not.
+        """
+        with self.condition:
+            return self.condition.wait_for(lambda: not self.running or self.get_pending_count() == 0, timeout)
+
+    def coalesce(self, chat: ChatQueue) -> str:
+        """
+        Combines the messages queued for a chat into the next message to deliver. Messages are combined while they fit
+        in a single Telegram message, and a message too long on its own is split.
+        :param chat: Chat queue to coalesce.
+        :return: Message to deliver. It stays at the front of the chat queue until it's delivered or dropped.
+        """
+        chunks = split_message(chat.messages.popleft(), self.max_message_length)
+        message = chunks.pop(0)
+        chat.messages.extendleft(reversed(chunks))
+
+        while chat.messages and len(message) + len(COALESCE_SEPARATOR) + len(chat.messages[0]) <= \
+                self.max_message_length:
+            message += COALESCE_SEPARATOR + chat.messages.popleft()
+
+        chat.messages.appendleft(message)
+        return message
+
+    def get_backoff(self, attempts: int) -> float:
+        """
+        Returns seconds to wait before retrying after the amount of failed attempts provided, with jitter.
+        :param attempts: Failed attempts so far.
+        :return: Seconds to wait.
+        """
+        backoff = min(self.max_backoff, self.backoff_base * 2 ** (attempts - 1))
+        return backoff * random.uniform(0.5, 1)
+
+    def run(self):
+        """
+        Main loop of the background sender.
+        """
+        while True:
+            with self.condition:
+                chat_id, message = self.get_next_delivery()
+                if chat_id is None:
+                    return
+
+            error = None
+            try:
+                self.send_function(chat_id, message)
+            except Exception as e:  # pylint: disable=broad-except
+                error = e
+
+            with self.condition:
+                self.handle_delivery(chat_id, message, error)
+                self.condition.notify_all()
+
+    def get_next_delivery(self):
+        """
+        Waits for a chat that can be delivered to. Must be called with the condition held.
+        :return: Tuple of chat ID and message, or Nones if the sender is stopped.
+        """
+        while self.running:
+            now = time.monotonic()
+            ready = [(chat.next_send_time, chat_id) for chat_id, chat in self.chats.items() if chat.messages]
+            if ready:
+                next_send_time, chat_id = min(ready)
+                if next_send_time <= now:
+                    chat = self.chats[chat_id]
+                    chat.next_send_time = now + self.rate_limit_interval
+                    return chat_id, self.coalesce(chat)
+
+                self.condition.wait(next_send_time - now)
+            else:
+                self.condition.wait()
+
+        return None, None
+
+    def handle_delivery(self, chat_id: str, message: str, error: Optional[Exception]):
+        """
+        Updates the chat queue after a delivery attempt. Must be called with the condition held.
+        :param chat_id: Chat ID delivered to.
+        :param message: Message delivered (at the front of the chat queue).
+        :param error: Exception raised by the delivery (if any).
+        """
+        chat = self.chats[chat_id]
+        if error is None:
+            chat.messages.popleft()
+            chat.attempts = 0
+            return
+
+        chat.attempts += 1
+        if chat.attempts > self.max_retries:
+            chat.messages.popleft()
+            chat.attempts = 0
+            if self.logger is not None:
+                self.logger.error(f'Dropped Telegram message to {chat_id} after {self.max_retries} retries: {error}')
+            return
+
+        if isinstance(error, RetryAfter):  # Telegram tells us how long to wait.
+            backoff = float(error.retry_after)
+        else:
+            backoff = self.get_backoff(chat.attempts)
+
+        chat.next_send_time = time.monotonic() + backoff
+        if self.logger is not None:
+            self.logger.warning(f'Telegram delivery to {chat_id} failed ({error}). Retrying in {backoff:.1f} seconds.')
@@ -2,18 +2,27 @@
 Main bot thread (sim or live bot).
 """
 
+import pickle
 import time
 import traceback
 from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
 
+from binance import ThreadedWebsocketManager
 from PyQt5.QtCore import QObject, QRunnable, pyqtSignal, pyqtSlot
 
 from algobot.data import Data
-from algobot.enums import LIVE, SIMULATION
+from algobot.enums import LIVE, LONG, SHORT, SIMULATION
 from algobot.helpers import convert_long_interval, convert_small_interval, get_elapsed_time, parse_precision
 from algobot.interface.config_utils.strategy_utils import get_strategies
 from algobot.interface.config_utils.telegram_utils import test_telegram
+from algobot.loop_profiler import LoopProfiler, get_loop_metrics_path
+from algobot.metrics_exporter import METRICS_EXPORTER, MetricSample, get_quantile_samples, get_used_weight
 from algobot.telegram_bot.bot import TelegramBot
+from algobot.trade_journal import TradeJournal, get_trade_journal_path
+from algobot.trade_statistics import GroupedStatistics
+from algobot.trader_snapshot import (POSITION_ATTRIBUTES, TraderSnapshotter, get_attributes, get_snapshot_path,
+                                     is_compatible, restore_data, restore_position_state, restore_trader)
 from algobot.traders.real_trader import RealTrader
 from algobot.traders.simulation_trader import SimulationTrader
 
@@ -61,6 +70,10 @@ class BotThread(QRunnable):
         self.daily_percentage = 0  # Initial change percentage.
         self.previous_day_time = None  # Previous day net time to compare to.
         self.previous_day_net = None  # Previous day net value to compare to.
+        self.grouped_statistics = GroupedStatistics()  # Grouped statistics kept between loops for the GUI.
+        self.snapshotter: Optional[TraderSnapshotter] = None  # Writes crash recovery snapshots of the trader.
+        self.snapshot: Optional[Dict[str, Any]] = None  # Snapshot of a crashed run to recover from.
+        self.profiler = LoopProfiler(metrics_path=get_loop_metrics_path(caller))  # Times stages of the trading loop.
 
         self.schedule_period = None  # Next schedule period in string format.
         self.next_scheduled_event = None  # These are for periodic scheduling. This variable holds next schedule event.
@@ -77,6 +90,7 @@ class BotThread(QRunnable):
         self.fail_limit = gui.configuration.failureLimitSpinBox.value()
         self.fail_sleep = gui.configuration.failureSleepSpinBox.value()
         self.fail_error = ''
+        self.error_count = 0  # Total amount of exceptions handled. Unlike the fail count, this never gets reset.
 
     def initialize_lower_interval_trading(self, caller, interval: str):
         """
@@ -134,8 +148,6 @@ class BotThread(QRunnable):
                                                      load_data=True,
                                                      update_data=False,
                                                      precision=precision)
-            gui.simulation_trader.data_view.custom_get_new_data(progress_callback=self.signals.progress,
-                                                                remove_first=True, caller=SIMULATION)
         elif caller == LIVE:
             api_secret = gui.configuration.binanceApiSecret.text()
             api_key = gui.configuration.binanceApiKey.text()
@@ -152,13 +164,14 @@ class BotThread(QRunnable):
                                     load_data=True,
                                     update_data=False,
                                     precision=precision)
-            gui.trader.data_view.custom_get_new_data(progress_callback=self.signals.progress, remove_first=True,
-                                                     caller=LIVE)
+            self.start_user_data_stream(gui.trader, api_key=api_key, api_secret=api_secret, tld=tld)
         else:
             raise ValueError("Invalid caller.")
 
         self.trader: SimulationTrader = self.gui.get_trader(caller)
+        self.load_snapshot_or_download_data(caller=caller, interval=interval)
         self.trader.add_trade_callback = self.signals.add_trade  # Passing an add trade call black.
+        self.trader.trade_journal = TradeJournal(get_trade_journal_path(caller))  # Persist trades across restarts.
         self.trader.data_view.callback = self.signals.activity  # Passing activity signal to data object.
         self.trader.data_view.caller = caller  # Passing caller to data object.
         if not self.trader.data_view.download_completed:
@@ -169,6 +182,119 @@ class BotThread(QRunnable):
         if config_dict['lowerIntervalCheck'].isChecked():
             self.initialize_lower_interval_trading(caller=caller, interval=interval)
 
+    def load_snapshot_or_download_data(self, caller, interval: str):
+        """
+        Restores candles the database didn't have yet from the snapshot of a previous crashed run (if there's one),
+        then downloads candles that closed since.
+        :param caller: Caller that determines which snapshot is loaded.
+        :param interval: Interval the trader trades on.
+        """
+        trader = self.trader
+        self.snapshotter = TraderSnapshotter(get_snapshot_path(caller, trader.symbol, interval))
+        snapshot = self.snapshotter.load()
+
+        if snapshot is not None and is_compatible(trader, snapshot):
+            self.snapshot = snapshot
+            restored = restore_data(trader, snapshot)
+            self.signals.activity.emit(caller, f"Restored {restored} candles from the snapshot of the previous run.")
+
+        trader.data_view.custom_get_new_data(progress_callback=self.signals.progress, remove_first=True, caller=caller)
+
+    def restore_snapshot(self, caller):
+        """
+        Restores trader state from the snapshot of a previous crashed run (if any). Live balances always come from
+        Binance, and live position state is only restored if Binance reports the same position.
+        :param caller: Caller whose trader gets restored.
+        """
+        if self.snapshot is None:
+            return
+
+        trader: SimulationTrader = self.gui.get_trader(caller)
+        snapshot_time = datetime.fromtimestamp(self.snapshot['time']).strftime('%Y-%m-%d %H:%M:%S')
+        if restore_trader(trader, self.snapshot, restore_balances=caller == SIMULATION):
+            self.signals.activity.emit(caller, f"Recovered bot state from snapshot taken at {snapshot_time}.")
+        else:
+            self.signals.activity.emit(caller, f"Recovered trades from snapshot taken at {snapshot_time}. Position "
+                                               f"changed since then, so it was retrieved from Binance instead.")
+        self.snapshot = None
+
+    def handle_snapshot(self, trader):
+        """
+        Writes a snapshot of the trader if one is due. Failing to write one is logged and doesn't stop the bot.
+        :param trader: Trader to snapshot.
+        """
+        try:
+            self.snapshotter.save_if_due(trader)
+        except (OSError, pickle.PicklingError) as e:
+            self.logger.warning(f'Could not write snapshot: {e}')
+
+    def handle_loop_metrics(self):
+        """
+        Writes loop metrics to the metrics file if they're enabled and due. Failing to write them is logged and doesn't
+        stop the bot.
+        """
+        try:
+            self.profiler.write_metrics_if_due()
+        except OSError as e:
+            self.logger.warning(f'Could not write loop metrics: {e}')
+
+    def start_metrics_exporter(self):
+        """
+        Starts the metrics exporter if it's enabled through the environment. Failing to start it is logged and doesn't
+        stop the bot.
+        """
+        try:
+            METRICS_EXPORTER.start_from_environment()
+        except (OSError, ValueError) as e:
+            self.logger.warning(f'Could not start metrics exporter: {e}')
+
+    def get_metric_samples(self, running: bool = True) -> List[MetricSample]:
+        """
+        Returns metric samples of the bot for the metrics exporter.
+        :param running: Boolean whether the bot is running or not.
+        :return: List of metric samples.
+        """
+        trader: SimulationTrader = self.trader
+        profiler = self.profiler
+        labels = {'caller': self.caller.lower(), 'symbol': trader.symbol}
+        samples = [
+            ('algobot_up', labels, int(running)),
+            ('algobot_net', labels, trader.get_net() if trader.current_price is not None else None),
+            ('algobot_position', labels, {LONG: 1, SHORT: -1}.get(trader.current_position, 0)),
+            ('algobot_candles', labels, len(trader.data_view.data)),
+            ('algobot_loops_total', labels, profiler.loop_count),
+            ('algobot_loop_rate', labels, profiler.get_loop_rate()),
+            ('algobot_errors_total', labels, self.error_count),
+            ('algobot_degraded', labels, int(trader.is_degraded())),
+        ]
+
+        if profiler.loops:
+            samples += get_quantile_samples('algobot_loop_latency_milliseconds', labels,
+                                            profiler.get_percentiles(profiler.loops))
+        for stage, durations in profiler.stages.items():
+            if durations:
+                samples += get_quantile_samples('algobot_stage_latency_milliseconds', {**labels, 'stage': stage},
+                                                profiler.get_percentiles(durations))
+
+        if isinstance(trader, RealTrader):
+            request_counts = {'account': trader.account.request_count, **trader.order_latency.get_request_counts()}
+            samples += [('algobot_api_requests_total', {**labels, 'endpoint': endpoint}, count)
+                        for endpoint, count in request_counts.items()]
+
+        # Both clients report the same per IP counter, so the highest weight either of them saw is used.
+        used_weights = [get_used_weight(client) for client in (trader.binance_client, trader.data_view.binance_client)]
+        used_weights = [weight for weight in used_weights if weight is not None]
+        samples.append(('algobot_api_used_weight', labels, max(used_weights) if used_weights else None))
+        return samples
+
+    def publish_metrics(self, running: bool = True):
+        """
+        Publishes metric samples of the bot to the metrics exporter if it's enabled.
+        :param running: Boolean whether the bot is running or not.
+        """
+        if METRICS_EXPORTER.enabled and self.trader is not None:
+            METRICS_EXPORTER.update(self.caller, self.get_metric_samples(running=running))
+
     @staticmethod
     def check_api_credentials(api_key: str, api_secret: str):
         """
@@ -232,13 +358,30 @@ class BotThread(QRunnable):
         trader.setup_strategies(get_strategies(config, caller))
         trader.output_configuration()
 
+    @staticmethod
+    def start_user_data_stream(trader: RealTrader, api_key: str, api_secret: str, tld: str):
+        """
+        Starts the user data stream of a live trader, so its balances and open orders are pushed. If the stream can't be
+        started, the trader keeps fetching account state over REST.
+        :param trader: Live trader.
+        :param api_key: Binance API key.
+        :param api_secret: Binance API secret.
+        :param tld: Top level domain of Binance.
+        """
+        try:
+            trader.start_user_data_stream(ThreadedWebsocketManager(api_key=api_key, api_secret=api_secret, tld=tld))
+        except Exception as e:
+            trader.output_message(f'Could not start the user data stream: {e}. Account state will be polled.', 4)
+
     def setup_bot(self, caller):
         """
         Initial full bot setup based on caller.
         :param caller: Caller that will determine what type of trader will be instantiated.
         """
+        self.start_metrics_exporter()
         self.create_trader(caller)
         self.set_parameters(caller)
+        self.restore_snapshot(caller)
 
         if self.gui.configuration.enableTelegramTrading.isChecked() and self.gui.telegram_bot is None:
             self.initialize_telegram_bot()
@@ -336,7 +479,7 @@ class BotThread(QRunnable):
                 self.daily_percentage = self.percentage  # Same as current percentage because of lack of values.
         else:
             if time.time() - self.previous_day_time >= self.daily_interval_seconds:
-                trader.daily_change_nets.append(trader.get_profit_percentage(self.previous_day_net, net))
+                trader.add_daily_change_net(trader.get_profit_percentage(self.previous_day_net, net))
                 self.previous_day_time = time.time()
                 self.previous_day_net = net
                 self.daily_percentage = 0
@@ -356,13 +499,16 @@ class BotThread(QRunnable):
         self.elapsed = get_elapsed_time(self.starting_time)
         self.set_daily_percentages(trader=trader, net=net)
 
-        grouped_dict = trader.get_grouped_statistics()
-        grouped_dict['general']['net'] = f'${round(net, 2)}'
-        grouped_dict['general']['profit'] = f'${round(profit, 2)}'
-        grouped_dict['general']['elapsed'] = self.elapsed
-        grouped_dict['general']['totalPercentage'] = f'{round(self.percentage, 2)}%'
-        grouped_dict['general']['dailyPercentage'] = f'{round(self.daily_percentage, 2)}%'
-        grouped_dict['general']['lowerTrend'] = self.lower_trend
+        # Only values that changed are set and emitted, so the statistics window doesn't redraw every label every loop.
+        statistics = self.grouped_statistics
+        trader.update_grouped_statistics(statistics)
+        statistics.set('general', 'net', f'${round(net, 2)}')
+        statistics.set('general', 'profit', f'${round(profit, 2)}')
+        statistics.set('general', 'elapsed', self.elapsed)
+        statistics.set('general', 'totalPercentage', f'{round(self.percentage, 2)}%')
+        statistics.set('general', 'dailyPercentage', f'{round(self.daily_percentage, 2)}%')
+        statistics.set('general', 'lowerTrend', self.lower_trend)
+        statistics.update('loopProfile', self.profiler.get_statistics_dictionary())
 
         value_dict = {
             'profitLossLabel': trader.get_profit_or_loss_string(profit=profit),
@@ -376,7 +522,7 @@ class BotThread(QRunnable):
             'price': trader.current_price,
         }
 
-        return value_dict, grouped_dict
+        return value_dict, statistics.pop_changes()
 
     def trading_loop(self, caller):
         """
@@ -387,16 +533,32 @@ class BotThread(QRunnable):
         running_loop = self.gui.running_live if caller == LIVE else self.gui.simulation_running_live
         trader: SimulationTrader = self.gui.get_trader(caller=caller)
 
+        profiler = self.profiler
+
         while running_loop:
             trader.completed_loop = False  # This boolean is checked when bot is ended to ensure it finishes its loop.
-            self.update_data(caller)  # Check for new updates.
-            self.handle_logging(caller=caller)  # Handle logging.
-            self.handle_current_and_trailing_prices(caller=caller)  # Handle trailing prices.
-            self.handle_trading(caller=caller)  # Main logic function.
-            self.handle_scheduler()  # Handle periodic statistics scheduler.
-            lower_trend = self.handle_lower_interval_cross(caller, lower_trend)  # Check lower trend.
-            value_dict, grouped_dict = self.get_statistics()  # Basic statistics of bot to update GUI.
-            self.signals.updated.emit(caller, value_dict, grouped_dict)
+            profiler.start_loop()
+            with profiler.stage('updateData'):
+                self.update_data(caller)  # Check for new updates.
+                trader.invalidate_account_snapshot()  # Balances are fetched at most once per cycle (if they're needed).
+            with profiler.stage('logging'):
+                self.handle_logging(caller=caller)  # Handle logging.
+            with profiler.stage('priceRefresh'):
+                self.handle_current_and_trailing_prices(caller=caller)  # Handle trailing prices.
+            with profiler.stage('strategyEvaluation'):
+                self.handle_trading(caller=caller)  # Main logic function.
+            with profiler.stage('scheduler'):
+                self.handle_scheduler()  # Handle periodic statistics scheduler.
+            with profiler.stage('lowerInterval'):
+                lower_trend = self.handle_lower_interval_cross(caller, lower_trend)  # Check lower trend.
+            with profiler.stage('statistics'):
+                value_dict, grouped_dict = self.get_statistics()  # Basic statistics of bot to update GUI.
+                self.signals.updated.emit(caller, value_dict, grouped_dict)
+            with profiler.stage('snapshot'):
+                self.handle_snapshot(trader)  # Snapshot state for crash recovery.
+            profiler.end_loop()
+            self.handle_loop_metrics()  # Write loop metrics if they're enabled.
+            self.publish_metrics()  # Publish metrics to the exporter if it's enabled.
             running_loop = self.gui.running_live if caller == LIVE else self.gui.simulation_running_live
             self.fail_count = 0  # Reset fail count as bot fixed itself.
             trader.completed_loop = True  # Set completed_loop to True. Or, there'll be an infinite loop in the GUI.
@@ -434,6 +596,8 @@ class BotThread(QRunnable):
         """
         self.failed = True  # Boolean that'll let the bot know it failed.
         self.fail_count += 1  # Increment fail_count by 1. There's a default limit of 10 fails.
+        self.error_count += 1
+        self.publish_metrics()
         self.fail_error = str(e)  # This is the fail error that led to the crash.
         error_message = traceback.format_exc()  # Get error message.
 
@@ -462,8 +626,11 @@ class BotThread(QRunnable):
             self.logger.critical(str(telegram_error))
 
         time.sleep(self.fail_sleep)  # Sleep for some seconds before reattempting a fix.
+        position_state = get_attributes(trader, POSITION_ATTRIBUTES)
+        trader.invalidate_account_snapshot()
         trader.retrieve_margin_values()  # Update bot margin values.
         trader.check_current_position()  # Check position it's in.
+        restore_position_state(trader, position_state)  # Keep stop loss and trailing state if position didn't change.
 
     def run_loop(self, trader):
         """
@@ -490,6 +657,13 @@ class BotThread(QRunnable):
         trader: SimulationTrader = self.gui.get_trader(self.caller)
         if success:
             self.run_loop(trader)
+            if not self.failed and self.snapshotter is not None:
+                self.snapshotter.delete()  # Bot ended cleanly, so there's nothing to recover.
+
+        if isinstance(trader, RealTrader):
+            trader.stop_user_data_stream()
+
+        self.publish_metrics(running=False)
 
         if trader:
             trader.completed_loop = True  # If false, this will cause an infinite loop.
@@ -2,13 +2,20 @@
 Optimizer thread.
 """
 
-from typing import Any, Dict
+import copy
+from typing import Any, Dict, Optional
 
 from PyQt5.QtCore import QObject, QRunnable, pyqtSignal, pyqtSlot
 
 from algobot.enums import OPTIMIZER
 from algobot.threads.thread_utils import get_config_helper
 from algobot.traders.backtester import Backtester
+from algobot.worker_pool import IsolatedWorkerPool
+
+# Limits of every combo run in an isolated worker, so a combo that hangs or runs out of memory only fails itself.
+OPTIMIZER_MEMORY_LIMIT_MB = 4096  # Address space limit of every worker in megabytes.
+OPTIMIZER_TIME_LIMIT = 600  # Wall-time limit of every combo in seconds.
+OPTIMIZER_MIN_ISOLATED_RUNS = 16  # Runs below this count skip the worker start-up and candle file and run in process.
 
 
 class OptimizerSignals(QObject):
@@ -26,7 +33,9 @@ class OptimizerThread(QRunnable):
     """
     Optimizer thread to use for running optimizers.
     """
-    def __init__(self, gui, logger, combos):
+    def __init__(self, gui, logger, combos, *, memory_limit_mb: Optional[int] = OPTIMIZER_MEMORY_LIMIT_MB,
+                 time_limit: Optional[float] = OPTIMIZER_TIME_LIMIT,
+                 min_isolated_runs: int = OPTIMIZER_MIN_ISOLATED_RUNS):
         super(OptimizerThread, self).__init__()
         self.signals = OptimizerSignals()
         self.combos = combos
@@ -34,6 +43,10 @@ class OptimizerThread(QRunnable):
         self.logger = logger
         self.running = True
         self.caller = OPTIMIZER
+        self.memory_limit_mb = memory_limit_mb
+        self.time_limit = time_limit
+        self.min_isolated_runs = min_isolated_runs
+        self.worker_pool: Optional[IsolatedWorkerPool] = None
 
     def get_configuration_details(self) -> Dict[str, Any]:
         """
@@ -50,16 +63,28 @@ class OptimizerThread(QRunnable):
 
     def stop(self):
         """
-        Halt the optimizer thread.
+        Halt the optimizer thread. Combos running in worker processes are killed.
         """
         self.running = False
+        if self.worker_pool is not None:
+            self.worker_pool.terminate()
 
     def run_optimizer(self):
         """
         Execute the optimizer thread.
         """
         optimizer = self.gui.optimizer
-        optimizer.optimize(combos=self.combos, thread=self)
+        # Permutations are built from a copy, because building them mutates the combos.
+        total_runs = len(optimizer.get_all_permutations(copy.deepcopy(self.combos)))
+        if total_runs < self.min_isolated_runs:
+            optimizer.optimize(combos=self.combos, thread=self)
+        else:
+            self.worker_pool = optimizer.create_worker_pool(memory_limit_mb=self.memory_limit_mb,
+                                                            time_limit=self.time_limit)
+            try:
+                optimizer.optimize(combos=self.combos, thread=self, worker_pool=self.worker_pool)
+            finally:
+                optimizer.remove_worker_data_file()
         self.running = False
         self.signals.finished.emit()
 
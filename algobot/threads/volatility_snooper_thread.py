@@ -4,7 +4,8 @@ Volatility Snooper.
 
 # TODO: Standardize thread operations to fewer files by leveraging kwargs.
 import datetime
-from typing import Callable, List
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, List, Optional, Union
 
 from PyQt5.QtCore import QObject, QRunnable, pyqtSignal, pyqtSlot
 
@@ -12,6 +13,9 @@ import algobot
 from algobot.algorithms import (get_basic_volatility, get_gk_volatility, get_parkinson_volatility, get_rs_volatility,
                                 get_zh_volatility)
 from algobot.helpers import convert_long_interval, get_interval_minutes, get_normalized_data
+from algobot.kline_cache import KLINE_CACHE, KlineCache
+
+NOT_ENOUGH_DATA = "Not enough data. Maybe the ticker is too new."
 
 
 class VolatilitySnooperSignals(QObject):
@@ -30,7 +34,17 @@ class VolatilitySnooperThread(QRunnable):
     """
     Volatility Snooper class.
     """
-    def __init__(self, periods, interval, volatility, tickers, filter_word=None):
+    def __init__(self, periods, interval, volatility, tickers, filter_word=None, max_workers: int = 8,
+                 kline_cache: KlineCache = KLINE_CACHE):
+        """
+        :param periods: Amount of periods to get volatility of.
+        :param interval: Long interval (e.g. 1 Hour) of data.
+        :param volatility: Type of volatility to get.
+        :param tickers: List of tickers to snoop.
+        :param filter_word: Filter for the list of tickers.
+        :param max_workers: Amount of tickers fetched concurrently. Requests are throttled by the cache's rate limiter.
+        :param kline_cache: Klines cache shared by snooper runs.
+        """
         super(VolatilitySnooperThread, self).__init__()
         self.periods = periods
         self.long_interval = interval
@@ -40,6 +54,8 @@ class VolatilitySnooperThread(QRunnable):
         self.filter_word = filter_word
         self.tickers = self.get_filtered_tickers(tickers=tickers, filter_word=filter_word)
         self.binance_client = algobot.BINANCE_CLIENT
+        self.max_workers = max_workers
+        self.kline_cache = kline_cache
         self.running = True
         self.signals = VolatilitySnooperSignals()
 
@@ -85,17 +101,16 @@ class VolatilitySnooperThread(QRunnable):
 
         return utc_timestamp
 
-    def get_starting_timestamp(self, multiplier: int = 1) -> int:
+    def get_starting_timestamp(self) -> int:
         """
-        Get starting timestamp for the snooping.
-        :param multiplier: Multiplier to use for the starting timestamp. The bigger, the further back the timestamp.
-        :return: Starting timestamp in an integer format.
+        Get starting timestamp for the snooping. It's the open time of the kline periods + 1 klines before the current
+        (open) kline, so the klines needed are fetched in one go.
+        :return: Starting timestamp in milliseconds.
         """
-        current_timestamp = self.get_current_timestamp() * 1000
-        period_minutes = get_interval_minutes(self.long_interval)
-        period_microseconds = period_minutes * 60 * 1000 * (self.periods + 1)  # Using +1 for safety.
+        interval_milliseconds = get_interval_minutes(self.long_interval) * 60 * 1000
+        current_open_time = int(self.get_current_timestamp() * 1000) // interval_milliseconds * interval_milliseconds
 
-        return int(current_timestamp - period_microseconds * multiplier)
+        return current_open_time - interval_milliseconds * (self.periods + 1)  # Using +1 for safety.
 
     def validate(self):
         """
@@ -104,44 +119,52 @@ class VolatilitySnooperThread(QRunnable):
         if len(self.tickers) < 1:
             raise RuntimeError(f"No tickers found with the filter: {self.filter_word}.")
 
-    def snoop(self):
+    def get_ticker_volatility(self, ticker: str, starting_timestamp: int) -> Optional[Union[float, str]]:
         """
-        Run snooper functionality.
+        Get volatility of the ticker provided.
+        :param ticker: Ticker to get volatility of.
+        :param starting_timestamp: Open time in milliseconds of the first kline needed.
+        :return: Volatility, a message if there's not enough data, or None if the snooper was stopped.
         """
-        self.validate()
-        self.signals.activity.emit('Starting the volatility snooper...')
-        volatility_dict = {}
-        for index, ticker in enumerate(self.tickers):
-            if not self.running:
-                break
-
-            self.signals.activity.emit(f"Gathering volatility for {ticker}...")
-            self.signals.progress.emit(int(index / len(self.tickers) * 100))
+        if not self.running:
+            return None
 
-            data = self.binance_client.get_historical_klines(ticker, self.short_interval, self.get_starting_timestamp())
-            data_length = len(data)
+        data = self.kline_cache.get_klines(self.binance_client, ticker, self.short_interval, starting_timestamp)
+        if len(data) < self.periods + 1:
+            return NOT_ENOUGH_DATA
 
-            multiplier = 2
-            impossible = False
+        data = [get_normalized_data(d) for d in data]
+        return self.volatility_func(periods=self.periods, data=data)
 
-            while len(data) < self.periods + 1:
-                starting_timestamp = self.get_starting_timestamp(multiplier=multiplier)
-                data = self.binance_client.get_historical_klines(ticker, self.short_interval, starting_timestamp)
-                multiplier += 1
-
-                if len(data) == data_length:
-                    impossible = True
-                    break
-
-                data_length = len(data)
-
-            if impossible:
-                volatility_dict[ticker] = "Not enough data. Maybe the ticker is too new."
-            else:
-                data = [get_normalized_data(d) for d in data]
-                volatility_dict[ticker] = self.volatility_func(periods=self.periods, data=data)
+    def snoop(self):
+        """
+        Run snooper functionality. Tickers are fetched concurrently, and progress is emitted as each ticker completes.
+        """
+        self.validate()
+        self.signals.activity.emit('Starting the volatility snooper...')
+        self.signals.progress.emit(0)
 
-        return volatility_dict
+        starting_timestamp = self.get_starting_timestamp()
+        volatility_dict = {}
+        total = len(self.tickers)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {executor.submit(self.get_ticker_volatility, ticker, starting_timestamp): ticker
+                       for ticker in self.tickers}
+            try:
+                for completed, future in enumerate(as_completed(futures), start=1):
+                    if not self.running:
+                        break
+
+                    ticker = futures[future]
+                    volatility_dict[ticker] = volatility = future.result()
+                    self.signals.progress.emit(int(completed / total * 100))
+                    self.signals.activity.emit(f"({completed}/{total}) {ticker} volatility: {volatility}")
+            finally:
+                for future in futures:  # Don't start fetching remaining tickers if stopped or failed.
+                    future.cancel()
+
+        return {ticker: volatility_dict[ticker] for ticker in self.tickers if ticker in volatility_dict}
 
     def stop(self):
         """
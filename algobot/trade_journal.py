@@ -0,0 +1,191 @@
+"""
+Trade journal. Trades are appended to an SQLite database as they're made with typed values (epoch time, price,
+quantity, fees, and order ID), so trade history survives restarts, can be exported with a single query, and can be
+analyzed without parsing formatted strings.
+"""
+
+import os
+import sqlite3
+from contextlib import closing
+from datetime import datetime, timezone
+from threading import Lock
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+
+from algobot.helpers import create_folder, export_dataframe, validate_export_file_type
+
+TRADE_JOURNAL_TABLE = 'trades'
+TRADE_JOURNAL_FOLDER = 'Trade History'
+
+# Column name, SQLite type, and the header used when exporting.
+TRADE_JOURNAL_COLUMNS = (
+    ('id', 'INTEGER PRIMARY KEY AUTOINCREMENT', 'ID'),
+    ('time', 'REAL NOT NULL', 'Time'),
+    ('symbol', 'TEXT NOT NULL', 'Symbol'),
+    ('order_id', 'TEXT', 'Order ID'),
+    ('action', 'TEXT', 'Action'),
+    ('method', 'TEXT', 'Method'),
+    ('price', 'REAL', 'Price'),
+    ('quantity', 'REAL', 'Quantity'),
+    ('fee', 'REAL', 'Fee'),
+    ('fee_asset', 'TEXT', 'Fee Asset'),
+    ('net', 'REAL', 'Net'),
+    ('profit', 'REAL', 'Profit'),
+    ('profit_percentage', 'REAL', 'Profit Percentage'),
+    ('fill_price', 'REAL', 'Fill Price'),
+    ('signal_latency', 'REAL', 'Signal Latency (ms)'),
+    ('request_latency', 'REAL', 'Request Latency (ms)'),
+    ('fill_latency', 'REAL', 'Fill Latency (ms)'),
+)
+
+TRADE_JOURNAL_COLUMN_NAMES = [column[0] for column in TRADE_JOURNAL_COLUMNS]
+TRADE_JOURNAL_HEADERS = {column[0]: column[2] for column in TRADE_JOURNAL_COLUMNS}
+
+
+def get_trade_journal_path(caller: str) -> str:
+    """
+    Returns the default path of the trade journal of the caller provided.
+    :param caller: Caller (live or simulation) the journal belongs to.
+    :return: Path to the trade journal database.
+    """
+    return os.path.join(create_folder(TRADE_JOURNAL_FOLDER), f'{caller.lower()}_journal.db')
+
+
+def get_history_row(row: Dict[str, Any], precision: int = 2) -> List[str]:
+    """
+    Returns a journal row formatted like a row of the GUI's trade history table. Times are shown in UTC like the
+    trades added while the bot runs.
+    :param row: Journal row with keys from TRADE_JOURNAL_COLUMN_NAMES.
+    :param precision: Precision to round profits to.
+    :return: List of the table's column values.
+    """
+    def get_rounded(value: Optional[float], decimals: int) -> Any:
+        return None if value is None or pd.isna(value) else round(float(value), decimals)
+
+    return [
+        datetime.fromtimestamp(float(row['time']), tz=timezone.utc).strftime("%Y-%m-%d %H:%M:%S"),
+        str(row['order_id']),
+        str(row['symbol']),
+        f'${row["price"]}',
+        f'{get_rounded(row["profit_percentage"], 2)}%',
+        f'${get_rounded(row["profit"], precision)}',
+        str(row['method']),
+        str(row['action']),
+    ]
+
+
+class TradeJournal:
+    """
+    Append-only trade journal backed by an SQLite database. Unlike optimizer results, every trade is written as soon as
+    it's added, as trades are infrequent and losing one is costly.
+    """
+    def __init__(self, database_file: str, table: str = TRADE_JOURNAL_TABLE):
+        """
+        :param database_file: Path to the SQLite database file to store trades in.
+        :param table: Table to store trades in.
+        """
+        self.database_file = database_file
+        self.table = table
+        self.lock = Lock()  # Trades may be added by the bot thread and by forced trades from the GUI.
+        self.create_table()
+
+    def create_table(self):
+        """
+        Creates the trades table if it does not exist. WAL mode is enabled so trades can be exported while the bot is
+        still writing to them. Columns added since the table was created are added to it.
+        """
+        columns = ',\n'.join(f'{name} {column_type}' for name, column_type, _header in TRADE_JOURNAL_COLUMNS)
+        with closing(sqlite3.connect(self.database_file)) as connection:
+            with closing(connection.cursor()) as cursor:
+                cursor.execute('PRAGMA journal_mode=WAL;')
+                cursor.execute(f'CREATE TABLE IF NOT EXISTS {self.table}({columns});')
+                cursor.execute(f'CREATE INDEX IF NOT EXISTS {self.table}_time ON {self.table}(time);')
+
+                existing = {row[1] for row in cursor.execute(f'PRAGMA table_info({self.table});')}
+                for name, column_type, _header in TRADE_JOURNAL_COLUMNS:
+                    if name not in existing:
+                        cursor.execute(f'ALTER TABLE {self.table} ADD COLUMN {name} {column_type};')
+                connection.commit()
+
+    def add_trade(self, trade: Dict[str, Any]) -> int:
+        """
+        Appends a trade to the journal.
+        :param trade: Dictionary with keys from TRADE_JOURNAL_COLUMN_NAMES. The ID is assigned by the journal.
+        :return: ID of the trade in the journal.
+        """
+        names = [name for name in TRADE_JOURNAL_COLUMN_NAMES if name != 'id']
+        placeholders = ', '.join('?' for _ in names)
+        query = f'INSERT INTO {self.table} ({", ".join(names)}) VALUES ({placeholders});'
+
+        with self.lock:
+            with closing(sqlite3.connect(self.database_file)) as connection:
+                with closing(connection.cursor()) as cursor:
+                    cursor.execute(query, tuple(trade.get(name) for name in names))
+                    connection.commit()
+                    return cursor.lastrowid
+
+    def get_rows(self, symbol: Optional[str] = None, start_time: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        Returns trades in a list of dictionaries ordered by time.
+        :param symbol: Symbol to filter trades by. If None, trades of every symbol are returned.
+        :param start_time: Epoch time to return trades from. If None, trades from the start are returned.
+        :return: List of trades.
+        """
+        query, parameters = self.get_select_query(symbol, start_time)
+        with closing(sqlite3.connect(self.database_file)) as connection:
+            with closing(connection.cursor()) as cursor:
+                rows = cursor.execute(query, parameters).fetchall()
+                return [dict(zip(TRADE_JOURNAL_COLUMN_NAMES, row)) for row in rows]
+
+    def get_select_query(self, symbol: Optional[str] = None, start_time: Optional[float] = None):
+        """
+        Returns the query and parameters to select trades with the filters provided.
+        :param symbol: Symbol to filter trades by.
+        :param start_time: Epoch time to filter trades from.
+        :return: Tuple of query and parameters.
+        """
+        conditions, parameters = [], []
+        if symbol is not None:
+            conditions.append('symbol = ?')
+            parameters.append(symbol)
+        if start_time is not None:
+            conditions.append('time >= ?')
+            parameters.append(start_time)
+
+        where = f' WHERE {" AND ".join(conditions)}' if conditions else ''
+        query = f'SELECT {", ".join(TRADE_JOURNAL_COLUMN_NAMES)} FROM {self.table}{where} ORDER BY time, id'
+        return query, parameters
+
+    def get_row_count(self) -> int:
+        """
+        Returns the amount of trades in the journal.
+        :return: Trade count.
+        """
+        with closing(sqlite3.connect(self.database_file)) as connection:
+            with closing(connection.cursor()) as cursor:
+                return cursor.execute(f'SELECT COUNT(*) FROM {self.table}').fetchone()[0]
+
+    def get_dataframe(self, symbol: Optional[str] = None, start_time: Optional[float] = None) -> pd.DataFrame:
+        """
+        Returns trades in a Pandas DataFrame with a single query.
+        :param symbol: Symbol to filter trades by. If None, trades of every symbol are returned.
+        :param start_time: Epoch time to return trades from. If None, trades from the start are returned.
+        :return: DataFrame containing trades.
+        """
+        query, parameters = self.get_select_query(symbol, start_time)
+        with closing(sqlite3.connect(self.database_file)) as connection:
+            return pd.read_sql_query(query, connection, params=parameters)
+
+    def export(self, file_path: str, file_type: str = 'CSV', symbol: Optional[str] = None):
+        """
+        Exports trades to the file path provided.
+        :param file_path: Path to export trades to.
+        :param file_type: Type of file to export to: CSV, XLSX, or PARQUET.
+        :param symbol: Symbol to filter trades by. If None, trades of every symbol are exported.
+        """
+        validate_export_file_type(file_type)  # Validated before querying trades.
+        df = self.get_dataframe(symbol=symbol)
+        df.rename(columns=TRADE_JOURNAL_HEADERS, inplace=True)
+        df.set_index('ID', inplace=True)
+        export_dataframe(df, file_path, file_type)
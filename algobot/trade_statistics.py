@@ -0,0 +1,233 @@
+"""
+Incremental trade statistics. Aggregates are updated in O(1) per trade or day, so statistics of long-running bots don't
+slow down as their trade history grows.
+"""
+
+import math
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+TRADES_PAGE_SIZE = 10
+
+
+class TradeStatistics:
+    """
+    Rolling aggregates of a trader's trades and daily net changes. A round trip starts with the trade that enters a
+    position and ends with the trade that exits it; win rate and profits are measured over round trips.
+    """
+    def __init__(self):
+        self.trades = 0  # All trades, including entries.
+        self.round_trips = 0
+        self.wins = 0
+        self.losses = 0
+        self.total_profit = 0
+        self.total_profit_percentage = 0
+        self.best_profit_percentage: Optional[float] = None
+        self.worst_profit_percentage: Optional[float] = None
+        self.entry_net: Optional[float] = None  # Net before the current position was entered.
+
+        self.days = 0
+        self.total_daily_percentage = 0
+        self.best_daily_percentage: Optional[float] = None
+        self.worst_daily_percentage: Optional[float] = None
+
+    def add_trade(self, initial_net: float, final_net: float, exited_position: bool):
+        """
+        Updates the aggregates with a trade.
+        :param initial_net: Net before the trade.
+        :param final_net: Net after the trade.
+        :param exited_position: Boolean whether the trade exited the position (ending a round trip) or not.
+        """
+        self.trades += 1
+        if not exited_position:
+            if self.entry_net is None:
+                self.entry_net = initial_net
+            return
+
+        entry_net = initial_net if self.entry_net is None else self.entry_net
+        self.entry_net = None
+
+        profit = final_net - entry_net
+        profit_percentage = profit / entry_net * 100 if entry_net else 0
+        self.round_trips += 1
+        self.total_profit += profit
+        self.total_profit_percentage += profit_percentage
+        if profit > 0:
+            self.wins += 1
+        elif profit < 0:
+            self.losses += 1
+
+        if self.best_profit_percentage is None or profit_percentage > self.best_profit_percentage:
+            self.best_profit_percentage = profit_percentage
+        if self.worst_profit_percentage is None or profit_percentage < self.worst_profit_percentage:
+            self.worst_profit_percentage = profit_percentage
+
+    def add_daily_percentage(self, percentage: float):
+        """
+        Updates the aggregates with a day's net change percentage.
+        :param percentage: Net change percentage of the day.
+        """
+        self.days += 1
+        self.total_daily_percentage += percentage
+        if self.best_daily_percentage is None or percentage > self.best_daily_percentage:
+            self.best_daily_percentage = percentage
+        if self.worst_daily_percentage is None or percentage < self.worst_daily_percentage:
+            self.worst_daily_percentage = percentage
+
+    def get_win_rate(self) -> Optional[float]:
+        """
+        Returns the percentage of round trips that were profitable.
+        :return: Win rate or None if there are no round trips.
+        """
+        return self.wins / self.round_trips * 100 if self.round_trips else None
+
+    def get_average_profit(self) -> Optional[float]:
+        """
+        Returns the average profit of round trips.
+        :return: Average profit or None if there are no round trips.
+        """
+        return self.total_profit / self.round_trips if self.round_trips else None
+
+    def get_average_profit_percentage(self) -> Optional[float]:
+        """
+        Returns the average profit percentage of round trips.
+        :return: Average profit percentage or None if there are no round trips.
+        """
+        return self.total_profit_percentage / self.round_trips if self.round_trips else None
+
+    def get_average_daily_percentage(self) -> Optional[float]:
+        """
+        Returns the average daily net change percentage.
+        :return: Average daily percentage or None if no day has passed.
+        """
+        return self.total_daily_percentage / self.days if self.days else None
+
+    def get_statistics_dictionary(self, precision: int = 2) -> Dict[str, str]:
+        """
+        Returns formatted statistics for the statistics window in the GUI.
+        :param precision: Precision to round profits to.
+        :return: Dictionary of formatted statistics.
+        """
+        def get_percentage_string(value: Optional[float]) -> str:
+            return 'None' if value is None else f'{round(value, 2)}%'
+
+        average_profit = self.get_average_profit()
+        return {
+            'roundTrips': str(self.round_trips),
+            'wins': str(self.wins),
+            'losses': str(self.losses),
+            'winRate': get_percentage_string(self.get_win_rate()),
+            'averageProfit': 'None' if average_profit is None else f'${round(average_profit, precision)}',
+            'averageProfitPercentage': get_percentage_string(self.get_average_profit_percentage()),
+            'bestTradePercentage': get_percentage_string(self.best_profit_percentage),
+            'worstTradePercentage': get_percentage_string(self.worst_profit_percentage),
+            'averageDailyPercentage': get_percentage_string(self.get_average_daily_percentage()),
+            'bestDailyPercentage': get_percentage_string(self.best_daily_percentage),
+            'worstDailyPercentage': get_percentage_string(self.worst_daily_percentage),
+        }
+
+
+def get_page(items: List[Any], page: Optional[int] = None,
+             page_size: int = TRADES_PAGE_SIZE) -> Tuple[List[Any], int, int]:
+    """
+    Returns a page of the items provided. Only the page is sliced, so this doesn't depend on the amount of items.
+    :param items: List of items (e.g. trades) in chronological order.
+    :param page: Page number starting from 1. If None, the last page (the latest items) is returned. Out of range pages
+     are clamped.
+    :param page_size: Amount of items per page.
+    :return: Tuple of the page's items, the page number, and the total amount of pages.
+    """
+    total_pages = max(1, math.ceil(len(items) / page_size))
+    page = total_pages if page is None else min(max(page, 1), total_pages)
+    start = (page - 1) * page_size
+    return items[start:start + page_size], page, total_pages
+
+
+class GroupedStatistics:
+    """
+    Grouped statistics of the statistics window, kept between loops. Traders set values as the state they're built
+    from changes, and only values set to something new since the last emit are emitted, so the grouped statistics
+    aren't rebuilt and diffed as a whole every loop.
+    """
+    def __init__(self):
+        self.values: Dict[str, Dict[str, Any]] = {}  # Current values of every category.
+        self.changes: Dict[str, Dict[str, Any]] = {}  # Values changed since the last emit.
+        self.signatures: Dict[str, tuple] = {}  # Raw state values of a category were last built from.
+        self.groups: Dict[str, Set[str]] = {}  # Categories of groups whose members come and go (e.g. strategies).
+        self.layout_changed = True  # Whether categories were added or removed since the last emit.
+
+    def is_stale(self, category: str, signature: tuple) -> bool:
+        """
+        Checks whether the raw state the values of a category are built from changed since they were last built, and
+        records the new state if so.
+        :param category: Category of the values.
+        :param signature: Tuple of the raw state (e.g. attributes of the trader) the values are built from.
+        :return: Boolean whether the values have to be rebuilt or not.
+        """
+        if category in self.values and self.signatures.get(category) == signature:
+            return False
+
+        self.signatures[category] = signature
+        return True
+
+    def set(self, category: str, key: str, value: Any):
+        """
+        Sets a value, recording it as changed if it's different from the current value.
+        :param category: Category of the value.
+        :param key: Key of the value.
+        :param value: Value to set.
+        """
+        values = self.values.get(category)
+        if values is None:
+            values = self.values[category] = {}
+            self.layout_changed = True
+
+        if key not in values or values[key] != value:
+            values[key] = value
+            self.changes.setdefault(category, {})[key] = value
+
+    def update(self, category: str, values: Dict[str, Any]):
+        """
+        Sets the values provided.
+        :param category: Category of the values.
+        :param values: Dictionary of values to set.
+        """
+        for key, value in values.items():
+            self.set(category, key, value)
+
+    def remove(self, category: str):
+        """
+        Removes a category (if it exists).
+        :param category: Category to remove.
+        """
+        if self.values.pop(category, None) is not None:
+            self.changes.pop(category, None)
+            self.signatures.pop(category, None)
+            self.layout_changed = True
+
+    def set_group_categories(self, group: str, categories: Iterable[str]):
+        """
+        Records the categories of a group, removing categories of the group that are no longer present.
+        :param group: Name of the group (e.g. strategies).
+        :param categories: Categories currently in the group.
+        """
+        categories = set(categories)
+        for category in self.groups.get(group, set()) - categories:
+            self.remove(category)
+
+        self.groups[group] = categories
+
+    def pop_changes(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Returns the values changed since the last call. Every category is kept (even if none of its values changed) so
+        the statistics window knows its layout didn't change. If categories were added or removed, everything is
+        returned.
+        :return: Grouped statistics with only changed values.
+        """
+        if self.layout_changed:
+            changes = {category: dict(values) for category, values in self.values.items()}
+        else:
+            changes = {category: self.changes.get(category, {}) for category in self.values}
+
+        self.changes = {}
+        self.layout_changed = False
+        return changes
@@ -0,0 +1,243 @@
+"""
+Crash recovery snapshots. A running bot periodically pickles its trader state (balances, position, stop loss and
+trailing state, trades) along with the candles it has that aren't stored in the database yet, so a restarted bot
+resumes where it left off with the same stop loss logic, only downloading candles that closed since the snapshot.
+History is loaded from the database as usual, so snapshots stay small and cheap to write from the trading thread.
+"""
+
+import os
+import pickle
+import time
+from datetime import timedelta
+from typing import Any, Dict, Iterable, Optional
+
+from algobot.helpers import create_folder
+
+SNAPSHOT_VERSION = 2
+SNAPSHOT_FOLDER = 'Snapshots'
+
+# Balances are retrieved from Binance for live bots, so they're only restored for simulations.
+BALANCE_ATTRIBUTES = ('balance', 'coin', 'coin_owed', 'commission_paid')
+
+# Position, stop loss, and take profit state. Configuration (loss percentages, counters, etc.) isn't included, as it's
+# applied from the GUI's configuration when the bot starts.
+POSITION_ATTRIBUTES = (
+    'current_position',
+    'previous_position',
+    'buy_long_price',
+    'sell_short_price',
+    'long_trailing_price',
+    'short_trailing_price',
+    'stop_loss',
+    'previous_stop_loss',
+    'custom_stop_loss',
+    'stop_loss_exit',
+    'smart_stop_loss_counter',
+    'smart_stop_loss_enter',
+    'scheduled_safety_timer',
+    'take_profit_point',
+    'trailing_take_profit_activated',
+    'in_human_control',
+)
+
+HISTORY_ATTRIBUTES = ('starting_balance', 'starting_time', 'previous_net', 'trades', 'daily_change_nets',
+                      'trade_statistics')
+
+
+def get_snapshot_path(caller: str, symbol: str, interval: str) -> str:
+    """
+    Returns the default path of the snapshot of the caller, symbol, and interval provided.
+    :param caller: Caller (live or simulation) the snapshot belongs to.
+    :param symbol: Symbol traded.
+    :param interval: Interval traded on.
+    :return: Path to the snapshot file.
+    """
+    return os.path.join(create_folder(SNAPSHOT_FOLDER), f'{caller.lower()}_{symbol}_{interval}.pickle')
+
+
+def get_attributes(obj, attributes: Iterable[str]) -> Dict[str, Any]:
+    """
+    Returns the attributes provided of an object in a dictionary.
+    :param obj: Object to get attributes of.
+    :param attributes: Names of attributes to get.
+    :return: Dictionary of attribute names and values.
+    """
+    return {attribute: getattr(obj, attribute) for attribute in attributes}
+
+
+def set_attributes(obj, state: Dict[str, Any]):
+    """
+    Sets attributes of an object from the dictionary provided.
+    :param obj: Object to set attributes of.
+    :param state: Dictionary of attribute names and values.
+    """
+    for attribute, value in state.items():
+        setattr(obj, attribute, value)
+
+
+def restore_position_state(trader, position_state: Dict[str, Any]) -> bool:
+    """
+    Restores position, stop loss, and take profit state if the trader is still in the same position. This is used after
+    a live trader re-checks its position with Binance, which resets trailing prices to the current price.
+    :param trader: Trader to restore state of.
+    :param position_state: Dictionary with POSITION_ATTRIBUTES values.
+    :return: Boolean whether the state was restored or not.
+    """
+    if position_state['current_position'] != trader.current_position:
+        return False
+
+    set_attributes(trader, position_state)
+    return True
+
+
+def create_snapshot(trader) -> Dict[str, Any]:
+    """
+    Returns a snapshot of the trader and the candles of its data that aren't in the database. Values aren't copied, so
+    the snapshot should be serialized while the trader lock is held.
+    :param trader: Trader to snapshot.
+    :return: Snapshot dictionary.
+    """
+    data_view = trader.data_view
+    return {
+        'version': SNAPSHOT_VERSION,
+        'time': time.time(),
+        'symbol': trader.symbol,
+        'interval': data_view.interval,
+        'balances': get_attributes(trader, BALANCE_ATTRIBUTES),
+        'position': get_attributes(trader, POSITION_ATTRIBUTES),
+        'history': get_attributes(trader, HISTORY_ATTRIBUTES),
+        'data': {'tail': data_view.get_unpersisted_data(), 'current_values': data_view.current_values},
+    }
+
+
+def is_compatible(trader, snapshot: Dict[str, Any]) -> bool:
+    """
+    Checks whether the snapshot provided can be restored to the trader provided.
+    :param trader: Trader to restore to.
+    :param snapshot: Snapshot dictionary.
+    :return: Boolean whether the snapshot is compatible or not.
+    """
+    return (snapshot.get('version') == SNAPSHOT_VERSION and
+            snapshot.get('symbol') == trader.symbol and
+            snapshot.get('interval') == trader.data_view.interval)
+
+
+def restore_data(trader, snapshot: Dict[str, Any]) -> int:
+    """
+    Restores candles that weren't in the database from the snapshot provided. They're appended to the trader's data
+    (loaded from the database) and stored, unless there's a gap between them, in which case they're downloaded again.
+    :param trader: Trader whose data gets restored.
+    :param snapshot: Snapshot dictionary.
+    :return: Amount of candles restored.
+    """
+    data_view = trader.data_view
+    data = data_view.data
+    tail = snapshot['data']['tail']
+    if data:
+        tail = [row for row in tail if row['date_utc'] > data[-1]['date_utc']]
+        interval = timedelta(minutes=data_view.interval_minutes)
+        if tail and tail[0]['date_utc'] - data[-1]['date_utc'] > interval:
+            return 0
+
+    if not tail:
+        return 0
+
+    data.extend(tail)
+    data_view.current_values = snapshot['data']['current_values']
+    data_view.dump_to_table(tail)
+    return len(tail)
+
+
+def restore_trader(trader, snapshot: Dict[str, Any], restore_balances: bool = True) -> bool:
+    """
+    Restores trader state from the snapshot provided. This should be done after the trader's configuration is applied.
+    :param trader: Trader to restore.
+    :param snapshot: Snapshot dictionary.
+    :param restore_balances: Boolean whether to restore balances or not. Live traders retrieve them from Binance.
+    :return: Boolean whether position state was restored or not. If balances aren't restored, position state is only
+     restored if the trader is still in the same position.
+    """
+    with trader.lock:
+        set_attributes(trader, snapshot['history'])
+        if restore_balances:
+            set_attributes(trader, snapshot['balances'])
+            set_attributes(trader, snapshot['position'])
+            return True
+
+        return restore_position_state(trader, snapshot['position'])
+
+
+class TraderSnapshotter:
+    """
+    Periodically writes snapshots of a trader to a file. Snapshots are written after every trade and at least every
+    interval seconds. Files are replaced atomically, so a crash mid-write never corrupts the previous snapshot.
+    """
+    def __init__(self, file_path: str, interval: float = 60):
+        """
+        :param file_path: Path to write snapshots to.
+        :param interval: Seconds between periodic snapshots.
+        """
+        self.file_path = file_path
+        self.interval = interval
+        self.last_snapshot_time = None
+        self.last_trade_count = None
+
+    def is_due(self, trader) -> bool:
+        """
+        Checks whether a snapshot is due.
+        :param trader: Trader to snapshot.
+        :return: Boolean whether a snapshot is due or not.
+        """
+        return (self.last_snapshot_time is None or
+                time.monotonic() - self.last_snapshot_time >= self.interval or
+                len(trader.trades) != self.last_trade_count)
+
+    def save(self, trader):
+        """
+        Writes a snapshot of the trader.
+        :param trader: Trader to snapshot.
+        """
+        with trader.lock:  # A forced trade from the GUI can't happen mid-snapshot.
+            trade_count = len(trader.trades)
+            serialized = pickle.dumps(create_snapshot(trader), protocol=pickle.HIGHEST_PROTOCOL)
+
+        temporary_path = f'{self.file_path}.tmp'
+        with open(temporary_path, 'wb') as f:
+            f.write(serialized)
+        os.replace(temporary_path, self.file_path)
+
+        self.last_snapshot_time = time.monotonic()
+        self.last_trade_count = trade_count
+
+    def save_if_due(self, trader) -> bool:
+        """
+        Writes a snapshot of the trader if one is due.
+        :param trader: Trader to snapshot.
+        :return: Boolean whether a snapshot was written or not.
+        """
+        if not self.is_due(trader):
+            return False
+
+        self.save(trader)
+        return True
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        """
+        Loads the last snapshot written.
+        :return: Snapshot dictionary or None if there's no readable snapshot.
+        """
+        if not os.path.exists(self.file_path):
+            return None
+
+        try:
+            with open(self.file_path, 'rb') as f:
+                return pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError):
+            return None
+
+    def delete(self):
+        """
+        Deletes the snapshot. This is done when a bot ends cleanly, so only crashed bots are recovered.
+        """
+        if os.path.exists(self.file_path):
+            os.remove(self.file_path)
@@ -0,0 +1,111 @@
+"""
+Account snapshot for real traders. Balances of the margin and spot accounts are fetched with a single request each and
+shared by every balance lookup until the snapshot is invalidated, so a decision cycle makes at most one authenticated
+request per account instead of one per lookup.
+"""
+
+import threading
+import time
+from typing import Callable, Dict, Tuple
+
+MARGIN = 'margin'
+SPOT = 'spot'
+
+# Seconds a snapshot is used for at most. Snapshots are also invalidated after fills and at the start of every cycle.
+ACCOUNT_SNAPSHOT_MAX_AGE = 60
+
+Assets = Dict[str, dict]  # Asset dictionaries from Binance keyed by asset name.
+
+
+class AccountSnapshot:
+    """
+    Thread-safe snapshot of account assets. Accounts are fetched lazily, so invalidating a snapshot doesn't make any
+    requests until a balance is read again. Lookups that don't trade (e.g. displaying balances) can fall back to the
+    last assets fetched if a fetch fails; lookups that trade never do, as those assets may predate a fill.
+    """
+    def __init__(self, fetch_margin_assets: Callable[[], Assets], fetch_spot_balances: Callable[[], Assets],
+                 max_age: float = ACCOUNT_SNAPSHOT_MAX_AGE, clock: Callable[[], float] = time.monotonic):
+        """
+        :param fetch_margin_assets: Function fetching margin assets with a single request.
+        :param fetch_spot_balances: Function fetching spot balances with a single request.
+        :param max_age: Seconds fetched assets are used for at most.
+        :param clock: Monotonic clock function.
+        """
+        self.fetchers: Dict[str, Callable[[], Assets]] = {MARGIN: fetch_margin_assets, SPOT: fetch_spot_balances}
+        self.max_age = max_age
+        self.clock = clock
+        self.entries: Dict[str, Tuple[float, Assets]] = {}  # Fetch time and assets keyed by account.
+        self.last_assets: Dict[str, Assets] = {}  # Last known assets keyed by account, only for stale lookups.
+        self.request_count = 0  # Amount of requests made, mostly for debugging.
+        self.lock = threading.Lock()
+
+    def invalidate(self):
+        """
+        Invalidates the snapshot, so the next lookups fetch accounts again. This must be done after anything changes
+        balances (fills, loans, and transfers).
+        """
+        with self.lock:
+            self.entries = {}
+
+    def get_assets(self, account: str, allow_stale: bool = False) -> Assets:
+        """
+        Returns the assets of the account provided, fetching them if they're not in the snapshot or too old. If the
+        fetch fails, the error is raised, unless stale assets are allowed, in which case the last known assets are
+        returned without being added to the snapshot, so they're fetched again on the next lookup.
+        :param account: Account (margin or spot) to get assets of.
+        :param allow_stale: Boolean whether the last known assets can be returned if the fetch fails. Never allow this
+        for lookups that orders are sized or positions are checked with.
+        :return: Dictionary of assets keyed by asset name.
+        """
+        with self.lock:  # Concurrent lookups (e.g. from the GUI) wait for a single fetch instead of making their own.
+            entry = self.entries.get(account)
+            if entry is None or self.clock() - entry[0] >= self.max_age:
+                self.request_count += 1
+                try:
+                    entry = (self.clock(), self.fetchers[account]())
+                except Exception:
+                    if not allow_stale or account not in self.last_assets:
+                        raise
+                    return self.last_assets[account]
+
+                self.entries[account] = entry
+                self.last_assets[account] = entry[1]
+
+            return entry[1]
+
+    def update_margin_assets(self, updates: Dict[str, dict]) -> bool:
+        """
+        Applies pushed updates (e.g. free and locked balances from the user data stream) to margin assets in the
+        snapshot. Updates are only applied to fetched snapshots, as pushed balances don't contain borrowed amounts.
+        :param updates: Dictionary of updated fields keyed by asset name. Assets not in the snapshot are ignored.
+        :return: Boolean whether any asset was updated or not.
+        """
+        with self.lock:
+            entry = self.entries.get(MARGIN)
+            if entry is None:
+                return False
+
+            fetch_time, assets = entry
+            updated = {asset: {**assets[asset], **fields} for asset, fields in updates.items() if asset in assets}
+            # Assets are replaced instead of mutated, so readers never see partial updates.
+            self.entries[MARGIN] = (fetch_time, {**assets, **updated})
+            self.last_assets[MARGIN] = self.entries[MARGIN][1]
+            return len(updated) > 0
+
+    def get_margin_asset(self, asset: str, allow_stale: bool = False) -> dict:
+        """
+        Returns margin information (free, borrowed, interest, etc.) of the asset provided.
+        :param asset: Asset to get information of.
+        :param allow_stale: Boolean whether the last known assets can be used if the fetch fails.
+        :return: Margin asset dictionary.
+        """
+        return self.get_assets(MARGIN, allow_stale=allow_stale)[asset]
+
+    def get_spot_balance(self, asset: str, allow_stale: bool = False) -> dict:
+        """
+        Returns the spot balance (free and locked) of the asset provided.
+        :param asset: Asset to get the balance of.
+        :param allow_stale: Boolean whether the last known balances can be used if the fetch fails.
+        :return: Spot balance dictionary.
+        """
+        return self.get_assets(SPOT, allow_stale=allow_stale)[asset]
@@ -2,24 +2,71 @@
 Backtester object.
 """
 
+import hashlib
+import json
 import os
 import sys
+import tempfile
 import time
 import traceback
 from datetime import datetime, timedelta
 from itertools import product
 from logging import Logger
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
-import pandas as pd
+import numpy as np
 from dateutil import parser
 
+from algobot.candle_cache import CANDLE_CACHE_EXTENSION, PRICE_COLUMNS, CandleCache, CandleRows
+from algobot.date_index import DateIndex, get_date_index
 from algobot.enums import (BACKTEST, BEARISH, BULLISH, ENTER_LONG, ENTER_SHORT, EXIT_LONG, EXIT_SHORT, LONG, OPTIMIZER,
-                           SHORT)
-from algobot.helpers import (LOG_FOLDER, ROOT_DIR, convert_all_dates_to_datetime, convert_small_interval,
-                             get_interval_minutes, is_number)
+                           SHORT, STOP, TRAILING)
+from algobot.helpers import (LOG_FOLDER, ROOT_DIR, convert_all_dates_to_datetime, convert_small_interval, create_folder,
+                             get_interval_minutes, get_label_string, is_number)
+from algobot.input_buffer import InputArrayBuffer
+from algobot.optimizer_store import OptimizerStore
 from algobot.traders.trader import Trader
 from algobot.typing_hints import DataType, DictType
+from algobot.worker_pool import DIED, ERROR, OK, IsolatedWorkerPool
+
+# Backtester of the current isolated optimizer worker. It's set once per worker process by initialize_isolated_worker(),
+#  so the data is only sent once per worker instead of with every run.
+ISOLATED_WORKER_STATE: Dict[str, Any] = {}
+
+
+def initialize_isolated_worker(candle_file: str, naive_dates: bool, backtester_kwargs: Dict[str, Any],
+                               start_date_index: int, end_date_index: int):
+    """
+    Initializes the backtester of an isolated optimizer worker. The backtester indexes the memory-mapped candle file
+    directly instead of getting the data pickled, so workers share its pages and only convert the rows they read.
+    :param candle_file: Path to the candle cache file with the data to backtest on.
+    :param naive_dates: Boolean whether the dates of the data were naive (in UTC) or not.
+    :param backtester_kwargs: Keyword arguments to create the backtester with.
+    :param start_date_index: Index of the data to start backtests at.
+    :param end_date_index: Index of the data to end backtests at.
+    """
+    data = CandleRows(CandleCache(candle_file).open(), naive_dates=naive_dates)
+    backtester = Backtester(data=data, strategies=[], output_trades=False, **backtester_kwargs)
+    backtester.start_date_index = start_date_index
+    backtester.end_date_index = end_date_index
+    ISOLATED_WORKER_STATE['backtester'] = backtester
+
+
+def run_isolated_combo(run: int, total_runs: int, settings: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Runs an optimizer combo in an isolated worker.
+    :param run: Run number of the combo.
+    :param total_runs: Total runs in the optimization.
+    :param settings: Settings combination to run.
+    :return: Optimizer row dictionary.
+    """
+    backtester: Backtester = ISOLATED_WORKER_STATE['backtester']
+    try:
+        backtester.apply_general_settings(settings)
+        result = backtester.start_backtest()
+        return backtester.get_optimize_row(run, total_runs, result=result, settings=settings)
+    finally:
+        backtester.restore()
 
 
 class Backtester(Trader):
@@ -39,7 +86,8 @@ class Backtester(Trader):
                  drawdown_percentage: int = 100,
                  precision: int = 4,
                  output_trades: bool = True,
-                 logger: Logger = None):
+                 logger: Logger = None,
+                 lookback_window: Optional[int] = None):
 
         super().__init__(
             symbol=symbol,
@@ -51,6 +99,7 @@ class Backtester(Trader):
         convert_all_dates_to_datetime(data)
 
         self.data = data
+        self.date_index: Optional[DateIndex] = None
         self.check_data()
 
         self.interval = self.get_interval()
@@ -65,14 +114,32 @@ class Backtester(Trader):
         # Percentage of loss at which bot exits backtest.
         self.drawdown_percentage_decimal = drawdown_percentage / 100
 
-        self.optimizer_rows = []
+        self.optimizer_store: Optional[OptimizerStore] = None
+        self.worker_data_file: Optional[str] = None  # Candle file isolated optimizer workers read the data from.
         self.logger = logger
 
-        if len(strategy_interval.split()) == 1:
+        # Optional cache shared between backtests on the same data (e.g. walk-forward windows and optimizer runs). It
+        #  maps a tick key to the indicator values and strategy trends computed at that tick.
+        self.indicator_cache: Optional[Dict[tuple, dict]] = None
+        self.strategy_signatures: Dict[str, str] = {}
+
+        # Strategy input arrays over the whole data and the data they were built from (see get_data_arrays()).
+        self.data_arrays: Optional[Dict[str, np.ndarray]] = None
+        self.data_arrays_source = None
+
+        # If this is a list, the date and net of every period backtested is appended to it.
+        self.equity_curve: Optional[List[tuple]] = None
+
+        # Amount of periods strategies are computed over. If no window is provided, it's derived from the strategies.
+        self.lookback_window_option = lookback_window
+        self.lookback_window = lookback_window
+
+        if strategy_interval is not None and len(strategy_interval.split()) == 1:
             strategy_interval = convert_small_interval(strategy_interval)
 
         self.all_strategies = {}
 
+        self.strategy_interval_option = strategy_interval  # Strategy interval provided, before combos change it.
         self.strategy_interval = self.interval if strategy_interval is None else strategy_interval
         self.strategy_interval_minutes = get_interval_minutes(self.strategy_interval)
 
@@ -137,26 +204,22 @@ class Backtester(Trader):
         if first_date > last_date:
             self.data = self.data[::-1]
 
+    def get_date_index(self) -> DateIndex:
+        """
+        Returns the date index of the data loaded. It's rebuilt only if the data changed since it was last built.
+        :return: Date index.
+        """
+        self.date_index = get_date_index(self.data, self.date_index)
+        return self.date_index
+
     def find_date_index(self, target_date: datetime.date, starting: bool = True) -> int:
         """
         Finds starting or ending index of date from targetDate if it exists in data loaded.
         :param starting: Boolean if true will find the first found index. If used for end index, set to False.
         :param target_date: Object to compare date-time with.
-        :return: Index from self.data if found, else -1.
+        :return: Index from self.data if found, else an IndexError is raised.
         """
-        if isinstance(target_date, datetime):
-            target_date = target_date.date()
-
-        iterator = list(enumerate(self.data))
-
-        if not starting:
-            iterator = reversed(list(enumerate(self.data)))
-
-        for index, data in iterator:
-            if data['date_utc'].date() == target_date:
-                return index
-
-        raise IndexError("Date not found.")
+        return self.get_date_index().find_date(target_date, starting=starting)
 
     def get_start_index(self, start_date: datetime.date) -> int:
         """
@@ -189,7 +252,7 @@ class Backtester(Trader):
         :param index: Index of data to set as current period.
         """
         self.current_period = self.data[index]
-        self.current_price = self.data[index]['open']
+        self.current_price = self.current_period['open']
 
     @staticmethod
     def generate_error_message(error: Exception, strategy) -> str:
@@ -205,23 +268,107 @@ class Backtester(Trader):
                f'{strategy.name}. You can find more details about the crash in the ' \
                f'logs file at {os.path.join(ROOT_DIR, LOG_FOLDER)}.'
 
-    def strategy_loop(self, strategy_data, thread) -> Optional[str]:
+    def setup_strategies(self, strategies: List[Dict[str, Any]], short_circuit: bool = False):
+        """
+        Sets up strategies and their signatures used for the shared indicator cache.
+        :param strategies: List of strategies to set up and apply to bot.
+        :param short_circuit: Whether you want to short circuit strategy or not.
+        """
+        super().setup_strategies(strategies, short_circuit=short_circuit)
+        self.strategy_signatures = {name: json.dumps(strategy.values, default=str)
+                                    for name, strategy in self.strategies.items()}
+        self.lookback_window = self.get_lookback_window()
+
+        if self.logger is not None and self.strategies:
+            self.logger.debug(self.strategy_set_plan.get_report())
+
+    def get_lookback_window(self) -> int:
+        """
+        Returns the amount of periods strategies are computed over. Unless a window was provided, this is the largest
+        lookback of the strategies' indicators plus a stability margin for indicators with unstable periods.
+        :return: Lookback window.
+        """
+        if self.lookback_window_option is not None:
+            return max(self.lookback_window_option, self.min_period)
+
+        return max(self.strategy_set_plan.get_window(), self.min_period, 1)
+
+    def get_tick_cache_key(self, index: int) -> tuple:
+        """
+        Returns the key of the tick at the index provided in the shared indicator cache. Strategy data at a tick only
+        depends on the index when the strategy interval matches the data interval; otherwise, the gap data also
+        depends on where the backtest started.
+        :param index: Index of the current period.
+        :return: Tuple key.
+        """
+        if self.strategy_interval_minutes == self.interval_minutes:
+            return self.strategy_interval_minutes, None, index, self.lookback_window
+        return self.strategy_interval_minutes, self.start_date_index, index, self.lookback_window
+
+    def get_data_arrays(self) -> Dict[str, np.ndarray]:
+        """
+        Returns strategy input arrays over the whole data. They're only built when the data changes, so strategy inputs
+        at a tick are views of them instead of a DataFrame built every tick. Columns of candle rows over an array are
+        used as is.
+        :return: Dictionary containing price type as key and price values as value.
+        """
+        if self.data_arrays is None or self.data_arrays_source is not self.data or \
+                len(self.data_arrays['close']) != len(self.data):
+            if isinstance(self.data, CandleRows):
+                arrays = {column: self.data.get_column(column) for column in PRICE_COLUMNS}
+            else:
+                arrays = {column: np.array([period[column] for period in self.data], dtype=float)
+                          for column in PRICE_COLUMNS if column in self.data[0]}
+
+            arrays['high/low'] = (arrays['high'] + arrays['low']) / 2
+            arrays['open/close'] = (arrays['open'] + arrays['close']) / 2
+            self.data_arrays = arrays
+            self.data_arrays_source = self.data
+
+        return self.data_arrays
+
+    def get_window_arrays(self, arrays: Dict[str, np.ndarray], length: int) -> Dict[str, np.ndarray]:
+        """
+        Returns views of the last lookback window periods of the first length periods of the arrays provided.
+        :param arrays: Input arrays.
+        :param length: Amount of periods seen.
+        :return: Dictionary containing price type as key and price values as value.
+        """
+        start = max(0, length - self.lookback_window)
+        return {column: array[start:length] for column, array in arrays.items()}
+
+    def strategy_loop(self, input_arrays_dict: Dict[str, np.ndarray], thread,
+                      cache_key: Optional[tuple] = None) -> Optional[str]:
         """
         This will traverse through all strategies and attempt to get their trends.
-        :param strategy_data: Data to use to get the strategy trend.
+        :param input_arrays_dict: Input arrays of the lookback window to use to get the strategy trend.
         :param thread: Thread object (if exists).
+        :param cache_key: Key of the current tick in the shared indicator cache (if one is used).
         :return: String "CRASHED" if an error is raised, else None if everything goes smoothly.
         """
-        cache = {}
-        df = pd.DataFrame(strategy_data[-250:])
-        df['high/low'] = (df['high'] + df['low']) / 2
-        df['open/close'] = (df['open'] + df['close']) / 2
-        df.columns = [c.lower() for c in df.columns]
-        input_arrays_dict = df.to_dict('series')
+        strategies = self.strategies
+        if self.indicator_cache is not None and cache_key is not None:
+            cache = self.indicator_cache.setdefault(cache_key, {})
+            strategies = {}
+            for name, strategy in self.strategies.items():
+                trend_key = ('trend', self.strategy_signatures[name])
+                if trend_key in cache:
+                    # Restore the values and plots the strategy had at this tick too, not just its trend.
+                    strategy.trend, output = cache[trend_key]
+                    strategy.restore_tick_output(output)
+                else:
+                    strategies[name] = strategy
 
-        for strategy in self.strategies.values():
+            if not strategies:  # Every trend was already computed for this tick.
+                return None
+        else:
+            cache = {}
+
+        for name, strategy in strategies.items():
             try:
-                strategy.get_trend(input_arrays_dict, cache)
+                trend = strategy.get_trend(input_arrays_dict, cache)
+                if cache_key is not None:
+                    cache['trend', self.strategy_signatures[name]] = trend, strategy.get_tick_output()
             except Exception as e:
                 if thread and thread.caller == OPTIMIZER:
                     error_message = traceback.format_exc()
@@ -303,8 +450,11 @@ class Backtester(Trader):
         :param test_length: Length of backtest.
         :param thread: Optional thread that called this function that'll be used for emitting signals.
         """
-        seen_data = self.data[:self.start_date_index]
-        strategy_data = seen_data if self.strategy_interval_minutes == self.interval_minutes else []
+        # Strategies on the data interval read the data up to the current period directly; strategies on a larger
+        #  interval read gap data built from it.
+        same_interval = self.strategy_interval_minutes == self.interval_minutes
+        strategy_data = []
+        strategy_buffer = InputArrayBuffer()  # Input arrays of the gap data, extended as it's appended to.
         next_insertion = self.data[self.start_date_index]['date_utc'] + timedelta(
             minutes=self.strategy_interval_minutes)
         index = None
@@ -316,7 +466,6 @@ class Backtester(Trader):
                     raise RuntimeError("Optimizer was canceled.")
 
             self.set_indexed_current_price_and_period(index)
-            seen_data.append(self.current_period)
 
             self.main_logic()
             if self.get_net() < 10:
@@ -327,22 +476,27 @@ class Backtester(Trader):
             elif self.get_net() < (1 - self.drawdown_percentage_decimal) * self.starting_balance:
                 return 'DRAWDOWN'
 
+            if self.equity_curve is not None:
+                self.equity_curve.append((self.current_period['date_utc'], self.get_net()))
+
             result = None  # Result of strategy loop to ensure nothing crashed -> None is good, anything else is bad.
-            if strategy_data is seen_data:
-                if len(strategy_data) >= self.min_period:
-                    result = self.strategy_loop(strategy_data=strategy_data, thread=thread)
+            cache_key = self.get_tick_cache_key(index) if self.indicator_cache is not None else None
+            if same_interval:
+                if index + 1 >= self.min_period:
+                    input_arrays_dict = self.get_window_arrays(self.get_data_arrays(), index + 1)
+                    result = self.strategy_loop(input_arrays_dict, thread=thread, cache_key=cache_key)
             else:
                 if len(strategy_data) + 1 >= self.min_period:
-                    strategy_data.append(self.current_period)
-                    result = self.strategy_loop(strategy_data=strategy_data, thread=thread)
-                    strategy_data.pop()
+                    arrays = strategy_buffer.get_input_arrays_dict(strategy_data, self.current_period)
+                    input_arrays_dict = self.get_window_arrays(arrays, len(strategy_data) + 1)
+                    result = self.strategy_loop(input_arrays_dict, thread=thread, cache_key=cache_key)
 
             if result is not None:
                 return result
 
-            if seen_data is not strategy_data and self.current_period['date_utc'] >= next_insertion:
+            if not same_interval and self.current_period['date_utc'] >= next_insertion:
                 next_insertion = self.current_period['date_utc'] + timedelta(minutes=self.strategy_interval_minutes)
-                gap_data = self.get_gap_data(seen_data[-self.interval_gap_multiplier - 1: -1])
+                gap_data = self.get_gap_data(self.data[max(0, index - self.interval_gap_multiplier):index])
                 strategy_data.append(gap_data)
 
             if thread and thread.caller == BACKTEST and index % divisor == 0:
@@ -449,71 +603,324 @@ class Backtester(Trader):
 
         return [dict(zip(combos.keys(), v)) for v in product(*combos.values())]
 
-    def optimize(self, combos: Dict, thread=None):
+    def get_data_fingerprint(self) -> str:
+        """
+        Returns a fingerprint of the data loaded, so optimizer sessions can't be resumed on different data.
+        :return: SHA-256 hex digest of the data.
+        """
+        prices = np.array([(d['open'], d['high'], d['low'], d['close'], d['volume']) for d in self.data], dtype=float)
+        fingerprint = hashlib.sha256(prices.tobytes())
+        fingerprint.update(f"{self.data[0]['date_utc']}|{self.data[-1]['date_utc']}|{len(self.data)}".encode())
+        return fingerprint.hexdigest()
+
+    def get_optimizer_session_specification(self, combos: Dict) -> Dict:
+        """
+        Returns everything that determines the results of an optimization: the combos, the backtester's configuration
+        (including settings combos don't override, like the strategy interval and lookback window), and the data
+        fingerprint.
+        :param combos: Combos with ranges for the permutations (before they're expanded).
+        :return: Dictionary specification of the session.
+        """
+        return {
+            'combos': json.loads(json.dumps(combos, default=str)),
+            'data': self.get_data_fingerprint(),
+            'symbol': self.symbol,
+            'starting_balance': self.starting_balance,
+            'margin_enabled': self.margin_enabled,
+            'drawdown_percentage': self.drawdown_percentage_decimal * 100,
+            'precision': self.precision,
+            'strategy_interval': self.strategy_interval_option,
+            'lookback_window': self.lookback_window_option,
+            'start_date': str(self.data[self.start_date_index]['date_utc']),
+            'end_date': str(self.data[self.end_date_index]['date_utc']),
+        }
+
+    @staticmethod
+    def get_optimizer_session_id(specification: Dict) -> str:
+        """
+        Returns the optimizer session ID from the specification provided. Key order is kept on purpose, as it
+        determines the order of the permutations and therefore the run numbers.
+        :param specification: Optimizer session specification.
+        :return: Session ID.
+        """
+        return hashlib.sha256(json.dumps(specification, default=str).encode()).hexdigest()
+
+    def get_optimizer_store_path(self, session_id: str) -> str:
+        """
+        Returns the default path for the optimizer results store of the session provided.
+        :param session_id: Optimizer session ID.
+        :return: Path to the optimizer results database.
+        """
+        inner_folder = os.path.join(create_folder('Optimizer Results'), self.symbol or 'Imported')
+        os.makedirs(inner_folder, exist_ok=True)
+        return os.path.join(inner_folder, f'session_{session_id[:16]}.db')
+
+    def create_worker_pool(self, max_workers: Optional[int] = None, memory_limit_mb: Optional[int] = None,
+                           time_limit: Optional[float] = None) -> IsolatedWorkerPool:
+        """
+        Creates a pool of isolated worker processes to run optimizer combos in. The data is written to a temporary
+        candle cache file once, and every worker memory-maps it to create a backtester with this backtester's
+        configuration; settings not in the combos use the backtester's defaults. Call remove_worker_data_file() once
+        the pool is done.
+        :param max_workers: Maximum amount of worker processes. Defaults to the CPU count.
+        :param memory_limit_mb: Address space limit of every worker in megabytes.
+        :param time_limit: Wall-time limit of every combo in seconds.
+        :return: Isolated worker pool.
+        """
+        backtester_kwargs = {
+            'starting_balance': self.starting_balance,
+            'symbol': self.symbol,
+            'margin_enabled': self.margin_enabled,
+            'drawdown_percentage': self.drawdown_percentage_decimal * 100,
+            'precision': self.precision,
+            'lookback_window': self.lookback_window_option
+        }
+
+        self.remove_worker_data_file()
+        file_descriptor, self.worker_data_file = tempfile.mkstemp(suffix=f'.{CANDLE_CACHE_EXTENSION}')
+        os.close(file_descriptor)
+        CandleCache(self.worker_data_file).write(self.data)
+        naive_dates = self.data[0]['date_utc'].tzinfo is None
+
+        return IsolatedWorkerPool(
+            max_workers=max_workers,
+            memory_limit_mb=memory_limit_mb,
+            time_limit=time_limit,
+            initializer=initialize_isolated_worker,
+            initargs=(self.worker_data_file, naive_dates, backtester_kwargs, self.start_date_index,
+                      self.end_date_index)
+        )
+
+    def remove_worker_data_file(self):
+        """
+        Removes the candle file written for isolated optimizer workers (if any).
+        """
+        if self.worker_data_file is not None:
+            if os.path.exists(self.worker_data_file):
+                os.remove(self.worker_data_file)
+            self.worker_data_file = None
+
+    def optimize(self, combos: Dict, thread=None, store_file: Optional[str] = None, resume: bool = True,
+                 worker_pool: Optional[IsolatedWorkerPool] = None):
         """
         This function will run a brute-force optimization test to figure out the best inputs.
         Sample combos should look something like: {
             'lossTypes': [TRAILING] -> use a list for predefined values.
             'lossPercentage': (5, 15, 3) -> use a tuple with 3 values for steps i.e. -> 5, 8, 11, 14.
         }
+
+        Optimizations are identified by a session ID that's a hash of the combos, configuration, and data. Results are
+        checkpointed to the session's store, so if the same optimization is run again, completed runs are skipped.
+        :param combos: Combos with ranges for the permutations.
+        :param thread: Optional thread that called this function that'll be used for emitting signals.
+        :param store_file: Path to the database results are written to. If not provided, a default one is used.
+        :param resume: Boolean whether to resume a previous session with the same session ID or start over.
+        :param worker_pool: Optional pool from create_worker_pool() to run every combo in an isolated process.
         """
+        specification = self.get_optimizer_session_specification(combos)
+        session_id = self.get_optimizer_session_id(specification)
         settings_list = self.get_all_permutations(combos)
+        total_runs = len(settings_list)
+
+        self.optimizer_store = OptimizerStore(store_file or self.get_optimizer_store_path(session_id))
+        resumed = self.optimizer_store.start_session(session_id, specification, total_runs, resume=resume)
+        completed_runs = self.optimizer_store.get_completed_runs() if resumed else set()
+
+        if self.logger is not None and completed_runs:
+            self.logger.info(f'Resuming optimizer session {session_id} with {len(completed_runs)}/{total_runs} runs '
+                             f'already completed.')
+
         was_thread = thread is not None
         if thread:
             thread.signals.started.emit()
+            for row in self.optimizer_store.get_rows():
+                thread.signals.activity.emit(self.get_optimizer_table_row(row))
+
+        try:
+            if worker_pool is not None:
+                runs = [(run, settings) for run, settings in enumerate(settings_list, start=1)
+                        if run not in completed_runs]
+                self.isolated_optimize(worker_pool, runs, total_runs, thread)
+                return
+
+            for index, settings in enumerate(settings_list, start=1):
+                if thread and not thread.running:
+                    break
+                if was_thread and not thread:
+                    break  # Bug fix for optimizer keeping on running even after it was stopped.
+                if index in completed_runs:
+                    continue
+
+                self.apply_general_settings(settings)
+                result = self.start_backtest(thread)
+                row = self.get_basic_optimize_info(index, total_runs, result=result, settings=settings)
+
+                if thread:
+                    thread.signals.activity.emit(row)
+
+                self.restore()
+        finally:
+            self.optimizer_store.checkpoint()
+
+    def isolated_optimize(self, worker_pool: IsolatedWorkerPool, runs: List[Tuple[int, dict]], total_runs: int,
+                          thread=None):
+        """
+        Runs optimizer combos in isolated worker processes. A combo that crashes, hangs, or runs out of memory only
+        fails its own run, which is recorded with the failure as its result.
+        :param worker_pool: Isolated worker pool to run combos in.
+        :param runs: List of run numbers and their settings.
+        :param total_runs: Total runs in the optimization.
+        :param thread: Optional thread that called this function that'll be used for emitting signals.
+        """
+        tasks = [(run, total_runs, settings) for run, settings in runs]
+        results = worker_pool.imap_unordered(run_isolated_combo, tasks)
+        try:
+            for task_result in results:
+                if thread and not thread.running:
+                    break
+
+                run, _, settings = tasks[task_result.index]
+                if task_result.status == OK:
+                    row = task_result.value
+                else:
+                    if self.logger is not None:
+                        self.logger.error(f'Optimizer run {run} failed ({task_result.status}): {task_result.error}')
 
-        for index, settings in enumerate(settings_list, start=1):
-            if thread and not thread.running:
-                break
-            if was_thread and not thread:
-                break  # Bug fix for optimizer keeping on running even after it was stopped.
-
-            self.apply_general_settings(settings)
-            result = self.start_backtest(thread)
-
-            if thread:
-                thread.signals.activity.emit(self.get_basic_optimize_info(index, len(settings_list), result=result))
-
-            self.restore()
-
-    def get_basic_optimize_info(self, run: int, total_runs: int, result: str = 'PASSED') -> tuple:
-        """
-        Return basic information in a tuple for emitting to the trades table in the GUI.
-        """
-        row = (
-            round(self.get_net() / self.starting_balance * 100 - 100, 2),
-            self.get_stop_loss_strategy_string(),
-            self.get_safe_rounded_string(self.loss_percentage_decimal, multiplier=100, symbol='%'),
-            str(self.take_profit_type),
-            self.get_safe_rounded_string(self.take_profit_percentage_decimal, multiplier=100, symbol='%'),
-            self.symbol,
-            self.interval,
-            self.strategy_interval,
-            len(self.trades),
-            f'{run}/{total_runs}',
-            result,  # PASSED / DRAWDOWN / CRASHED
-            self.get_strategies_info_string(left=' ', right=' ')
+                    result = 'CRASHED' if task_result.status in (ERROR, DIED) else task_result.status
+                    row = self.get_failed_optimize_row(run, total_runs, result=result, settings=settings)
+
+                if self.optimizer_store is not None:
+                    self.optimizer_store.add_row(row)
+
+                if thread:
+                    thread.signals.activity.emit(self.get_optimizer_table_row(row))
+        finally:
+            results.close()
+
+    def get_basic_optimize_info(self, run: int, total_runs: int, result: str = 'PASSED',
+                                settings: Optional[dict] = None) -> tuple:
+        """
+        Return basic information in a tuple for emitting to the trades table in the GUI. If an optimizer store exists,
+        the typed version of the row is also written to it.
+        :param run: Current run number.
+        :param total_runs: Total runs in the optimization.
+        :param result: Result of the run (PASSED / DRAWDOWN / CRASHED, etc).
+        :param settings: Settings combination used for this run.
+        """
+        row = self.get_optimize_row(run, total_runs, result=result, settings=settings)
+        if self.optimizer_store is not None:
+            self.optimizer_store.add_row(row)
+
+        return self.get_optimizer_table_row(row)
+
+    def get_optimize_row(self, run: int, total_runs: int, result: str = 'PASSED',
+                         settings: Optional[dict] = None) -> Dict[str, Any]:
+        """
+        Returns the typed optimizer row of the current run.
+        :param run: Current run number.
+        :param total_runs: Total runs in the optimization.
+        :param result: Result of the run (PASSED / DRAWDOWN / CRASHED, etc).
+        :param settings: Settings combination used for this run.
+        :return: Optimizer row dictionary.
+        """
+        return {
+            'run': run,
+            'total_runs': total_runs,
+            'profit_percentage': self.get_net() / self.starting_balance * 100 - 100,
+            'stop_loss_strategy': self.get_stop_loss_strategy_string(),
+            'stop_loss_percentage': self.get_optional_percentage(self.loss_percentage_decimal),
+            'take_profit_strategy': str(self.take_profit_type),
+            'take_profit_percentage': self.get_optional_percentage(self.take_profit_percentage_decimal),
+            'ticker': self.symbol,
+            'interval': self.interval,
+            'strategy_interval': self.strategy_interval,
+            'trades': len(self.trades),
+            'result': result,
+            'strategy': self.get_strategies_info_string(left=' ', right=' '),
+            'settings': OptimizerStore.serialize_settings(settings) if settings is not None else None
+        }
+
+    def get_failed_optimize_row(self, run: int, total_runs: int, result: str, settings: dict) -> Dict[str, Any]:
+        """
+        Returns the typed optimizer row of a run that failed in a worker before returning its own row. The row is built
+        from the run's settings alone, as the backtester's state doesn't belong to the run.
+        :param run: Run number.
+        :param total_runs: Total runs in the optimization.
+        :param result: Result of the run (CRASHED / TIMEOUT, etc).
+        :param settings: Settings combination of the run.
+        :return: Optimizer row dictionary.
+        """
+        loss_strategy = self.get_enum_from_str(settings['lossType']) if 'lossType' in settings else None
+        take_profit_type = self.get_enum_from_str(settings['takeProfitType']) if 'takeProfitType' in settings else None
+        strategy_interval = settings.get('strategyIntervals', self.strategy_interval)
+        if len(strategy_interval.split()) == 1:
+            strategy_interval = convert_small_interval(strategy_interval)
+
+        strategy_names = ', '.join(get_label_string(name) for name in settings.get('strategies', {}))
+        return {
+            'run': run,
+            'total_runs': total_runs,
+            'profit_percentage': 0,
+            'stop_loss_strategy': {STOP: 'Stop Loss', TRAILING: 'Trailing Loss'}.get(loss_strategy, 'None'),
+            'stop_loss_percentage': settings.get('lossPercentage') if loss_strategy is not None else None,
+            'take_profit_strategy': str(take_profit_type),
+            'take_profit_percentage': settings.get('takeProfitPercentage') if take_profit_type is not None else None,
+            'ticker': self.symbol,
+            'interval': self.interval,
+            'strategy_interval': strategy_interval,
+            'trades': 0,
+            'result': result,
+            'strategy': f'Strategies: {strategy_names}',
+            'settings': OptimizerStore.serialize_settings(settings)
+        }
+
+    def get_optimizer_table_row(self, row: dict) -> tuple:
+        """
+        Converts a typed optimizer row into the formatted tuple the optimizer table in the GUI expects.
+        :param row: Optimizer row dictionary.
+        :return: Tuple of formatted values.
+        """
+        return (
+            round(row['profit_percentage'], 2),
+            row['stop_loss_strategy'],
+            self.get_safe_rounded_string(row['stop_loss_percentage'], symbol='%'),
+            row['take_profit_strategy'],
+            self.get_safe_rounded_string(row['take_profit_percentage'], symbol='%'),
+            row['ticker'],
+            row['interval'],
+            row['strategy_interval'],
+            row['trades'],
+            f"{row['run']}/{row['total_runs']}",
+            row['result'],  # PASSED / DRAWDOWN / CRASHED
+            row['strategy']
         )
-        self.optimizer_rows.append(row)
-        return row
+
+    @staticmethod
+    def get_optional_percentage(decimal_value: Optional[float]) -> Optional[float]:
+        """
+        Converts an optional decimal value to a percentage.
+        :param decimal_value: Decimal value or None.
+        :return: Percentage or None.
+        """
+        return None if decimal_value is None else decimal_value * 100
+
+    def get_optimizer_row_count(self) -> int:
+        """
+        Returns the amount of optimizer rows stored so far.
+        :return: Amount of optimizer rows.
+        """
+        return 0 if self.optimizer_store is None else self.optimizer_store.get_row_count()
 
     def export_optimizer_rows(self, file_path: str, file_type: str):
         """
-        Exports optimizer rows to file path provided using Pandas.
+        Exports optimizer rows from the optimizer store to file path provided.
+        :param file_path: Path to export rows to.
+        :param file_type: Type of file to export to: CSV, XLSX, or PARQUET.
         """
-        headers = ['Profit Percentage', 'Stop Loss Strategy', 'Stop Loss Percentage', 'Take Profit Strategy',
-                   'Take Profit Percentage', 'Ticker', 'Interval', 'Strategy Interval', 'Trades', 'Run',
-                   'Result', 'Strategy']
-        df = pd.DataFrame(self.optimizer_rows)
-        df.columns = headers
-        df.set_index('Run', inplace=True)
+        if self.optimizer_store is None:
+            raise RuntimeError("No optimizer results found to export.")
 
-        if file_type == 'CSV':
-            df.to_csv(file_path)  # noqa
-        elif file_type == 'XLSX':
-            df.to_excel(file_path)
-        else:
-            raise TypeError("Invalid type of file type provided.")
+        self.optimizer_store.export(file_path, file_type)
 
     def apply_general_settings(self, settings: dict):
         """
@@ -547,6 +954,9 @@ class Backtester(Trader):
         self.stop_loss_exit = False
         self.smart_stop_loss_enter = False
 
+        if self.equity_curve is not None:
+            self.equity_curve = []
+
     def get_interval(self) -> str:
         """
         Attempts to parse interval from loaded data.
@@ -645,6 +1055,7 @@ class Backtester(Trader):
         print(f'\tDrawdown Percentage: {self.drawdown_percentage_decimal * 100}')
         print(f'\tMargin Enabled: {self.margin_enabled}')
         print(f"\tStarting Balance: ${self.starting_balance}")
+        print(f'\tLookback Window: {self.lookback_window} periods')
 
         if self.take_profit_type is not None:
             print(f'\tTake Profit Percentage: {round(self.take_profit_percentage_decimal * 100, 2)}%')
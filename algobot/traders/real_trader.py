@@ -4,13 +4,20 @@ File for real trader. TODO: Add support for CCXT.
 
 import math
 import time
-from typing import Any, Dict
+from functools import partial
+from typing import Any, Callable, Dict, Optional, Tuple
 
 from binance.client import Client
 from binance.enums import ORDER_TYPE_MARKET, SIDE_BUY, SIDE_SELL
 
 from algobot.enums import LONG, SHORT
+from algobot.order_latency import FILL_STAGE, REQUEST_STAGE, SIGNAL_STAGE, OrderLatencyTracker
+from algobot.retry_policy import CLOSED, OPEN, RetryPolicy
+from algobot.trade_statistics import GroupedStatistics
+from algobot.trader_snapshot import POSITION_ATTRIBUTES, get_attributes, restore_position_state
+from algobot.traders.account_snapshot import AccountSnapshot
 from algobot.traders.simulation_trader import SimulationTrader
+from algobot.traders.user_data_stream import UserDataStream
 
 
 class RealTrader(SimulationTrader):
@@ -49,8 +56,13 @@ class RealTrader(SimulationTrader):
         self.binance_client = Client(api_key, api_secret, tld=tld)
         self.transaction_fee_percentage = 0.002  # Added 0.001 for volatility safety.
         self.isolated = is_isolated
+        self.retry_policy = RetryPolicy(on_retry=self.handle_retry, on_state_change=self.handle_circuit_state)
+        self.account = AccountSnapshot(partial(self.retry_policy.call, self.fetch_margin_assets),
+                                       partial(self.retry_policy.call, self.fetch_spot_balances))
+        self.user_data_stream: Optional[UserDataStream] = None
+        self.order_latency = OrderLatencyTracker()
 
-        symbol_info = self.binance_client.get_symbol_info(self.symbol)
+        symbol_info = self.retry_policy.call(self.binance_client.get_symbol_info, self.symbol)
         self.purchase_precision = self.get_purchase_precision(symbol_info)
         self.min_notional = self.get_min_notional(symbol_info)
 
@@ -79,6 +91,102 @@ class RealTrader(SimulationTrader):
                 return min_notional  # Get the default min_notional value from Binance if found.
         return 10  # Default value of $10.
 
+    @staticmethod
+    def get_order_fill_details(order: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Returns the executed quantity and fees of an order from its response.
+        :param order: Order dictionary returned from the Binance API.
+        :return: Dictionary with the quantity, fee, and fee asset to add to the trade.
+        """
+        fills = order.get('fills', [])
+        fee_assets = {fill.get('commissionAsset') for fill in fills}
+        single_fee_asset = len(fee_assets) == 1  # Fees paid in different assets can't be summed.
+        return {
+            'quantity': float(order['executedQty']) if 'executedQty' in order else None,
+            'fee': sum(float(fill['commission']) for fill in fills) if single_fee_asset else None,
+            'fee_asset': fee_assets.pop() if single_fee_asset else None
+        }
+
+    @staticmethod
+    def get_average_fill_price(order: Dict[str, Any]) -> Optional[float]:
+        """
+        Returns the average price an order was filled at from its response.
+        :param order: Order dictionary returned from the Binance API.
+        :return: Average fill price or None if the response doesn't contain fills.
+        """
+        fills = order.get('fills', [])
+        quantity = sum(float(fill['qty']) for fill in fills)
+        if quantity == 0:
+            return None
+
+        return sum(float(fill['price']) * float(fill['qty']) for fill in fills) / quantity
+
+    def handle_retry(self, error: Exception, attempt: int, delay: float):
+        """
+        Outputs a failed attempt of a Binance call that's retried.
+        :param error: Exception raised by the attempt.
+        :param attempt: Number of the failed attempt.
+        :param delay: Seconds slept before the retry.
+        """
+        self.output_message("Error: %s. Retrying (attempt %d) in %.1f seconds...", 4, args=(error, attempt + 1, delay))
+
+    def handle_circuit_state(self, state: str):
+        """
+        Outputs when Binance becomes unreachable (degraded mode, in which orders fail fast and last known balances are
+        used) or reachable again.
+        :param state: New state of the circuit.
+        """
+        if state == OPEN:
+            self.output_message("Binance is unreachable. Orders will fail until it is reachable again.", 4)
+        elif state == CLOSED:
+            self.output_message("Binance is reachable again.")
+
+    def is_degraded(self) -> bool:
+        """
+        Returns whether Binance calls of the trader or its data object are failing.
+        :return: Boolean whether the trader is in degraded mode or not.
+        """
+        return self.retry_policy.degraded or super().is_degraded()
+
+    def call_exchange(self, endpoint: str, signal_time: float, function: Callable[..., Any],
+                      **kwargs) -> Tuple[Any, Dict[str, Optional[float]]]:
+        """
+        Calls an exchange endpoint and records its latencies: from the signal to the request, from the request to the
+        response, and from the request to the transaction time reported by the exchange (which includes any clock
+        offset with the exchange). Slippage of orders against the signal price is recorded too. Calls are made through
+        the circuit breaker, but never retried, as orders, loans, and repayments aren't safe to repeat.
+        :param endpoint: Name of the endpoint for the latency histograms.
+        :param signal_time: Performance counter time of the signal that led to the call.
+        :param function: Client function to call.
+        :param kwargs: Keyword arguments of the client function.
+        :return: Tuple of the response and its latencies in milliseconds keyed by stage.
+        """
+        sent_time = time.perf_counter()
+        sent_epoch = time.time()
+        response = self.retry_policy.call(function, attempts=1, **kwargs)
+        transact_time = response.get('transactTime') if isinstance(response, dict) else None
+
+        timings = {
+            SIGNAL_STAGE: (sent_time - signal_time) * 1000,
+            REQUEST_STAGE: (time.perf_counter() - sent_time) * 1000,
+            FILL_STAGE: None if transact_time is None else transact_time - sent_epoch * 1000,
+        }
+        self.order_latency.add_timings(endpoint, timings)
+        if 'side' in kwargs:
+            self.order_latency.add_slippage(kwargs['side'], self.current_price, self.get_average_fill_price(response))
+
+        return response, timings
+
+    def get_trade_details(self, order: Dict[str, Any], timings: Dict[str, Optional[float]]) -> Dict[str, Any]:
+        """
+        Returns fill details and latencies of an order to add to its trade.
+        :param order: Order dictionary returned from the Binance API.
+        :param timings: Latencies of the order keyed by stage.
+        :return: Dictionary of add trade keyword arguments.
+        """
+        return {**self.get_order_fill_details(order), 'fill_price': self.get_average_fill_price(order),
+                'timings': timings}
+
     @staticmethod
     def get_purchase_precision(symbol_info: Dict[str, Any]) -> int:
         """
@@ -120,7 +228,7 @@ class RealTrader(SimulationTrader):
         :return: A boolean whether it is isolated or not.
         """
         try:  # Attempt to get coin from regular cross margin account.
-            assets = self.binance_client.get_margin_account()['userAssets']
+            assets = self.retry_policy.call(self.binance_client.get_margin_account)['userAssets']
             _ = [asset for asset in assets if asset['asset'] == self.coin_name][0]
             return False
         except IndexError:  # If not found, it most likely means it is not in the cross margin account.
@@ -152,17 +260,10 @@ class RealTrader(SimulationTrader):
 
     def retrieve_margin_values(self):
         """
-        Retrieves margin values and sets them to instance variables.
+        Retrieves margin values from the account snapshot and sets them to instance variables.
         """
-        if self.isolated:
-            assets = self.get_isolated_margin_account()['assets']
-            coin = [asset for asset in assets if asset['baseAsset']['asset'] == self.coin_name][0]['baseAsset']
-            usdt = [asset for asset in assets if asset['baseAsset']['asset'] == self.coin_name and
-                    asset['quoteAsset']['asset'] == 'USDT'][0]['quoteAsset']
-        else:
-            assets = self.binance_client.get_margin_account()['userAssets']
-            coin = [asset for asset in assets if asset['asset'] == self.coin_name][0]
-            usdt = [asset for asset in assets if asset['asset'] == 'USDT'][0]
+        coin = self.get_asset(self.coin_name)
+        usdt = self.get_asset('USDT')
 
         self.balance = self.round_down(float(usdt['free']))
         self.coin = self.round_down(float(coin['free']))
@@ -172,7 +273,9 @@ class RealTrader(SimulationTrader):
         """
         Transfer assets from spot account to margin account.
         """
-        self.binance_client.transfer_spot_to_margin(asset=self.coin_name, amount=self.get_spot_coin())
+        self.retry_policy.call(self.binance_client.transfer_spot_to_margin, attempts=1, asset=self.coin_name,
+                               amount=self.get_spot_coin())
+        self.account.invalidate()
         self.add_trade(message='Transferred from spot to margin',
                        force=False,
                        orderID="TRANSFER SPOT TO MARGIN")
@@ -181,7 +284,9 @@ class RealTrader(SimulationTrader):
         """
         Transfers assets from margin account to spot account.
         """
-        order = self.binance_client.transfer_margin_to_spot(asset=self.coin_name, amount=self.get_margin_coin())
+        order = self.retry_policy.call(self.binance_client.transfer_margin_to_spot, attempts=1, asset=self.coin_name,
+                                       amount=self.get_margin_coin())
+        self.account.invalidate()
         self.add_trade(message='Transferred from margin to spot',
                        force=False,
                        orderID=order['clientOrderId'])
@@ -197,44 +302,52 @@ class RealTrader(SimulationTrader):
         """
         Enters long position in spot account.
         """
+        signal_time = time.perf_counter()
         self.spot_usdt = self.get_spot_usdt()
         self.current_price = self.data_view.get_current_price()
         max_buy = self.round_down(self.spot_usdt * (1 - self.transaction_fee_percentage) / self.current_price)
 
-        order = self.binance_client.order_market_buy(
+        order, timings = self.call_exchange(
+            'orderMarketBuy', signal_time, self.binance_client.order_market_buy,
             symbol=self.symbol,
             quantity=max_buy
         )
+        self.account.invalidate()
 
         self.add_trade(message='Bought spot long.',
                        force=False,
-                       orderID=order['clientOrderId'])
+                       orderID=order['clientOrderId'],
+                       **self.get_trade_details(order, timings))
 
     def spot_sell_long(self):
         """
         Exits long position in spot account.
         """
+        signal_time = time.perf_counter()
         self.spot_coin = self.get_spot_coin()
-        order = self.binance_client.order_market_sell(
+        order, timings = self.call_exchange(
+            'orderMarketSell', signal_time, self.binance_client.order_market_sell,
             symbol=self.symbol,
             quantity=self.spot_coin
         )
+        self.account.invalidate()
 
         self.add_trade(message='Sold spot long.',
                        force=False,
-                       orderID=order['clientOrderId'])
+                       orderID=order['clientOrderId'],
+                       **self.get_trade_details(order, timings))
 
     def get_spot_usdt(self) -> float:
         """
         Returns spot USDT amount.
         """
-        return self.round_down(self.binance_client.get_asset_balance(asset='USDT')['free'])
+        return self.round_down(self.account.get_spot_balance('USDT')['free'])
 
     def get_spot_coin(self) -> float:
         """
         Returns spot coin amount.
         """
-        return self.round_down(self.binance_client.get_asset_balance(asset=self.coin_name)['free'])
+        return self.round_down(self.account.get_spot_balance(self.coin_name)['free'])
 
     # noinspection PyProtectedMember
     def get_isolated_margin_account(self, **params) -> dict:
@@ -246,6 +359,101 @@ class RealTrader(SimulationTrader):
         # pylint: disable=protected-access
         return self.binance_client._request_margin_api('get', 'margin/isolated/account', True, data=params)
 
+    def fetch_margin_assets(self) -> Dict[str, dict]:
+        """
+        Fetches margin assets of the margin account traded in with a single request. Isolated accounts only contain the
+        symbol's base and quote assets.
+        :return: Dictionary of margin assets keyed by asset name.
+        """
+        if self.isolated:
+            assets = self.get_isolated_margin_account(symbols=self.symbol)['assets']
+            pair = [asset for asset in assets if asset['baseAsset']['asset'] == self.coin_name and
+                    asset['quoteAsset']['asset'] == 'USDT'][0]
+            return {self.coin_name: pair['baseAsset'], 'USDT': pair['quoteAsset']}
+
+        assets = self.binance_client.get_margin_account()['userAssets']
+        return {asset['asset']: asset for asset in assets}
+
+    def fetch_spot_balances(self) -> Dict[str, dict]:
+        """
+        Fetches spot balances with a single request.
+        :return: Dictionary of spot balances keyed by asset name.
+        """
+        return {balance['asset']: balance for balance in self.binance_client.get_account()['balances']}
+
+    def get_grouped_statistics(self) -> dict:
+        """
+        Returns dictionary of grouped statistics for the statistics window in the GUI with order latencies.
+        """
+        grouped_dict = super().get_grouped_statistics()
+        grouped_dict['orderLatency'] = self.order_latency.get_statistics_dictionary()
+        return grouped_dict
+
+    def update_grouped_statistics(self, statistics: GroupedStatistics):
+        """
+        Updates the grouped statistics kept by the bot thread with order latencies.
+        :param statistics: Grouped statistics to update.
+        """
+        super().update_grouped_statistics(statistics)
+        if statistics.is_stale('orderLatency', (self.order_latency.updates,)):
+            statistics.update('orderLatency', self.order_latency.get_statistics_dictionary())
+
+    def invalidate_account_snapshot(self):
+        """
+        Invalidates the account snapshot, so balances are fetched again the next time they're needed. While the user
+        data stream is connected, balances are kept current by push, so the snapshot is kept.
+        """
+        if not self.is_streaming():
+            self.account.invalidate()
+
+    def is_streaming(self) -> bool:
+        """
+        Checks whether account state is being pushed by the user data stream or not.
+        :return: Boolean whether the user data stream is connected or not.
+        """
+        return self.user_data_stream is not None and self.user_data_stream.connected
+
+    def start_user_data_stream(self, manager):
+        """
+        Starts consuming the user data stream, so balances and open orders are pushed instead of polled.
+        :param manager: Websocket manager (e.g. python-binance's ThreadedWebsocketManager) to start the socket with.
+        """
+        user_data_stream = UserDataStream(self, manager)
+        try:
+            user_data_stream.start()
+        except Exception:
+            manager.stop()
+            raise
+
+        self.user_data_stream = user_data_stream
+
+    def stop_user_data_stream(self):
+        """
+        Stops consuming the user data stream (if it was started).
+        """
+        if self.user_data_stream is not None:
+            self.user_data_stream.stop()
+            self.user_data_stream = None
+
+    def get_open_orders(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Returns open orders of the symbol traded as pushed by the user data stream.
+        :return: Dictionary of open orders keyed by client order ID (empty if the stream isn't running).
+        """
+        return dict(self.user_data_stream.open_orders) if self.user_data_stream is not None else {}
+
+    def resync_account(self):
+        """
+        Fetches the account again and re-checks the current position. Stop loss and trailing state are kept if the
+        position didn't change. This is done whenever the user data stream (re)connects.
+        """
+        with self.lock:
+            position_state = get_attributes(self, POSITION_ATTRIBUTES)
+            self.account.invalidate()
+            self.retrieve_margin_values()
+            self.check_current_position()
+            restore_position_state(self, position_state)
+
     def get_starting_balance(self) -> float:
         """
         Returns the initial starting balance for bot.
@@ -258,16 +466,12 @@ class RealTrader(SimulationTrader):
 
     def get_asset(self, target_asset: str) -> dict:
         """
-        Retrieves asset specified (if exists).
+        Retrieves asset specified (if exists) from the account snapshot. Balances are used to size and check orders,
+        so a failed fetch is raised instead of falling back to last known balances.
         :param target_asset: Asset to be retrieved.
         :return: The target asset (if found).
         """
-        if self.isolated:
-            assets = self.get_isolated_margin_account()['assets']
-            return [asset for asset in assets if asset['baseAsset']['asset'] == target_asset][0]['baseAsset']
-        else:
-            assets = self.binance_client.get_margin_account()['userAssets']
-            return [asset for asset in assets if asset['asset'] == target_asset][0]
+        return self.account.get_margin_asset(target_asset)
 
     def get_margin_coin_info(self) -> dict:
         """
@@ -281,13 +485,7 @@ class RealTrader(SimulationTrader):
         Retrieves USDT available in margin account.
         :return: USDT available.
         """
-        if self.isolated:
-            assets = self.get_isolated_margin_account()['assets']
-            for asset in assets:
-                if asset['baseAsset']['asset'] == self.coin_name and asset['quoteAsset']['asset'] == 'USDT':
-                    return self.round_down(float(asset['quoteAsset']['free']))
-        else:
-            return self.round_down(float(self.get_asset('USDT')['free']))
+        return self.round_down(float(self.get_asset('USDT')['free']))
 
     def get_margin_coin(self) -> float:
         """
@@ -320,42 +518,52 @@ class RealTrader(SimulationTrader):
         :param amount: Amount to borrow in margin loan.
         :return: Order dictionary.
         """
+        signal_time = time.perf_counter()
         if self.isolated:
-            self.binance_client.create_margin_loan(asset=self.coin_name,
-                                                   amount=amount,
-                                                   isIsolated=True,
-                                                   symbol=self.symbol)
+            _, timings = self.call_exchange('createMarginLoan', signal_time, self.binance_client.create_margin_loan,
+                                            asset=self.coin_name,
+                                            amount=amount,
+                                            isIsolated=True,
+                                            symbol=self.symbol)
         else:
-            self.binance_client.create_margin_loan(asset=self.coin_name,
-                                                   amount=amount)
+            _, timings = self.call_exchange('createMarginLoan', signal_time, self.binance_client.create_margin_loan,
+                                            asset=self.coin_name,
+                                            amount=amount)
 
+        self.account.invalidate()
         self.retrieve_margin_values()
         self.add_trade(message='Created margin loan.',
                        force=force,
-                       orderID=None)
+                       orderID=None,
+                       timings=timings)
 
     def repay_margin_loan(self, force: bool):
         """
         Repays margin loan.
         :param force: Boolean that determines whether bot executed action or human.
         """
+        signal_time = time.perf_counter()
         if self.isolated:
-            self.binance_client.repay_margin_loan(
+            _, timings = self.call_exchange(
+                'repayMarginLoan', signal_time, self.binance_client.repay_margin_loan,
                 asset=self.coin_name,
                 amount=self.coin,
                 isIsolated=self.isolated,
                 symbol=self.symbol
             )
         else:
-            self.binance_client.repay_margin_loan(
+            _, timings = self.call_exchange(
+                'repayMarginLoan', signal_time, self.binance_client.repay_margin_loan,
                 asset=self.coin_name,
                 amount=self.coin
             )
 
+        self.account.invalidate()
         self.retrieve_margin_values()
         self.add_trade(message='Repaid margin loan.',
                        force=force,
-                       orderID=None)
+                       orderID=None,
+                       timings=timings)
 
     def buy_long(self, msg: str, coin: float or None = None, force: bool = False, smart_enter=False):
         """
@@ -367,6 +575,7 @@ class RealTrader(SimulationTrader):
         """
         # TODO: Refactor to get rid of this pylint disable.
         # pylint: disable=arguments-renamed
+        signal_time = time.perf_counter()
         with self.lock:
             if self.current_position == LONG:
                 return
@@ -378,7 +587,8 @@ class RealTrader(SimulationTrader):
 
             self.output_message(f'Attempting to enter long by buying {coin} coins...')
 
-            order = self.binance_client.create_margin_order(
+            order, timings = self.call_exchange(
+                'createMarginOrder', signal_time, self.binance_client.create_margin_order,
                 symbol=self.symbol,
                 side=SIDE_BUY,
                 type=ORDER_TYPE_MARKET,
@@ -387,6 +597,7 @@ class RealTrader(SimulationTrader):
             )
 
             time.sleep(2)  # Sleep for a second so that the bot registers new margin values.
+            self.account.invalidate()  # Balances changed with the fill.
             self.retrieve_margin_values()
             self.current_position = LONG
             self.buy_long_price = self.current_price
@@ -394,7 +605,8 @@ class RealTrader(SimulationTrader):
             self.add_trade(message=msg,
                            force=force,
                            orderID=order['clientOrderId'],
-                           smart_enter=smart_enter)
+                           smart_enter=smart_enter,
+                           **self.get_trade_details(order, timings))
 
     def sell_long(self, msg: str, coin: float or None = None, force: bool = False, stop_loss_exit=False):
         """
@@ -404,6 +616,7 @@ class RealTrader(SimulationTrader):
         :param coin: Coin amount to sell to exit long position.
         :param force: Boolean that determines whether bot executed action or human.
         """
+        signal_time = time.perf_counter()
         with self.lock:
             if self.current_position != LONG:
                 return
@@ -413,7 +626,8 @@ class RealTrader(SimulationTrader):
 
             self.output_message(f"Attempting to exit long by selling {coin} coins...")
 
-            order = self.binance_client.create_margin_order(
+            order, timings = self.call_exchange(
+                'createMarginOrder', signal_time, self.binance_client.create_margin_order,
                 symbol=self.symbol,
                 side=SIDE_SELL,
                 type=ORDER_TYPE_MARKET,
@@ -422,6 +636,7 @@ class RealTrader(SimulationTrader):
             )
 
             time.sleep(2)  # Sleep for a second so that the bot registers new margin values.
+            self.account.invalidate()  # Balances changed with the fill.
             self.retrieve_margin_values()
             self.previous_position = LONG
             self.current_position = None
@@ -430,7 +645,9 @@ class RealTrader(SimulationTrader):
             self.long_trailing_price = None
             self.add_trade(message=msg,
                            force=force,
-                           orderID=order['clientOrderId'], stop_loss_exit=stop_loss_exit)
+                           orderID=order['clientOrderId'],
+                           stop_loss_exit=stop_loss_exit,
+                           **self.get_trade_details(order, timings))
 
     def buy_short(self, msg: str, coin: float or None = None, force: bool = False, stop_loss_exit=False):
         """
@@ -441,6 +658,7 @@ class RealTrader(SimulationTrader):
         :param coin: Coin amount to buy back to exit short position.
         :param force: Boolean that determines whether bot executed action or human.
         """
+        signal_time = time.perf_counter()
         with self.lock:
             if self.current_position != SHORT:
                 return
@@ -453,7 +671,8 @@ class RealTrader(SimulationTrader):
 
             self.output_message(f'Attempting to exit short by returning {coin} coins...')
 
-            order = self.binance_client.create_margin_order(
+            order, timings = self.call_exchange(
+                'createMarginOrder', signal_time, self.binance_client.create_margin_order,
                 side=SIDE_BUY,
                 symbol=self.symbol,
                 quantity=self.round_down(coin),
@@ -471,11 +690,13 @@ class RealTrader(SimulationTrader):
             # )
 
             time.sleep(2)  # Sleep for a second so that the bot registers new margin values.
+            self.account.invalidate()  # Balances changed with the fill.
             self.retrieve_margin_values()
             self.add_trade(message=msg,
                            force=force,
                            orderID=order['clientOrderId'],
-                           stop_loss_exit=stop_loss_exit)
+                           stop_loss_exit=stop_loss_exit,
+                           **self.get_trade_details(order, timings))
 
             # self.repay_margin_loan(force=force)
             self.previous_position = SHORT
@@ -494,6 +715,7 @@ class RealTrader(SimulationTrader):
         :param coin: Coin amount to sell to enter short position.
         :param force: Boolean that determines whether bot executed action or human.
         """
+        signal_time = time.perf_counter()
         with self.lock:
             if self.current_position == SHORT:
                 return
@@ -508,7 +730,8 @@ class RealTrader(SimulationTrader):
             # self.create_margin_loan(amount=max_borrow, force=force)
             self.output_message(f'Attempting to enter short by selling {coin} coins...')
 
-            order = self.binance_client.create_margin_order(
+            order, timings = self.call_exchange(
+                'createMarginOrder', signal_time, self.binance_client.create_margin_order,
                 side=SIDE_SELL,
                 symbol=self.symbol,
                 type=ORDER_TYPE_MARKET,
@@ -518,6 +741,7 @@ class RealTrader(SimulationTrader):
             )
 
             time.sleep(2)  # Sleep for a second so that the bot registers new margin values.
+            self.account.invalidate()  # Balances changed with the fill.
             self.current_position = SHORT
             self.sell_short_price = self.current_price
             self.short_trailing_price = self.current_price
@@ -525,4 +749,5 @@ class RealTrader(SimulationTrader):
             self.add_trade(message=msg,
                            force=force,
                            orderID=order['clientOrderId'],
-                           smart_enter=smart_enter)
+                           smart_enter=smart_enter,
+                           **self.get_trade_details(order, timings))
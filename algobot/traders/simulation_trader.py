@@ -2,16 +2,18 @@
 Simulation Trader file. Real Trader will create a subclass out of this.
 """
 
+import sqlite3
 import time
-from datetime import datetime
+from datetime import datetime, timezone
 from threading import Lock
-from typing import Union
-
-import pandas as pd
+from typing import Dict, Optional, Union
 
 from algobot.data import Data
 from algobot.enums import BEARISH, BULLISH, ENTER_LONG, ENTER_SHORT, EXIT_LONG, EXIT_SHORT, LONG, SHORT
 from algobot.helpers import convert_small_interval, get_logger
+from algobot.logging_pipeline import OUTPUT_LEVELS
+from algobot.trade_journal import TradeJournal
+from algobot.trade_statistics import GroupedStatistics, TradeStatistics
 from algobot.traders.trader import Trader
 
 
@@ -52,106 +54,210 @@ class SimulationTrader(Trader):
         self.lock = Lock()  # Lock to ensure a transaction doesn't occur when another one is taking place.
         self.add_trade_callback = add_trade_callback  # Callback for GUI to add trades.
         self.daily_change_nets = []  # Daily change net list. Will contain list of all nets.
+        self.trade_statistics = TradeStatistics()  # Rolling trade and daily net aggregates.
+        self.trade_journal: Optional[TradeJournal] = None  # Persistent trade journal (if any) trades are written to.
 
-    def output_message(self, message: str, level: int = 2, print_message: bool = False):
+    def output_message(self, message: str, level: int = 2, print_message: bool = False, args: tuple = ()):
         """
         Prints out and logs message provided.
         :param message: Message to be logged and/or outputted.
         :param level: Level to be debugged at.
         :param print_message: Boolean that determines whether messaged will be printed or not.
+        :param args: Arguments of the message. They're only formatted into it once it's written, so frequent messages
+        should pass values here instead of formatting them.
         """
         if print_message:
-            print(message)
-        if level == 2:
-            self.logger.info(message)
-        elif level == 3:
-            self.logger.debug(message)
-        elif level == 4:
-            self.logger.warning(message)
-        elif level == 5:
-            self.logger.critical(message)
+            print(message % args if args else message)
+        if level in OUTPUT_LEVELS:
+            self.logger.log(OUTPUT_LEVELS[level], message, *args)
+
+    def is_degraded(self) -> bool:
+        """
+        Returns whether Binance calls of the data object are failing, so last known values are used.
+        :return: Boolean whether the trader is in degraded mode or not.
+        """
+        return self.data_view.retry_policy.degraded
+
+    def get_general_statistics(self) -> Dict[str, str]:
+        """
+        Returns general statistics for the statistics window in the GUI.
+        """
+        return {
+            'currentBalance': f'${round(self.balance, 2)}',
+            'startingBalance': f'${round(self.starting_balance, 2)}',
+            'tradesMade': str(len(self.trades)),
+            'coinOwned': f'{round(self.coin, 6)}',
+            'coinOwed': f'{round(self.coin_owed, 6)}',
+            'ticker': self.symbol,
+            'tickerPrice': f'${self.current_price}',
+            'interval': f'{convert_small_interval(self.data_view.interval)}',
+            'position': self.get_position_string(),
+            'autonomous': str(not self.in_human_control),
+            'precision': str(self.precision),
+            'trend': str(self.trend),
+            'marginEnabled': str(self.margin_enabled),
+            'degradedMode': str(self.is_degraded()),
+        }
+
+    def get_stop_loss_statistics(self) -> Dict[str, str]:
+        """
+        Returns stop loss statistics for the statistics window in the GUI.
+        """
+        stop_loss_price_statistics = self.get_stop_loss_price_statistics()
+        return {
+            'stopLossType': self.get_stop_loss_strategy_string(),
+            'stopLossPercentage': self.get_safe_rounded_percentage(self.loss_percentage_decimal),
+            'stopLossPoint': stop_loss_price_statistics['stopLossPoint'],
+            self.symbol: stop_loss_price_statistics[self.symbol],
+            'customStopPointValue': self.get_safe_rounded_string(self.custom_stop_loss),
+            'initialSmartStopLossCounter': str(self.smart_stop_loss_initial_counter),
+            'smartStopLossCounter': str(self.smart_stop_loss_counter),
+            'stopLossExit': str(self.stop_loss_exit),
+            'smartStopLossEnter': str(self.smart_stop_loss_enter),
+            'previousStopLossPoint': stop_loss_price_statistics['previousStopLossPoint'],
+            'longTrailingPrice': stop_loss_price_statistics['longTrailingPrice'],
+            'shortTrailingPrice': stop_loss_price_statistics['shortTrailingPrice'],
+            'buyLongPrice': self.get_safe_rounded_string(self.buy_long_price),
+            'sellShortPrice': self.get_safe_rounded_string(self.sell_short_price),
+            'safetyTimer': self.get_safe_rounded_string(self.safety_timer, symbol=' seconds', direction='right'),
+            'scheduledTimerRemaining': self.get_remaining_safety_timer(),
+        }
+
+    def get_stop_loss_price_statistics(self) -> Dict[str, str]:
+        """
+        Returns the stop loss statistics that move with the current price (trailing prices and the stop loss point).
+        """
+        stop_loss_point = self.get_safe_rounded_string(self.get_stop_loss())  # Updates trailing prices first.
+        return {
+            'stopLossPoint': stop_loss_point,
+            self.symbol: f'${self.current_price}',
+            'previousStopLossPoint': self.get_safe_rounded_string(self.previous_stop_loss),
+            'longTrailingPrice': self.get_safe_rounded_string(self.long_trailing_price),
+            'shortTrailingPrice': self.get_safe_rounded_string(self.short_trailing_price),
+        }
+
+    def get_take_profit_statistics(self) -> Dict[str, str]:
+        """
+        Returns take profit statistics for the statistics window in the GUI.
+        """
+        return {
+            'takeProfitType': str(self.take_profit_type),
+            'takeProfitPercentage': self.get_safe_rounded_percentage(self.take_profit_percentage_decimal),
+            'trailingTakeProfitActivated': str(self.trailing_take_profit_activated),
+            'takeProfitPoint': self.get_safe_rounded_string(self.take_profit_point),
+            self.symbol: f'${self.current_price}',
+        }
+
+    def get_current_data_statistics(self) -> Dict[str, str]:
+        """
+        Returns statistics of the current period's data for the statistics window in the GUI.
+        """
+        current_values = self.data_view.current_values
+        return {
+            'UTC Open Time': current_values['date_utc'].strftime('%Y-%m-%d %H:%M:%S'),
+            'open': '$' + str(round(current_values['open'], self.precision)),
+            'close': '$' + str(round(current_values['close'], self.precision)),
+            'high': '$' + str(round(current_values['high'], self.precision)),
+            'low': '$' + str(round(current_values['low'], self.precision)),
+            'volume': str(round(current_values['volume'], self.precision)),
+            'quoteAssetVolume': str(round(current_values['quote_asset_volume'], self.precision)),
+            'numberOfTrades': str(round(current_values['number_of_trades'], self.precision)),
+            'takerBuyBaseAsset': str(round(current_values['taker_buy_base_asset'], self.precision)),
+            'takerBuyQuoteAsset': str(round(current_values['taker_buy_quote_asset'], self.precision)),
+        }
 
     def get_grouped_statistics(self) -> dict:
         """
         Returns dictionary of grouped statistics for the statistics window in the GUI.
         """
-        grouped_dict = {
-            'general': {
-                'currentBalance': f'${round(self.balance, 2)}',
-                'startingBalance': f'${round(self.starting_balance, 2)}',
-                'tradesMade': str(len(self.trades)),
-                'coinOwned': f'{round(self.coin, 6)}',
-                'coinOwed': f'{round(self.coin_owed, 6)}',
-                'ticker': self.symbol,
-                'tickerPrice': f'${self.current_price}',
-                'interval': f'{convert_small_interval(self.data_view.interval)}',
-                'position': self.get_position_string(),
-                'autonomous': str(not self.in_human_control),
-                'precision': str(self.precision),
-                'trend': str(self.trend),
-                'marginEnabled': str(self.margin_enabled),
-            }
-        }
+        grouped_dict = {'general': self.get_general_statistics()}
 
         if self.loss_strategy is not None:
-            grouped_dict['stopLoss'] = {
-                'stopLossType': self.get_stop_loss_strategy_string(),
-                'stopLossPercentage': self.get_safe_rounded_percentage(self.loss_percentage_decimal),
-                'stopLossPoint': self.get_safe_rounded_string(self.get_stop_loss()),
-                self.symbol: f'${self.current_price}',
-                'customStopPointValue': self.get_safe_rounded_string(self.custom_stop_loss),
-                'initialSmartStopLossCounter': str(self.smart_stop_loss_initial_counter),
-                'smartStopLossCounter': str(self.smart_stop_loss_counter),
-                'stopLossExit': str(self.stop_loss_exit),
-                'smartStopLossEnter': str(self.smart_stop_loss_enter),
-                'previousStopLossPoint': self.get_safe_rounded_string(self.previous_stop_loss),
-                'longTrailingPrice': self.get_safe_rounded_string(self.long_trailing_price),
-                'shortTrailingPrice': self.get_safe_rounded_string(self.short_trailing_price),
-                'buyLongPrice': self.get_safe_rounded_string(self.buy_long_price),
-                'sellShortPrice': self.get_safe_rounded_string(self.sell_short_price),
-                'safetyTimer': self.get_safe_rounded_string(self.safety_timer, symbol=' seconds', direction='right'),
-                'scheduledTimerRemaining': self.get_remaining_safety_timer(),
-            }
+            grouped_dict['stopLoss'] = self.get_stop_loss_statistics()
 
         if self.take_profit_type is not None:
-            grouped_dict['takeProfit'] = {
-                'takeProfitType': str(self.take_profit_type),
-                'takeProfitPercentage': self.get_safe_rounded_percentage(self.take_profit_percentage_decimal),
-                'trailingTakeProfitActivated': str(self.trailing_take_profit_activated),
-                'takeProfitPoint': self.get_safe_rounded_string(self.take_profit_point),
-                self.symbol: f'${self.current_price}',
-            }
+            grouped_dict['takeProfit'] = self.get_take_profit_statistics()
 
         if self.data_view.current_values:
-            data_view = self.data_view
-            grouped_dict['currentData'] = {
-                'UTC Open Time': data_view.current_values['date_utc'].strftime('%Y-%m-%d %H:%M:%S'),
-                'open': '$' + str(round(data_view.current_values['open'], self.precision)),
-                'close': '$' + str(round(data_view.current_values['close'], self.precision)),
-                'high': '$' + str(round(data_view.current_values['high'], self.precision)),
-                'low': '$' + str(round(data_view.current_values['low'], self.precision)),
-                'volume': str(round(data_view.current_values['volume'], self.precision)),
-                'quoteAssetVolume': str(round(data_view.current_values['quote_asset_volume'], self.precision)),
-                'numberOfTrades': str(round(data_view.current_values['number_of_trades'], self.precision)),
-                'takerBuyBaseAsset': str(round(data_view.current_values['taker_buy_base_asset'], self.precision)),
-                'takerBuyQuoteAsset': str(round(data_view.current_values['taker_buy_quote_asset'], self.precision)),
-            }
+            grouped_dict['currentData'] = self.get_current_data_statistics()
 
+        grouped_dict['tradeStatistics'] = self.trade_statistics.get_statistics_dictionary(precision=self.precision)
         self.add_strategy_info_to_grouped_dict(grouped_dict)
         return grouped_dict
 
+    def update_grouped_statistics(self, statistics: GroupedStatistics):
+        """
+        Updates the grouped statistics kept by the bot thread. The price-dependent and strategy values are set every
+        loop; the other values of a category are only rebuilt when the state they're built from changes.
+        :param statistics: Grouped statistics to update.
+        """
+        price = f'${self.current_price}'
+        statistics.set('general', 'tickerPrice', price)
+        general_signature = (self.balance, len(self.trades), self.coin, self.coin_owed, self.current_position,
+                             self.in_human_control, self.trend, self.margin_enabled, self.precision, self.is_degraded())
+        if statistics.is_stale('general', general_signature):
+            statistics.update('general', self.get_general_statistics())
+
+        if self.loss_strategy is None:
+            statistics.remove('stopLoss')
+        else:
+            stop_loss_signature = (self.symbol, self.current_position, self.loss_strategy, self.loss_percentage_decimal,
+                                   self.custom_stop_loss, self.smart_stop_loss_initial_counter,
+                                   self.smart_stop_loss_counter, self.stop_loss_exit, self.smart_stop_loss_enter,
+                                   self.buy_long_price, self.sell_short_price, self.safety_timer,
+                                   self.scheduled_safety_timer)
+            if statistics.is_stale('stopLoss', stop_loss_signature):
+                statistics.update('stopLoss', self.get_stop_loss_statistics())
+            else:
+                statistics.update('stopLoss', self.get_stop_loss_price_statistics())
+                if self.scheduled_safety_timer:
+                    statistics.set('stopLoss', 'scheduledTimerRemaining', self.get_remaining_safety_timer())
+
+        if self.take_profit_type is None:
+            statistics.remove('takeProfit')
+        else:
+            take_profit_signature = (self.symbol, self.take_profit_type, self.take_profit_percentage_decimal,
+                                     self.trailing_take_profit_activated, self.take_profit_point)
+            if statistics.is_stale('takeProfit', take_profit_signature):
+                statistics.update('takeProfit', self.get_take_profit_statistics())
+            else:
+                statistics.set('takeProfit', self.symbol, price)
+
+        current_values = self.data_view.current_values
+        if not current_values:
+            statistics.remove('currentData')
+        elif statistics.is_stale('currentData', (self.precision, *current_values.values())):
+            statistics.update('currentData', self.get_current_data_statistics())
+
+        trade_statistics_signature = (self.precision, self.trade_statistics.trades, self.trade_statistics.days)
+        if statistics.is_stale('tradeStatistics', trade_statistics_signature):
+            statistics.update('tradeStatistics', self.trade_statistics.get_statistics_dictionary(self.precision))
+
+        statistics.set_group_categories('strategies', self.strategies)  # Removes strategies no longer traded.
+        for strategy_name, strategy in self.strategies.items():
+            statistics.update(strategy_name, self.get_strategy_info(strategy))
+
+    def get_strategy_info(self, strategy) -> Dict[str, str]:
+        """
+        Returns information of the strategy provided for the statistics window in the GUI.
+        :param strategy: Strategy to get information of.
+        :return: Dictionary of strategy information.
+        """
+        strategy_dict = {
+            'trend': str(strategy.trend),
+            'enabled': 'True',
+        }
+
+        strategy.populate_grouped_dict(strategy_dict)
+        return strategy_dict
+
     def add_strategy_info_to_grouped_dict(self, grouped_dict: dict):
         """
         Adds strategy information to the dictionary provided.
         :param grouped_dict: Dictionary to add strategy information to.
         """
         for strategy_name, strategy in self.strategies.items():
-            grouped_dict[strategy_name] = {
-                'trend': str(strategy.trend),
-                'enabled': 'True',
-            }
-
-            strategy.populate_grouped_dict(grouped_dict[strategy_name])
+            grouped_dict[strategy_name] = self.get_strategy_info(strategy)
 
     def get_remaining_safety_timer(self) -> str:
         """
@@ -164,9 +270,16 @@ class SimulationTrader(Trader):
             return f'{remaining} seconds'
 
     def add_trade(self, message: str, force: bool = False, orderID: str = None, stop_loss_exit: bool = False,
-                  smart_enter: bool = False):
-        """
-        Adds a trade to list of trades
+                  smart_enter: bool = False, quantity: Optional[float] = None, fee: Optional[float] = None,
+                  fee_asset: Optional[str] = None, fill_price: Optional[float] = None,
+                  timings: Optional[Dict[str, Optional[float]]] = None):
+        """
+        Adds a trade to list of trades and to the trade journal (if any).
+        :param timings: Latencies in milliseconds of the order keyed by stage (see order_latency).
+        :param fill_price: Average price the order was filled at.
+        :param fee_asset: Asset the fee was paid in. If None, the fee is in the quote asset.
+        :param fee: Fee paid for the trade.
+        :param quantity: Quantity of coin traded.
         :param smart_enter: Boolean that'll determine whether current position is entered from a smart enter or not.
         :param stop_loss_exit: Boolean for whether last position was exited because of a stop loss.
         :param orderID: Order ID returned from Binance API.
@@ -179,8 +292,9 @@ class SimulationTrader(Trader):
         profit_percentage = self.get_profit_percentage(initial_net, final_net)
         method = "Manual" if force else "Automation"
 
+        date = datetime.utcnow()
         trade = {
-            'date': datetime.utcnow(),
+            'date': date,
             'orderID': orderID,
             'action': message,
             'pair': self.symbol,
@@ -197,6 +311,25 @@ class SimulationTrader(Trader):
                 pass
 
         self.trades.append(trade)
+        if self.trade_journal is not None:
+            self.add_trade_to_journal({
+                'time': date.replace(tzinfo=timezone.utc).timestamp(),
+                'symbol': self.symbol,
+                'order_id': orderID,
+                'action': message,
+                'method': method,
+                'price': self.current_price,
+                'quantity': quantity,
+                'fee': fee,
+                'fee_asset': fee_asset,
+                'net': final_net,
+                'profit': profit,
+                'profit_percentage': profit_percentage,
+                'fill_price': fill_price,
+                **{f'{stage}_latency': latency for stage, latency in (timings or {}).items()}
+            })
+
+        self.trade_statistics.add_trade(initial_net, final_net, exited_position=self.current_position is None)
         self.previous_net = final_net
         self.stop_loss_exit = stop_loss_exit
         self.smart_stop_loss_enter = smart_enter
@@ -211,6 +344,25 @@ class SimulationTrader(Trader):
                             f'Percentage: {round(profit_percentage, 2)}%\n'
                             f'Profit: ${round(profit, self.precision)}\n')
 
+    def add_trade_to_journal(self, journal_trade: dict):
+        """
+        Writes a trade to the trade journal. A journal failure is logged instead of raised, so it never interrupts
+        trading.
+        :param journal_trade: Dictionary with the trade's journal values.
+        """
+        try:
+            self.trade_journal.add_trade(journal_trade)
+        except sqlite3.Error as e:
+            self.output_message(f'Could not write trade to the trade journal: {e}', 4)
+
+    def add_daily_change_net(self, percentage: float):
+        """
+        Adds a day's net change percentage.
+        :param percentage: Net change percentage of the day.
+        """
+        self.daily_change_nets.append(percentage)
+        self.trade_statistics.add_daily_percentage(percentage)
+
     def buy_long(self, msg: str, usd: float = None, force: bool = False, smart_enter: bool = False):
         """
         Buys coin at current market price with amount of USD specified. If not specified, assumes bot goes all in.
@@ -238,9 +390,10 @@ class SimulationTrader(Trader):
             self.commission_paid += transaction_fee
             self.current_position = LONG
             self.buy_long_price = self.long_trailing_price = self.current_price
-            self.coin += (usd - transaction_fee) / self.current_price
+            quantity = (usd - transaction_fee) / self.current_price
+            self.coin += quantity
             self.balance -= usd
-            self.add_trade(msg, force=force, smart_enter=smart_enter)
+            self.add_trade(msg, force=force, smart_enter=smart_enter, quantity=quantity, fee=transaction_fee)
 
     def sell_long(self, msg: str, coin: float = None, force: bool = False, stop_loss_exit: bool = False):
         """
@@ -265,13 +418,14 @@ class SimulationTrader(Trader):
                 raise ValueError(f'You have {self.coin} {self.coin_name}. You cannot sell {coin} {self.coin_name}.')
 
             self.current_price = self.data_view.get_current_price()
-            self.commission_paid += coin * self.current_price * self.transaction_fee_percentage_decimal
+            transaction_fee = coin * self.current_price * self.transaction_fee_percentage_decimal
+            self.commission_paid += transaction_fee
             self.balance += coin * self.current_price * (1 - self.transaction_fee_percentage_decimal)
             self.current_position = None
             self.custom_stop_loss = None
             self.previous_position = LONG
             self.coin -= coin
-            self.add_trade(msg, force=force, stop_loss_exit=stop_loss_exit)
+            self.add_trade(msg, force=force, stop_loss_exit=stop_loss_exit, quantity=coin, fee=transaction_fee)
 
             if self.coin == 0:
                 self.buy_long_price = self.long_trailing_price = None
@@ -301,9 +455,10 @@ class SimulationTrader(Trader):
             self.custom_stop_loss = None
             self.current_position = None
             self.previous_position = SHORT
-            self.commission_paid += self.current_price * coin * self.transaction_fee_percentage_decimal
+            transaction_fee = self.current_price * coin * self.transaction_fee_percentage_decimal
+            self.commission_paid += transaction_fee
             self.balance -= self.current_price * coin * (1 + self.transaction_fee_percentage_decimal)
-            self.add_trade(msg, force=force, stop_loss_exit=stop_loss_exit)
+            self.add_trade(msg, force=force, stop_loss_exit=stop_loss_exit, quantity=coin, fee=transaction_fee)
 
             if self.coin_owed == 0:
                 self.sell_short_price = self.short_trailing_price = None
@@ -332,12 +487,13 @@ class SimulationTrader(Trader):
             if coin <= 0:
                 raise ValueError(f"You cannot borrow negative {abs(coin)} {self.coin_name}.")
 
+            transaction_fee = self.current_price * coin * self.transaction_fee_percentage_decimal
             self.coin_owed += coin
-            self.commission_paid += self.current_price * coin * self.transaction_fee_percentage_decimal
+            self.commission_paid += transaction_fee
             self.balance += self.current_price * coin * (1 - self.transaction_fee_percentage_decimal)
             self.current_position = SHORT
             self.sell_short_price = self.short_trailing_price = self.current_price
-            self.add_trade(msg, force=force, smart_enter=smart_enter)
+            self.add_trade(msg, force=force, smart_enter=smart_enter, quantity=coin, fee=transaction_fee)
 
     def get_trend(self, dataObject: Data = None, log_data: bool = False, in_lower_interval: bool = False
                   ) -> Union[int, None]:
@@ -351,11 +507,7 @@ class SimulationTrader(Trader):
         if not dataObject:  # We usually only pass the dataObject for a lower interval.
             dataObject = self.data_view
 
-        df = pd.DataFrame(dataObject.data + [dataObject.current_values])
-        df['high/low'] = (df['high'] + df['low']) / 2
-        df['open/close'] = (df['open'] + df['close']) / 2
-        df.columns = [c.lower() for c in df.columns]
-        input_arrays_dict = df.to_dict('series')
+        input_arrays_dict = dataObject.get_input_arrays_dict()
         cache = {}
 
         trends = [
@@ -522,7 +674,8 @@ class SimulationTrader(Trader):
         """
         if self.current_position == SHORT and self.stop_loss is not None:
             self.output_message('\nCurrently in short position.')
-            self.output_message(f'{self.get_stop_loss_strategy_string()}: ${round(self.stop_loss, self.precision)}')
+            self.output_message('%s: $%s', args=(self.get_stop_loss_strategy_string(),
+                                                 round(self.stop_loss, self.precision)))
 
     def output_long_information(self):
         """
@@ -530,7 +683,8 @@ class SimulationTrader(Trader):
         """
         if self.current_position == LONG and self.stop_loss is not None:
             self.output_message('\nCurrently in long position.')
-            self.output_message(f'{self.get_stop_loss_strategy_string()}: ${round(self.stop_loss, self.precision)}')
+            self.output_message('%s: $%s', args=(self.get_stop_loss_strategy_string(),
+                                                 round(self.stop_loss, self.precision)))
 
     def output_control_mode(self):
         """
@@ -546,7 +700,7 @@ class SimulationTrader(Trader):
         Outputs general information about profit.
         """
         profit = round(self.get_profit(), self.precision)
-        self.output_message(f'{self.get_profit_or_loss_string(profit)}: ${abs(profit)}')
+        self.output_message('%s: $%s', args=(self.get_profit_or_loss_string(profit), abs(profit)))
 
     def output_basic_information(self):
         """
@@ -560,12 +714,12 @@ class SimulationTrader(Trader):
             self.current_price = self.data_view.get_current_price()
 
         if self.current_price * self.coin > 5:  # If total worth of coin owned is more than $5, assume we're in long.
-            self.output_message(f'{self.coin_name} owned: {self.coin}')
-            self.output_message(f'Price bot bought {self.coin_name} long for: ${self.buy_long_price}')
+            self.output_message('%s owned: %s', args=(self.coin_name, self.coin))
+            self.output_message('Price bot bought %s long for: $%s', args=(self.coin_name, self.buy_long_price))
 
         if self.current_price * self.coin_owed > 5:  # If worth of coin owed is more than $5, assume we're in short.
-            self.output_message(f'{self.coin_name} owed: {self.coin_owed}')
-            self.output_message(f'Price bot sold {self.coin_name} short for: ${self.sell_short_price}')
+            self.output_message('%s owed: %s', args=(self.coin_name, self.coin_owed))
+            self.output_message('Price bot sold %s short for: $%s', args=(self.coin_name, self.sell_short_price))
 
         if self.current_position == LONG:
             self.output_long_information()
@@ -574,14 +728,15 @@ class SimulationTrader(Trader):
         elif self.current_position is None:
             self.output_no_position_information()
 
-        self.output_message(f'\nCurrent {self.coin_name} price: ${self.current_price}')
-        self.output_message(f'\nCurrent values: {self.data_view.current_values}')
-        self.output_message(f'Balance: ${round(self.balance, self.precision)}')
+        self.output_message('\nCurrent %s price: $%s', args=(self.coin_name, self.current_price))
+        # Current values are copied, as they may be updated before the message is formatted.
+        self.output_message('\nCurrent values: %s', args=(dict(self.data_view.current_values),))
+        self.output_message('Balance: $%s', args=(round(self.balance, self.precision),))
         self.output_profit_information()
         if type(self) == SimulationTrader:  # pylint: disable=unidiomatic-typecheck
-            self.output_message(f'\nTrades conducted this simulation: {len(self.trades)}\n')
+            self.output_message('\nTrades conducted this simulation: %s\n', args=(len(self.trades),))
         else:
-            self.output_message(f'\nTrades conducted in live market: {len(self.trades)}\n')
+            self.output_message('\nTrades conducted in live market: %s\n', args=(len(self.trades),))
 
     def get_run_result(self, is_simulation: bool = False):
         """
@@ -642,6 +797,8 @@ class SimulationTrader(Trader):
         self.output_message(f'\tSmart stop loss counter: {self.smart_stop_loss_initial_counter}')
         self.output_message(f'\tSafety timer: {self.safety_timer}')
         self.output_message(self.get_strategies_info_string())
+        if self.strategies:
+            self.output_message(self.strategy_set_plan.get_report(), level=3)
         self.output_message('\nEnd of Configuration')
         self.output_message('---------------------------------------------------')
 
@@ -651,6 +808,12 @@ class SimulationTrader(Trader):
         """
         pass
 
+    def invalidate_account_snapshot(self):
+        """
+        This is used in the real trader to fetch balances from Binance again the next time they're needed.
+        """
+        pass
+
     def check_current_position(self):
         """
         This is used in the real trader to check its current position reflective of Binance.
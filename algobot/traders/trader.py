@@ -8,6 +8,7 @@ from typing import Any, Dict, List, Union
 from algobot.enums import BEARISH, BULLISH, ENTER_LONG, ENTER_SHORT, EXIT_LONG, EXIT_SHORT, LONG, SHORT, STOP, TRAILING
 from algobot.helpers import get_label_string
 from algobot.strategies.custom import CustomStrategy
+from algobot.strategies.plan import StrategySetPlan
 
 
 class Trader:
@@ -27,6 +28,7 @@ class Trader:
         self.precision = precision  # Precision to round data to.
         self.trades = []  # All trades performed.
         self.strategies: Dict[str, CustomStrategy] = {}
+        self.strategy_set_plan = StrategySetPlan({})  # Indicators shared across strategies.
 
         self.starting_time = datetime.utcnow()  # Starting time in UTC.
         self.ending_time = None  # Ending time for previous bot run.
@@ -210,6 +212,8 @@ class Trader:
 
             self.min_period = max(self.strategies[name].get_min_option_period(), self.min_period)
 
+        self.strategy_set_plan = StrategySetPlan({name: strategy.plan for name, strategy in self.strategies.items()})
+
     def handle_trailing_prices(self):
         """
         Handles trailing prices based on the current price.
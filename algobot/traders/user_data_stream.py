@@ -0,0 +1,176 @@
+"""
+User data stream consumer for real traders. Binance pushes balance changes and execution reports over the margin user
+data stream; they're applied to the trader's account snapshot and open orders as they arrive, so the trader reads
+current account state without polling. Whenever the socket (re)connects, the account is resynced over REST once, as
+events pushed while disconnected are lost. Reconnects back off exponentially, and after too many consecutive failures
+the stream is stopped and the trader falls back to polling account state over REST.
+"""
+
+import time
+from typing import Any, Callable, Dict, Optional
+
+from algobot.retry_policy import RetryPolicy
+
+# Order statuses after which an order is no longer open.
+CLOSED_ORDER_STATUSES = {'FILLED', 'CANCELED', 'REJECTED', 'EXPIRED', 'EXPIRED_IN_MATCH'}
+
+ACCOUNT_POSITION = 'outboundAccountPosition'
+EXECUTION_REPORT = 'executionReport'
+LIABILITY_CHANGE = 'USER_LIABILITY_CHANGE'
+ERROR = 'error'
+
+STREAM_MAX_FAILURES = 5  # Consecutive failed connections before falling back to polling.
+STREAM_RECONNECT_BASE_DELAY = 1  # Seconds before the first reconnect. Doubled with every consecutive failure.
+STREAM_RECONNECT_MAX_DELAY = 60  # Seconds before a reconnect at most.
+
+
+class UserDataStream:
+    """
+    Consumes the margin (or isolated margin) user data stream of a real trader. The websocket manager can be python-
+    binance's ThreadedWebsocketManager or anything with the same start, stop, and socket functions (e.g. a replay of
+    recorded events).
+    """
+    def __init__(self, trader, manager, clock: Callable[[], float] = time.time,
+                 sleep: Callable[[float], None] = time.sleep):
+        """
+        :param trader: Real trader to keep current.
+        :param manager: Websocket manager to start sockets with.
+        :param clock: Clock function for event times.
+        :param sleep: Sleep function for reconnect delays.
+        """
+        self.trader = trader
+        self.manager = manager
+        self.clock = clock
+        self.sleep = sleep
+        # Only used for its backoff and failure count: reconnects are driven by error events, not by raised calls.
+        self.retry_policy = RetryPolicy(base_delay=STREAM_RECONNECT_BASE_DELAY, max_delay=STREAM_RECONNECT_MAX_DELAY,
+                                        failure_threshold=STREAM_MAX_FAILURES)
+        self.socket_name: Optional[str] = None
+        self.connected = False
+        self.reconnect_count = 0
+        self.last_event_time: Optional[float] = None
+        self.open_orders: Dict[str, Dict[str, Any]] = {}  # Open orders of the trader's symbol keyed by client order ID.
+        self.handlers: Dict[str, Callable[[Dict[str, Any]], None]] = {
+            ACCOUNT_POSITION: self.handle_account_position,
+            EXECUTION_REPORT: self.handle_execution_report,
+            LIABILITY_CHANGE: self.handle_liability_change,
+            ERROR: self.handle_error,
+        }
+
+    def start(self):
+        """
+        Starts the websocket manager and the user data socket.
+        """
+        self.manager.start()
+        self.start_socket()
+
+    def start_socket(self):
+        """
+        Starts the user data socket, then resyncs the account. The socket is started first, so no event falls between
+        the REST snapshot and the first pushed event.
+        """
+        if self.trader.isolated:
+            self.socket_name = self.manager.start_isolated_margin_socket(callback=self.handle_message,
+                                                                         symbol=self.trader.symbol)
+        else:
+            self.socket_name = self.manager.start_margin_socket(callback=self.handle_message)
+
+        self.connected = True
+        self.trader.resync_account()
+
+    def stop(self):
+        """
+        Stops the websocket manager. The trader falls back to fetching account state over REST.
+        """
+        self.connected = False
+        self.manager.stop()
+
+    def handle_message(self, message: Dict[str, Any]):
+        """
+        Handles a message from the user data socket.
+        :param message: Message dictionary.
+        """
+        handler = self.handlers.get(message.get('e'))
+        if handler is not None:
+            self.last_event_time = self.clock()
+            if message['e'] != ERROR and self.retry_policy.failure_count:
+                self.retry_policy.record_success()  # The connection works again.
+            handler(message)
+
+    def handle_account_position(self, message: Dict[str, Any]):
+        """
+        Applies pushed free and locked balances to the account snapshot and the trader.
+        :param message: Account position event.
+        """
+        balances = {balance['a']: {'free': balance['f'], 'locked': balance['l']} for balance in message['B']}
+        if self.trader.account.update_margin_assets(balances):
+            with self.trader.lock:
+                self.trader.retrieve_margin_values()
+
+    def handle_liability_change(self, _message: Dict[str, Any]):
+        """
+        Borrowed and interest amounts aren't pushed with balances, so the snapshot is fetched again the next time it's
+        read after a borrow or repay.
+        """
+        self.trader.account.invalidate()
+
+    def handle_execution_report(self, message: Dict[str, Any]):
+        """
+        Tracks open orders of the trader's symbol.
+        :param message: Execution report event.
+        """
+        if message['s'] != self.trader.symbol:
+            return
+
+        client_order_id = message['c']
+        if message['X'] in CLOSED_ORDER_STATUSES:
+            self.open_orders.pop(client_order_id, None)
+        else:
+            self.open_orders[client_order_id] = {
+                'orderId': message['i'],
+                'side': message['S'],
+                'type': message['o'],
+                'status': message['X'],
+                'price': float(message['p']),
+                'quantity': float(message['q']),
+                'executed': float(message['z']),
+            }
+
+    def handle_error(self, message: Dict[str, Any]):
+        """
+        Restarts the socket after it fails and resyncs the account.
+        :param message: Error event.
+        """
+        self.connected = False
+        if self.socket_name is not None:
+            self.manager.stop_socket(self.socket_name)
+
+        self.reconnect(message.get('m'))
+
+    def reconnect(self, error: Any):
+        """
+        Starts the socket again after a delay that grows with every consecutive failure. Once there have been too many
+        consecutive failures, the stream is stopped, so the trader polls account state over REST instead.
+        :param error: Error that disconnected the socket.
+        """
+        while True:
+            self.retry_policy.record_failure()
+            if self.retry_policy.degraded:
+                self.trader.output_message("User data stream error: %s. Failed %d times in a row, so account state "
+                                           "will be polled.", 4, args=(error, self.retry_policy.failure_count))
+                self.stop()
+                return
+
+            delay = self.retry_policy.get_delay(self.retry_policy.failure_count - 1)
+            self.trader.output_message("User data stream error: %s. Reconnecting in %.1f seconds...", 4,
+                                       args=(error, delay))
+            self.sleep(delay)
+            self.reconnect_count += 1
+            try:
+                self.start_socket()
+                return
+            except Exception as e:  # pylint: disable=broad-except
+                self.connected = False
+                if self.socket_name is not None:
+                    self.manager.stop_socket(self.socket_name)
+                error = e
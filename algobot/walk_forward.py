@@ -0,0 +1,368 @@
+"""
+Walk-forward analysis built on the backtester. Data is sliced into rolling in-sample and out-of-sample windows. The
+optimizer runs on every in-sample window, and the winning settings are then backtested on the out-of-sample window
+right after it. The out-of-sample results are stitched into one equity curve.
+"""
+
+import copy
+import os
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from logging import Logger
+from typing import Any, Dict, List, Optional, Tuple
+
+from algobot.helpers import convert_all_dates_to_datetime
+from algobot.traders.backtester import Backtester
+
+# Dataset and indicator cache of the current worker. They're set once per worker process by initialize_worker(), so
+#  the data is not sent again with every window and indicator values are shared between the windows a worker runs.
+WORKER_STATE: Dict[str, Any] = {}
+
+# Windows worth of ticks the indicator cache of a worker holds by default. Overlapping windows share ticks, so a bit
+#  more than one window is needed for cached values to survive into the next window.
+INDICATOR_CACHE_WINDOWS = 2
+
+# Chunks of in-sample tasks every worker gets on average. More chunks balance the load better; fewer keep a worker on
+#  the same window (and its cached indicators) for longer.
+TASK_CHUNKS_PER_WORKER = 4
+
+
+class IndicatorCache(OrderedDict):
+    """
+    Indicator cache of a worker (see Backtester.indicator_cache) bounded to a maximum amount of ticks. Ticks that were
+    least recently used are evicted first, so the memory of a worker is bounded by the maximum ticks times the distinct
+    strategy signatures of a tick, instead of growing for the whole walk-forward run.
+    """
+    def __init__(self, max_ticks: int):
+        """
+        :param max_ticks: Maximum amount of ticks to hold values of.
+        """
+        super().__init__()
+        self.max_ticks = max_ticks
+
+    def setdefault(self, key: tuple, default: dict = None) -> dict:
+        """
+        Returns the values of the tick provided, adding the default if the tick isn't cached and evicting the least
+        recently used ticks over the maximum.
+        :param key: Tick cache key.
+        :param default: Values to add if the tick isn't cached.
+        :return: Cached values of the tick.
+        """
+        if key in self:
+            self.move_to_end(key)
+            return self[key]
+
+        self[key] = default
+        while len(self) > self.max_ticks:
+            self.popitem(last=False)
+        return default
+
+
+@dataclass
+class WalkForwardWindow:
+    """
+    Data class for a walk-forward window. Indices are inclusive and refer to the walk-forward data.
+    """
+    number: int
+    in_sample_start: int
+    in_sample_end: int
+    out_of_sample_start: int
+    out_of_sample_end: int
+
+
+@dataclass
+class WalkForwardResult:
+    """
+    Data class for the results of a walk-forward analysis.
+    """
+    starting_balance: float
+    ending_balance: float
+    windows: List[Dict[str, Any]] = field(default_factory=list)
+    equity_curve: List[Tuple[datetime, float]] = field(default_factory=list)
+
+    def get_profit_percentage(self) -> float:
+        """
+        Returns the stitched out-of-sample profit percentage.
+        :return: Profit percentage.
+        """
+        return self.ending_balance / self.starting_balance * 100 - 100
+
+
+def get_walk_forward_windows(data_length: int, in_sample_periods: int, out_of_sample_periods: int,
+                             step_periods: Optional[int] = None) -> List[WalkForwardWindow]:
+    """
+    Returns rolling walk-forward windows. Each out-of-sample window directly follows its in-sample window, and windows
+    move forward by step_periods (by default, the out-of-sample length, so out-of-sample windows don't overlap).
+    :param data_length: Length of the data.
+    :param in_sample_periods: Amount of periods in each in-sample window.
+    :param out_of_sample_periods: Amount of periods in each out-of-sample window.
+    :param step_periods: Amount of periods to move forward by after each window.
+    :return: List of walk-forward windows.
+    """
+    step_periods = out_of_sample_periods if step_periods is None else step_periods
+    if min(in_sample_periods, out_of_sample_periods, step_periods) < 1:
+        raise ValueError("Walk-forward window sizes and steps must be positive.")
+
+    windows = []
+    start = 0
+    while start + in_sample_periods + out_of_sample_periods <= data_length:
+        out_of_sample_start = start + in_sample_periods
+        windows.append(WalkForwardWindow(
+            number=len(windows) + 1,
+            in_sample_start=start,
+            in_sample_end=out_of_sample_start - 1,
+            out_of_sample_start=out_of_sample_start,
+            out_of_sample_end=out_of_sample_start + out_of_sample_periods - 1
+        ))
+        start += step_periods
+
+    if not windows:
+        raise ValueError("Not enough data for a single walk-forward window.")
+
+    return windows
+
+
+def initialize_worker(data: List[Dict[str, Any]], backtester_kwargs: Dict[str, Any], indicator_cache_ticks: int):
+    """
+    Stores the dataset and backtester configuration for the current worker.
+    :param data: Walk-forward data (sorted in ascending order).
+    :param backtester_kwargs: Keyword arguments used for every backtester.
+    :param indicator_cache_ticks: Maximum amount of ticks the worker's indicator cache holds.
+    """
+    WORKER_STATE['data'] = data
+    WORKER_STATE['backtester_kwargs'] = backtester_kwargs
+    WORKER_STATE['indicator_cache'] = IndicatorCache(indicator_cache_ticks)
+
+
+def get_window_backtester(start_index: int, end_index: int) -> Backtester:
+    """
+    Returns a backtester over the worker's dataset that only trades between the indices provided. Data before the
+    start index is still used as strategy history.
+    :param start_index: Index to start trading from.
+    :param end_index: Index to stop trading at.
+    :return: Backtester object.
+    """
+    backtester = Backtester(data=WORKER_STATE['data'], strategies=[], output_trades=False,
+                            **WORKER_STATE['backtester_kwargs'])
+    backtester.start_date_index = start_index
+    backtester.end_date_index = end_index
+    backtester.indicator_cache = WORKER_STATE['indicator_cache']
+    return backtester
+
+
+def run_in_sample(window: WalkForwardWindow, settings: Dict[str, Any]) -> Optional[float]:
+    """
+    Backtests one settings combination on the in-sample window provided. The worker keeps the backtester of the last
+    window it ran, so consecutive combos of a window don't create a new backtester each.
+    :param window: Walk-forward window.
+    :param settings: Settings combination to backtest.
+    :return: In-sample profit percentage, or None if the backtest didn't pass.
+    """
+    window_backtester = WORKER_STATE.get('window_backtester')
+    if window_backtester is None or window_backtester[0] != window.number:
+        window_backtester = WORKER_STATE['window_backtester'] = (
+            window.number, get_window_backtester(window.in_sample_start, window.in_sample_end)
+        )
+
+    backtester = window_backtester[1]
+    try:
+        backtester.apply_general_settings(settings)
+        result = backtester.start_backtest()
+        profit_percentage = backtester.get_net() / backtester.starting_balance * 100 - 100
+    finally:
+        backtester.restore()
+
+    return profit_percentage if result == 'PASSED' else None
+
+
+def get_best_in_sample(settings_list: List[Dict[str, Any]],
+                       profit_percentages: List[Optional[float]]) -> Dict[str, Any]:
+    """
+    Returns the most profitable settings of an in-sample window. Ties go to the settings that come first.
+    :param settings_list: Settings combinations backtested on the window.
+    :param profit_percentages: In-sample profit percentages of the settings (None for backtests that didn't pass).
+    :return: Dictionary with the best settings (None if no run passed) and their in-sample profit percentage.
+    """
+    best_settings = best_profit_percentage = None
+    for settings, profit_percentage in zip(settings_list, profit_percentages):
+        if profit_percentage is not None and (best_profit_percentage is None or
+                                              profit_percentage > best_profit_percentage):
+            best_settings, best_profit_percentage = settings, profit_percentage
+
+    return {
+        'runs': len(settings_list),
+        'settings': best_settings,
+        'in_sample_profit_percentage': best_profit_percentage
+    }
+
+
+def backtest_window(window: WalkForwardWindow, settings: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Backtests the settings provided on the out-of-sample window.
+    :param window: Walk-forward window.
+    :param settings: Settings that won the in-sample optimization.
+    :return: Dictionary with the result, profit percentage, trades, and equity curve of the window.
+    """
+    backtester = get_window_backtester(window.out_of_sample_start, window.out_of_sample_end)
+    backtester.equity_curve = []
+    backtester.apply_general_settings(settings)
+    result = backtester.start_backtest()
+    backtester.equity_curve.append((backtester.current_period['date_utc'], backtester.get_net()))
+
+    return {
+        'result': result,
+        'out_of_sample_profit_percentage': backtester.get_net() / backtester.starting_balance * 100 - 100,
+        'trades': len(backtester.trades),
+        'equity_curve': backtester.equity_curve
+    }
+
+
+class WalkForward:
+    """
+    Walk-forward analysis engine. The dataset is loaded once per worker process and every window reuses it along with
+    the indicator values computed on it, so overlapping in-sample windows and repeated strategy settings don't
+    recompute their indicators.
+    """
+    def __init__(self,
+                 data: List[Dict[str, Any]],
+                 starting_balance: float,
+                 symbol: str,
+                 in_sample_periods: int,
+                 out_of_sample_periods: int,
+                 step_periods: Optional[int] = None,
+                 margin_enabled: bool = True,
+                 drawdown_percentage: int = 100,
+                 precision: int = 4,
+                 max_workers: Optional[int] = None,
+                 logger: Optional[Logger] = None,
+                 lookback_window: Optional[int] = None,
+                 indicator_cache_ticks: Optional[int] = None):
+        """
+        :param data: Data to run the analysis on. Periods below are in this data's interval.
+        :param starting_balance: Starting balance of every window.
+        :param symbol: Symbol of the data.
+        :param in_sample_periods: Amount of periods to optimize on in each window.
+        :param out_of_sample_periods: Amount of periods to test the winning settings on in each window.
+        :param step_periods: Amount of periods to move forward by after each window.
+        :param margin_enabled: Boolean whether margin is enabled or not.
+        :param drawdown_percentage: Drawdown percentage at which a backtest exits.
+        :param precision: Precision of the backtests.
+        :param max_workers: Maximum amount of worker processes. If 1, everything runs in the current process.
+        :param logger: Optional logger.
+        :param lookback_window: Amount of periods strategies are computed over. If None, it's derived from them.
+        :param indicator_cache_ticks: Maximum amount of ticks the indicator cache of every worker holds. Defaults to
+        two windows worth of ticks. Combos with several strategy intervals cache every tick once per interval, so
+        raising it for those keeps more values cached at the cost of memory.
+        """
+        convert_all_dates_to_datetime(data)
+        self.data = data if data[0]['date_utc'] <= data[-1]['date_utc'] else data[::-1]
+        self.starting_balance = starting_balance
+        self.windows = get_walk_forward_windows(len(self.data), in_sample_periods, out_of_sample_periods, step_periods)
+        self.max_workers = max_workers
+        self.logger = logger
+        self.indicator_cache_ticks = indicator_cache_ticks or \
+            INDICATOR_CACHE_WINDOWS * (in_sample_periods + out_of_sample_periods)
+        self.backtester_kwargs = {
+            'starting_balance': starting_balance,
+            'symbol': symbol,
+            'margin_enabled': margin_enabled,
+            'drawdown_percentage': drawdown_percentage,
+            'precision': precision,
+            'lookback_window': lookback_window
+        }
+
+    def run(self, combos: Dict[str, Any]) -> WalkForwardResult:
+        """
+        Runs the walk-forward analysis. Every (window, settings) in-sample backtest is a separate task, so workers stay
+        busy even with fewer windows than workers. Out-of-sample tests run once every window is optimized.
+        :param combos: Optimizer combos (same format as Backtester.optimize()).
+        :return: Walk-forward result.
+        """
+        settings_list = self.get_settings_list(combos)
+        tasks = [(window, settings) for window in self.windows for settings in settings_list]
+
+        if self.max_workers == 1:
+            initialize_worker(self.data, self.backtester_kwargs, self.indicator_cache_ticks)
+            try:
+                profit_percentages = [run_in_sample(window, settings) for window, settings in tasks]
+                optimizations = self.get_optimizations(settings_list, profit_percentages)
+                tests = [backtest_window(window, optimization['settings']) if optimization['settings'] else None
+                         for window, optimization in zip(self.windows, optimizations)]
+            finally:
+                WORKER_STATE.clear()
+        else:
+            max_workers = self.max_workers or os.cpu_count() or 1
+            # Tasks are ordered by window, so chunks keep a worker on the same window and its cached indicators.
+            chunksize = max(1, len(tasks) // (max_workers * TASK_CHUNKS_PER_WORKER))
+            with ProcessPoolExecutor(max_workers=max_workers, initializer=initialize_worker,
+                                     initargs=(self.data, self.backtester_kwargs,
+                                               self.indicator_cache_ticks)) as executor:
+                profit_percentages = list(executor.map(run_in_sample, *zip(*tasks), chunksize=chunksize))
+                optimizations = self.get_optimizations(settings_list, profit_percentages)
+                futures = [executor.submit(backtest_window, window, optimization['settings'])
+                           if optimization['settings'] else None
+                           for window, optimization in zip(self.windows, optimizations)]
+                tests = [future.result() if future else None for future in futures]
+
+        return self.stitch(optimizations, tests)
+
+    def get_settings_list(self, combos: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Returns every settings combination of the combos provided. They're the same for every window.
+        :param combos: Optimizer combos.
+        :return: List of settings combinations.
+        """
+        backtester = Backtester(data=self.data, strategies=[], output_trades=False, **self.backtester_kwargs)
+        return backtester.get_all_permutations(copy.deepcopy(combos))
+
+    def get_optimizations(self, settings_list: List[Dict[str, Any]],
+                          profit_percentages: List[Optional[float]]) -> List[Dict[str, Any]]:
+        """
+        Groups in-sample results (ordered by window, then settings) into the optimization of every window.
+        :param settings_list: Settings combinations backtested on every window.
+        :param profit_percentages: In-sample profit percentages of every task.
+        :return: List of optimizations in window order.
+        """
+        runs = len(settings_list)
+        return [get_best_in_sample(settings_list, profit_percentages[index * runs:(index + 1) * runs])
+                for index in range(len(self.windows))]
+
+    def stitch(self, optimizations: List[Dict[str, Any]], tests: List[Optional[Dict[str, Any]]]) -> WalkForwardResult:
+        """
+        Stitches out-of-sample results into one equity curve. Every window starts with the balance the previous window
+        ended with. Windows without a winning setting stay flat.
+        :param optimizations: In-sample optimization results.
+        :param tests: Out-of-sample test results (None for windows without a winning setting).
+        :return: Walk-forward result.
+        """
+        result = WalkForwardResult(starting_balance=self.starting_balance, ending_balance=self.starting_balance)
+
+        for window, optimization, test in zip(self.windows, optimizations, tests):
+            scale = result.ending_balance / self.starting_balance
+            if test is None:
+                result.equity_curve.append((self.data[window.out_of_sample_end]['date_utc'], result.ending_balance))
+                test = {'result': 'SKIPPED', 'out_of_sample_profit_percentage': 0, 'trades': 0}
+            else:
+                result.equity_curve.extend((date, net * scale) for date, net in test['equity_curve'])
+                result.ending_balance *= 1 + test['out_of_sample_profit_percentage'] / 100
+
+            result.windows.append({
+                'window': window,
+                'start_date': self.data[window.out_of_sample_start]['date_utc'],
+                'end_date': self.data[window.out_of_sample_end]['date_utc'],
+                'runs': optimization['runs'],
+                'settings': optimization['settings'],
+                'in_sample_profit_percentage': optimization['in_sample_profit_percentage'],
+                'out_of_sample_profit_percentage': test['out_of_sample_profit_percentage'],
+                'out_of_sample_result': test['result'],
+                'trades': test['trades']
+            })
+
+            if self.logger is not None:
+                self.logger.info(f"Walk-forward window {window.number}/{len(self.windows)}: "
+                                 f"{test['result']} with {test['out_of_sample_profit_percentage']:.2f}% "
+                                 f"out-of-sample.")
+
+        return result
@@ -0,0 +1,251 @@
+"""
+Process-isolated worker pool. Every worker is a separate process with optional memory and wall-time limits, so a task
+that crashes, hangs, or runs out of memory only fails itself: its worker is replaced and the remaining tasks carry on.
+"""
+
+import multiprocessing
+import time
+import traceback
+from collections import deque
+from dataclasses import dataclass
+from multiprocessing.connection import Connection, wait
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, Optional, Tuple
+
+try:
+    import resource  # Not available on Windows, where memory limits are not applied.
+except ImportError:  # pragma: no cover
+    resource = None
+
+STARTED = 'STARTED'
+OK = 'OK'
+ERROR = 'ERROR'
+TIMEOUT = 'TIMEOUT'
+OUT_OF_MEMORY = 'OUT OF MEMORY'
+DIED = 'DIED'
+
+POLL_INTERVAL = 0.1  # Seconds to wait for results before checking time limits again.
+
+
+@dataclass
+class TaskResult:
+    """
+    Data class for the result of a task. Value is only set if the status is OK; error contains the reason otherwise.
+    """
+    index: int
+    status: str
+    value: Any = None
+    error: Optional[str] = None
+
+
+def set_memory_limit(memory_limit_mb: Optional[int]):
+    """
+    Limits the address space of the current process. Allocations over the limit raise MemoryError.
+    :param memory_limit_mb: Memory limit in megabytes. If None, nothing is limited.
+    """
+    if memory_limit_mb is None or resource is None:
+        return
+
+    limit = memory_limit_mb * 1024 * 1024
+    resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+
+def run_worker(task_connection: Connection, result_connection: Connection, function: Callable,
+               memory_limit_mb: Optional[int], initializer: Optional[Callable], initargs: tuple):
+    """
+    Main function of a worker process. Tasks are received until None is received. A notification is sent when a task
+    starts, and its result (or exception) is sent back before the next task is received.
+    :param task_connection: Connection tasks are received from.
+    :param result_connection: Connection results are sent to.
+    :param function: Function to run every task's arguments with.
+    :param memory_limit_mb: Memory limit of the worker in megabytes.
+    :param initializer: Function to call once when the worker starts.
+    :param initargs: Arguments for the initializer.
+    """
+    if initializer is not None:
+        initializer(*initargs)
+
+    set_memory_limit(memory_limit_mb)
+    while True:
+        task = task_connection.recv()
+        if task is None:
+            break
+
+        index, args = task
+        result_connection.send((index, STARTED, None, None))
+        try:
+            result = (index, OK, function(*args), None)
+        except MemoryError:
+            result = (index, OUT_OF_MEMORY, None, traceback.format_exc())
+        except Exception:  # pylint: disable=broad-except
+            result = (index, ERROR, None, traceback.format_exc())
+
+        try:
+            result_connection.send(result)
+        except Exception:  # pylint: disable=broad-except
+            result_connection.send((index, ERROR, None, traceback.format_exc()))  # E.g. the value can't be pickled.
+
+
+class Worker:
+    """
+    Handle of a worker process and the task it's currently running.
+    """
+    def __init__(self, context, function: Callable, memory_limit_mb: Optional[int], initializer: Optional[Callable],
+                 initargs: tuple):
+        task_receiver, self.task_sender = context.Pipe(duplex=False)
+        self.result_receiver, result_sender = context.Pipe(duplex=False)
+        self.process = context.Process(
+            target=run_worker,
+            args=(task_receiver, result_sender, function, memory_limit_mb, initializer, initargs),
+            daemon=True
+        )
+        self.process.start()
+
+        # Close the worker's ends here, so the result connection reports EOF if the worker dies.
+        task_receiver.close()
+        result_sender.close()
+
+        self.task: Optional[int] = None  # Index of the task currently running.
+        self.task_start: Optional[float] = None  # Set when the worker starts the task, so startup isn't timed.
+
+    def submit(self, index: int, args: tuple):
+        """
+        Sends a task to the worker.
+        :param index: Index of the task.
+        :param args: Arguments of the task.
+        """
+        self.task, self.task_start = index, None
+        self.task_sender.send((index, args))
+
+    def stop(self):
+        """
+        Asks the worker to exit after its current task.
+        """
+        try:
+            self.task_sender.send(None)
+        except OSError:
+            pass
+
+    def kill(self):
+        """
+        Kills the worker immediately.
+        """
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join()
+        self.close()
+
+    def close(self):
+        """
+        Closes the worker's connections.
+        """
+        self.task_sender.close()
+        self.result_receiver.close()
+
+
+class IsolatedWorkerPool:
+    """
+    Pool of worker processes that runs every task in isolation from the calling process.
+    """
+    def __init__(self,
+                 max_workers: Optional[int] = None,
+                 memory_limit_mb: Optional[int] = None,
+                 time_limit: Optional[float] = None,
+                 initializer: Optional[Callable] = None,
+                 initargs: tuple = (),
+                 start_method: str = 'spawn'):
+        """
+        :param max_workers: Maximum amount of worker processes. Defaults to the CPU count.
+        :param memory_limit_mb: Memory limit of every worker in megabytes.
+        :param time_limit: Wall-time limit of every task in seconds.
+        :param initializer: Function every worker calls once when it starts (e.g. to load data).
+        :param initargs: Arguments for the initializer.
+        :param start_method: Multiprocessing start method of the workers.
+        """
+        self.max_workers = max_workers or multiprocessing.cpu_count()
+        self.memory_limit_mb = memory_limit_mb
+        self.time_limit = time_limit
+        self.initializer = initializer
+        self.initargs = initargs
+        self.context = multiprocessing.get_context(start_method)
+        self.workers: Dict[Connection, Worker] = {}  # Workers running tasks of the current imap_unordered() call.
+        self.terminated = False
+
+    def start_worker(self, function: Callable) -> Worker:
+        """
+        Starts a new worker process.
+        :param function: Function the worker runs tasks with.
+        :return: Worker handle.
+        """
+        return Worker(self.context, function, self.memory_limit_mb, self.initializer, self.initargs)
+
+    def terminate(self):
+        """
+        Kills the workers of the running imap_unordered() call, which then stops without yielding the remaining tasks.
+        This can be called from another thread (e.g. when the user stops an optimizer).
+        """
+        self.terminated = True
+        for worker in list(self.workers.values()):
+            if worker.process.is_alive():
+                worker.process.kill()
+
+    def imap_unordered(self, function: Callable, tasks: Iterable[tuple]) -> Iterator[TaskResult]:
+        """
+        Runs the function with every task's arguments in the worker processes. Results are yielded as tasks complete.
+        If the generator is closed early or the pool is terminated, the workers are killed.
+        :param function: Module-level function to run.
+        :param tasks: Iterable of argument tuples.
+        :return: Iterator of task results.
+        """
+        pending: Deque[Tuple[int, tuple]] = deque(enumerate(tasks))
+        workers = self.workers = {}
+        self.terminated = False
+
+        def assign(worker: Worker):
+            if pending:
+                worker.submit(*pending.popleft())
+                workers[worker.result_receiver] = worker
+            else:
+                worker.stop()
+                worker.process.join()
+                worker.close()
+
+        try:
+            for _ in range(min(self.max_workers, len(pending))):
+                assign(self.start_worker(function))
+
+            while workers and not self.terminated:
+                for connection in wait(list(workers), timeout=POLL_INTERVAL):
+                    if self.terminated:
+                        break
+
+                    worker = workers.pop(connection)
+                    try:
+                        index, status, value, error = connection.recv()
+                    except (EOFError, OSError):
+                        worker.kill()
+                        exitcode = worker.process.exitcode
+                        yield TaskResult(worker.task, DIED, error=f'Worker exited with code {exitcode}.')
+                        if pending:
+                            assign(self.start_worker(function))
+                        continue
+
+                    if status == STARTED:
+                        worker.task_start = time.monotonic()
+                        workers[connection] = worker
+                        continue
+
+                    yield TaskResult(index, status, value, error)
+                    assign(worker)
+
+                if self.time_limit is not None:
+                    now = time.monotonic()
+                    for connection, worker in list(workers.items()):
+                        if worker.task_start is not None and now - worker.task_start > self.time_limit:
+                            del workers[connection]
+                            worker.kill()
+                            yield TaskResult(worker.task, TIMEOUT, error=f'Task exceeded {self.time_limit} seconds.')
+                            if pending:
+                                assign(self.start_worker(function))
+        finally:
+            for worker in workers.values():
+                worker.kill()
@@ -1,7 +1,12 @@
 """
 Mock the Binance client for tests.
 """
-from typing import Dict, List, Union
+import time
+from collections import Counter
+from typing import Callable, Dict, List, Union
+
+PRICE = 1209.54  # Ticker price of ALGOBOTUSDT.
+HOUR_MS = 3600 * 1000  # Length of the fake klines client's klines in milliseconds.
 
 
 class BinanceMockClient:
@@ -76,3 +81,135 @@ class BinanceMockClient:
         :return: Arbitrary timestamp.
         """
         return 1502942400000
+
+    @staticmethod
+    def get_server_time() -> Dict[str, int]:
+        """
+        Mock the server time endpoint with the local time.
+        :return: Dictionary with the server time in milliseconds.
+        """
+        return {'serverTime': int(time.time() * 1000)}
+
+
+class BinanceAccountMockClient(BinanceMockClient):
+    """
+    Mock the Binance client's account, margin account, and margin order endpoints. Market orders fill at the
+    ALGOBOTUSDT ticker price, and every account request is counted.
+    """
+    def __init__(self, *_args, **_kwargs):
+        self.requests = Counter()
+        self.margin = {'ALGOBOT': {'free': 0.0, 'borrowed': 0.0, 'interest': 0.0}, 'USDT': {'free': 5000.0}}
+        self.spot = {'ALGOBOT': 1.5, 'USDT': 100.0}
+
+    def get_margin_assets(self) -> list:
+        """
+        Get margin assets as Binance returns them.
+        """
+        return [{'asset': asset, 'borrowed': '0', 'interest': '0', **{key: str(value) for key, value in info.items()}}
+                for asset, info in self.margin.items()]
+
+    def get_account(self) -> dict:
+        """
+        Mock the spot account endpoint.
+        """
+        self.requests['account'] += 1
+        return {'balances': [{'asset': asset, 'free': str(free), 'locked': '0'} for asset, free in self.spot.items()]}
+
+    def get_asset_balance(self, asset: str) -> dict:
+        """
+        Mock the asset balance endpoint (which fetches the whole spot account).
+        """
+        return [balance for balance in self.get_account()['balances'] if balance['asset'] == asset][0]
+
+    def get_margin_account(self) -> dict:
+        """
+        Mock the cross margin account endpoint.
+        """
+        self.requests['margin'] += 1
+        return {'userAssets': self.get_margin_assets()}
+
+    def _request_margin_api(self, method: str, path: str, signed: bool, data: dict) -> dict:
+        """
+        Mock the isolated margin account endpoint.
+        """
+        assert (method, path, signed) == ('get', 'margin/isolated/account', True)
+        self.requests['isolated'] += 1
+        base, quote = self.get_margin_assets()
+        assert data == {'symbols': 'ALGOBOTUSDT'}
+        return {'assets': [{'baseAsset': base, 'quoteAsset': quote, 'symbol': 'ALGOBOTUSDT'}]}
+
+    def create_margin_order(self, side: str, quantity: float, **_kwargs) -> dict:
+        """
+        Mock the margin order endpoint.
+        """
+        direction = 1 if side == 'BUY' else -1
+        self.margin['ALGOBOT']['free'] += direction * quantity
+        self.margin['USDT']['free'] -= direction * quantity * PRICE
+        return {'clientOrderId': f'order{sum(self.requests.values())}', 'executedQty': str(quantity),
+                'transactTime': int(time.time() * 1000),
+                'fills': [{'price': str(PRICE), 'qty': str(quantity), 'commission': '0', 'commissionAsset': 'BNB'}]}
+
+
+class FakeKlinesClient:
+    """
+    Fake of Binance's server time and hourly klines endpoints. Klines are served from each symbol's listing time up to
+    the open kline. The server clock can be offset from the local clock, and roll over to a new kline a moment after
+    each close.
+    """
+    def __init__(self, clock: Callable[[], float] = time.time):
+        """
+        :param clock: Local clock in seconds.
+        """
+        self.clock = clock
+        self.offset = 0  # Seconds the server clock is ahead of the local clock.
+        self.rollover_lag = 0  # Seconds after a close the server serves the new kline.
+        self.listing_times: Dict[str, int] = {}
+        self.requests: List[dict] = []
+
+    def get_open_time(self) -> int:
+        """
+        Get the open time of the kline currently open on the server.
+        """
+        return int((self.clock() + self.offset - self.rollover_lag) * 1000) // HOUR_MS * HOUR_MS
+
+    def list_symbols(self, listing_hours_ago: Dict[str, int]):
+        """
+        List symbols the amount of hours provided before the open kline.
+        :param listing_hours_ago: Dictionary of symbols to the hours they were listed before the open kline.
+        """
+        current_open_time = self.get_open_time()
+        for symbol, hours in listing_hours_ago.items():
+            self.listing_times[symbol] = current_open_time - hours * HOUR_MS
+
+    @staticmethod
+    def get_kline(open_time: int) -> list:
+        """
+        Get the kline opened at the time provided, as Binance returns it.
+        :param open_time: Open time in milliseconds.
+        """
+        price = 100 + (open_time // HOUR_MS) % 7
+        return [open_time, str(price), str(price + 2), str(price - 1), str(price + 1), '10', open_time + HOUR_MS - 1,
+                '1000', '5', '5', '500', '0']
+
+    def get_server_time(self) -> dict:
+        """
+        Mock the server time endpoint.
+        """
+        return {'serverTime': int((self.clock() + self.offset) * 1000)}
+
+    def get_klines(self, **params) -> List[list]:
+        """
+        Mock the klines endpoint. Parameters are named as Binance names them (e.g. startTime), so they're taken as
+        keyword arguments.
+        """
+        assert params.get('interval', '1h') == '1h'
+        self.requests.append(params)
+        start_time, limit = params['startTime'], params.get('limit')
+        open_time = max(start_time + (-start_time % HOUR_MS), self.listing_times.get(params.get('symbol'), 0))
+
+        klines = []
+        current_open_time = self.get_open_time()
+        while open_time <= current_open_time and (limit is None or len(klines) < limit):
+            klines.append(self.get_kline(open_time))
+            open_time += HOUR_MS
+        return klines
@@ -0,0 +1,14 @@
+"""
+Fixtures shared by tests.
+"""
+import pytest
+
+from tests.binance_client_mocker import FakeKlinesClient
+
+
+@pytest.fixture(name='klines_client')
+def get_klines_client() -> FakeKlinesClient:
+    """
+    Get a fake Binance klines client on the local clock.
+    """
+    return FakeKlinesClient()
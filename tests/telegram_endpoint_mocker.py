@@ -0,0 +1,101 @@
+"""
+Local fake of the Telegram Bot API's sendMessage endpoint.
+"""
+import json
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Deque, Dict, List, Optional, Tuple
+
+
+class FakeTelegramEndpoint:
+    """
+    Fake Telegram endpoint running on a local HTTP server. Scripted failures are returned before successful responses.
+    """
+    def __init__(self):
+        self.messages: Dict[str, List[Tuple[float, str]]] = {}  # Chat ID to delivery times and texts.
+        self.failures: Deque[Tuple[int, dict]] = deque()
+        self.requests = 0
+        self.lock = threading.Lock()
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), self.get_handler())
+        self.thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        """
+        Returns the base URL to give to the Telegram bot.
+        """
+        return f'http://127.0.0.1:{self.server.server_address[1]}/bot'
+
+    def add_failure(self, status: int, description: str, retry_after: Optional[int] = None):
+        """
+        Scripts a failed response for the next request.
+        :param status: HTTP status code.
+        :param description: Error description.
+        :param retry_after: Seconds Telegram asks to wait before retrying (for 429 responses).
+        """
+        body = {'ok': False, 'error_code': status, 'description': description}
+        if retry_after is not None:
+            body['parameters'] = {'retry_after': retry_after}
+        self.failures.append((status, body))
+
+    def respond(self, payload: dict) -> Tuple[int, dict]:
+        """
+        Returns the status and body of the response to a sendMessage payload.
+        :param payload: Request payload.
+        :return: Tuple of status and body.
+        """
+        with self.lock:
+            self.requests += 1
+            if self.failures:
+                return self.failures.popleft()
+
+            chat_id = str(payload['chat_id'])
+            self.messages.setdefault(chat_id, []).append((time.monotonic(), payload['text']))
+            message_id = sum(len(messages) for messages in self.messages.values())
+
+        return 200, {'ok': True, 'result': {'message_id': message_id, 'date': int(time.time()), 'text': payload['text'],
+                                            'chat': {'id': int(chat_id), 'type': 'private'}}}
+
+    def get_handler(self):
+        """
+        Returns the request handler class of the server.
+        """
+        endpoint = self
+
+        class Handler(BaseHTTPRequestHandler):
+            """
+            Request handler for the fake endpoint.
+            """
+            def do_POST(self):  # noqa: N802 pylint: disable=invalid-name
+                """
+                Handles sendMessage requests.
+                """
+                body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                status, response = endpoint.respond(json.loads(body or b'{}'))
+                data = json.dumps(response).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *_args):
+                pass
+
+        return Handler
+
+    def start(self):
+        """
+        Starts serving requests in a background thread.
+        """
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """
+        Stops the server.
+        """
+        self.server.shutdown()
+        self.server.server_close()
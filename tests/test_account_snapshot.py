@@ -0,0 +1,107 @@
+"""
+Test account snapshots of real traders against a fake of Binance's account endpoints.
+"""
+from unittest import mock
+
+import pytest
+
+from algobot.enums import LONG
+from algobot.traders.account_snapshot import AccountSnapshot
+from algobot.traders.real_trader import RealTrader
+from tests.binance_client_mocker import PRICE, BinanceAccountMockClient, BinanceMockClient
+
+SYMBOL = 'ALGOBOTUSDT'
+
+
+def get_trader(client: BinanceAccountMockClient, **kwargs) -> RealTrader:
+    """
+    Get a real trader using the fake client provided.
+    """
+    with mock.patch('binance.client.Client', BinanceMockClient), \
+            mock.patch('algobot.traders.real_trader.Client', lambda *_args, **_kwargs: client):
+        return RealTrader(api_key='key', api_secret='secret', symbol=SYMBOL, load_data=False, **kwargs)
+
+
+@pytest.fixture(name='client')
+def get_client() -> BinanceAccountMockClient:
+    """
+    Get the fake client of the trader fixture.
+    """
+    return BinanceAccountMockClient()
+
+
+@pytest.fixture(name='trader')
+def get_cross_margin_trader(client: BinanceAccountMockClient) -> RealTrader:
+    """
+    Get a cross margin real trader with the fake client.
+    """
+    return get_trader(client)
+
+
+def test_initialization_requests(trader: RealTrader, client: BinanceAccountMockClient):
+    """
+    Test that a real trader initializes from a single request per account.
+    """
+    assert client.requests == {'account': 1, 'margin': 1}
+    assert trader.spot_coin == 1.5 and trader.spot_usdt == 100
+    assert trader.balance == 5000
+    assert trader.account.request_count == 2
+
+
+def test_fills_invalidate_snapshot(trader: RealTrader, client: BinanceAccountMockClient):
+    """
+    Test that orders read balances from the snapshot and refetch them once after fills.
+    """
+    with mock.patch('algobot.traders.real_trader.time.sleep'):
+        trader.buy_long('Bought long.', coin=2)
+        assert trader.current_position == LONG
+        assert trader.coin == 2
+        assert trader.balance == pytest.approx(5000 - 2 * PRICE)
+        assert client.requests['margin'] == 2
+
+        trader.sell_long('Sold long.')
+        assert trader.coin == 0
+        assert client.requests['margin'] == 3  # The coin to sell is read from the snapshot taken after buying.
+
+
+def test_cycle_invalidation(trader: RealTrader, client: BinanceAccountMockClient):
+    """
+    Test that invalidating doesn't make requests until balances are read, and then only makes one.
+    """
+    trader.invalidate_account_snapshot()
+    trader.invalidate_account_snapshot()
+    assert client.requests['margin'] == 1
+
+    trader.retrieve_margin_values()
+    trader.get_margin_usdt()
+    trader.get_borrowed_margin_interest()
+    assert client.requests['margin'] == 2
+
+
+def test_isolated_account(client: BinanceAccountMockClient):
+    """
+    Test that isolated traders fetch the isolated account of their symbol once.
+    """
+    trader = get_trader(client, is_isolated=True)
+    assert client.requests == {'account': 1, 'isolated': 1}
+    assert trader.get_margin_usdt() == 5000
+    assert trader.get_margin_coin_info()['asset'] == 'ALGOBOT'
+
+
+def test_max_age():
+    """
+    Test that snapshots are fetched again once they're too old.
+    """
+    now = [0]
+    fetches = []
+    snapshot = AccountSnapshot(lambda: fetches.append('margin') or {'USDT': {'free': '1'}}, dict, max_age=10,
+                               clock=lambda: now[0])
+
+    assert snapshot.get_margin_asset('USDT') == {'free': '1'}
+    now[0] = 9
+    snapshot.get_margin_asset('USDT')
+    assert fetches == ['margin']
+
+    now[0] = 10
+    snapshot.get_margin_asset('USDT')
+    assert fetches == ['margin', 'margin']
@@ -2,8 +2,10 @@
 Test backtester object.
 """
 
+import copy
 import os
 from datetime import datetime
+from unittest import mock
 
 import pytest
 
@@ -347,3 +349,58 @@ def test_trailing_take_profit(backtester: Backtester):
     Test trailing take profit.
     """
     pass
+
+
+def test_lookback_window(backtester: Backtester):
+    """
+    Test that the lookback window is derived from strategies unless one is provided.
+    """
+    def get_strategy(indicator: str, timeperiod: int) -> dict:
+        operation = {'indicator': indicator, 'operator': '>', 'against': 'Close', 'price': 'Close',
+                     'timeperiod': timeperiod, 'output': 'real'}
+        return {'name': 'Window Test', 'Enter Long': {'a': operation}}
+
+    assert backtester.lookback_window == 1
+
+    backtester.setup_strategies([get_strategy('SMA', 20)])
+    assert backtester.lookback_window == 20
+
+    backtester.strategies = {}
+    backtester.setup_strategies([get_strategy('EMA', 30)])
+    assert backtester.lookback_window == 330  # Lookback + 1 + stability margin of 10 times that.
+    assert backtester.get_tick_cache_key(5)[-1] == 330
+
+    backtester.lookback_window_option = 500
+    backtester.setup_strategies([get_strategy('EMA', 30)])
+    assert backtester.lookback_window == 500
+
+    backtester.lookback_window_option = 10
+    backtester.setup_strategies([get_strategy('EMA', 30)])
+    assert backtester.lookback_window == backtester.min_period == 30
+
+
+def test_optimizer_session_specification(backtester: Backtester, tmp_path):
+    """
+    Test that an optimization is only resumed with the same configuration, so a changed lookback window or strategy
+    interval clears previous results.
+    """
+    combos = {'lossType': [TRAILING], 'lossPercentage': [5, 10, 5], 'strategyIntervals': ['15 Minutes'],
+              'strategies': {}}
+    store_file = os.path.join(tmp_path, 'optimizer.db')
+
+    def get_runs_made() -> int:
+        with mock.patch.object(backtester, 'apply_general_settings', wraps=backtester.apply_general_settings) as apply:
+            backtester.optimize(copy.deepcopy(combos), store_file=store_file)
+        return apply.call_count
+
+    assert get_runs_made() == 2
+    assert get_runs_made() == 0  # Resumed with every run completed.
+    assert {row['strategy_interval'] for row in backtester.optimizer_store.get_rows()} == {'15 Minutes'}
+
+    backtester.lookback_window_option = 50
+    assert get_runs_made() == 2
+    assert backtester.optimizer_store.get_session()['specification']['lookback_window'] == 50
+
+    backtester.strategy_interval_option = '1 Hour'
+    assert get_runs_made() == 2
+    assert get_runs_made() == 0
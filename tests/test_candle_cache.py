@@ -0,0 +1,141 @@
+"""
+Test memory-mapped candle cache.
+"""
+import os
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pytest
+
+from algobot.candle_cache import CANDLE_DTYPE, CandleCache, CandleRows
+
+
+def get_data(count: int, start_hour: int = 0) -> list:
+    """
+    Get dummy hourly candle data.
+    :param count: Amount of candles.
+    :param start_hour: Hour of the first candle.
+    :return: List of candle dictionaries.
+    """
+    start = datetime(2021, 1, 1, tzinfo=timezone.utc) + timedelta(hours=start_hour)
+    return [{
+        'date_utc': start + timedelta(hours=hour),
+        'open': 1.5 + hour,
+        'high': 2.5 + hour,
+        'low': 0.5 + hour,
+        'close': 2.0 + hour,
+        'volume': 100.0 * hour,
+        'quote_asset_volume': 3.0,
+        'number_of_trades': 10.0,
+        'taker_buy_base_asset': 4.0,
+        'taker_buy_quote_asset': 5.0,
+    } for hour in range(count)]
+
+
+@pytest.fixture(name='cache')
+def get_cache(tmp_path) -> CandleCache:
+    """
+    Get a candle cache in a temporary directory.
+    """
+    return CandleCache(os.path.join(tmp_path, 'TEST_1h.candles'))
+
+
+def test_write_and_load(cache: CandleCache):
+    """
+    Test that candles round-trip through the cache.
+    """
+    assert cache.get_row_count() == 0
+    assert len(cache.open()) == 0
+
+    data = get_data(24)
+    cache.write(data)
+
+    assert cache.get_row_count() == 24
+    assert cache.load() == data
+    assert cache.load(limit=5) == data[-5:]
+
+    array = cache.open()
+    assert isinstance(array, np.memmap)
+    assert array.dtype == CANDLE_DTYPE
+    assert array['close'][3] == data[3]['close']
+
+
+def test_append(cache: CandleCache):
+    """
+    Test that only candles newer than the cached ones are appended.
+    """
+    data = get_data(30)
+    assert cache.append(data[:10]) == 10
+    assert cache.append(data[5:20]) == 10
+    assert cache.append(data[:20]) == 0
+    assert cache.load() == data[:20]
+
+    # Arrays mapped before an append keep their row count.
+    array = cache.open()
+    cache.append(data[20:])
+    assert len(array) == 20
+    assert cache.load() == data
+
+
+def test_synced_rowid(cache: CandleCache):
+    """
+    Test that the synced database rowid is stored in the header and kept by appends.
+    """
+    assert cache.get_synced_rowid() == 0
+
+    data = get_data(10)
+    cache.write(data[:5], synced_rowid=7)
+    assert cache.read_header() == (5, 7)
+
+    cache.append(data)
+    assert cache.read_header() == (10, 7)
+
+    cache.set_synced_rowid(12)
+    assert cache.read_header() == (10, 12)
+    assert cache.load() == data
+
+
+def test_candle_rows(cache: CandleCache):
+    """
+    Test that candle rows index the mapped array without copying it.
+    """
+    data = get_data(24)
+    cache.write(data)
+    rows = CandleRows(cache.open())
+
+    assert len(rows) == 24
+    assert rows[3] == data[3] and rows[-1] == data[-1]
+    assert list(rows) == data
+    assert list(rows[5:10]) == data[5:10]
+    assert list(rows[::-1]) == data[::-1]
+    assert np.shares_memory(rows[5:10].get_column('close'), rows.array)
+    assert rows.get_dates() == [period['date_utc'] for period in data]
+
+    naive_rows = CandleRows(cache.open(), naive_dates=True)
+    assert naive_rows[0]['date_utc'] == data[0]['date_utc'].replace(tzinfo=None)
+    with pytest.raises(IndexError):
+        rows[24]  # pylint: disable=pointless-statement
+
+
+def test_get_range(cache: CandleCache):
+    """
+    Test inclusive date ranges.
+    """
+    data = get_data(24)
+    cache.write(data)
+
+    result = cache.get_range(datetime(2021, 1, 1, 5), datetime(2021, 1, 1, 8, tzinfo=timezone.utc))
+    assert list(result['close']) == [period['close'] for period in data[5:9]]
+    assert cache.load(start=data[20]['date_utc']) == data[20:]
+    assert len(cache.get_range(end=datetime(2020, 1, 1))) == 0
+
+
+def test_invalid_file(cache: CandleCache):
+    """
+    Test that files that aren't candle caches are rejected.
+    """
+    with open(cache.file_path, 'wb') as f:
+        f.write(b'not a candle cache' * 10)
+
+    with pytest.raises(ValueError, match="Invalid candle cache file"):
+        cache.open()
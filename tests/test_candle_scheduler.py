@@ -0,0 +1,143 @@
+"""
+Test candle close scheduling with a fake clock and a fake Binance klines endpoint.
+"""
+from datetime import datetime, timezone
+from functools import partial
+from typing import List
+from unittest import mock
+
+import pytest
+
+from algobot.candle_scheduler import CandleCloseScheduler, ServerClock
+from algobot.data import Data
+from tests.binance_client_mocker import BinanceMockClient, FakeKlinesClient
+
+HOUR = 3600
+START = 1_600_000_000 // HOUR * HOUR  # Open time of the latest closed candle in the tests.
+
+
+class FakeClock:
+    """
+    Local clock whose sleeps advance time instantly.
+    """
+    def __init__(self, now: float):
+        self.now = now
+        self.sleeps: List[float] = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float):
+        """
+        Advance the clock.
+        :param seconds: Seconds to advance by.
+        """
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def get_exchange(klines_client: FakeKlinesClient, clock: FakeClock, offset: float,
+                 rollover_lag: float = 0) -> FakeKlinesClient:
+    """
+    Set the fake klines client up as Binance with a server clock offset from the fake local clock.
+    """
+    klines_client.clock = clock
+    klines_client.offset = offset
+    klines_client.rollover_lag = rollover_lag
+    return klines_client
+
+
+def get_scheduler(clock: FakeClock, exchange: FakeKlinesClient) -> CandleCloseScheduler:
+    """
+    Get an hourly scheduler of the fake exchange.
+    """
+    server_clock = ServerClock(exchange.get_server_time, clock=clock, monotonic=clock)
+    return CandleCloseScheduler(HOUR, server_clock, sleep=clock.sleep, close_delay=0.25, retry_delays=(0.5, 1))
+
+
+def test_server_clock():
+    """
+    Test that the offset is measured at the midpoint of the request and resynced periodically.
+    """
+    clock = FakeClock(1000)
+    responses = []
+
+    def fetch_server_time():
+        clock.now += 0.2  # Round trip of 0.4 seconds.
+        responses.append(clock.now)
+        response = {'serverTime': int((clock.now + 5) * 1000)}
+        clock.now += 0.2
+        return response
+
+    server_clock = ServerClock(fetch_server_time, resync_interval=60, clock=clock, monotonic=clock)
+    assert server_clock.now() == pytest.approx(1000.4 + 5)
+    clock.now += 30
+    server_clock.now()
+    assert len(responses) == 1
+
+    clock.now += 30
+    server_clock.now()
+    assert len(responses) == 2
+
+
+def test_wakes_at_close(klines_client: FakeKlinesClient):
+    """
+    Test that the scheduler sleeps until the close in server time and fetches the closed candle once.
+    """
+    clock = FakeClock(START + 2 * HOUR - 100)  # 100 seconds before the next close in local time.
+    # The server is 30 seconds ahead, so it's 70 seconds in server time.
+    exchange = get_exchange(klines_client, clock, offset=30)
+    scheduler = get_scheduler(clock, exchange)
+    assert not scheduler.is_due(START)
+
+    fetch = partial(exchange.get_klines, startTime=START * 1000 + 1)
+    closed = scheduler.fetch_closed_candles(fetch, START)
+    assert clock.sleeps == [pytest.approx(70.25)]
+    assert [kline[0] for kline in closed] == [(START + HOUR) * 1000]
+    assert len(exchange.requests) == 1
+    assert scheduler.is_due(START)
+    assert not scheduler.is_due(START + HOUR)
+
+
+def test_bounded_retries(klines_client: FakeKlinesClient):
+    """
+    Test that fetches are retried until Binance rolls over, and give up after the retries.
+    """
+    clock = FakeClock(START + 2 * HOUR)
+    exchange = get_exchange(klines_client, clock, offset=0, rollover_lag=0.5)
+    scheduler = get_scheduler(clock, exchange)
+
+    fetch = partial(exchange.get_klines, startTime=START * 1000 + 1)
+    assert len(scheduler.fetch_closed_candles(fetch, START)) == 1
+    assert clock.sleeps == [pytest.approx(0.25), 0.5]
+    assert len(exchange.requests) == 2
+
+    exchange.rollover_lag = HOUR
+    with pytest.raises(RuntimeError):
+        scheduler.fetch_closed_candles(fetch, START + HOUR)
+    assert len(exchange.requests) == 5
+
+
+def test_data_update(klines_client: FakeKlinesClient):
+    """
+    Test that data objects update from the scheduler in server time.
+    """
+    clock = FakeClock(START + 2 * HOUR + 10)
+    # The next candle only closes in 10 seconds in server time.
+    exchange = get_exchange(klines_client, clock, offset=-20)
+    with mock.patch('binance.client.Client', BinanceMockClient):
+        data = Data(interval='1h', symbol='ALGOBOTUSDT', load_data=False)
+
+    data.binance_client = exchange
+    server_clock = ServerClock(exchange.get_server_time, clock=clock, monotonic=clock)
+    data.server_clock = data.candle_scheduler.server_clock = server_clock
+    data.candle_scheduler.sleep = clock.sleep
+    data.data = [{'date_utc': datetime.fromtimestamp(START, tz=timezone.utc)}]
+    assert data.data_is_updated()
+
+    clock.now += 10
+    assert not data.data_is_updated()
+    data.update_data()
+    assert [row['date_utc'].timestamp() for row in data.data] == [START, START + HOUR]
+    assert data.data[-1]['close'] == float(exchange.get_kline((START + HOUR) * 1000)[4])
+    assert data.data_is_updated()
@@ -6,7 +6,7 @@ import os
 import re
 import sqlite3
 from contextlib import closing
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import Callable, Dict, List, Union
 from unittest import mock
 
@@ -24,14 +24,16 @@ TICKER = 'ALGOBOTUSDT'
 DATABASE_FILE = f'{TICKER}.db'
 DATABASE_TABLE = "data_1h"
 DATABASE_FILE_PATH = os.path.join(ROOT_DIR, "Databases", DATABASE_FILE)
+CANDLE_CACHE_FILE_PATH = os.path.join(ROOT_DIR, "Databases", f'{TICKER}_{INTERVAL}.candles')
 
 
 def remove_test_data():
     """
     Remove test data.
     """
-    if os.path.isfile(DATABASE_FILE_PATH):
-        os.remove(DATABASE_FILE_PATH)
+    for file_path in (DATABASE_FILE_PATH, CANDLE_CACHE_FILE_PATH):
+        if os.path.isfile(file_path):
+            os.remove(file_path)
 
 
 def get_csv_data(headers: bool = False) -> List[str]:
@@ -289,6 +291,38 @@ def test_get_data_from_database(data_object: Data):
     assert normalized_csv_data == result, "Expected data to equal."
 
 
+def test_get_data_from_candle_cache(data_object: Data):
+    """
+    Test that data is loaded from the candle cache, which is built from and kept in sync with the database.
+    :param data_object: Data object to leverage to test this function.
+    """
+    normalized_csv_data = get_normalized_csv_data()
+
+    remove_test_data()
+    data_object.create_table()
+    data_object.dump_to_table(normalized_csv_data[:3])
+    assert data_object.candle_cache.exists() is False
+
+    assert data_object.get_data_from_candle_cache() == normalized_csv_data[:3]
+    assert data_object.candle_cache_is_synced() is True
+
+    # New data dumped to the database should be appended to the candle cache too.
+    data_object.dump_to_table(normalized_csv_data)
+    assert data_object.candle_cache_is_synced() is True
+    assert data_object.get_data_from_candle_cache() == normalized_csv_data
+    assert data_object.get_data_from_candle_cache(limit=2) == normalized_csv_data[-2:]
+
+    # Rows inserted elsewhere aren't in the cache, so the synced rowid in its header falls behind the database's.
+    rowid = data_object.candle_cache.get_synced_rowid()
+    assert rowid == data_object.get_database_rowid() == len(normalized_csv_data)
+    new_row = {**normalized_csv_data[-1], 'date_utc': normalized_csv_data[-1]['date_utc'] + timedelta(days=1)}
+    with mock.patch.object(data_object, 'update_candle_cache'):
+        data_object.dump_to_table([new_row])
+    assert data_object.candle_cache_is_synced() is False
+    assert data_object.get_data_from_candle_cache()[-1] == new_row
+    assert data_object.candle_cache_is_synced() is True
+
+
 @pytest.mark.parametrize(
     'data, expected',
     [
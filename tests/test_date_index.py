@@ -0,0 +1,75 @@
+"""
+Test date index.
+"""
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+
+from algobot.date_index import DateIndex, get_date_index
+
+
+def get_data(tzinfo=None) -> list:
+    """
+    Get dummy data with 12 hourly periods starting from 01/01/2021 18:00.
+    :param tzinfo: Timezone of the dates.
+    :return: List of periods.
+    """
+    start = datetime(2021, 1, 1, 18, tzinfo=tzinfo)
+    return [{'date_utc': start + timedelta(hours=hour), 'close': hour} for hour in range(12)]
+
+
+@pytest.mark.parametrize('tzinfo', [None, timezone.utc])
+def test_find_date(tzinfo):
+    """
+    Test finding the first and last periods of a date.
+    """
+    date_index = DateIndex(get_data(tzinfo))
+
+    assert date_index.find_date(date(2021, 1, 1)) == 0
+    assert date_index.find_date(date(2021, 1, 1), starting=False) == 5
+    assert date_index.find_date(datetime(2021, 1, 2, 3)) == 6
+    assert date_index.find_date(date(2021, 1, 2), starting=False) == 11
+
+    for target in (date(2020, 12, 31), date(2021, 1, 3)):
+        for starting in (True, False):
+            with pytest.raises(IndexError, match="Date not found."):
+                date_index.find_date(target, starting=starting)
+
+
+@pytest.mark.parametrize(
+    'start, end, expected',
+    [
+        (None, None, (0, 12)),
+        (date(2021, 1, 2), None, (6, 12)),
+        (None, date(2021, 1, 1), (0, 6)),
+        (datetime(2021, 1, 1, 20), datetime(2021, 1, 1, 22, 30), (2, 5)),
+        (datetime(2021, 1, 1, 20, tzinfo=timezone(timedelta(hours=1))), None, (1, 12)),
+        (date(2021, 1, 5), None, (12, 12)),
+        (date(2021, 1, 2), date(2021, 1, 1), (6, 6)),
+    ]
+)
+def test_get_range(start, end, expected):
+    """
+    Test getting inclusive ranges by dates and datetimes.
+    """
+    data = get_data()
+    date_index = DateIndex(data)
+
+    assert date_index.get_range(start, end) == expected
+    assert date_index.get_data_range(start, end) == data[expected[0]:expected[1]]
+
+
+def test_get_date_index():
+    """
+    Test that date indices are only rebuilt when the data changes.
+    """
+    data = get_data()
+    date_index = get_date_index(data)
+    assert get_date_index(data, date_index) is date_index
+
+    data.append({'date_utc': datetime(2021, 1, 3), 'close': 12})
+    rebuilt = get_date_index(data, date_index)
+    assert rebuilt is not date_index
+    assert rebuilt.find_date(date(2021, 1, 3)) == 12
+
+    assert get_date_index(data[1:], rebuilt) is not rebuilt
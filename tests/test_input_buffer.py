@@ -0,0 +1,87 @@
+"""
+Test persistent strategy input arrays.
+"""
+import copy
+import os
+
+import numpy as np
+import pandas as pd
+
+from algobot.helpers import convert_all_dates_to_datetime, load_from_csv
+from algobot.input_buffer import InputArrayBuffer
+from algobot.strategies.custom import CustomStrategy
+
+data_path = os.path.join(os.path.dirname(__file__), 'data', '1INCHUSDT_data_1m.csv')
+test_data = load_from_csv(path=data_path, descending=False)[:300]
+convert_all_dates_to_datetime(test_data)
+
+
+def get_expected(data: list) -> dict:
+    """
+    Get input arrays the way they were built with a DataFrame.
+    :param data: List of candle dictionaries.
+    :return: Dictionary of input series.
+    """
+    df = pd.DataFrame(data)
+    df['high/low'] = (df['high'] + df['low']) / 2
+    df['open/close'] = (df['open'] + df['close']) / 2
+    return df.to_dict('series')
+
+
+def assert_matches(input_arrays_dict: dict, data: list):
+    """
+    Assert that input arrays match the ones built with a DataFrame.
+    :param input_arrays_dict: Input arrays to check.
+    :param data: Data the input arrays should contain.
+    """
+    expected = get_expected(data)
+    for column, array in input_arrays_dict.items():
+        np.testing.assert_allclose(array, expected[column].to_numpy(dtype=float))
+
+
+def test_incremental_updates():
+    """
+    Test that appended candles, current candle changes, and replaced data are all reflected.
+    """
+    buffer = InputArrayBuffer(capacity=16)
+    data = copy.deepcopy(test_data[:100])
+    current_values = dict(test_data[100])
+
+    assert_matches(buffer.get_input_arrays_dict(data, current_values), data + [current_values])
+
+    current_values['close'] = current_values['high']  # Current candle changed in place.
+    assert_matches(buffer.get_input_arrays_dict(data, current_values), data + [current_values])
+
+    data.extend(copy.deepcopy(test_data[100:250]))  # Candles closed; the buffer has to grow.
+    current_values = dict(test_data[250])
+    assert_matches(buffer.get_input_arrays_dict(data, current_values), data + [current_values])
+    assert buffer.get_capacity() >= 251
+
+    data = data[50:]  # Data was trimmed, so the buffer is rebuilt.
+    assert_matches(buffer.get_input_arrays_dict(data, current_values), data + [current_values])
+    assert_matches(buffer.get_input_arrays_dict(data), data)
+
+
+def test_trend_matches_dataframe():
+    """
+    Test that strategies get the same trends from the buffer as from DataFrame series.
+    """
+    strategy = CustomStrategy(trader=None, values={
+        'name': 'Buffer Test',
+        'Enter Long': {'a': {'indicator': 'SMA', 'operator': '>', 'against': 'High/Low', 'price': 'Close',
+                             'timeperiod': 5, 'output': 'real'}},
+        'Exit Long': {'b': {'indicator': 'SMA', 'operator': '<', 'against': 'Open/Close', 'price': 'Close',
+                            'timeperiod': 5, 'output': 'real'}},
+    })
+
+    buffer = InputArrayBuffer()
+    data = []
+    trends = set()
+    for period in test_data[:100]:
+        expected = strategy.get_trend(get_expected(data + [period])) if len(data) >= 5 else None
+        trend = strategy.get_trend(buffer.get_input_arrays_dict(data, period)) if len(data) >= 5 else None
+        assert trend == expected
+        trends.add(trend)
+        data.append(period)
+
+    assert len(trends) > 1
@@ -0,0 +1,120 @@
+"""
+Test klines cache, rate limiter, and volatility snooper.
+"""
+import pytest
+
+from algobot.kline_cache import KlineCache, fetch_klines, get_klines_weight
+from algobot.rate_limiter import RateLimiter
+from algobot.threads.volatility_snooper_thread import NOT_ENOUGH_DATA, VolatilitySnooperThread
+from tests.binance_client_mocker import HOUR_MS, FakeKlinesClient
+
+
+class FakeClock:
+    """
+    Fake monotonic clock whose sleeps advance time instantly.
+    """
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float):
+        """
+        Advance the clock.
+        :param seconds: Seconds to advance by.
+        """
+        self.now += seconds
+
+
+@pytest.fixture(name='clock')
+def get_clock() -> FakeClock:
+    """
+    Get a fake clock.
+    """
+    return FakeClock()
+
+
+def test_rate_limiter(clock: FakeClock):
+    """
+    Test that bursts up to the capacity are allowed and the rate is kept afterwards.
+    """
+    limiter = RateLimiter(rate=10, clock=clock, sleep=clock.sleep)
+    for _ in range(10):
+        limiter.acquire()
+    assert clock.now == 0
+
+    limiter.acquire(5)
+    assert clock.now == pytest.approx(0.5)
+
+    with pytest.raises(ValueError):
+        limiter.acquire(11)
+
+
+def test_klines_weight():
+    """
+    Test Binance's klines request weights.
+    """
+    assert [get_klines_weight(limit) for limit in (1, 99, 100, 499, 500, 1000, 1500)] == [1, 1, 2, 2, 5, 5, 10]
+
+
+def test_fetch_klines_pages(clock: FakeClock, klines_client: FakeKlinesClient):
+    """
+    Test that klines are fetched in pages and every page waits on the rate limiter.
+    """
+    klines_client.list_symbols({'BTCUSDT': 2500})
+    limiter = RateLimiter(rate=10, clock=clock, sleep=clock.sleep)
+    start_time = klines_client.listing_times['BTCUSDT']
+    klines = fetch_klines(klines_client, 'BTCUSDT', '1h', start_time, limiter, limit=1000)
+
+    assert len(klines) == 2501
+    assert [kline[0] for kline in klines] == list(range(start_time, start_time + 2501 * HOUR_MS, HOUR_MS))
+    assert len(klines_client.requests) == 3
+    assert clock.now == pytest.approx(0.5)
+
+
+def test_cache_ttl_and_tail(clock: FakeClock, klines_client: FakeKlinesClient):
+    """
+    Test that fresh klines are served from the cache and stale klines are only refreshed from their last kline.
+    """
+    klines_client.list_symbols({'BTCUSDT': 500})
+    cache = KlineCache(ttl=60, rate_limiter=RateLimiter(rate=1000), clock=clock)
+    start_time = klines_client.listing_times['BTCUSDT'] + 100 * HOUR_MS
+
+    klines = cache.get_klines(klines_client, 'BTCUSDT', '1h', start_time)
+    assert len(klines) == 401
+    assert len(klines_client.requests) == 1
+
+    clock.now = 30
+    assert cache.get_klines(klines_client, 'BTCUSDT', '1h', start_time) == klines
+    assert len(klines_client.requests) == 1
+
+    clock.now = 61
+    assert cache.get_klines(klines_client, 'BTCUSDT', '1h', start_time + HOUR_MS) == klines[1:]
+    assert klines_client.requests[-1]['startTime'] == klines[-1][0]
+
+    # Older klines than cached need a full fetch.
+    cache.get_klines(klines_client, 'BTCUSDT', '1h', start_time - HOUR_MS)
+    assert klines_client.requests[-1]['startTime'] == start_time - HOUR_MS
+
+
+def test_volatility_snooper(klines_client: FakeKlinesClient):
+    """
+    Test that the snooper gets volatility of every ticker concurrently and reports tickers without enough data.
+    """
+    klines_client.list_symbols({'BTCUSDT': 100, 'ETHUSDT': 100, 'NEWUSDT': 5})
+    cache = KlineCache(rate_limiter=RateLimiter(rate=1000))
+    thread = VolatilitySnooperThread(periods=20, interval='1 Hour', volatility='basic',
+                                     tickers=list(klines_client.listing_times), max_workers=3, kline_cache=cache)
+    thread.binance_client = klines_client
+
+    progress = []
+    thread.signals.progress.connect(progress.append)
+    volatility_dict = thread.snoop()
+
+    assert list(volatility_dict) == ['BTCUSDT', 'ETHUSDT', 'NEWUSDT']
+    assert isinstance(volatility_dict['BTCUSDT'], float)
+    assert volatility_dict['NEWUSDT'] == NOT_ENOUGH_DATA
+    assert progress[-1] == 100
+    assert all(request['startTime'] == thread.get_starting_timestamp() for request in klines_client.requests)
+    assert len(klines_client.requests) == 3
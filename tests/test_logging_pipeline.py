@@ -0,0 +1,110 @@
+"""
+Test the non-blocking logging pipeline.
+"""
+import logging
+import threading
+
+import pytest
+
+from algobot.logging_pipeline import DeferredQueueHandler, LoggingPipeline, RateLimitFilter
+
+
+class ThreadRecorder:
+    """
+    Message argument recording the thread it's formatted in.
+    """
+    def __init__(self):
+        self.thread_name = None
+
+    def __str__(self) -> str:
+        self.thread_name = threading.current_thread().name
+        return 'recorded'
+
+
+@pytest.fixture(name='pipeline')
+def get_pipeline() -> LoggingPipeline:
+    """
+    Get a logging pipeline that's stopped afterwards.
+    """
+    pipeline = LoggingPipeline()
+    yield pipeline
+    pipeline.stop()
+
+
+def get_file_logger(pipeline: LoggingPipeline, name: str, path) -> logging.Logger:
+    """
+    Get a logger writing to the path provided through the pipeline.
+    :param pipeline: Pipeline to log through.
+    :param name: Name of the logger.
+    :param path: Path of the log file.
+    :return: Logger.
+    """
+    logger = logging.getLogger(name)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    handler = logging.FileHandler(str(path), delay=True)
+    handler.setFormatter(logging.Formatter('%(message)s'))
+    pipeline.add_logger(logger, handler)
+    return logger
+
+
+def read_lines(path) -> list:
+    """
+    Read lines of a log file.
+    :param path: Path of the log file.
+    :return: List of lines.
+    """
+    with open(path, encoding='utf-8') as f:
+        return f.read().splitlines()
+
+
+def test_deferred_formatting(pipeline: LoggingPipeline, tmp_path):
+    """
+    Test that records are formatted and written by the listener thread.
+    """
+    logger = get_file_logger(pipeline, 'test_pipeline_deferred', tmp_path / 'deferred.log')
+    recorder = ThreadRecorder()
+    logger.info('Value: %s', recorder)
+    try:
+        raise ValueError('Failure.')
+    except ValueError:
+        logger.exception('Handled %s.', 'error')
+
+    pipeline.flush()
+    lines = read_lines(tmp_path / 'deferred.log')
+    assert lines[:2] == ['Value: recorded', 'Handled error.']
+    assert lines[-1] == 'ValueError: Failure.'
+    assert recorder.thread_name not in (None, threading.current_thread().name)
+
+
+def test_logger_added_again(pipeline: LoggingPipeline, tmp_path):
+    """
+    Test that adding a logger again switches its file without duplicating records.
+    """
+    logger = get_file_logger(pipeline, 'test_pipeline_again', tmp_path / 'first.log')
+    logger.info('First.')
+    logger = get_file_logger(pipeline, 'test_pipeline_again', tmp_path / 'second.log')
+    logger.info('Second.')
+
+    pipeline.flush()
+    assert [isinstance(handler, DeferredQueueHandler) for handler in logger.handlers] == [True]
+    assert read_lines(tmp_path / 'first.log') == ['First.']
+    assert read_lines(tmp_path / 'second.log') == ['Second.']
+
+
+def test_rate_limiting(pipeline: LoggingPipeline, tmp_path):
+    """
+    Test that records above the rate are dropped and counted, and that warnings are never dropped.
+    """
+    logger = get_file_logger(pipeline, 'test_pipeline_rate', tmp_path / 'rate.log')
+    rate_limit_filter = RateLimitFilter(rate=0.001, burst=3)
+    logger.handlers[0].filters = [rate_limit_filter]
+
+    for index in range(5):
+        logger.info('Tick %s.', index)
+    logger.warning('Stop loss hit.')
+
+    pipeline.flush()
+    assert read_lines(tmp_path / 'rate.log') == ['Tick 0.', 'Tick 1.', 'Tick 2.',
+                                                 '[2 messages suppressed by rate limiting]', 'Stop loss hit.']
+    assert rate_limit_filter.suppressed == 0
@@ -0,0 +1,115 @@
+"""
+Test the trading loop profiler with a fake clock.
+"""
+import json
+
+import pytest
+
+from algobot.loop_profiler import LOOP_METRICS_VARIABLE, LoopProfiler, get_loop_metrics_path
+
+
+class FakeClock:
+    """
+    Clock advanced manually.
+    """
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance(self, milliseconds: float):
+        """
+        Advance the clock.
+        :param milliseconds: Milliseconds to advance by.
+        """
+        self.now += milliseconds / 1000
+
+
+@pytest.fixture(name='clock')
+def get_clock() -> FakeClock:
+    """
+    Get a fake clock.
+    """
+    return FakeClock()
+
+
+def run_loops(profiler: LoopProfiler, clock: FakeClock, count: int):
+    """
+    Run loops with a 10 ms data update stage and a 30 ms strategy stage.
+    :param profiler: Profiler to time loops with.
+    :param clock: Clock of the profiler.
+    :param count: Amount of loops to run.
+    """
+    for _ in range(count):
+        profiler.start_loop()
+        with profiler.stage('updateData'):
+            clock.advance(10)
+        with profiler.stage('strategyEvaluation'):
+            clock.advance(30)
+        profiler.end_loop()
+        clock.advance(60)
+
+
+def test_statistics(clock: FakeClock):
+    """
+    Test that stage percentiles, the loop rate, and the dominant stage are computed over the window.
+    """
+    profiler = LoopProfiler(window=10, clock=clock)
+    assert profiler.get_statistics_dictionary() == {'loopRate': 'None', 'loopLatency': 'None',
+                                                    'dominantStage': 'None'}
+
+    run_loops(profiler, clock, 20)
+    statistics = profiler.get_statistics_dictionary()
+    assert statistics['loopRate'] == '10.0 loops/second'
+    assert statistics['loopLatency'] == '40.0 / 40.0 / 40.0 ms (p50 / p95 / p99)'
+    assert statistics['updateDataLatency'] == '10.0 / 10.0 / 10.0 ms (p50 / p95 / p99)'
+    assert statistics['dominantStage'] == 'strategyEvaluation'
+    assert len(profiler.stages['updateData']) == 10
+    assert profiler.loop_count == 20
+
+
+def test_failed_stage(clock: FakeClock):
+    """
+    Test that stages raising exceptions aren't recorded.
+    """
+    profiler = LoopProfiler(clock=clock)
+    with pytest.raises(ValueError):
+        with profiler.stage('updateData'):
+            raise ValueError('No connection.')
+
+    assert 'updateData' not in profiler.stages
+
+
+def test_metrics_file(clock: FakeClock, tmp_path):
+    """
+    Test that metrics are written at most once per metrics interval.
+    """
+    metrics_path = str(tmp_path / 'live_loop.json')
+    assert LoopProfiler(clock=clock).write_metrics_if_due() is False
+
+    profiler = LoopProfiler(metrics_path=metrics_path, metrics_interval=1, clock=clock)
+    run_loops(profiler, clock, 5)
+    assert profiler.write_metrics_if_due() is True
+    assert profiler.write_metrics_if_due() is False
+
+    with open(metrics_path, encoding='utf-8') as f:
+        metrics = json.load(f)
+    assert metrics['loops'] == 5
+    assert metrics['stages']['strategyEvaluation']['p99'] == pytest.approx(30)
+    assert metrics['dominantStage'] == 'strategyEvaluation'
+
+    run_loops(profiler, clock, 10)
+    assert profiler.write_metrics_if_due() is True
+
+
+def test_metrics_path(monkeypatch, tmp_path):
+    """
+    Test that metrics files are only used when enabled through the environment.
+    """
+    monkeypatch.setattr('algobot.loop_profiler.create_folder', lambda _folder: str(tmp_path))
+    monkeypatch.delenv(LOOP_METRICS_VARIABLE, raising=False)
+    assert get_loop_metrics_path('Live') is None
+
+    monkeypatch.setenv(LOOP_METRICS_VARIABLE, '1')
+    assert get_loop_metrics_path('Live') == str(tmp_path / 'live_loop.json')
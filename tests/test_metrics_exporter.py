@@ -0,0 +1,88 @@
+"""
+Test the metrics exporter.
+"""
+import urllib.request
+from types import SimpleNamespace
+
+import pytest
+
+from algobot.metrics_exporter import MetricsExporter, get_memory_usage, get_quantile_samples, get_used_weight
+from algobot.rate_limiter import RateLimiter
+
+LABELS = {'caller': 'live', 'symbol': 'BTCUSDT'}
+
+
+@pytest.fixture(name='exporter')
+def get_exporter() -> MetricsExporter:
+    """
+    Get a metrics exporter with its own rate limiter.
+    """
+    rate_limiter = RateLimiter(rate=100, sleep=lambda _seconds: None)
+    rate_limiter.acquire(5)
+    rate_limiter.acquire(2)
+
+    exporter = MetricsExporter(rate_limiter=rate_limiter)
+    exporter.update('Live', [
+        ('algobot_net', LABELS, 1050.5),
+        ('algobot_position', LABELS, -1),
+        ('algobot_api_used_weight', LABELS, None),
+        *get_quantile_samples('algobot_loop_latency_milliseconds', LABELS, {'p50': 12.5, 'p99': 40}),
+    ])
+    yield exporter
+    exporter.stop()
+
+
+def test_render(exporter: MetricsExporter):
+    """
+    Test that samples are rendered in the Prometheus text format, skipping samples without values.
+    """
+    lines = exporter.render().splitlines()
+    assert 'algobot_net{caller="live",symbol="BTCUSDT"} 1050.5' in lines
+    assert 'algobot_position{caller="live",symbol="BTCUSDT"} -1.0' in lines
+    assert 'algobot_loop_latency_milliseconds{caller="live",symbol="BTCUSDT",quantile="0.99"} 40.0' in lines
+    assert lines.count('# TYPE algobot_loop_latency_milliseconds gauge') == 1
+    assert 'algobot_rate_limited_requests_total 2.0' in lines
+    assert 'algobot_rate_limited_weight_total 7.0' in lines
+    assert not any(line.startswith('algobot_api_used_weight') for line in lines)
+
+    exporter.update('Simulation', [('algobot_net', {'symbol': 'A"B'}, 1)])
+    assert 'algobot_net{symbol="A\\"B"} 1.0' in exporter.render().splitlines()
+
+    exporter.remove('Live')
+    assert 'caller="live"' not in exporter.render()
+
+
+@pytest.mark.enable_socket
+def test_server(exporter: MetricsExporter):
+    """
+    Test that metrics are served over HTTP on localhost.
+    """
+    assert not exporter.enabled
+    port = exporter.start_server(0)
+    assert exporter.enabled
+
+    with urllib.request.urlopen(f'http://127.0.0.1:{port}/metrics', timeout=5) as response:
+        assert response.headers['Content-Type'].startswith('text/plain')
+        assert 'algobot_net{caller="live",symbol="BTCUSDT"} 1050.5' in response.read().decode('utf-8').splitlines()
+
+
+def test_file(exporter: MetricsExporter, tmp_path):
+    """
+    Test that metrics are written to the metrics file.
+    """
+    exporter.file_path = str(tmp_path / 'metrics.prom')
+    exporter.write_file()
+    with open(exporter.file_path, encoding='utf-8') as f:
+        assert 'algobot_position{caller="live",symbol="BTCUSDT"} -1.0' in f.read().splitlines()
+
+
+def test_helpers():
+    """
+    Test used weight and memory helpers.
+    """
+    assert get_used_weight(object()) is None
+    client = SimpleNamespace(response=SimpleNamespace(headers={'x-sapi-used-ip-weight-1m': '30'}))
+    assert get_used_weight(client) == 30
+
+    memory = get_memory_usage()
+    assert memory is None or memory > 0
@@ -0,0 +1,168 @@
+"""
+Test optimizer results store.
+"""
+import os
+
+import pandas as pd
+import pytest
+
+from algobot.optimizer_store import OPTIMIZER_HEADERS, OptimizerStore
+
+
+def get_row(run: int, profit_percentage: float = 5.5) -> dict:
+    """
+    Get a dummy optimizer row.
+    :param run: Run number of row.
+    :param profit_percentage: Profit percentage of row.
+    :return: Dictionary containing optimizer row.
+    """
+    return {
+        'run': run,
+        'total_runs': 10,
+        'profit_percentage': profit_percentage,
+        'stop_loss_strategy': 'Trailing Loss',
+        'stop_loss_percentage': 5.0,
+        'take_profit_strategy': 'None',
+        'take_profit_percentage': None,
+        'ticker': 'BTCUSDT',
+        'interval': '1 Hour',
+        'strategy_interval': '1 Hour',
+        'trades': 3,
+        'result': 'PASSED',
+        'strategy': 'Strategies: Test',
+        'settings': OptimizerStore.serialize_settings({'lossType': 'Trailing', 'lossPercentage': 5})
+    }
+
+
+@pytest.fixture(name='store', params=['sqlite', 'parquet'])
+def get_store(tmp_path, request) -> OptimizerStore:
+    """
+    Get an optimizer store in a temporary directory storing results in SQLite, or Parquet if pyarrow is installed.
+    """
+    if request.param == 'parquet':
+        pytest.importorskip('pyarrow')
+    return OptimizerStore(os.path.join(tmp_path, 'optimizer.db'), parquet=request.param == 'parquet')
+
+
+def test_insert_and_count(store: OptimizerStore):
+    """
+    Test inserting rows and counting them.
+    """
+    assert store.get_row_count() == 0
+
+    store.insert_row(get_row(1))
+    store.insert_rows([get_row(2), get_row(3)])
+    assert store.get_row_count() == 3
+
+    # Re-inserting an existing run should replace it instead of duplicating it.
+    store.insert_row(get_row(3, profit_percentage=-1))
+    assert store.get_row_count() == 3
+
+
+def test_get_dataframe_is_typed(store: OptimizerStore):
+    """
+    Test that numeric columns are stored as numbers and not formatted strings.
+    """
+    store.insert_rows([get_row(2, 1.25), get_row(1, 10)])
+    df = store.get_dataframe(order_by='profit_percentage', descending=True)
+
+    assert list(df['run']) == [1, 2]
+    assert list(df['profit_percentage']) == [10, 1.25]
+    assert df['trades'].dtype.kind == 'i'
+    assert df['take_profit_percentage'].isna().all()
+
+    with pytest.raises(ValueError, match="Invalid column to order by"):
+        store.get_dataframe(order_by='bad; DROP TABLE')
+
+
+def test_export_csv(store: OptimizerStore, tmp_path):
+    """
+    Test exporting optimizer results to CSV.
+    """
+    store.insert_rows([get_row(1), get_row(2)])
+    file_path = os.path.join(tmp_path, 'results.csv')
+    store.export(file_path, 'CSV')
+
+    df = pd.read_csv(file_path)
+    assert list(df.columns) == list(OPTIMIZER_HEADERS.values())
+    assert list(df['Run']) == [1, 2]
+
+    with pytest.raises(TypeError, match="Invalid type of file type provided."):
+        store.export(file_path, 'TXT')
+
+
+def test_checkpointing(store: OptimizerStore):
+    """
+    Test that added rows are buffered and written to disk once a checkpoint is due.
+    """
+    store.checkpoint_size = 3
+    store.checkpoint_seconds = 3600
+
+    store.add_row(get_row(1))
+    store.add_row(get_row(2))
+    assert store.get_completed_runs() == set()
+
+    store.add_row(get_row(3))
+    assert store.get_completed_runs() == {1, 2, 3}
+
+    store.add_row(get_row(4))
+    store.checkpoint()
+    assert store.get_completed_runs() == {1, 2, 3, 4}
+
+
+def test_sessions(store: OptimizerStore):
+    """
+    Test that matching sessions are resumed and different sessions clear previous results.
+    """
+    assert store.start_session('abc', {'combos': {}}, 10) is False
+    store.insert_rows([get_row(1), get_row(2)])
+
+    assert store.start_session('abc', {'combos': {}}, 10) is True
+    assert [row['run'] for row in store.get_rows()] == [1, 2]
+    assert store.get_session()['specification'] == {'combos': {}}
+
+    assert store.start_session('abc', {'combos': {}}, 10, resume=False) is False
+    assert store.get_completed_runs() == set()
+
+    store.insert_row(get_row(1))
+    assert store.start_session('def', {'combos': {}}, 10) is False
+    assert store.get_completed_runs() == set()
+    assert store.get_session()['session_id'] == 'def'
+
+
+def test_parquet_checkpoints(tmp_path):
+    """
+    Test that checkpoints are written to Parquet files with typed columns, and new sessions remove them.
+    """
+    pq = pytest.importorskip('pyarrow.parquet')
+    store = OptimizerStore(os.path.join(tmp_path, 'optimizer.db'), checkpoint_size=2)
+    store.start_session('abc', {'combos': {}}, 10)
+    for run in (1, 2, 3):
+        store.add_row(get_row(run))
+    store.checkpoint()
+
+    files = store.get_parquet_files()
+    assert len(files) == 2
+    schema = pq.read_schema(files[0])
+    assert str(schema.field('trades').type) == 'int64' and str(schema.field('profit_percentage').type) == 'double'
+    assert store.get_rows() == [get_row(1), get_row(2), get_row(3)]
+
+    file_path = os.path.join(tmp_path, 'results.parquet')
+    store.export(file_path, 'PARQUET')
+    df = pd.read_parquet(file_path)
+    assert list(df.columns) == list(OPTIMIZER_HEADERS.values())
+    assert list(df['Run']) == [1, 2, 3]
+
+    store.start_session('def', {'combos': {}}, 10)
+    assert store.get_parquet_files() == [] and store.get_row_count() == 0
+
+
+def test_sqlite_fallback(tmp_path):
+    """
+    Test that results are stored in the database when Parquet isn't used.
+    """
+    store = OptimizerStore(os.path.join(tmp_path, 'optimizer.db'), parquet=False)
+    store.insert_rows([get_row(1)])
+    assert store.parquet_directory is None
+    assert not os.path.exists(os.path.join(tmp_path, 'optimizer_optimizer_results'))
+    assert store.get_rows() == [get_row(1)]
@@ -0,0 +1,117 @@
+"""
+Test order latency histograms and their instrumentation of real traders.
+"""
+import sqlite3
+from contextlib import closing
+from unittest import mock
+
+import pytest
+
+from algobot.order_latency import LatencyHistogram, OrderLatencyTracker
+from algobot.trade_journal import TradeJournal
+from algobot.trade_statistics import GroupedStatistics
+from algobot.traders.real_trader import RealTrader
+from tests.binance_client_mocker import PRICE, BinanceAccountMockClient, BinanceMockClient
+
+SYMBOL = 'ALGOBOTUSDT'
+
+
+@pytest.fixture(name='trader')
+def get_trader(tmp_path) -> RealTrader:
+    """
+    Get a cross margin real trader with the fake client writing to a trade journal.
+    """
+    with mock.patch('binance.client.Client', BinanceMockClient), \
+            mock.patch('algobot.traders.real_trader.Client', BinanceAccountMockClient):
+        trader = RealTrader(api_key='key', api_secret='secret', symbol=SYMBOL, load_data=False)
+
+    trader.trade_journal = TradeJournal(str(tmp_path / 'journal.db'))
+    return trader
+
+
+def test_histogram_percentiles():
+    """
+    Test that percentiles are interpolated inside buckets and clamped to the latencies seen.
+    """
+    histogram = LatencyHistogram(buckets=(10, 100))
+    assert histogram.get_percentile(50) is None
+    assert histogram.get_mean() is None
+
+    for latency in (2, 4, 6, 8, 50, 60, 70, 80, 90, 500):
+        histogram.add(latency)
+
+    assert histogram.counts == [4, 5, 1]
+    assert histogram.get_mean() == 87
+    assert histogram.get_percentile(50) == pytest.approx(10 + 90 * 1 / 5)
+    assert histogram.get_percentile(99) == pytest.approx(100 + 400 * 0.9)
+    assert histogram.get_percentile(0) == 2
+    assert histogram.get_percentile(100) == 500
+
+
+def test_tracker_statistics():
+    """
+    Test that the tracker formats percentiles per endpoint and stage and signs slippage by side.
+    """
+    tracker = OrderLatencyTracker()
+    tracker.add_timings('createMarginOrder', {'signal': 1, 'request': 80, 'fill': None})
+    tracker.add_slippage('BUY', 100, 101)
+    tracker.add_slippage('SELL', 100, 99)
+    tracker.add_slippage('SELL', 100, None)
+
+    statistics = tracker.get_statistics_dictionary()
+    assert statistics['averageSlippagePercentage'] == '1.0%'
+    assert statistics['createMarginOrderRequestCount'] == '1'
+    assert statistics['createMarginOrderRequestLatency'] == '80 / 80 / 80 ms (p50 / p95 / p99)'
+    assert 'createMarginOrderFillCount' not in statistics
+
+
+def test_real_trader_instrumentation(trader: RealTrader):
+    """
+    Test that orders of real traders are timed per endpoint, and timings are written to the trade journal.
+    """
+    with mock.patch('algobot.traders.real_trader.time.sleep'):
+        trader.buy_long('Bought long.', coin=2)
+        trader.sell_long('Sold long.')
+
+    histograms = trader.order_latency.histograms
+    assert {key for key in histograms if key[0] == 'createMarginOrder'} == {
+        ('createMarginOrder', 'signal'), ('createMarginOrder', 'request'), ('createMarginOrder', 'fill')
+    }
+    assert histograms['createMarginOrder', 'request'].count == 2
+    assert trader.order_latency.get_average_slippage() == 0
+
+    rows = trader.trade_journal.get_rows()
+    assert [row['fill_price'] for row in rows] == [PRICE, PRICE]
+    assert all(row['signal_latency'] >= 0 and row['request_latency'] >= 0 for row in rows)
+
+    statistics = trader.get_grouped_statistics()['orderLatency']
+    assert statistics['createMarginOrderSignalCount'] == '2'
+
+    grouped_statistics = GroupedStatistics()
+    trader.update_grouped_statistics(grouped_statistics)
+    assert grouped_statistics.values['orderLatency'] == statistics
+    with mock.patch.object(trader.order_latency, 'get_statistics_dictionary') as get_statistics_dictionary:
+        trader.update_grouped_statistics(grouped_statistics)
+        get_statistics_dictionary.assert_not_called()  # Only rebuilt once latencies are added.
+
+        trader.order_latency.add_slippage('BUY', PRICE, PRICE * 1.01)
+        trader.update_grouped_statistics(grouped_statistics)
+        get_statistics_dictionary.assert_called_once()
+
+
+def test_journal_migration(tmp_path):
+    """
+    Test that journals created before the latency columns existed get them added.
+    """
+    database_file = str(tmp_path / 'journal.db')
+    with closing(sqlite3.connect(database_file)) as connection:
+        connection.execute('CREATE TABLE trades(id INTEGER PRIMARY KEY AUTOINCREMENT, time REAL NOT NULL, '
+                           'symbol TEXT NOT NULL, price REAL);')
+        connection.execute("INSERT INTO trades(time, symbol, price) VALUES (1, 'BTCUSDT', 100);")
+        connection.commit()
+
+    journal = TradeJournal(database_file)
+    journal.add_trade({'time': 2, 'symbol': 'BTCUSDT', 'fill_price': 101, 'request_latency': 50})
+    rows = journal.get_rows()
+    assert rows[0]['fill_price'] is None
+    assert rows[1]['fill_price'] == 101 and rows[1]['request_latency'] == 50
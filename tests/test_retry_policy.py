@@ -0,0 +1,195 @@
+"""
+Test the retry policy and the fallbacks of data objects and account snapshots with a fake clock.
+"""
+import threading
+from typing import List
+from unittest import mock
+
+import pytest
+
+from algobot.data import Data
+from algobot.retry_policy import CLOSED, HALF_OPEN, OPEN, CircuitOpenError, RetryPolicy
+from algobot.traders.account_snapshot import MARGIN, AccountSnapshot
+from tests.binance_client_mocker import BinanceMockClient
+
+
+class FakeClock:
+    """
+    Monotonic clock whose sleeps advance time instantly.
+    """
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps: List[float] = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float):
+        """
+        Advance the clock.
+        :param seconds: Seconds to advance by.
+        """
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class FlakyFunction:
+    """
+    Function that raises the amount of times provided before returning.
+    """
+    def __init__(self, failures: int):
+        self.failures = failures
+        self.calls = 0
+
+    def __call__(self, value=None, **_kwargs):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise ConnectionError('Connection reset.')
+        return value
+
+
+def get_policy(clock: FakeClock, states: list = None) -> RetryPolicy:
+    """
+    Get a retry policy with the fake clock and jitter at its midpoint.
+    """
+    return RetryPolicy(max_attempts=4, base_delay=1, max_delay=3, failure_threshold=6, reset_timeout=30,
+                       on_state_change=None if states is None else states.append, sleep=clock.sleep, clock=clock,
+                       random_function=lambda: 0.5)
+
+
+def test_backoff():
+    """
+    Test that calls are retried with capped exponential backoff and give up after the max attempts.
+    """
+    clock = FakeClock()
+    policy = get_policy(clock)
+    function = FlakyFunction(failures=2)
+    assert policy.call(function, value='price') == 'price'
+    assert clock.sleeps == [0.75, 1.5]
+    assert policy.failure_count == 0
+
+    function = FlakyFunction(failures=4)
+    with pytest.raises(ConnectionError):
+        policy.call(function)
+    assert function.calls == 4
+    assert clock.sleeps[2:] == [0.75, 1.5, 2.25]
+
+    function = FlakyFunction(failures=1)
+    with pytest.raises(ConnectionError):
+        policy.call(function, attempts=1)
+    assert function.calls == 1
+
+
+def test_circuit_breaker():
+    """
+    Test that the circuit opens after consecutive failures, fails fast while open, and closes after a trial succeeds.
+    """
+    clock = FakeClock()
+    states = []
+    policy = get_policy(clock, states)
+    function = FlakyFunction(failures=100)
+    with pytest.raises(ConnectionError):
+        policy.call(function)
+    with pytest.raises(ConnectionError):
+        policy.call(function)  # Opens after the second of its attempts.
+    assert function.calls == 6
+    assert policy.get_state() == OPEN and policy.degraded
+    assert states == [OPEN]
+
+    with pytest.raises(CircuitOpenError):
+        policy.call(function)
+    assert function.calls == 6
+
+    clock.now += 30
+    assert policy.get_state() == HALF_OPEN
+    with pytest.raises(ConnectionError):
+        policy.call(function)  # A failed trial isn't retried and opens the circuit again.
+    assert function.calls == 7
+    assert policy.get_state() == OPEN
+
+    clock.now += 30
+    function.failures = 0
+    assert policy.call(function, value=1) == 1
+    assert policy.get_state() == CLOSED and not policy.degraded
+    assert states == [OPEN, CLOSED]
+
+
+def test_single_trial():
+    """
+    Test that only one caller makes the trial call of a half open circuit while concurrent callers fail fast.
+    """
+    clock = FakeClock()
+    policy = get_policy(clock)
+    policy.record_failure()
+    policy.opened_time = clock.now  # Open the circuit.
+    clock.now += 30
+    assert policy.get_state() == HALF_OPEN
+
+    trial_started = threading.Event()
+    release_trial = threading.Event()
+
+    def trial():
+        trial_started.set()
+        assert release_trial.wait(timeout=5)
+        return 'trial'
+
+    results = []
+    thread = threading.Thread(target=lambda: results.append(policy.call(trial)))
+    thread.start()
+    assert trial_started.wait(timeout=5)
+
+    function = FlakyFunction(failures=0)
+    for _ in range(3):
+        with pytest.raises(CircuitOpenError):
+            policy.call(function)
+    assert function.calls == 0
+
+    release_trial.set()
+    thread.join(timeout=5)
+    assert results == ['trial']
+    assert policy.get_state() == CLOSED and not policy.trial_in_flight
+    assert policy.call(function, value=1) == 1
+
+
+def test_data_fallback():
+    """
+    Test that data objects fall back to their last known price and values once Binance is unreachable.
+    """
+    with mock.patch('binance.client.Client', BinanceMockClient):
+        data = Data(interval='1h', symbol='ALGOBOTUSDT', load_data=False)
+
+    clock = FakeClock()
+    data.retry_policy = get_policy(clock)
+    with mock.patch.object(data.binance_client, 'get_symbol_ticker', FlakyFunction(failures=100)):
+        with pytest.raises(ConnectionError):
+            data.get_current_price()  # There is no last known price yet.
+
+    price = data.get_current_price()
+    with mock.patch.object(data.binance_client, 'get_symbol_ticker', FlakyFunction(failures=100)):
+        assert data.get_current_price() == price
+        assert data.get_current_price() == price  # Opens the circuit.
+        assert data.retry_policy.degraded
+        assert data.get_current_price() == price
+
+    data.current_values['close'] = 5
+    with mock.patch.object(data, 'data_is_updated', FlakyFunction(failures=1)):
+        assert data.get_current_data() is data.current_values
+
+
+def test_account_snapshot_fallback():
+    """
+    Test that only stale lookups use the last assets fetched while fetches fail, and that lookups after a fill never
+    return assets from before it.
+    """
+    assets = {'USDT': {'free': '100'}}
+    fetch = mock.Mock(side_effect=[assets, ConnectionError('Connection reset.'), ConnectionError('Connection reset.'),
+                                   {'USDT': {'free': '50'}}])
+    snapshot = AccountSnapshot(fetch, mock.Mock())
+    assert snapshot.get_margin_asset('USDT')['free'] == '100'
+
+    snapshot.invalidate()  # Balances changed with a fill.
+    with pytest.raises(ConnectionError):
+        snapshot.get_margin_asset('USDT')
+    assert snapshot.get_assets(MARGIN, allow_stale=True) is assets
+    assert snapshot.get_margin_asset('USDT')['free'] == '50'
+    assert fetch.call_count == 4
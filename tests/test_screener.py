@@ -0,0 +1,143 @@
+"""
+Test cross-sectional screener.
+"""
+from datetime import datetime, timedelta, timezone
+from typing import Dict
+
+import numpy as np
+import pytest
+import talib
+from talib import abstract
+
+from algobot.candle_cache import CandleCache, get_candle_cache_file
+from algobot.enums import ENTER_LONG, EXIT_LONG
+from algobot.screener import (CandleMatrix, get_cached_symbols, get_strategy_values, load_candle_matrix,
+                              screen_indicator, screen_strategies)
+
+PERIODS = 100
+END = datetime(2021, 1, 10, tzinfo=timezone.utc)
+
+# Slope of the close prices and amount of hourly candles of every symbol. The newest symbol doesn't have enough candles
+#  for indicators and the stale symbol stopped trading two hours before the others.
+SYMBOLS = {'UPUSDT': (1, 150), 'FLATUSDT': (0, 150), 'DOWNUSDT': (-1, 150), 'NEWUSDT': (1, 10)}
+
+
+def get_closes(slope: float, count: int) -> np.ndarray:
+    """
+    Get close prices trending with the slope provided plus some noise.
+    :param slope: Slope of the trend.
+    :param count: Amount of close prices.
+    :return: Array of close prices.
+    """
+    return 500 + slope * np.arange(count) + 3 * np.sin(np.arange(count))
+
+
+def write_candles(database_folder: str, symbol: str, closes: np.ndarray, end: datetime = END):
+    """
+    Write hourly candles with the close prices provided to the candle store.
+    :param database_folder: Folder of the candle store.
+    :param symbol: Symbol of the candles.
+    :param closes: Close prices.
+    :param end: Open date of the last candle.
+    """
+    data = [{
+        'date_utc': end - timedelta(hours=len(closes) - 1 - index),
+        'open': close - 0.5,
+        'high': close + 1,
+        'low': close - 1,
+        'close': close,
+        'volume': 100.0,
+        'quote_asset_volume': 100.0 * close,
+        'number_of_trades': 10.0,
+        'taker_buy_base_asset': 50.0,
+        'taker_buy_quote_asset': 50.0 * close,
+    } for index, close in enumerate(closes)]
+    CandleCache(get_candle_cache_file(database_folder, symbol, '1h')).write(data)
+
+
+@pytest.fixture(name='closes')
+def get_all_closes(tmp_path) -> Dict[str, np.ndarray]:
+    """
+    Write candles of every test symbol to a temporary candle store.
+    """
+    closes = {symbol: get_closes(slope, count) for symbol, (slope, count) in SYMBOLS.items()}
+    for symbol, symbol_closes in closes.items():
+        write_candles(str(tmp_path), symbol, symbol_closes)
+
+    closes['STALEUSDT'] = get_closes(1, 150)
+    write_candles(str(tmp_path), 'STALEUSDT', closes['STALEUSDT'], end=END - timedelta(hours=2))
+    return closes
+
+
+@pytest.fixture(name='matrix')
+def get_matrix(tmp_path, closes) -> CandleMatrix:  # pylint: disable=unused-argument
+    """
+    Get a candle matrix of every test symbol.
+    """
+    return load_candle_matrix('1h', periods=PERIODS, database_folder=str(tmp_path))
+
+
+def test_load_candle_matrix(tmp_path, matrix: CandleMatrix, closes: Dict[str, np.ndarray]):
+    """
+    Test that candles are aligned by open time and missing periods are NaN.
+    """
+    assert get_cached_symbols('1h', str(tmp_path)) == ['DOWNUSDT', 'FLATUSDT', 'NEWUSDT', 'STALEUSDT', 'UPUSDT']
+    assert get_cached_symbols('15m', str(tmp_path)) == []
+    assert matrix.symbols == get_cached_symbols('1h', str(tmp_path))
+    assert matrix.arrays['close'].shape == (5, PERIODS)
+    assert matrix.timestamps[-1] == END.timestamp() * 1000
+
+    rows = {symbol: row for row, symbol in enumerate(matrix.symbols)}
+    np.testing.assert_array_equal(matrix.arrays['close'][rows['UPUSDT']], closes['UPUSDT'][-PERIODS:])
+    np.testing.assert_array_equal(matrix.arrays['close'][rows['STALEUSDT'], :-2], closes['STALEUSDT'][-PERIODS + 2:])
+    assert np.isnan(matrix.arrays['close'][rows['STALEUSDT'], -2:]).all()
+    assert np.isnan(matrix.arrays['close'][rows['NEWUSDT'], :-10]).all()
+    assert list(matrix.starts) == [0, 0, PERIODS - 10, PERIODS, 0]
+
+
+def test_screen_indicator(matrix: CandleMatrix, closes: Dict[str, np.ndarray]):
+    """
+    Test that symbols are ranked by the latest indicator values computed per symbol by TALIB.
+    """
+    df = screen_indicator(matrix, 'RSI', timeperiod=14)
+    assert list(df['Symbol']) == ['UPUSDT', 'FLATUSDT', 'DOWNUSDT', 'NEWUSDT', 'STALEUSDT']
+    assert list(df.index) == [1, 2, 3, 4, 5]
+    assert df['RSI(14) - Close'].iloc[0] == pytest.approx(talib.RSI(closes['UPUSDT'][-PERIODS:], timeperiod=14)[-1])
+    assert df['RSI(14) - Close'].iloc[3:].isna().all()
+
+    df = screen_indicator(matrix, 'BBANDS', output='lowerband', ascending=True, timeperiod=5, matype=1)
+    expected = abstract.Function('BBANDS')({'close': closes['DOWNUSDT'][-PERIODS:]}, timeperiod=5, matype=1)[2]
+    assert df['Symbol'].iloc[0] == 'DOWNUSDT'
+    assert df['lowerband(5) - Close'].iloc[0] == pytest.approx(expected[-1])
+
+
+def test_screen_strategies(matrix: CandleMatrix):
+    """
+    Test that strategies loaded from JSON rank symbols with a trend first and share indicators.
+    """
+    sma = abstract.Function('SMA').info
+    json_strategy = {
+        'name': 'Trend',
+        ENTER_LONG: {'a': {**sma, 'operator': '>', 'against': 'current_price'}},
+        EXIT_LONG: {'b': {**sma, 'operator': '<', 'against': 'current_price'}},
+    }
+    values = get_strategy_values(json_strategy)
+    assert values[ENTER_LONG]['a']['against'] == 'Close'
+    assert values[ENTER_LONG]['a']['output'] == (None, 'real')
+
+    # Reverse of the first strategy with a shorter moving average.
+    reverse = get_strategy_values({**json_strategy, 'name': 'Reverse'})
+    reverse[ENTER_LONG]['a']['timeperiod'] = 10
+
+    results = screen_strategies(matrix, {'Trend': values, 'Reverse': reverse})
+    df = results['Trend'].set_index('Symbol')
+    assert list(results['Trend']['Symbol'][3:]) == ['NEWUSDT', 'STALEUSDT']
+    assert results['Trend']['Streak'][:3].is_monotonic_increasing
+    assert df.loc['DOWNUSDT', 'Trend'] == ENTER_LONG and df.loc['DOWNUSDT', 'Streak'] > 10
+    assert df.loc['UPUSDT', 'Trend'] == EXIT_LONG and df.loc['UPUSDT', 'Streak'] > 10
+    assert df.loc['FLATUSDT', 'Streak'] < 10  # Flat prices keep crossing their moving average.
+    assert df['Trend'].iloc[3:].isna().all()
+    assert df['Streak'].iloc[3:].isna().all()
+    assert list(results['Trend'].columns) == ['Symbol', 'Close', 'Trend', 'Streak', 'SMA(30) - Close']
+    assert list(results['Reverse'].columns) == ['Symbol', 'Close', 'Trend', 'Streak', 'SMA(10) - Close',
+                                                'SMA(30) - Close']
@@ -0,0 +1,156 @@
+"""
+Test compiled strategy plans.
+"""
+import os
+
+import pandas as pd
+import pytest
+
+from algobot.enums import BEARISH, BULLISH, ENTER_LONG, ENTER_SHORT, EXIT_LONG, EXIT_SHORT
+from algobot.helpers import load_from_csv
+from algobot.strategies.custom import CustomStrategy
+from algobot.strategies.plan import (LOOKBACKS, StrategyPlan, StrategySetPlan, get_lookback, get_probe_lookback,
+                                     get_trend_from_true_trends)
+
+data_path = os.path.join(os.path.dirname(__file__), 'data', '1INCHUSDT_data_1m.csv')
+test_df = pd.DataFrame(load_from_csv(path=data_path, descending=False)[:300])
+test_df['high/low'] = (test_df['high'] + test_df['low']) / 2
+test_df['open/close'] = (test_df['open'] + test_df['close']) / 2
+
+
+def get_strategy_values() -> dict:
+    """
+    Get strategy values comparing indicators against prices, constants, and other indicators.
+    :return: Strategy values dictionary.
+    """
+    return {
+        'name': 'Plan Test',
+        ENTER_LONG: {
+            'a': {'indicator': 'SMA', 'operator': '>', 'against': 'Close', 'price': 'Open', 'timeperiod': 5,
+                  'output': 'real'},
+            'b': {'indicator': 'SMA', 'operator': '>=', 'price': 'Close', 'timeperiod': 10, 'output': 'real',
+                  'against': {'indicator': 'SMA', 'price': 'Close', 'timeperiod': 20, 'output': 'real'}},
+        },
+        EXIT_LONG: {
+            'c': {'indicator': 'SMA', 'operator': '<', 'against': 'High/Low', 'price': 'Close', 'timeperiod': 5,
+                  'output': 'real'},
+        },
+        ENTER_SHORT: {
+            'd': {'indicator': 'BBANDS', 'operator': '<', 'against': 'Close', 'price': 'Close', 'timeperiod': 10,
+                  'nbdevup': 2.0, 'nbdevdn': 2.0, 'matype': 'Simple Moving Average',
+                  'output': 'upperband'},
+        },
+    }
+
+
+def test_plan_compilation():
+    """
+    Test that plans deduplicate indicators and only contain trends with comparisons.
+    """
+    plan = StrategyPlan(CustomStrategy(trader=None, values=get_strategy_values()).values)
+
+    assert list(plan.trends) == [ENTER_LONG, EXIT_LONG, ENTER_SHORT]
+    assert plan.get_labels() == ['SMA(5) - Open', 'SMA(10) - Close', 'SMA(20) - Close', 'SMA(5) - Close',
+                                 'upperband(10) - Close']
+    assert plan.trends[ENTER_LONG][1].against_indicator is plan.indicators['SMA', 'close', (('timeperiod', 20),), None]
+    assert plan.trends[EXIT_LONG][0].against_price == 'high/low'
+
+    values = get_strategy_values()
+    values[EXIT_SHORT] = {'e': {'indicator': 'SMA', 'operator': '=>', 'against': 5, 'price': 'Close',
+                                'timeperiod': 5, 'output': 'real'}}
+    with pytest.raises(ValueError, match="Invalid operator => provided."):
+        CustomStrategy(trader=None, values=values)
+
+
+def test_trend_array_matches_ticks():
+    """
+    Test that evaluating whole arrays gives the same trends as evaluating every tick.
+    """
+    strategy = CustomStrategy(trader=None, values=get_strategy_values())
+    trend_array = strategy.plan.get_trend_array(test_df.to_dict('series'))
+
+    tick_trends = []
+    for index in range(len(test_df)):
+        input_arrays_dict = test_df.iloc[:index + 1].reset_index(drop=True).to_dict('series')
+        tick_trends.append(strategy.get_trend(input_arrays_dict) if index >= 20 else None)
+
+    assert list(trend_array[20:]) == tick_trends[20:]
+    assert len({trend for trend in tick_trends if trend is not None}) > 1
+
+
+@pytest.mark.parametrize(
+    'signature, expected',
+    [
+        (('SMA', 'close', (('timeperiod', 20),), None), 19),
+        (('SMA', 'close', (('timeperiod', 700),), None), 699),
+        (('RSI', 'close', (('timeperiod', 14),), None), 14),
+        (('BBANDS', 'close', (('matype', 0), ('nbdevdn', 2.0), ('nbdevup', 2.0), ('timeperiod', 10)), 0), 9),
+    ]
+)
+def test_get_lookback(signature, expected):
+    """
+    Test that lookbacks match probing, including indicators needing more than the initial probe periods.
+    """
+    assert get_lookback(signature) == expected
+    assert LOOKBACKS[signature] == expected
+    assert get_probe_lookback(signature) == expected
+
+
+def test_min_option_period():
+    """
+    Test that the minimum option period is the largest indicator lookback plus one.
+    """
+    strategy = CustomStrategy(trader=None, values=get_strategy_values())
+    assert strategy.get_min_option_period() == 20
+
+    values = get_strategy_values()
+    values[ENTER_LONG]['a']['timeperiod'] = 600
+    assert CustomStrategy(trader=None, values=values).get_min_option_period() == 600
+
+
+def test_strategy_set_plan():
+    """
+    Test that indicators are shared by signature across strategies and trends.
+    """
+    first_values = get_strategy_values()
+    second_values = get_strategy_values()
+    second_values['name'] = 'Plan Test 2'
+    second_values[ENTER_SHORT]['d']['nbdevup'] = 3.0  # Same label as the first strategy's BBANDS, different signature.
+
+    first = CustomStrategy(trader=None, values=first_values)
+    second = CustomStrategy(trader=None, values=second_values)
+    set_plan = StrategySetPlan({first.name: first.plan, second.name: second.plan})
+
+    assert len(set_plan.indicators) == 6
+    assert set_plan.get_total_usages() == 10
+    assert 'Shared indicator plan: 6 unique indicator(s) for 10 usage(s) across 2 strateg(ies).' in \
+           set_plan.get_report()
+
+    input_arrays_dict = test_df.to_dict('series')
+    trend_arrays = set_plan.get_trend_arrays(input_arrays_dict)
+    assert list(trend_arrays[first.name]) == list(first.plan.get_trend_array(input_arrays_dict))
+    assert list(trend_arrays[second.name]) == list(second.plan.get_trend_array(input_arrays_dict))
+
+    # Per tick, strategies sharing a cache only compute shared indicators once.
+    cache = {}
+    first.get_trend(input_arrays_dict, cache)
+    assert len(cache) == 5
+    second.get_trend(input_arrays_dict, cache)
+    assert len(cache) == 6
+
+
+@pytest.mark.parametrize(
+    'true_trends, expected',
+    [
+        ([], None),
+        ([ENTER_LONG], ENTER_LONG),
+        ([EXIT_LONG, ENTER_SHORT], BEARISH),
+        ([ENTER_LONG, EXIT_SHORT], BULLISH),
+        ([ENTER_LONG, EXIT_LONG], None),
+    ]
+)
+def test_get_trend_from_true_trends(true_trends, expected):
+    """
+    Test overall trend resolution.
+    """
+    assert get_trend_from_true_trends(true_trends) == expected
@@ -0,0 +1,102 @@
+"""
+Test asynchronous Telegram notifications.
+"""
+import threading
+import time
+
+import pytest
+
+from algobot.telegram_bot.bot import TelegramBot
+from algobot.telegram_bot.notifications import NotificationQueue, split_message
+from tests.telegram_endpoint_mocker import FakeTelegramEndpoint
+
+
+@pytest.fixture(name='endpoint')
+def get_endpoint():
+    """
+    Starts a fake Telegram endpoint and stops it after the test.
+    """
+    endpoint = FakeTelegramEndpoint()
+    endpoint.start()
+    yield endpoint
+    endpoint.stop()
+
+
+def test_split_message():
+    """
+    Test that long messages are split on newlines when possible.
+    """
+    assert split_message('abc', max_length=5) == ['abc']
+    assert split_message('abc\ndefgh\nij', max_length=6) == ['abc', 'defgh', 'ij']
+    assert split_message('abcdefghij', max_length=4) == ['abcd', 'efgh', 'ij']
+
+
+def test_enqueue_does_not_block_and_coalesces():
+    """
+    Test that enqueueing returns while a delivery is in progress and that messages queued meanwhile are coalesced.
+    """
+    release = threading.Event()
+    deliveries = []
+
+    def send(chat_id, message):
+        deliveries.append((chat_id, message))
+        release.wait(5)
+
+    queue = NotificationQueue(send, rate_limit_interval=0)
+    queue.enqueue('1', 'first')
+    while not deliveries:
+        time.sleep(0.01)
+
+    start = time.monotonic()
+    for index in range(2, 6):
+        queue.enqueue('1', f'message {index}')
+    assert time.monotonic() - start < 0.5
+
+    release.set()
+    assert queue.flush(timeout=5)
+    assert deliveries == [('1', 'first'), ('1', 'message 2\n\nmessage 3\n\nmessage 4\n\nmessage 5')]
+    queue.stop()
+
+
+def test_drops_after_retries():
+    """
+    Test that a message that can't be delivered is dropped after the maximum retries.
+    """
+    attempts = []
+
+    def send(chat_id, message):
+        attempts.append((chat_id, message))
+        raise ConnectionError("Telegram is down.")
+
+    queue = NotificationQueue(send, rate_limit_interval=0, max_retries=2, backoff_base=0.01)
+    queue.enqueue('1', 'lost')
+    assert queue.flush(timeout=5)
+    assert len(attempts) == 3
+    queue.stop()
+
+
+@pytest.mark.enable_socket
+def test_telegram_bot_delivery(endpoint: FakeTelegramEndpoint):
+    """
+    Test delivery through the Telegram bot to a fake endpoint with retries and per-chat rate limiting.
+    """
+    telegram_bot = TelegramBot(gui=None, token='123456:TEST-TOKEN', base_url=endpoint.base_url)
+    telegram_bot.notifications.rate_limit_interval = 0.3
+    telegram_bot.notifications.backoff_base = 0.05
+
+    endpoint.add_failure(500, 'Internal Server Error')
+    endpoint.add_failure(429, 'Too Many Requests: retry after 1', retry_after=1)
+
+    telegram_bot.send_message('1', 'Retried.')
+    assert telegram_bot.notifications.flush(timeout=10)
+    assert endpoint.requests == 3
+    assert [text for _, text in endpoint.messages['1']] == ['Retried.']
+
+    for index in range(3):
+        telegram_bot.send_message('2', f'Message {index}.')
+        time.sleep(0.35)
+
+    telegram_bot.stop()
+    times = [delivery_time for delivery_time, _ in endpoint.messages['2']]
+    assert len(times) == 3
+    assert all(later - earlier >= 0.3 for earlier, later in zip(times, times[1:]))
@@ -0,0 +1,135 @@
+"""
+Test trade journal.
+"""
+import csv
+import time
+from datetime import datetime, timezone
+
+import pytest
+
+from algobot.trade_journal import TRADE_JOURNAL_HEADERS, TradeJournal, get_history_row
+from algobot.traders.real_trader import RealTrader
+
+
+def get_trade(trade_time: float, symbol: str = 'BTCUSDT', profit: float = 0) -> dict:
+    """
+    Get a dummy journal trade.
+    :param trade_time: Epoch time of trade.
+    :param symbol: Symbol of trade.
+    :param profit: Profit of trade.
+    :return: Dictionary containing journal trade.
+    """
+    return {
+        'time': trade_time,
+        'symbol': symbol,
+        'order_id': f'order-{trade_time}',
+        'action': 'Bought long because a bullish trend was detected.',
+        'method': 'Automation',
+        'price': 123.45,
+        'quantity': 0.5,
+        'fee': 0.06,
+        'fee_asset': None,
+        'net': 1000 + profit,
+        'profit': profit,
+        'profit_percentage': profit / 10,
+        'fill_price': 123.5,
+        'signal_latency': 0.2,
+        'request_latency': 85.0,
+        'fill_latency': 40.0,
+    }
+
+
+@pytest.fixture(name='journal')
+def get_journal(tmp_path) -> TradeJournal:
+    """
+    Get a trade journal in a temporary directory.
+    """
+    return TradeJournal(str(tmp_path / 'journal.db'))
+
+
+def test_trades_persist(journal: TradeJournal):
+    """
+    Test that trades are persisted with their types and survive reopening the journal.
+    """
+    assert journal.add_trade(get_trade(2)) == 1
+    assert journal.add_trade(get_trade(1, symbol='ETHUSDT')) == 2
+
+    reopened = TradeJournal(journal.database_file)
+    assert reopened.get_row_count() == 2
+
+    rows = reopened.get_rows()
+    assert [row['time'] for row in rows] == [1, 2]
+    assert rows[1] == {'id': 1, **get_trade(2)}
+    assert isinstance(rows[1]['price'], float)
+
+
+def test_filters(journal: TradeJournal):
+    """
+    Test filtering trades by symbol and start time.
+    """
+    for trade_time in range(5):
+        journal.add_trade(get_trade(trade_time, symbol='BTCUSDT' if trade_time % 2 else 'ETHUSDT'))
+
+    assert [row['time'] for row in journal.get_rows(symbol='BTCUSDT')] == [1, 3]
+    assert [row['time'] for row in journal.get_rows(start_time=3)] == [3, 4]
+    assert journal.get_dataframe(symbol='ETHUSDT', start_time=1)['time'].tolist() == [2, 4]
+
+
+def test_export(journal: TradeJournal, tmp_path):
+    """
+    Test that exported trades have headers and can be converted to trade history table rows.
+    """
+    trade_time = datetime(2021, 1, 1, tzinfo=timezone.utc).timestamp()
+    journal.add_trade(get_trade(trade_time, profit=12.345))
+    file_path = str(tmp_path / 'trades.csv')
+    journal.export(file_path, 'CSV')
+
+    with open(file_path, encoding='utf-8') as f:
+        reader = csv.DictReader(f)
+        assert reader.fieldnames == list(TRADE_JOURNAL_HEADERS.values())
+        exported_rows = list(reader)
+
+    column_names = {header: name for name, header in TRADE_JOURNAL_HEADERS.items()}
+    row = {column_names[header]: value for header, value in exported_rows[0].items()}
+    assert get_history_row(row) == ['2021-01-01 00:00:00', f'order-{trade_time}', 'BTCUSDT', '$123.45', '1.23%',
+                                    '$12.35', 'Automation', 'Bought long because a bullish trend was detected.']
+
+    with pytest.raises(TypeError):
+        journal.export(file_path, 'TXT')
+
+
+def test_history_row_time(monkeypatch):
+    """
+    Test that journal times are shown in UTC regardless of the machine's time zone.
+    """
+    monkeypatch.setenv('TZ', 'America/New_York')
+    if hasattr(time, 'tzset'):  # Not available on Windows.
+        time.tzset()
+
+    try:
+        assert get_history_row(get_trade(1609459200))[0] == '2021-01-01 00:00:00'  # Epoch of 2021-01-01 UTC.
+    finally:
+        monkeypatch.undo()
+        if hasattr(time, 'tzset'):
+            time.tzset()
+
+
+def test_order_fill_details():
+    """
+    Test that the executed quantity and fees are retrieved from order responses.
+    """
+    order = {
+        'executedQty': '0.30000000',
+        'fills': [
+            {'price': '100', 'qty': '0.1', 'commission': '0.0001', 'commissionAsset': 'BTC'},
+            {'price': '101', 'qty': '0.2', 'commission': '0.0002', 'commissionAsset': 'BTC'},
+        ]
+    }
+    details = RealTrader.get_order_fill_details(order)
+    assert details['quantity'] == 0.3
+    assert details['fee'] == pytest.approx(0.0003)
+    assert details['fee_asset'] == 'BTC'
+
+    order['fills'][1]['commissionAsset'] = 'BNB'
+    assert RealTrader.get_order_fill_details(order)['fee'] is None
+    assert RealTrader.get_order_fill_details({}) == {'quantity': None, 'fee': None, 'fee_asset': None}
@@ -0,0 +1,181 @@
+"""
+Test incremental trade statistics.
+"""
+from unittest import mock
+
+import pytest
+
+from algobot.enums import LONG, STOP, TRAILING
+from algobot.helpers import get_normalized_data
+from algobot.trade_statistics import GroupedStatistics, TradeStatistics, get_page
+from algobot.traders.simulation_trader import SimulationTrader
+from tests.binance_client_mocker import BinanceMockClient
+
+
+def test_round_trips():
+    """
+    Test that round trips are measured from the net before the entry to the net after the exit.
+    """
+    statistics = TradeStatistics()
+    assert statistics.get_win_rate() is None
+    assert statistics.get_average_profit() is None
+
+    statistics.add_trade(1000, 999, exited_position=False)
+    statistics.add_trade(999, 1100, exited_position=True)
+    statistics.add_trade(1100, 1099, exited_position=False)
+    statistics.add_trade(1099, 1045, exited_position=True)
+
+    assert statistics.trades == 4
+    assert statistics.round_trips == 2
+    assert statistics.wins == 1
+    assert statistics.losses == 1
+    assert statistics.get_win_rate() == 50
+    assert statistics.get_average_profit() == pytest.approx(22.5)
+    assert statistics.best_profit_percentage == pytest.approx(10)
+    assert statistics.worst_profit_percentage == pytest.approx(-5)
+    assert statistics.get_average_profit_percentage() == pytest.approx(2.5)
+
+
+def test_daily_percentages():
+    """
+    Test daily net change aggregates.
+    """
+    statistics = TradeStatistics()
+    for percentage in (1, -3, 5):
+        statistics.add_daily_percentage(percentage)
+
+    assert statistics.get_average_daily_percentage() == 1
+    assert statistics.best_daily_percentage == 5
+    assert statistics.worst_daily_percentage == -3
+
+    dictionary = statistics.get_statistics_dictionary()
+    assert dictionary['averageDailyPercentage'] == '1.0%'
+    assert dictionary['winRate'] == 'None'
+
+
+@pytest.mark.parametrize(
+    'page, expected',
+    [
+        (None, ([20, 21, 22], 3, 3)),
+        (1, (list(range(10)), 1, 3)),
+        (2, (list(range(10, 20)), 2, 3)),
+        (0, (list(range(10)), 1, 3)),
+        (7, ([20, 21, 22], 3, 3)),
+    ]
+)
+def test_get_page(page, expected):
+    """
+    Test that pages default to the latest items and out of range pages are clamped.
+    """
+    assert get_page(list(range(23)), page) == expected
+
+
+def test_get_page_empty():
+    """
+    Test that an empty list has a single empty page.
+    """
+    assert get_page([]) == ([], 1, 1)
+
+
+def test_grouped_statistics():
+    """
+    Test that only values set to something new are emitted while every category is kept.
+    """
+    statistics = GroupedStatistics()
+    statistics.update('general', {'net': '$1', 'profit': '$0'})
+    statistics.update('tradeStatistics', {'wins': '0'})
+    assert statistics.pop_changes() == {'general': {'net': '$1', 'profit': '$0'}, 'tradeStatistics': {'wins': '0'}}
+
+    statistics.set('general', 'net', '$2')
+    statistics.set('general', 'profit', '$0')
+    assert statistics.pop_changes() == {'general': {'net': '$2'}, 'tradeStatistics': {}}
+    assert statistics.pop_changes() == {'general': {}, 'tradeStatistics': {}}
+
+    statistics.set('rsi', 'value', '50')
+    assert statistics.pop_changes() == {'general': {'net': '$2', 'profit': '$0'}, 'tradeStatistics': {'wins': '0'},
+                                        'rsi': {'value': '50'}}
+
+    statistics.remove('rsi')
+    assert statistics.pop_changes() == {'general': {'net': '$2', 'profit': '$0'}, 'tradeStatistics': {'wins': '0'}}
+
+    assert statistics.is_stale('general', (1,)) is True
+    assert statistics.is_stale('general', (1,)) is False
+    assert statistics.is_stale('general', (2,)) is True
+    assert statistics.is_stale('takeProfit', (2,)) is True  # Categories that don't exist are always stale.
+    assert statistics.is_stale('takeProfit', (2,)) is True
+
+
+def test_update_grouped_statistics():
+    """
+    Test that traders only rebuild categories whose state changed, and that the values match the full statistics.
+    """
+    with mock.patch('binance.client.Client', BinanceMockClient):
+        trader = SimulationTrader(symbol='ALGOBOTUSDT', load_data=False)
+
+    trader.data_view.current_values = get_normalized_data(['2021-01-01 00:00:00', 10, 12, 9, 11, 100, 1100, 50, 40,
+                                                           440], parse_date=True)
+    trader.current_price = 11
+    trader.current_position = LONG
+    trader.buy_long_price = 10
+    trader.loss_strategy = STOP
+    trader.loss_percentage_decimal = 0.1
+
+    statistics = GroupedStatistics()
+    trader.update_grouped_statistics(statistics)
+    assert statistics.pop_changes() == trader.get_grouped_statistics()
+
+    trader.update_grouped_statistics(statistics)
+    assert all(values == {} for values in statistics.pop_changes().values())
+
+    trader.current_price = 12
+    with mock.patch.object(trader, 'get_general_statistics') as get_general_statistics, \
+            mock.patch.object(trader, 'get_stop_loss_statistics') as get_stop_loss_statistics:
+        trader.update_grouped_statistics(statistics)
+    get_general_statistics.assert_not_called()
+    get_stop_loss_statistics.assert_not_called()
+
+    changes = statistics.pop_changes()
+    assert changes['general'] == {'tickerPrice': '$12'}
+    assert changes['stopLoss'] == {'ALGOBOTUSDT': '$12'}
+    assert changes['tradeStatistics'] == {}
+    assert statistics.values == trader.get_grouped_statistics()
+
+    # Trailing stop losses move with the price without the other stop loss values being rebuilt.
+    trader.loss_strategy = TRAILING
+    trader.long_trailing_price = 12
+    trader.update_grouped_statistics(statistics)
+    statistics.pop_changes()
+    trader.current_price = 15
+    with mock.patch.object(trader, 'get_stop_loss_statistics') as get_stop_loss_statistics:
+        trader.update_grouped_statistics(statistics)
+    get_stop_loss_statistics.assert_not_called()
+    assert statistics.pop_changes()['stopLoss'] == {'stopLossPoint': '$13.5', 'ALGOBOTUSDT': '$15',
+                                                    'previousStopLossPoint': '$13.5', 'longTrailingPrice': '$15'}
+    assert statistics.values == trader.get_grouped_statistics()
+
+    trader.loss_strategy = None
+    trader.update_grouped_statistics(statistics)
+    assert statistics.pop_changes() == trader.get_grouped_statistics()
+
+
+def test_removed_strategy_statistics():
+    """
+    Test that the statistics of strategies no longer traded are removed.
+    """
+    with mock.patch('binance.client.Client', BinanceMockClient):
+        trader = SimulationTrader(symbol='ALGOBOTUSDT', load_data=False)
+
+    trader.current_price = 11
+    strategy = mock.Mock(trend=None)
+    trader.strategies = {'RSI': strategy, 'MACD': strategy}
+
+    statistics = GroupedStatistics()
+    statistics.update('loopProfile', {'loop': '1 ms'})
+    trader.update_grouped_statistics(statistics)
+    assert {'RSI', 'MACD', 'loopProfile'} <= statistics.pop_changes().keys()
+
+    del trader.strategies['MACD']
+    trader.update_grouped_statistics(statistics)
+    changes = statistics.pop_changes()
+    assert 'MACD' not in changes
+    assert {'RSI', 'loopProfile'} <= changes.keys()
@@ -0,0 +1,160 @@
+"""
+Test crash recovery snapshots.
+"""
+from unittest import mock
+
+import numpy as np
+import pytest
+
+from algobot.enums import LONG, SHORT
+from algobot.helpers import get_normalized_data
+from algobot.trader_snapshot import TraderSnapshotter, is_compatible, restore_data, restore_trader
+from algobot.traders.simulation_trader import SimulationTrader
+from tests.binance_client_mocker import BinanceMockClient
+
+SYMBOL = 'ALGOBOTUSDT'
+
+
+def get_trader(interval: str = '1h', hours: int = 24, persisted_hours: int = 20) -> SimulationTrader:
+    """
+    Get a simulation trader with a mocked Binance client and some candle data.
+    :param interval: Interval of trader.
+    :param hours: Amount of hourly candles of the data.
+    :param persisted_hours: Amount of candles stored in the database.
+    :return: Simulation trader.
+    """
+    with mock.patch('binance.client.Client', BinanceMockClient):
+        trader = SimulationTrader(symbol=SYMBOL, interval=interval, load_data=False)
+
+    trader.data_view.data = [
+        get_normalized_data([f'2021-01-01 {hour:02}:00:00', 10 + hour, 12 + hour, 9 + hour, 11 + hour, 100, 1100,
+                             50, 40, 440], parse_date=True)
+        for hour in range(hours)
+    ]
+    trader.data_view.persisted_date = trader.data_view.data[persisted_hours - 1]['date_utc']
+    trader.data_view.current_values = dict(trader.data_view.data[-1])
+    return trader
+
+
+def set_state(trader: SimulationTrader):
+    """
+    Put the trader in a long position with trailing and smart stop loss state.
+    :param trader: Trader to put in a position.
+    """
+    trader.balance = 0
+    trader.coin = 2.5
+    trader.current_position = LONG
+    trader.buy_long_price = 30
+    trader.long_trailing_price = 42.5
+    trader.previous_stop_loss = 28
+    trader.smart_stop_loss_counter = 3
+    trader.custom_stop_loss = 25
+    trader.trades.append({'date': None, 'action': 'Bought long.'})
+    trader.trade_statistics.add_trade(1000, 999, exited_position=False)
+    trader.data_view.get_input_arrays_dict()  # Builds the input buffer.
+
+
+@pytest.fixture(name='snapshotter')
+def get_snapshotter(tmp_path) -> TraderSnapshotter:
+    """
+    Get a snapshotter writing to a temporary directory.
+    """
+    return TraderSnapshotter(str(tmp_path / 'snapshot.pickle'))
+
+
+def test_restore(snapshotter: TraderSnapshotter):
+    """
+    Test that a restored trader has the same state and input arrays as the trader snapshotted, and that only candles
+    not in the database are snapshotted.
+    """
+    trader = get_trader()
+    set_state(trader)
+    snapshotter.save(trader)
+    expected_arrays = {key: value.copy() for key, value in trader.data_view.get_input_arrays_dict().items()}
+
+    restored = get_trader(hours=20)  # Loaded from the database.
+    snapshot = snapshotter.load()
+    assert len(snapshot['data']['tail']) == 4
+    assert is_compatible(restored, snapshot)
+    assert not is_compatible(get_trader(interval='15m'), snapshot)
+
+    with mock.patch.object(restored.data_view, 'dump_to_table') as dump_to_table:
+        assert restore_data(restored, snapshot) == 4
+    dump_to_table.assert_called_once_with(snapshot['data']['tail'])
+    assert restore_trader(restored, snapshot)
+
+    for attribute in ('balance', 'coin', 'current_position', 'buy_long_price', 'long_trailing_price',
+                      'previous_stop_loss', 'smart_stop_loss_counter', 'custom_stop_loss', 'trades'):
+        assert getattr(restored, attribute) == getattr(trader, attribute)
+    assert restored.trade_statistics.entry_net == 1000
+
+    data_view = restored.data_view
+    assert data_view.data == trader.data_view.data
+    for key, array in data_view.get_input_arrays_dict().items():
+        np.testing.assert_array_equal(array, expected_arrays[key])
+
+
+def test_restore_with_gap(snapshotter: TraderSnapshotter):
+    """
+    Test that snapshotted candles aren't restored if candles between them and the database are missing.
+    """
+    snapshotter.save(get_trader())
+    restored = get_trader(hours=18, persisted_hours=18)
+    with mock.patch.object(restored.data_view, 'dump_to_table') as dump_to_table:
+        assert restore_data(restored, snapshotter.load()) == 0
+    dump_to_table.assert_not_called()
+    assert len(restored.data_view.data) == 18
+
+
+def test_restore_without_balances(snapshotter: TraderSnapshotter):
+    """
+    Test that position state isn't restored without balances when the position changed.
+    """
+    trader = get_trader()
+    set_state(trader)
+    snapshotter.save(trader)
+    snapshot = snapshotter.load()
+
+    restored = get_trader()
+    restored.current_position = SHORT
+    assert not restore_trader(restored, snapshot, restore_balances=False)
+    assert restored.current_position == SHORT
+    assert restored.long_trailing_price is None
+    assert restored.balance == 1000
+    assert restored.trades == trader.trades
+
+    restored.current_position = LONG
+    assert restore_trader(restored, snapshot, restore_balances=False)
+    assert restored.long_trailing_price == 42.5
+    assert restored.balance == 1000
+
+
+def test_save_if_due(snapshotter: TraderSnapshotter):
+    """
+    Test that snapshots are written periodically and after trades.
+    """
+    trader = get_trader()
+    assert snapshotter.save_if_due(trader)
+    assert not snapshotter.save_if_due(trader)
+
+    trader.trades.append({'date': None, 'action': 'Bought long.'})
+    assert snapshotter.save_if_due(trader)
+
+    snapshotter.interval = 0
+    assert snapshotter.save_if_due(trader)
+
+
+def test_load_missing_or_corrupt(snapshotter: TraderSnapshotter):
+    """
+    Test that missing and corrupt snapshots aren't loaded, and that deleting a snapshot removes it.
+    """
+    assert snapshotter.load() is None
+
+    with open(snapshotter.file_path, 'wb') as f:
+        f.write(b'corrupt')
+    assert snapshotter.load() is None
+
+    snapshotter.save(get_trader())
+    assert snapshotter.load() is not None
+    snapshotter.delete()
+    assert snapshotter.load() is None
@@ -0,0 +1,205 @@
+"""
+Test user data stream reconciliation of real traders with a replayed stream.
+"""
+from typing import Callable, Dict, List, Optional
+from unittest import mock
+
+import pytest
+
+from algobot.enums import LONG
+from algobot.traders.real_trader import RealTrader
+from tests.binance_client_mocker import BinanceAccountMockClient, BinanceMockClient
+
+SYMBOL = 'ALGOBOTUSDT'
+
+
+class ReplayWebsocketManager:
+    """
+    Stand-in for python-binance's ThreadedWebsocketManager that replays events to the socket's callback.
+    """
+    def __init__(self):
+        self.running = False
+        self.callback: Optional[Callable[[dict], None]] = None
+        self.sockets: List[str] = []
+        self.stopped_sockets: List[str] = []
+
+    def start(self):
+        """
+        Start the manager.
+        """
+        self.running = True
+
+    def stop(self):
+        """
+        Stop the manager.
+        """
+        self.running = False
+
+    def start_margin_socket(self, callback: Callable[[dict], None]) -> str:
+        """
+        Start a cross margin user data socket.
+        """
+        self.callback = callback
+        self.sockets.append(f'margin_socket_{len(self.sockets)}')
+        return self.sockets[-1]
+
+    def start_isolated_margin_socket(self, callback: Callable[[dict], None], symbol: str) -> str:
+        """
+        Start an isolated margin user data socket.
+        """
+        self.callback = callback
+        self.sockets.append(f'isolated_margin_socket_{symbol}_{len(self.sockets)}')
+        return self.sockets[-1]
+
+    def stop_socket(self, socket_name: str):
+        """
+        Stop a socket.
+        """
+        self.stopped_sockets.append(socket_name)
+
+    def replay(self, *events: dict):
+        """
+        Push events to the socket's callback.
+        """
+        for event in events:
+            self.callback(event)
+
+
+def get_execution_report(client_order_id: str, status: str, executed: float, symbol: str = SYMBOL) -> dict:
+    """
+    Get an execution report event of a limit buy order of 2 coins.
+    :param client_order_id: Client order ID.
+    :param status: Order status.
+    :param executed: Cumulative executed quantity.
+    :param symbol: Symbol of the order.
+    :return: Execution report dictionary.
+    """
+    return {'e': 'executionReport', 's': symbol, 'c': client_order_id, 'S': 'BUY', 'o': 'LIMIT', 'X': status,
+            'i': 7, 'p': '1200.00', 'q': '2.00', 'z': str(executed)}
+
+
+def get_account_position(balances: Dict[str, float]) -> dict:
+    """
+    Get an account position event with the free balances provided.
+    :param balances: Free balances keyed by asset.
+    :return: Account position dictionary.
+    """
+    return {'e': 'outboundAccountPosition', 'B': [{'a': asset, 'f': str(free), 'l': '0'}
+                                                  for asset, free in balances.items()]}
+
+
+@pytest.fixture(name='manager')
+def get_manager() -> ReplayWebsocketManager:
+    """
+    Get a replay websocket manager.
+    """
+    return ReplayWebsocketManager()
+
+
+@pytest.fixture(name='trader')
+def get_trader(manager: ReplayWebsocketManager) -> RealTrader:
+    """
+    Get a real trader consuming the replayed user data stream.
+    """
+    with mock.patch('binance.client.Client', BinanceMockClient), \
+            mock.patch('algobot.traders.real_trader.Client', BinanceAccountMockClient):
+        trader = RealTrader(api_key='key', api_secret='secret', symbol=SYMBOL, load_data=False)
+
+    trader.start_user_data_stream(manager)
+    trader.user_data_stream.sleep = lambda _seconds: None
+    return trader
+
+
+def test_pushed_balances(trader: RealTrader, manager: ReplayWebsocketManager):
+    """
+    Test that pushed balances update the trader without any requests, even across cycles.
+    """
+    client = trader.binance_client
+    assert manager.running and trader.is_streaming()
+    assert client.requests['margin'] == 2  # Initialization and the resync after subscribing.
+
+    manager.replay(get_account_position({'USDT': 4000, 'ALGOBOT': 0.8, 'BNB': 1}))
+    trader.invalidate_account_snapshot()  # Start of a new cycle.
+    assert trader.balance == 4000
+    assert trader.coin == 0.8
+    assert trader.get_margin_usdt() == 4000
+    assert trader.get_borrowed_margin_coin() == 0
+    assert client.requests['margin'] == 2
+
+    manager.replay({'e': 'USER_LIABILITY_CHANGE', 'a': 'ALGOBOT', 't': 'BORROW', 'p': '1', 'i': '0'})
+    trader.get_borrowed_margin_coin()
+    assert client.requests['margin'] == 3
+
+
+def test_open_orders(trader: RealTrader, manager: ReplayWebsocketManager):
+    """
+    Test that open orders of the trader's symbol are tracked from execution reports.
+    """
+    manager.replay(get_execution_report('a', 'NEW', 0), get_execution_report('b', 'NEW', 0),
+                   get_execution_report('c', 'NEW', 0, symbol='ETHUSDT'))
+    assert set(trader.get_open_orders()) == {'a', 'b'}
+
+    manager.replay(get_execution_report('a', 'PARTIALLY_FILLED', 0.5))
+    assert trader.get_open_orders()['a']['executed'] == 0.5
+    assert trader.get_open_orders()['a']['status'] == 'PARTIALLY_FILLED'
+
+    manager.replay(get_execution_report('a', 'FILLED', 2), get_execution_report('b', 'CANCELED', 0))
+    assert trader.get_open_orders() == {}
+
+
+def test_reconnect_recovers_position(trader: RealTrader, manager: ReplayWebsocketManager):
+    """
+    Test that a reconnect restarts the socket and recovers the position, keeping trailing state of the same position.
+    """
+    client = trader.binance_client
+    client.margin['ALGOBOT']['free'] = 2.0  # Filled while the stream was down, so it was never pushed.
+    manager.replay({'e': 'error', 'm': 'Max reconnect retries reached'})
+
+    assert manager.stopped_sockets == ['margin_socket_0']
+    assert manager.sockets == ['margin_socket_0', 'margin_socket_1']
+    assert trader.user_data_stream.reconnect_count == 1
+    assert trader.current_position == LONG
+    assert trader.coin == 2
+
+    trader.long_trailing_price = 1300
+    manager.replay({'e': 'error', 'm': 'Max reconnect retries reached'})
+    assert trader.current_position == LONG
+    assert trader.long_trailing_price == 1300
+
+
+def test_reconnect_backoff(trader: RealTrader, manager: ReplayWebsocketManager):
+    """
+    Test that reconnects back off, that events reset the backoff, and that too many consecutive failures fall back to
+    polling.
+    """
+    stream = trader.user_data_stream
+    stream.retry_policy.random_function = lambda: 1  # Delays without jitter.
+    delays = []
+    stream.sleep = delays.append
+    error = {'e': 'error', 'm': 'Connection lost'}
+
+    manager.replay(error, error)
+    assert delays == [1, 2]
+    manager.replay(get_account_position({'USDT': 4000}))
+    assert trader.is_streaming()
+
+    with mock.patch.object(trader, 'resync_account', side_effect=ConnectionError('Connection reset.')):
+        manager.replay(error)  # Reconnects keep failing, so the fifth consecutive failure stops the stream.
+    assert delays == [1, 2, 1, 2, 4, 8]
+    assert not manager.running
+    assert not trader.is_streaming()
+    assert len(manager.sockets) == 7
+
+
+def test_stop(trader: RealTrader, manager: ReplayWebsocketManager):
+    """
+    Test that account state is fetched over REST again once the stream is stopped.
+    """
+    trader.stop_user_data_stream()
+    assert not manager.running
+    assert not trader.is_streaming()
+    assert trader.get_open_orders() == {}
+
+    trader.invalidate_account_snapshot()
+    trader.get_margin_usdt()
+    assert trader.binance_client.requests['margin'] == 3
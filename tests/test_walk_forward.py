@@ -0,0 +1,141 @@
+"""
+Test walk-forward analysis.
+"""
+import copy
+import os
+
+import pytest
+
+from algobot.helpers import convert_all_dates_to_datetime, load_from_csv
+from algobot.traders.backtester import Backtester
+from algobot.walk_forward import IndicatorCache, WalkForward, WalkForwardWindow, get_walk_forward_windows
+
+data_path = os.path.join(os.path.dirname(__file__), 'data', '1INCHUSDT_data_1m.csv')
+test_data = load_from_csv(path=data_path, descending=False)[:600]
+convert_all_dates_to_datetime(test_data)
+
+
+def get_strategy(timeperiod=14) -> dict:
+    """
+    Get a simple RSI strategy.
+    :param timeperiod: RSI time period.
+    :return: Strategy dictionary.
+    """
+    return {
+        'name': 'Test',
+        'Enter Long': {'a': {'indicator': 'RSI', 'operator': '<', 'against': 40, 'price': 'Close',
+                             'timeperiod': timeperiod, 'output': 'real'}},
+        'Exit Long': {'b': {'indicator': 'RSI', 'operator': '>', 'against': 60, 'price': 'Close',
+                            'timeperiod': timeperiod, 'output': 'real'}},
+    }
+
+
+def get_combos() -> dict:
+    """
+    Get optimizer combos for the test strategy.
+    :return: Combos dictionary.
+    """
+    strategy = get_strategy()
+    strategy['Enter Long']['a']['timeperiod'] = [10, 14, 4]
+    return {
+        'lossType': ['Trailing'],
+        'lossPercentage': [5, 10, 5],
+        'strategyIntervals': ['1 Minute'],
+        'strategies': {'Test': strategy}
+    }
+
+
+def test_get_walk_forward_windows():
+    """
+    Test rolling walk-forward window generation.
+    """
+    windows = get_walk_forward_windows(100, in_sample_periods=40, out_of_sample_periods=20)
+    assert windows == [
+        WalkForwardWindow(1, 0, 39, 40, 59),
+        WalkForwardWindow(2, 20, 59, 60, 79),
+        WalkForwardWindow(3, 40, 79, 80, 99),
+    ]
+
+    assert len(get_walk_forward_windows(100, 40, 20, step_periods=10)) == 5
+
+    with pytest.raises(ValueError, match="Not enough data for a single walk-forward window."):
+        get_walk_forward_windows(50, 40, 20)
+
+    with pytest.raises(ValueError, match="Walk-forward window sizes and steps must be positive."):
+        get_walk_forward_windows(100, 40, 0)
+
+
+@pytest.mark.parametrize('strategy_interval', ['1m', '5m'])
+def test_shared_indicator_cache(strategy_interval: str):
+    """
+    Test that backtests sharing an indicator cache produce the same trades, strategy values, and plot values as ones
+    that don't.
+    :param strategy_interval: Strategy interval of the backtests.
+    """
+    def run_backtest(indicator_cache):
+        backtester = Backtester(starting_balance=1000, data=copy.deepcopy(test_data), strategies=[get_strategy()],
+                                strategy_interval=strategy_interval, symbol='1INCHUSDT', output_trades=False)
+        backtester.indicator_cache = indicator_cache
+        backtester.start_backtest()
+        trades = [(trade['date'], trade['action']) for trade in backtester.trades]
+        return trades, backtester.get_net(), backtester.strategies['Test'].get_tick_output()
+
+    indicator_cache = {}
+    expected = run_backtest(None)
+    assert len(expected[0]) > 0 and expected[2][0]['regular']
+    assert run_backtest(indicator_cache) == expected
+    assert len(indicator_cache) > 0
+    assert run_backtest(indicator_cache) == expected  # Now everything should come from the cache.
+
+    indicator_cache = IndicatorCache(max_ticks=50)
+    assert run_backtest(indicator_cache) == expected
+    assert len(indicator_cache) == 50
+
+
+def test_indicator_cache_bound():
+    """
+    Test that the indicator cache evicts the least recently used ticks over its maximum.
+    """
+    indicator_cache = IndicatorCache(max_ticks=2)
+    first = indicator_cache.setdefault(('tick', 1), {})
+    indicator_cache.setdefault(('tick', 2), {})
+    assert indicator_cache.setdefault(('tick', 1), {}) is first
+    indicator_cache.setdefault(('tick', 3), {})
+    assert list(indicator_cache) == [('tick', 1), ('tick', 3)]
+
+
+def test_walk_forward():
+    """
+    Test that a walk-forward analysis stitches every out-of-sample window.
+    """
+    walk_forward = WalkForward(data=copy.deepcopy(test_data), starting_balance=1000, in_sample_periods=300,
+                               out_of_sample_periods=100, symbol='1INCHUSDT', max_workers=1)
+    result = walk_forward.run(get_combos())
+
+    assert len(result.windows) == 3
+    assert all(window['runs'] == 4 for window in result.windows)
+    assert result.equity_curve[-1][0] == test_data[-1]['date_utc']
+
+    expected_balance = 1000
+    for window in result.windows:
+        expected_balance *= 1 + window['out_of_sample_profit_percentage'] / 100
+
+    assert result.ending_balance == pytest.approx(expected_balance)
+    assert result.get_profit_percentage() == pytest.approx(expected_balance / 10 - 100)
+
+
+def test_parallel_walk_forward():
+    """
+    Test that distributing (window, settings) tasks over workers gives the same result as running them in process.
+    """
+    def run_walk_forward(max_workers: int):
+        walk_forward = WalkForward(data=copy.deepcopy(test_data), starting_balance=1000, in_sample_periods=300,
+                                   out_of_sample_periods=100, symbol='1INCHUSDT', max_workers=max_workers)
+        return walk_forward.run(get_combos())
+
+    expected = run_walk_forward(max_workers=1)
+    result = run_walk_forward(max_workers=2)
+    assert result.ending_balance == pytest.approx(expected.ending_balance)
+    assert [window['settings'] for window in result.windows] == [window['settings'] for window in expected.windows]
+    assert [window['in_sample_profit_percentage'] for window in result.windows] == \
+        pytest.approx([window['in_sample_profit_percentage'] for window in expected.windows])
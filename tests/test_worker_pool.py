@@ -0,0 +1,143 @@
+"""
+Test the process-isolated worker pool.
+"""
+import copy
+import os
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+from algobot.candle_cache import CandleRows
+from algobot.helpers import convert_all_dates_to_datetime, load_from_csv
+from algobot.traders.backtester import ISOLATED_WORKER_STATE, Backtester, initialize_isolated_worker
+from algobot.worker_pool import DIED, ERROR, OK, OUT_OF_MEMORY, TIMEOUT, IsolatedWorkerPool
+
+data_path = os.path.join(os.path.dirname(__file__), 'data', '1INCHUSDT_data_1m.csv')
+test_data = load_from_csv(path=data_path, descending=False)[:300]
+convert_all_dates_to_datetime(test_data)
+
+
+def run_task(kind: str, value: int) -> int:
+    """
+    Task for the worker pool that behaves according to its kind.
+    :param kind: Kind of task: square, raise, hang, allocate, or exit.
+    :param value: Value of the task.
+    :return: Square of the value.
+    """
+    if kind == 'raise':
+        raise ValueError(f"Bad value {value}.")
+    if kind == 'hang':
+        time.sleep(60)
+    if kind == 'allocate':
+        return len(bytearray(8 * 1024 ** 3))
+    if kind == 'exit':
+        os._exit(3)  # pylint: disable=protected-access
+
+    return value * value
+
+
+def test_failures_are_isolated():
+    """
+    Test that failing tasks only fail themselves and the other tasks still complete.
+    """
+    pool = IsolatedWorkerPool(max_workers=2, memory_limit_mb=4096, time_limit=2)
+    tasks = [('square', 2), ('raise', 3), ('hang', 4), ('allocate', 5), ('exit', 6), ('square', 7), ('square', 8)]
+    results = {result.index: result for result in pool.imap_unordered(run_task, tasks)}
+
+    assert sorted(results) == list(range(len(tasks)))
+    assert [results[index].status for index in range(len(tasks))] == [OK, ERROR, TIMEOUT, OUT_OF_MEMORY, DIED, OK, OK]
+    assert [results[index].value for index in (0, 5, 6)] == [4, 49, 64]
+    assert 'Bad value 3.' in results[1].error
+    assert results[4].error == 'Worker exited with code 3.'
+
+
+def test_isolated_optimizer():
+    """
+    Test that an optimizer run in isolated workers gives the same rows as one run in process.
+    """
+    strategy = {
+        'name': 'Test',
+        'Enter Long': {'a': {'indicator': 'RSI', 'operator': '<', 'against': 40, 'price': 'Close',
+                             'timeperiod': [10, 14, 4], 'output': 'real'}},
+        'Exit Long': {'b': {'indicator': 'RSI', 'operator': '>', 'against': 60, 'price': 'Close',
+                            'timeperiod': 14, 'output': 'real'}},
+    }
+    combos = {
+        'lossType': ['Trailing'],
+        'lossPercentage': [5, 10, 5],
+        'strategyIntervals': ['1 Minute'],
+        'strategies': {'Test': strategy}
+    }
+
+    def run_optimizer(isolated: bool) -> list:
+        backtester = Backtester(starting_balance=1000, data=copy.deepcopy(test_data), strategies=[],
+                                strategy_interval='1m', symbol='1INCHUSDT')
+        worker_pool = backtester.create_worker_pool(max_workers=2, time_limit=60) if isolated else None
+        backtester.optimize(copy.deepcopy(combos), store_file=os.path.join(tempfile.mkdtemp(), 'optimizer.db'),
+                            worker_pool=worker_pool)
+        if isolated:
+            # Workers build their data from the candle file instead of getting the data pickled.
+            initialize_isolated_worker(*worker_pool.initargs)
+            worker_data = ISOLATED_WORKER_STATE['backtester'].data
+            assert isinstance(worker_data, CandleRows) and isinstance(worker_data.array, np.memmap)
+            assert list(worker_data) == backtester.data
+            backtester.remove_worker_data_file()
+        df = backtester.optimizer_store.get_dataframe().sort_values('run')
+        return df[['run', 'profit_percentage', 'trades', 'result', 'settings']].values.tolist()
+
+    expected = run_optimizer(isolated=False)
+    assert len(expected) == 4
+    assert run_optimizer(isolated=True) == expected
+
+
+def test_isolated_optimizer_failure(tmp_path):
+    """
+    Test that rows of runs that fail in a worker are built from their own settings.
+    """
+    strategy = {
+        'name': 'Broken',
+        'Enter Long': {'a': {'indicator': 'NOT AN INDICATOR', 'operator': '<', 'against': 40, 'price': 'Close',
+                             'timeperiod': 14, 'output': 'bad'}},
+    }
+    combos = {
+        'lossType': ['Stop'],
+        'lossPercentage': [5, 10, 5],
+        'strategyIntervals': ['1m'],
+        'strategies': {'Broken': strategy}
+    }
+
+    backtester = Backtester(starting_balance=1000, data=copy.deepcopy(test_data), strategies=[],
+                            strategy_interval='1m', symbol='1INCHUSDT')
+    backtester.apply_loss_settings({'lossType': 'Trailing', 'lossPercentage': 50})
+    worker_pool = backtester.create_worker_pool(max_workers=1, time_limit=60)
+    try:
+        backtester.optimize(combos, store_file=os.path.join(tmp_path, 'optimizer.db'), worker_pool=worker_pool)
+    finally:
+        backtester.remove_worker_data_file()
+
+    rows = backtester.optimizer_store.get_rows()
+    assert [(row['run'], row['result'], row['stop_loss_strategy'], row['stop_loss_percentage']) for row in rows] == [
+        (1, 'CRASHED', 'Stop Loss', 5), (2, 'CRASHED', 'Stop Loss', 10)
+    ]
+    assert {(row['strategy_interval'], row['strategy'], row['trades']) for row in rows} == {
+        ('1 Minute', 'Strategies: Broken', 0)
+    }
+
+
+def test_terminate():
+    """
+    Test that terminating the pool from another thread kills its workers and stops the results.
+    """
+    pool = IsolatedWorkerPool(max_workers=2)
+    tasks = [('square', 2), ('hang', 3), ('hang', 4), ('hang', 5)]
+    results = []
+    start_time = time.monotonic()
+    for result in pool.imap_unordered(run_task, tasks):
+        results.append(result)
+        threading.Timer(0.5, pool.terminate).start()
+
+    assert [result.status for result in results] == [OK]
+    assert time.monotonic() - start_time < 30
+    assert not any(worker.process.is_alive() for worker in pool.workers.values())